@@ -46,7 +46,9 @@ def get_vector_potential(
 
     Note that the returned array has N+1 samples so that the derivative (the efield) will have N samples.
 
-    The numerical integration was replaces by a sum using the trapezoid rule using vectorized numpy operations
+    The numerical integration was replaces by a sum using the trapezoid rule using vectorized numpy operations.
+    Time bins to which no part of the shower contributes (i.e., for which the observer time is more than 20 ns
+    away from the retarded time of all profile positions) are skipped.
 
     Parameters
     ----------
@@ -147,9 +149,19 @@ def get_vector_potential(
     factor = -xmu / (4. * np.pi)
     fc = 4. * np.pi / (xmu * np.sin(cher))
 
+    # The retarded time of each profile position does not depend on the observer time, i.e.,
+    # tt = tobs - t_ret. Time bins for which all |tt| > 20 ns do not contribute (with a small margin
+    # to be insensitive to rounding)
+    t_ret = np.sort((length + xn * get_dist_shower(X, length)) / (beta * c))
+    t_margin = 20. * units.ns + 1e-3 * units.ns
+
     vp = np.zeros((N, 3))
     for it, t in enumerate(ttt):
         tobs = t + (get_dist_shower(X, 0) / c * xn)
+        if np.searchsorted(t_ret, tobs - t_margin) == np.searchsorted(t_ret, tobs + t_margin):
+            vp[it] = 0
+            continue
+
         z = length
 
         R = get_dist_shower(X, z)
@@ -278,6 +290,14 @@ def get_vector_potential(
 if numba_available:
     get_vector_potential_numba = jit(get_vector_potential, nopython=True, cache=True)
 
+
+def _get_random_integer(random_generator, high):
+    """ draws a random integer in [0, high) from a numpy Generator or a (legacy) RandomState """
+    if isinstance(random_generator, np.random.Generator):
+        return random_generator.integers(high)
+    return random_generator.randint(high)
+
+
 def thetaprime_to_theta(thetaprime, xmax, R_prime):
     """
     converts a viewing angle relative to the shower maximum to a viewing angle relative to the start of the shower.
@@ -495,7 +515,7 @@ class ARZ(object):
 
     def get_time_trace(self, shower_energy, theta, N, dt, shower_type, n_index, R, shift_for_xmax=False,
                        same_shower=False, iN=None, output_mode='trace', maximum_angle=20 * units.deg,
-                       profile_depth=None, profile_ce=None):
+                       profile_depth=None, profile_ce=None, random_generator=None):
         """
         calculates the electric-field Askaryan pulse from a charge-excess profile
 
@@ -544,6 +564,9 @@ class ARZ(object):
             if provided, the function will not use the library to get the profile but use the provided profile
         profile_ce: (optional) array of floats
             charge-excess values of the charge excess profile
+        random_generator: None or numpy.random.Generator
+            if provided, the random shower realization is drawn from this generator instead of the one
+            created from the seed
 
         Returns
         -------
@@ -562,6 +585,8 @@ class ARZ(object):
             profiles = self._library[shower_type][energies[iE]]
 
             N_profiles = len(profiles['charge_excess'])
+            if(random_generator is None):
+                random_generator = self._random_generator
 
             if(iN is None or np.isnan(iN)):
                 if(same_shower):
@@ -570,11 +595,11 @@ class ARZ(object):
                         logger.info("using previously used shower {}/{}".format(iN, N_profiles))
                     else:
                         logger.warning("no previous random number for shower type {} exists. Generating a new random number.".format(shower_type))
-                        iN = self._random_generator.randint(N_profiles)
+                        iN = _get_random_integer(random_generator, N_profiles)
                         self._random_numbers[shower_type] = iN
                         logger.info("picking profile {}/{} randomly".format(iN, N_profiles))
                 else:
-                    iN = self._random_generator.randint(N_profiles)
+                    iN = _get_random_integer(random_generator, N_profiles)
                     self._random_numbers[shower_type] = iN
                     logger.info("picking profile {}/{} randomly".format(iN, N_profiles))
             else:
@@ -591,7 +616,7 @@ class ARZ(object):
         xmax = profile_depth[np.argmax(profile_ce)]
 
         # Due to the oscillatory nature of the ARZ integral, some numerical instabilities arise
-        #  for angles near the axis and near 90 degrees. This creates some waveforms with large
+        # for angles near the axis and near 90 degrees. This creates some waveforms with large
         # spikes due to numerical errors, while the real electric field should be much smaller
         # than near the Cherenkov cone due to the loss of coherence. Since incoherent events
         # should not trigger, we return an empty trace for angular differences > 20 degrees.
@@ -1155,7 +1180,7 @@ class ARZ_tabulated(object):
         self._random_generator.seed(seed)
 
     def get_time_trace(self, shower_energy, theta, N, dt, shower_type, n_index, R,
-                       same_shower=False, iN=None, output_mode='trace', theta_reference='X0'):
+                       same_shower=False, iN=None, output_mode='trace', theta_reference='X0', random_generator=None):
         """
         calculates the electric-field Askaryan pulse from a charge-excess profile
 
@@ -1191,6 +1216,10 @@ class ARZ_tabulated(object):
             * 'X0': viewing angle relativ to start of the shower
             * 'Xmax': viewing angle is relativ to Xmax, internally it will be converted to be relative to X0
 
+        random_generator: None or numpy.random.Generator
+            if provided, the random shower realization is drawn from this generator instead of the one
+            created from the seed
+
         Returns
         -------
         efield_trace: array of floats
@@ -1206,6 +1235,8 @@ class ARZ_tabulated(object):
         logger.info("shower energy of {:.3g}eV requested, closest available energy is {:.3g}eV. The pulse amplitude will be rescaled accordingly by a factor of {:.2f}".format(shower_energy / units.eV, energies[iE] / units.eV, rescaling_factor))
         profiles = self._library[shower_type][energies[iE]]
         N_profiles = len(profiles.keys())
+        if(random_generator is None):
+            random_generator = self._random_generator
 
         if(iN is None):
             if(same_shower):
@@ -1214,11 +1245,11 @@ class ARZ_tabulated(object):
                     logger.info("using previously used shower {}/{}".format(iN, N_profiles))
                 else:
                     logger.warning("no previous random number for shower type {} exists. Generating a new random number.".format(shower_type))
-                    iN = self._random_generator.randint(N_profiles)
+                    iN = _get_random_integer(random_generator, N_profiles)
                     self._random_numbers[shower_type] = iN
                     logger.info("picking profile {}/{} randomly".format(iN, N_profiles))
             else:
-                iN = self._random_generator.randint(N_profiles)
+                iN = _get_random_integer(random_generator, N_profiles)
                 self._random_numbers[shower_type] = iN
                 logger.info("picking profile {}/{} randomly".format(iN, N_profiles))
         else:
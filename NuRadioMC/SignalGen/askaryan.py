@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from NuRadioReco.utilities import units, fft
+from NuRadioReco.utilities import profiling
 from NuRadioMC.SignalGen import parametrizations as par
 import logging
 logger = logging.getLogger("SignalGen.askaryan")
@@ -11,8 +12,9 @@ def set_log_level(level):
     par.set_log_level(level)
 
 
+@profiling.profile("askaryan.get_time_trace", category="signal")
 def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_factor=None, interp_factor2=None,
-                   same_shower=False, seed=None, full_output=False, **kwargs):
+                   same_shower=False, seed=None, full_output=False, random_generator=None, **kwargs):
     """
     returns the Askaryan pulse in the time domain of the eTheta component
 
@@ -82,6 +84,9 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
         see description there for more details
     seed: None or int
         the random seed for the Askaryan modules
+    random_generator: None or numpy.random.Generator
+        if provided, the random shower realization of the Alvarez2009 and ARZ models is drawn from this
+        generator instead of the one created from `seed`
     full_output: bool (default False)
         if True, askaryan modules can return additional output
 
@@ -100,7 +105,7 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
         trace = np.zeros(N)
     if model in par.get_parametrizations():
         tmp = par.get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=seed, same_shower=same_shower,
-                                     full_output=full_output, **kwargs)
+                                     full_output=full_output, random_generator=random_generator, **kwargs)
         if(full_output):
             trace, additional_output = tmp
         else:
@@ -129,7 +134,8 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, interp_
 
         if(interp_factor2 is not None):
             gARZ.set_interpolation_factor2(interp_factor2)
-        trace = gARZ.get_time_trace(energy, theta, N, dt, shower_type, n_index, R, same_shower=same_shower, **kwargs)[1]
+        trace = gARZ.get_time_trace(energy, theta, N, dt, shower_type, n_index, R, same_shower=same_shower,
+                                    random_generator=random_generator, **kwargs)[1]
         additional_output['iN'] = gARZ.get_last_shower_profile_id()[shower_type]
 
     elif(model == 'spherical'):
@@ -3,6 +3,7 @@ import h5py
 from scipy.interpolate import interp1d
 from radiotools import helper as hp
 from NuRadioReco.utilities import units, fft
+from NuRadioReco.utilities import profiling
 import NuRadioReco.framework.base_trace
 import logging
 logger = logging.getLogger("SignalGen.emitter")
@@ -12,6 +13,7 @@ import pickle, lzma
 buffer_emitter_model = {}
 
 
+@profiling.profile("emitter.get_time_trace", category="signal")
 def get_time_trace(amplitude, N, dt, model, full_output=False, **kwargs):
     """
     returns the voltage trace of an emitter
@@ -31,7 +31,7 @@ def get_parametrizations():
 
 
 def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=None, same_shower=False,
-                   k_L=None, full_output=False, average_shower=False):
+                   k_L=None, full_output=False, average_shower=False, random_generator=None):
     """
     returns the Askaryan pulse in the time domain of the eTheta component
 
@@ -82,6 +82,9 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
         - For ZHS1992 and ALvarez2000 the dict is empty.
     average_shower: bool (default False)
         if True, for the Alvarez2009 model electromagnetic showers, no random shower is generated, but the average shower is choosen.
+    random_generator: None or numpy.random.Generator
+        if provided, this generator is used to draw the random shower realization instead of the one
+        created from `seed`
 
     Returns
     -------
@@ -93,6 +96,8 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
     """
     if(model not in _random_generators):
         _random_generators[model] = np.random.RandomState(seed)
+    if(random_generator is None):
+        random_generator = _random_generators[model]
     if(model == 'ZHS1992'):
         """ Parametrization from E. Zas, F. Halzen, and T. Stanev, Phys. Rev. D 45, 362 (1992)."""
         freqs = np.fft.rfftfreq(N, dt)
@@ -173,7 +178,7 @@ def get_time_trace(energy, theta, N, dt, shower_type, n_index, R, model, seed=No
                         k_L = _Alvarez2009_k_L
 
                 else:
-                    _Alvarez2009_k_L = 10 ** _random_generators[model].normal(log10_k_L_bar, sigma_k_L)
+                    _Alvarez2009_k_L = 10 ** random_generator.normal(log10_k_L_bar, sigma_k_L)
                     k_L = _Alvarez2009_k_L
         else:
             raise NotImplementedError("shower type {} is not implemented in Alvarez2009 model.".format(shower_type))
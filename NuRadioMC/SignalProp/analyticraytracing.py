@@ -12,6 +12,7 @@ except ImportError:
     from backports.functools_lru_cache import lru_cache
 
 from NuRadioReco.utilities import units
+from NuRadioReco.utilities import profiling
 from NuRadioMC.utilities import attenuation as attenuation_util
 
 from radiotools import helper as hp
@@ -1945,6 +1946,7 @@ class ray_tracing(ray_tracing_base):
                                 'reflection_case': reflection_case})
         self._results = results
 
+    @profiling.profile("ray_tracing.find_solutions", category="propagation")
     def find_solutions(self):
         """
         find all solutions between x1 and x2
@@ -2195,35 +2197,23 @@ class ray_tracing(ray_tracing_base):
 
         return transform.dot(polarization)
 
-    def get_pulse_propagation_birefringence(self, pulse, samp_rate, i_solution, bire_model = 'southpole_A'):
-        
+    def _get_birefringence_path_properties(self, i_solution, bire_model='southpole_A'):
         """
-        Function for the time trace propagation according to the polarization change due to birefringence. 
-        The trace propagation is explained in this paper: https://link.springer.com/article/10.1140/epjc/s10052-023-11238-y
+        Evaluates the indices of refraction, the effective indices of refraction and polarization eigenvectors of both
+        birefringent states and their incremental time delays for all steps (of ~1 m) along the ray path at once.
 
         Parameters
         ----------
-        pulse: np.ndarray
-            3d array with the frequency spectrum of np.array([eR, eTheta, ePhi]), usually provided by the apply_propagation_effects function
-        samp_rate: float
-            sampling rate of the time traces
         i_solution: int
             choose which ray-tracing solution should be propagated
         bire_model: string
             choose the interpolation to fit the measured refractive index data
-            options include (A, B, C, D, E) description can be found under: NuRadioMC/NuRadioMC/utilities/birefringence_models/model_description
 
         Returns
         -------
-
-        final pulse: numpy.array([eR, eTheta, ePhi])
-            [0] - eR        - final frequency spectrum of the radial component - not altered by the function
-            [1] - eTheta    - final frequency spectrum of the theta component
-            [2] - ePhi      - final frequency spectrum of the phi component
+        path_properties: dict
+            see `get_path_properties_birefringence`
         """
-
-        t_fast = base_trace.BaseTrace()
-
         ice_n = self._medium
         ice_birefringence = medium.get_ice_model('birefringence_medium')
         ice_birefringence.__init__(bire_model)
@@ -2236,40 +2226,126 @@ class ray_tracing(ray_tracing_base):
             rot = np.matrix([[np.cos(rotation_angle), -np.sin(rotation_angle)], [np.sin(rotation_angle), np.cos(rotation_angle)]])
             path[:, :2] = np.swapaxes(np.matmul(rot, np.swapaxes(path[:, :2],0,1)),0,1)
 
-        for i in range(acc - 1):
+        # every step is described by the properties at its start point
+        refractive_index = ice_n.get_index_of_refraction(path[:-1])
+        refractive_index_birefringence = np.array(ice_birefringence.get_birefringence_index_of_refraction(path[:-1].T))
 
-            refractive_index = ice_n.get_index_of_refraction(path[i])
-            refractive_index_birefringence = ice_birefringence.get_birefringence_index_of_refraction(path[i])
+        n_xyz = refractive_index + refractive_index_birefringence - 1.78
+        nx, ny, nz = n_xyz
 
-            nx, ny, nz = refractive_index + refractive_index_birefringence - 1.78
-            dD = path[i + 1] - path[i]     
+        dD = np.diff(path, axis=0)
+        len_diff = np.linalg.norm(dD, axis=1)
+        direction = (dD / len_diff[:, None]).T
 
-            direction = np.array(dD)
-            len_diff = np.linalg.norm(direction)
-            direction = direction / len_diff
+        N_effective = self.get_effective_index_birefringence(direction, nx, ny, nz)
 
-            N_effective = self.get_effective_index_birefringence(direction, nx, ny, nz)
-            sky_polarization = self.get_polarization_birefringence(N_effective[0], N_effective[1], direction, nx, ny, nz)
+        # Same as `get_polarization_birefringence_simple` and `on_sky_birefringence` for all steps
+        zenith, azimuth = hp.cartesian_to_spherical(*direction)
+        transform = np.array([[np.sin(zenith) * np.cos(azimuth), np.sin(zenith) * np.sin(azimuth), np.cos(zenith)],
+                              [np.cos(zenith) * np.cos(azimuth), np.cos(zenith) * np.sin(azimuth), -np.sin(zenith)],
+                              [-np.sin(azimuth), np.cos(azimuth), np.zeros_like(azimuth)]])
+        sky_polarization = np.zeros((2, len(len_diff), 3))
+        for i_state in range(2):
+            polarization = direction / (N_effective[i_state] ** 2 - n_xyz ** 2)
+            polarization = polarization / np.linalg.norm(polarization, axis=0)
+            sky_polarization[i_state] = np.einsum('ijk,jk->ki', transform, polarization)
 
-            t_0, t_1 = len_diff * N_effective / (speed_of_light * units.m / units.ns)
+        # Steps for which one of the effective indices is (almost) equal to one of nx, ny, nz are special cases
+        # which are handled by `get_polarization_birefringence`
+        special_cases = np.any(np.abs(N_effective[:, None, :] - n_xyz[None, :, :]) <= 1e-9, axis=(0, 1))
+        for i in np.arange(len(len_diff))[special_cases]:
+            sky_polarization[:, i] = self.get_polarization_birefringence(
+                N_effective[0, i], N_effective[1, i], direction[:, i], nx[i], ny[i], nz[i])
 
-            a, b = sky_polarization[0, 1:]
-            c, d = sky_polarization[1, 1:]
+        time_delays = len_diff * N_effective / (speed_of_light * units.m / units.ns)
 
-            if np.isclose(a * d - b * c, 0) or np.isnan([a, b, c, d]).any():
-                self.__logger.warning("warning: Polarization vectors similar, R-matrix not invertible, iteration" + str(i))
-                continue
+        path_properties = {}
 
-            R = np.matrix([[a, b], [c, d]])
+        path_properties['path'] = path[1:]
+        path_properties['nominal_refractive_index'] = refractive_index
 
-            birefringent_base = R * pulse[1:] 
+        path_properties['refractive_index_x'] = refractive_index_birefringence[0]
+        path_properties['refractive_index_y'] = refractive_index_birefringence[1]
+        path_properties['refractive_index_z'] = refractive_index_birefringence[2]
 
-            t_fast.set_frequency_spectrum(birefringent_base[1], sampling_rate=samp_rate)
-            t_fast.apply_time_shift(t_1 - t_0)
-            birefringent_base[1] = t_fast.get_frequency_spectrum()
-            
-            Rtransp = np.matrix.transpose(R)
-            pulse[1:]  = Rtransp * birefringent_base
+        path_properties['first_refractive_index'] = N_effective[0]
+        path_properties['second_refractive_index'] = N_effective[1]
+
+        path_properties['first_polarization_vector'] = sky_polarization[0]
+        path_properties['second_polarization_vector'] = sky_polarization[1]
+
+        path_properties['first_time_delay'] = time_delays[0]
+        path_properties['second_time_delay'] = time_delays[1]
+
+        return path_properties
+
+    def get_pulse_propagation_birefringence(self, pulse, samp_rate, i_solution, bire_model = 'southpole_A',
+                                            merge_tolerance=0):
+        
+        """
+        Function for the time trace propagation according to the polarization change due to birefringence. 
+        The trace propagation is explained in this paper: https://link.springer.com/article/10.1140/epjc/s10052-023-11238-y
+
+        The ice properties are evaluated for all steps along the path at once (see `get_path_properties_birefringence`)
+        and the relative time delay of the two birefringent states is applied as a phase in the frequency domain.
+
+        Parameters
+        ----------
+        pulse: np.ndarray
+            3d array with the frequency spectrum of np.array([eR, eTheta, ePhi]), usually provided by the apply_propagation_effects function
+        samp_rate: float
+            sampling rate of the time traces
+        i_solution: int
+            choose which ray-tracing solution should be propagated
+        bire_model: string
+            choose the interpolation to fit the measured refractive index data
+            options include (A, B, C, D, E) description can be found under: NuRadioMC/NuRadioMC/utilities/birefringence_models/model_description
+        merge_tolerance: float (Default: 0)
+            Consecutive steps whose polarization eigenvectors differ by less than this value (in each component) from
+            the first step of a group are merged, i.e., their time delays are summed and applied at once. This
+            considerably speeds up the propagation for long paths through ice with slowly changing properties but
+            is an approximation. With the default of 0 every step is applied individually.
+
+        Returns
+        -------
+
+        final pulse: numpy.array([eR, eTheta, ePhi])
+            [0] - eR        - final frequency spectrum of the radial component - not altered by the function
+            [1] - eTheta    - final frequency spectrum of the theta component
+            [2] - ePhi      - final frequency spectrum of the phi component
+        """
+
+        path_properties = self._get_birefringence_path_properties(i_solution, bire_model)
+
+        # Matrices which transform (eTheta, ePhi) into the basis of the birefringent states
+        R = np.stack([path_properties['first_polarization_vector'][:, 1:],
+                      path_properties['second_polarization_vector'][:, 1:]], axis=1)
+        delta_t = path_properties['second_time_delay'] - path_properties['first_time_delay']
+
+        det = R[:, 0, 0] * R[:, 1, 1] - R[:, 0, 1] * R[:, 1, 0]
+        invalid = np.isclose(det, 0) | np.any(np.isnan(R), axis=(1, 2))
+        for i in np.arange(len(det))[invalid]:
+            self.__logger.warning("warning: Polarization vectors similar, R-matrix not invertible, iteration" + str(i))
+
+        steps = np.arange(len(det))[~invalid]
+
+        # same frequencies as `BaseTrace.get_frequencies()` for this spectrum
+        frequencies = np.fft.rfftfreq((pulse.shape[-1] - 1) * 2, 1. / samp_rate)
+
+        i = 0
+        while i < len(steps):
+            rotation = R[steps[i]]
+            time_shift = delta_t[steps[i]]
+            i += 1
+
+            if merge_tolerance > 0:
+                while i < len(steps) and np.max(np.abs(R[steps[i]] - rotation)) < merge_tolerance:
+                    time_shift += delta_t[steps[i]]
+                    i += 1
+
+            birefringent_base = np.dot(rotation, pulse[1:])
+            birefringent_base[1] *= np.exp(-2.j * np.pi * time_shift * frequencies)
+            pulse[1:] = np.dot(rotation.T, birefringent_base)
 
         return pulse
     
@@ -2308,83 +2384,7 @@ class ray_tracing(ray_tracing_base):
 
         """
 
-        ice_n = self._medium
-        ice_birefringence = medium.get_ice_model('birefringence_medium')
-        ice_birefringence.__init__(bire_model)
-
-        acc = int(self.get_path_length(i_solution) / units.m)
-        path = self.get_path(i_solution, n_points=acc)
-        
-        if 'angle_to_iceflow' in self._config['propagation']:
-            rotation_angle = self._config['propagation']['angle_to_iceflow'] * units.deg
-            rot = np.matrix([[np.cos(rotation_angle), -np.sin(rotation_angle)], [np.sin(rotation_angle), np.cos(rotation_angle)]])
-            path[:, :2] = np.swapaxes(np.matmul(rot, np.swapaxes(path[:, :2],0,1)),0,1)
-
-        n_nominal = np.zeros(acc - 1)
-
-        N1 = np.zeros(acc - 1)
-        N2 = np.zeros(acc - 1)
-
-        Nx = np.zeros(acc - 1)
-        Ny = np.zeros(acc - 1)
-        Nz = np.zeros(acc - 1)
-
-        P1 = np.zeros((acc - 1, 3))
-        P2 = np.zeros((acc - 1, 3))
-
-        T1 = np.zeros(acc - 1)
-        T2 = np.zeros(acc - 1)
-
-        for i in range(acc - 1):
-
-            refractive_index = ice_n.get_index_of_refraction(path[i])
-            refractive_index_birefringence = ice_birefringence.get_birefringence_index_of_refraction(path[i])
-
-            nx, ny, nz = refractive_index + refractive_index_birefringence - 1.78
-            dD = path[i + 1] - path[i]   
-
-            direction = np.array(dD)
-            len_diff = np.linalg.norm(direction)
-            direction = direction / len_diff
-
-            N_effective = self.get_effective_index_birefringence(direction, nx, ny, nz)
-            sky_polarization = self.get_polarization_birefringence(N_effective[0], N_effective[1], direction, nx, ny, nz)
-
-            t_0, t_1 = len_diff * N_effective / (speed_of_light * units.m / units.ns)
-            n_nominal[i] = refractive_index
-
-            Nx[i] = refractive_index_birefringence[0]
-            Ny[i] = refractive_index_birefringence[1]
-            Nz[i] = refractive_index_birefringence[2]
-
-            N1[i] = N_effective[0]
-            N2[i] = N_effective[1]
-
-            P1[i] = sky_polarization[0]
-            P2[i] = sky_polarization[1]
-
-            T1[i] = t_0
-            T2[i] = t_1
-
-        path_properties = {}
-
-        path_properties['path'] = path[1:]
-        path_properties['nominal_refractive_index'] = n_nominal
-
-        path_properties['refractive_index_x'] = Nx
-        path_properties['refractive_index_y'] = Ny
-        path_properties['refractive_index_z'] = Nz
-
-        path_properties['first_refractive_index'] = N1
-        path_properties['second_refractive_index'] = N2
-
-        path_properties['first_polarization_vector'] = P1
-        path_properties['second_polarization_vector'] = P2
-
-        path_properties['first_time_delay'] = T1
-        path_properties['second_time_delay'] = T2
-
-        return path_properties
+        return self._get_birefringence_path_properties(i_solution, bire_model)
 
     def get_launch_vector(self, iS):
         """
@@ -2476,6 +2476,7 @@ class ray_tracing(ray_tracing_base):
         return self._r2d.get_reflection_angle(self._x1, self._x2, result['C0'],
                                                reflection=result['reflection'], reflection_case=result['reflection_case'])
 
+    @profiling.profile("ray_tracing.get_path_length", category="propagation")
     def get_path_length(self, iS, analytic=True):
         """
         calculates the path length of solution iS
@@ -2517,6 +2518,7 @@ class ray_tracing(ray_tracing_base):
                                               reflection=result['reflection'],
                                               reflection_case=result['reflection_case'])
 
+    @profiling.profile("ray_tracing.get_travel_time", category="propagation")
     def get_travel_time(self, iS, analytic=True):
         """
         calculates the travel time of solution iS
@@ -2697,6 +2699,7 @@ class ray_tracing(ray_tracing_base):
         }
         return output_dict
 
+    @profiling.profile("ray_tracing.apply_propagation_effects", category="propagation")
     def apply_propagation_effects(self, efield, i_solution):
         """
         Apply propagation effects to the electric field
@@ -7,6 +7,7 @@ from NuRadioMC.utilities import medium_base
 from scipy import interpolate, optimize
 import NuRadioReco.utilities.geometryUtilities
 from NuRadioReco.utilities import units
+from NuRadioReco.utilities import profiling
 from NuRadioReco.framework.parameters import electricFieldParameters as efp
 from NuRadioMC.SignalProp.propagation_base_class import ray_tracing_base
 from NuRadioMC.SignalProp import analyticraytracing as ana
@@ -86,6 +87,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
                 config['propagation']['radiopropa']['iter_steps_channel'] = [25., 2., .5]
                 config['propagation']['radiopropa']['auto_step_size'] = False
                 config['propagation']['radiopropa']['iter_steps_zenith'] = [.5, .05, .005]
+                config['propagation']['radiopropa']['batch_size'] = 1
         detector: detector object
         """
         self.__logger = logging.getLogger('radiopropa_ray_tracing')
@@ -109,6 +111,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
 
         self.set_config(config=config)
         self._ice_model = self._medium.get_ice_model_radiopropa()
+        self._propagation_modules = {}
 
         self.set_minimizer_tolerance()
         self._shower_axis = None ## this is given so we can limit the rays that are checked around the cherenkov angle
@@ -240,6 +243,78 @@ class radiopropa_ray_tracing(ray_tracing_base):
         """
         self._max_traj_length = max_traj_length
 
+    def _get_module_list(self, bire_model=None):
+        """
+        Returns a new radiopropa module list with the propagation module, the modules of the
+        ice model and the maximum trajectory length. These modules are only created once
+        (per birefringence model and trajectory length) and reused for all rays traced by this object.
+
+        Parameters
+        ----------
+        bire_model: string or None
+            if not None, the propagation module propagates an electric field with the given birefringence model
+
+        Returns
+        -------
+        sim: radiopropa.ModuleList
+        """
+        key = (bire_model, self._max_traj_length)
+        if key not in self._propagation_modules:
+            if bire_model is None:
+                propagation = radiopropa.PropagationCK(self._ice_model.get_scalar_field(), 1E-8, .001, 1.)
+            else:
+                propagation = radiopropa.PropagationCK(self._ice_model.get_scalar_field(), 1E-8, .001, 1., bire_model)
+
+            self._propagation_modules[key] = (
+                [propagation] + list(self._ice_model.get_modules().values()) +
+                [radiopropa.MaximumTrajectoryLength(self._max_traj_length * (radiopropa.meter/units.meter))])
+
+        sim = radiopropa.ModuleList()
+        for module in self._propagation_modules[key]:
+            sim.add(module)
+        return sim
+
+    def _shoot_rays(self, sim, x1, ray_directions):
+        """
+        Propagates rays starting at x1 for all launch directions. If `config['propagation']['radiopropa']['batch_size']`
+        is larger than 1 and the installed radiopropa version provides a CandidateVector, the rays are run
+        in batches of this size, which radiopropa propagates in parallel. Ice models with a scalar field
+        implemented in python (`ScalarFieldBuilder`) are always propagated one ray at a time.
+
+        Parameters
+        ----------
+        sim: radiopropa.ModuleList
+            the module list used for the propagation
+        x1: 3dim np.array
+            start point of the rays (in radiopropa units)
+        ray_directions: 2dim np.array of shape (n, 3)
+            launch directions of the rays
+
+        Returns
+        -------
+        rays: list of radiopropa.Candidate
+            the propagated rays, in the order of the launch directions
+        """
+        rays = []
+        for ray_dir in ray_directions:
+            source = radiopropa.Source()
+            source.add(radiopropa.SourcePosition(radiopropa.Vector3d(*x1)))
+            source.add(radiopropa.SourceDirection(radiopropa.Vector3d(*ray_dir)))
+            rays.append(source.getCandidate())
+
+        batch_size = self._config['propagation']['radiopropa'].get('batch_size', 1)
+        if (batch_size > 1 and hasattr(radiopropa, 'CandidateVector') and
+                not isinstance(self._ice_model.get_scalar_field(), medium_base.ScalarFieldBuilder)):
+            for i_start in range(0, len(rays), batch_size):
+                candidates = radiopropa.CandidateVector()
+                for ray in rays[i_start:i_start + batch_size]:
+                    candidates.append(ray)
+                sim.run(candidates, True)
+        else:
+            for ray in rays:
+                sim.run(ray, True)
+        return rays
+
     def raytracer_iterative(self, n_reflections=0):
         """
         Uses RadioPropa to find all the numerical ray tracing solutions between sphere X1 and X2.
@@ -296,11 +371,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
             results = []
 
             ##define module list for simulation
-            sim = radiopropa.ModuleList()
-            sim.add(radiopropa.PropagationCK(self._ice_model.get_scalar_field(), 1E-8, .001, 1.)) ## add propagation to module list
-            for module in self._ice_model.get_modules().values(): 
-                sim.add(module)
-            sim.add(radiopropa.MaximumTrajectoryLength(self._max_traj_length * (radiopropa.meter/units.meter)))
+            sim = self._get_module_list()
 
             ## define observer for detection (channel)            
             obs = radiopropa.Observer()
@@ -326,39 +397,32 @@ class radiopropa_ray_tracing(ray_tracing_base):
                 new_scanning_range = np.arange(launch_lower[iL], launch_upper[iL]+step, step)
                 theta_scanning_range = np.concatenate((theta_scanning_range, new_scanning_range))
 
-            for theta in theta_scanning_range:
-                ray_dir = hp.spherical_to_cartesian(theta, phi_direct)
-                
-                def delta(ray_dir,shower_dir):
-                    viewing = np.arccos(np.dot(shower_dir, ray_dir)) * units.radian
-                    return viewing - cherenkov_angle
-
-                if (self._shower_axis is None) or (abs(delta(ray_dir,self._shower_axis)) < self._cut_viewing_angle):
-
-                    source = radiopropa.Source()
-                    source.add(radiopropa.SourcePosition(radiopropa.Vector3d(*X1)))
-                    source.add(radiopropa.SourceDirection(radiopropa.Vector3d(*ray_dir)))
-                    sim.setShowProgress(True)
-                    ray = source.getCandidate()
-                    sim.run(ray, True)
-                    
-                    current_rays = [ray]
-                    while len(current_rays) > 0:
-                        next_rays = []
-                        for ray in current_rays:
-                            if channel.checkDetection(ray.get()) == radiopropa.DETECTED:
-                                detected_rays.append(ray)
-                                result = {}
-                                if n_reflections == 0:
-                                    result['reflection']=0
-                                    result['reflection_case']=1
-                                elif self._ice_model.get_modules()["bottom reflection"].get_times_reflectedoff(ray.get()) <= n_reflections: 
-                                    result['reflection']=self._ice_model.get_modules()["bottom reflection"].get_times_reflectedoff(ray.get())
-                                    result['reflection_case']=int(np.ceil(theta/np.deg2rad(90)))
-                                results.append(result)
-                            for secondary in ray.secondaries:
-                                next_rays.append(secondary)
-                        current_rays = next_rays
+            ray_directions = hp.spherical_to_cartesian(theta_scanning_range, np.full_like(theta_scanning_range, phi_direct))
+            if self._shower_axis is not None:
+                ## only shoot rays close to the cherenkov angle
+                viewing_angles = np.arccos(np.dot(ray_directions, self._shower_axis)) * units.radian
+                mask = np.abs(viewing_angles - cherenkov_angle) < self._cut_viewing_angle
+                theta_scanning_range = theta_scanning_range[mask]
+                ray_directions = ray_directions[mask]
+
+            for theta, ray in zip(theta_scanning_range, self._shoot_rays(sim, X1, ray_directions)):
+                current_rays = [ray]
+                while len(current_rays) > 0:
+                    next_rays = []
+                    for ray in current_rays:
+                        if channel.checkDetection(ray.get()) == radiopropa.DETECTED:
+                            detected_rays.append(ray)
+                            result = {}
+                            if n_reflections == 0:
+                                result['reflection']=0
+                                result['reflection_case']=1
+                            elif self._ice_model.get_modules()["bottom reflection"].get_times_reflectedoff(ray.get()) <= n_reflections: 
+                                result['reflection']=self._ice_model.get_modules()["bottom reflection"].get_times_reflectedoff(ray.get())
+                                result['reflection_case']=int(np.ceil(theta/np.deg2rad(90)))
+                            results.append(result)
+                        for secondary in ray.secondaries:
+                            next_rays.append(secondary)
+                    current_rays = next_rays
 
             #loop over previous rays to find the upper and lower theta of each bundle of rays
             #uses step, but because step is initialized after this loop this ios the previous step size as intented
@@ -441,11 +505,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
         sphere_size = 0.5 * (radiopropa.meter/units.meter)
 
         ##define module list for simulation
-        sim = radiopropa.ModuleList()
-        sim.add(radiopropa.PropagationCK(self._ice_model.get_scalar_field(), 1E-8, .001, 1., bire_model)) ## add propagation to module list
-        for module in self._ice_model.get_modules().values(): 
-            sim.add(module)
-        sim.add(radiopropa.MaximumTrajectoryLength(self._max_traj_length * (radiopropa.meter/units.meter)))
+        sim = self._get_module_list(bire_model)
 
         ## define observer for detection (channel)            
         obs = radiopropa.Observer()
@@ -537,11 +597,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
             raise AttributeError("Radiopropa minimizer tracer can not be used for reflections at the bottom")
 
         ##define module list for simulation
-        sim = radiopropa.ModuleList()
-        sim.add(radiopropa.PropagationCK(self._ice_model.get_scalar_field(), 1E-8, .001, 1.)) ## add propagation to module list
-        for module in self._ice_model.get_modules().values(): 
-            sim.add(module)
-        sim.add(radiopropa.MaximumTrajectoryLength(self._max_traj_length*(radiopropa.meter/units.meter)))
+        sim = self._get_module_list()
 
         ## define observer
         obs2 = radiopropa.Observer()
@@ -646,6 +702,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
         self._rays = rays
 
 
+    @profiling.profile("radiopropa_ray_tracing.find_solutions", category="propagation")
     def find_solutions(self):
         """
         find all solutions between X1 and X2
@@ -962,6 +1019,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
         return self.get_correction_path_length(iS) / ((scipy.constants.c*units.meter/units.second)/refrac_index)
 
 
+    @profiling.profile("radiopropa_ray_tracing.get_path_length", category="propagation")
     def get_path_length(self, iS):
         """
         calculates the path length of solution iS
@@ -987,6 +1045,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
             path_length += self.get_correction_path_length(iS)
         return path_length
 
+    @profiling.profile("radiopropa_ray_tracing.get_travel_time", category="propagation")
     def get_travel_time(self, iS):
         """
         calculates the travel time of solution iS
@@ -1145,6 +1204,7 @@ class radiopropa_ray_tracing(ray_tracing_base):
         n2 = self._medium.get_index_of_refraction(self._X2)  # receiver
         return focusing * (n1 / n2) ** 0.5
         
+    @profiling.profile("radiopropa_ray_tracing.apply_propagation_effects", category="propagation")
     def apply_propagation_effects(self, efield, i_solution):
         """
         Apply propagation effects to the electric field
@@ -1293,7 +1353,8 @@ class radiopropa_ray_tracing(ray_tracing_base):
                     iter_steps_channel = [25., 2., .5], #unit is meter
                     iter_steps_zenith = [.5, .05, .005], #unit is degree
                     auto_step_size = False,
-                    max_traj_length = 10000) #unit is meter
+                    max_traj_length = 10000, #unit is meter
+                    batch_size = 1)
             )
             config['speedup'] = dict(
                 delta_C_cut = 40 * units.degree
@@ -5,9 +5,11 @@ from radiotools import coordinatesystems as cstrans
 from NuRadioMC.SignalGen import askaryan
 from NuRadioMC.SignalGen import emitter
 from NuRadioReco.utilities import units
+from NuRadioReco.utilities.random_streams import RandomStreams
+from NuRadioReco.utilities import profiling
 from NuRadioMC.utilities import medium
 from NuRadioReco.utilities import fft
-from NuRadioMC.utilities.earth_attenuation import get_weight
+from NuRadioMC.utilities.earth_attenuation import get_weight, SlantDepthTable, PREM, CoreMantleCrustModel
 from NuRadioMC.SignalProp import propagation
 from numpy.random import Generator, Philox
 import h5py
@@ -16,6 +18,7 @@ import six
 import copy
 import json
 from scipy import constants
+from scipy.spatial import cKDTree
 # import detector simulation modules
 import NuRadioReco.modules.io.eventWriter
 import NuRadioReco.modules.channelSignalReconstructor
@@ -172,6 +175,7 @@ class simulation:
             self._cfg['seed'] = np.random.randint(0, 2 ** 32 - 1)
 
         self._rnd = Generator(Philox(self._cfg['seed']))
+        self._random_streams = RandomStreams(self._cfg['seed'])
 
         self._outputfilename = outputfilename
         if os.path.exists(self._outputfilename):
@@ -422,7 +426,27 @@ class simulation:
     def run(self):
         """
         run the NuRadioMC simulation
+
+        If profiling is enabled in the config, the profiler of this process is enabled for the duration of the
+        simulation (unless it is already enabled, in which case its state is left untouched) and the profiling
+        output is written next to the hdf5 output file, also if the simulation fails.
         """
+        if not self._cfg['profiling']['enabled']:
+            return self._run()
+
+        profiler = profiling.get_profiler()
+        was_enabled = profiler.enabled
+        if not was_enabled:
+            profiler.reset()
+            profiler.enable(trace_allocations=self._cfg['profiling']['trace_allocations'])
+        try:
+            return self._run()
+        finally:
+            if not was_enabled:
+                profiler.disable()
+            self._write_profiling_output()
+
+    def _run(self):
         if len(self._fin['xx']) == 0:
             logger.status(f"writing empty hdf5 output file")
             self._write_output_file(empty=True)
@@ -444,7 +468,7 @@ class simulation:
         electricFieldResampler = NuRadioReco.modules.electricFieldResampler.electricFieldResampler()
         if self._outputfilenameNuRadioReco is not None:
             self._eventWriter.begin(self._outputfilenameNuRadioReco, log_level=self._log_level)
-        unique_event_group_ids = np.unique(self._fin['event_group_ids'])
+        unique_event_group_ids, primary_indices = np.unique(self._fin['event_group_ids'], return_index=True)
         self._n_showers = len(self._fin['event_group_ids'])
         self._shower_ids = np.array(self._fin['shower_ids'])
         self._shower_index_array = {}  # this array allows to convert the shower id to an index that starts from 0 to be used to access the arrays in the hdf5 file.
@@ -479,13 +503,22 @@ class simulation:
         n_shower_station = len(self._station_ids) * self._n_showers
         iCounter = 0
 
-        # calculate bary centers of station
-        self._station_barycenter = np.zeros((len(self._station_ids), 3))
-        for iSt, station_id in enumerate(self._station_ids):
-            pos = []
-            for channel_id in range(self._det.get_number_of_channels(station_id)):
-                pos.append(self._det.get_relative_position(station_id, channel_id))
-            self._station_barycenter[iSt] = np.mean(np.array(pos), axis=0) + self._det.get_absolute_position(station_id)
+        # query channel positions, bary centers and sampling settings of all stations once
+        self._compile_station_geometry()
+
+        # determine which showers can possibly be seen by which station
+        t_tmp = time.time()
+        self._prefilter_showers()
+        distance_cut_time += time.time() - t_tmp
+
+        # the weight calculation is independent of the station, and depends just on the "mother" particle (the first
+        # entry of each event group), so we calculate the weights of all event groups in one go before the event loop
+        t1 = time.time()
+        # determine if a particle (neutrinos, or a secondary interaction of a neutrino, or surfaec muons) is simulated
+        particle_mode = "simulation_mode" not in self._fin_attrs or self._fin_attrs['simulation_mode'] != "emitter"
+        if particle_mode and self._cfg['weights']['weight_mode'] not in ["existing", None]:
+            primary_weights = self._calculate_primary_weights(primary_indices)
+        weightTime += time.time() - t1
 
         # loop over event groups
         for i_event_group_id, event_group_id in enumerate(unique_event_group_ids):
@@ -494,16 +527,13 @@ class simulation:
                 logger.debug(f"skipping event group {event_group_id} because it is not in the event group list provided to the __init__ function")
                 continue
             event_indices = np.atleast_1d(np.squeeze(np.argwhere(self._fin['event_group_ids'] == event_group_id)))
+            self._event_group_id = event_group_id
 
-            # the weight calculation is independent of the station, so we do this calculation only once
-            # the weight also depends just on the "mother" particle, i.e. the incident neutrino which determines
-            # the propability of arriving at our simulation volume. All subsequent showers have the same weight. So
-            # we calculate it just once and save it to all subshowers.
+            # the weight depends just on the "mother" particle, i.e. the incident neutrino which determines
+            # the propability of arriving at our simulation volume. All subsequent showers have the same weight.
             t1 = time.time()
 
             self._primary_index = event_indices[0]
-            # determine if a particle (neutrinos, or a secondary interaction of a neutrino, or surfaec muons) is simulated
-            particle_mode = "simulation_mode" not in self._fin_attrs or self._fin_attrs['simulation_mode'] != "emitter"
             self._mout['weights'][event_indices] = np.ones(len(event_indices))  # for a pulser simulation, every event has the same weight
             if particle_mode:
                 self._read_input_particle_properties(self._primary_index)  # this sets the self.input_particle for self._primary_index
@@ -517,13 +547,7 @@ class simulation:
                 elif self._cfg['weights']['weight_mode'] is None:
                     self.primary[simp.weight] = 1.
                 else:
-                    self.primary[simp.weight] = get_weight(self.primary[simp.zenith],
-                                                           self.primary[simp.energy],
-                                                           self.primary[simp.flavor],
-                                                           mode=self._cfg['weights']['weight_mode'],
-                                                           cross_section_type=self._cfg['weights']['cross_section_type'],
-                                                           vertex_position=self.primary[simp.vertex],
-                                                           phi_nu=self.primary[simp.azimuth])
+                    self.primary[simp.weight] = primary_weights[i_event_group_id]
                 # all entries for the event for this primary get the calculated primary's weight
                 self._mout['weights'][event_indices] = self.primary[simp.weight]
 
@@ -534,44 +558,35 @@ class simulation:
                 logger.debug("neutrino weight is smaller than {}, skipping event".format(self._cfg['speedup']['minimum_weight_cut']))
                 continue
 
-            # these quantities get computed to apply the distance cut as a function of shower energies
-            # the shower energies of closeby showers will be added as they can constructively interfere
-            if self._cfg['speedup']['distance_cut']:
-                t_tmp = time.time()
-                shower_energies = np.array(self._fin['shower_energies'])[event_indices]
-                vertex_positions = np.array([np.array(self._fin['xx'])[event_indices],
-                                             np.array(self._fin['yy'])[event_indices],
-                                             np.array(self._fin['zz'])[event_indices]]).T
-                vertex_distances = np.linalg.norm(vertex_positions - vertex_positions[0], axis=1)
-                distance_cut_time += time.time() - t_tmp
-
             triggered_showers = {}  # this variable tracks which showers triggered a particular station
 
-            # loop over all stations (each station is treated independently)
-            for iSt, self._station_id in enumerate(self._station_ids):
+            # only stations that are close enough to at least one shower of the event group are simulated
+            t_tmp = time.time()
+            candidate_stations = self._get_candidate_stations(event_indices)
+            distance_cut_time += time.time() - t_tmp
+            iCounter += len(event_indices) * (len(self._station_ids) - len(candidate_stations))
+            logger.debug(f"simulating {len(candidate_stations)} of {len(self._station_ids)} stations for event group {event_group_id}")
+
+            # loop over all candidate stations (each station is treated independently)
+            for iSt in sorted(candidate_stations):
+                self._station_id = self._station_ids[iSt]
                 t1 = time.time()
                 triggered_showers[self._station_id] = []
                 logger.debug(f"simulating station {self._station_id}")
-
-                if self._cfg['speedup']['distance_cut']:
-                    # perform a quick cut to reject event group completely if no shower is close enough to the station
-                    t_tmp = time.time()
-                    vertex_distances_to_station = np.linalg.norm(vertex_positions - self._station_barycenter[iSt], axis=1)
-                    distance_cut = self._get_distance_cut(np.sum(shower_energies)) + 100 * units.m  # 100m safety margin is added to account for extent of station around bary center.
-                    if vertex_distances_to_station.min() > distance_cut:
-                        logger.debug(f"skipping station {self._station_id} because minimal distance {vertex_distances_to_station.min()/units.km:.1f}km > {distance_cut/units.km:.1f}km (shower energy = {shower_energies.max():.2g}eV) bary center of station {self._station_barycenter[iSt]}")
-                        distance_cut_time += time.time() - t_tmp
-                        iCounter += len(shower_energies)
-                        continue
-                    distance_cut_time += time.time() - t_tmp
+                shower_candidates = candidate_stations[iSt]
 
                 candidate_station = False
-                self._sampling_rate_detector = self._det.get_sampling_frequency(self._station_id, 0)
+                station_geometry = self._station_geometry[self._station_id]
+                self._sampling_rate_detector = station_geometry['sampling_rate_detector']
 #                 logger.warning('internal sampling rate is {:.3g}GHz, final detector sampling rate is {:.3g}GHz'.format(self.get_sampling_rate(), self._sampling_rate_detector))
-                self._n_samples = self._det.get_number_of_samples(self._station_id, 0) / self._sampling_rate_detector / self._dt
-                self._n_samples = int(np.ceil(self._n_samples / 2.) * 2)  # round to nearest even integer
-                self._ff = np.fft.rfftfreq(self._n_samples, self._dt)
-                self._tt = np.arange(0, self._n_samples * self._dt, self._dt)
+                self._n_samples = station_geometry['n_samples']
+                self._ff = station_geometry['frequencies']
+                self._tt = station_geometry['times']
+
+                # derive independent random number streams for this event group and station (if enabled)
+                signal_random_generator = self.get_random_generator('signal')
+                if self._cfg['random_streams']:
+                    channelGenericNoiseAdder.set_random_generator(self.get_random_generator('channelGenericNoiseAdder'))
 
                 ray_tracing_performed = False
                 if 'station_{:d}'.format(self._station_id) in self._fin_stations:
@@ -585,7 +600,7 @@ class simulation:
                 self._create_sim_station()
                 # loop over all showers in event group
                 # create output data structure for this channel
-                sg = self._create_station_output_structure(len(event_indices), self._det.get_number_of_channels(self._station_id))
+                sg = self._create_station_output_structure(len(event_indices), station_geometry['n_channels'])
                 for iSh, self._shower_index in enumerate(event_indices):
                     sg['shower_id'][iSh] = self._shower_ids[self._shower_index]
                     iCounter += 1
@@ -619,35 +634,14 @@ class simulation:
                         logger.debug(f"simulating shower {self._shower_index}: {self._fin['shower_type'][self._shower_index]} with E = {self._fin['shower_energies'][self._shower_index]/units.eV:.2g}eV")
                     x1 = self._shower_vertex  # the interaction point
 
-                    if self._cfg['speedup']['distance_cut']:
-                        t_tmp = time.time()
-                        # calculate the sum of shower energies for all showers within self._cfg['speedup']['distance_cut_sum_length']
-                        mask_shower_sum = np.abs(vertex_distances - vertex_distances[iSh]) < self._cfg['speedup']['distance_cut_sum_length']
-                        shower_energy_sum = np.sum(shower_energies[mask_shower_sum])
-                        # quick speedup cut using barycenter of station as position
-                        distance_to_station = np.linalg.norm(x1 - self._station_barycenter[iSt])
-                        distance_cut = self._get_distance_cut(shower_energy_sum) + 100 * units.m  # 100m safety margin is added to account for extent of station around bary center.
-                        logger.debug(f"calculating distance cut. Current event has energy {self._fin['shower_energies'][self._shower_index]:.4g}, it is event number {iSh} and {np.sum(mask_shower_sum)} are within {self._cfg['speedup']['distance_cut_sum_length']/units.m:.1f}m -> {shower_energy_sum:.4g}")
-                        if distance_to_station > distance_cut:
-                            logger.debug(f"skipping station {self._station_id} because distance {distance_to_station/units.km:.1f}km > {distance_cut/units.km:.1f}km (shower energy = {self._fin['shower_energies'][self._shower_index]:.2g}eV) between vertex {x1} and bary center of station {self._station_barycenter[iSt]}")
-                            distance_cut_time += time.time() - t_tmp
-                            continue
-                        distance_cut_time += time.time() - t_tmp
-
-                    # skip vertices not in fiducial volume. This is required because 'mother' events are added to the event list
-                    # if daugthers (e.g. tau decay) have their vertex in the fiducial volume
-                    if not self._is_in_fiducial_volume(self._shower_vertex):
-                        logger.debug(f"event is not in fiducial volume, skipping simulation {self._fin['xx'][self._shower_index]}, "
-                                     f"{self._fin['yy'][self._shower_index]}, {self._fin['zz'][self._shower_index]}")
+                    # skip showers which are too far away from the station (distance cut), not in the fiducial volume
+                    # or of the wrong shower type, see `_prefilter_showers`
+                    if not shower_candidates[iSh]:
+                        logger.debug(f"shower {self._shower_index} does not pass the prefilter for station {self._station_id}, skipping")
                         continue
 
-                    # for special cases where only EM or HAD showers are simulated, skip all events that don't fulfill this criterion
-                    if self._cfg['signal']['shower_type'] == "em":
-                        if self._fin['shower_type'][self._shower_index] != "em":
-                            continue
-                    if self._cfg['signal']['shower_type'] == "had":
-                        if self._fin['shower_type'][self._shower_index] != "had":
-                            continue
+                    if self._cfg['speedup']['distance_cut']:
+                        shower_energy_sum = self._shower_energy_sums[self._shower_index]
 
                     if particle_mode:
                         self._create_sim_shower()  # create sim shower
@@ -683,14 +677,20 @@ class simulation:
                     t2 = time.time()
 #                     input_time += (time.time() - t1)
 
-                    for channel_id in range(self._det.get_number_of_channels(self._station_id)):
-                        x2 = self._det.get_relative_position(self._station_id, channel_id) + self._det.get_absolute_position(self._station_id)
+                    if self._cfg['speedup']['distance_cut']:
+                        # distances of the vertex to all channels of the station
+                        t_tmp = time.time()
+                        distance_cut = self._get_distance_cut(shower_energy_sum)
+                        channel_distances = np.linalg.norm(station_geometry['channel_positions'] - x1, axis=1)
+                        distance_cut_time += time.time() - t_tmp
+
+                    for channel_id in range(station_geometry['n_channels']):
+                        x2 = np.copy(station_geometry['channel_positions'][channel_id])
                         logger.debug(f"simulating channel {channel_id} at {x2}")
 
                         if self._cfg['speedup']['distance_cut']:
                             t_tmp = time.time()
-                            distance_cut = self._get_distance_cut(shower_energy_sum)
-                            distance = np.linalg.norm(x1 - x2)
+                            distance = channel_distances[channel_id]
 
                             if distance > distance_cut:
                                 logger.debug('A distance speed up cut has been applied')
@@ -719,7 +719,6 @@ class simulation:
                             logger.debug("event {} and station {}, channel {} does not have any ray tracing solution ({} to {})".format(
                                 self._event_group_id, self._station_id, channel_id, x1, x2))
                             continue
-                        delta_Cs = []
                         viewing_angles = []
                         # loop through all ray tracing solution
                         for iS in range(self._raytracer.get_number_of_solutions()):
@@ -730,13 +729,12 @@ class simulation:
                             # calculates angle between shower axis and launch vector
                             viewing_angle = hp.get_angle(self._shower_axis, self._launch_vector)
                             viewing_angles.append(viewing_angle)
-                            delta_C = (viewing_angle - cherenkov_angle)
                             logger.debug('solution {} {}: viewing angle {:.1f} = delta_C = {:.1f}'.format(
                                 iS, propagation.solution_types[self._raytracer.get_solution_type(iS)], viewing_angle / units.deg, (viewing_angle - cherenkov_angle) / units.deg))
-                            delta_Cs.append(delta_C)
 
+                        delta_Cs = np.array(viewing_angles) - cherenkov_angle
                         # discard event if delta_C (angle off cherenkov cone) is too large
-                        if min(np.abs(delta_Cs)) > self._cfg['speedup']['delta_C_cut']:
+                        if np.min(np.abs(delta_Cs)) > self._cfg['speedup']['delta_C_cut']:
                             logger.debug('delta_C too large, event unlikely to be observed, skipping event')
                             continue
 
@@ -789,7 +787,8 @@ class simulation:
 
                                 spectrum, additional_output = askaryan.get_frequency_spectrum(self._fin['shower_energies'][self._shower_index], viewing_angles[iS],
                                                 self._n_samples, self._dt, self._fin['shower_type'][self._shower_index], n_index, R,
-                                                self._cfg['signal']['model'], seed=self._cfg['seed'], full_output=True, **kwargs)
+                                                self._cfg['signal']['model'], seed=self._cfg['seed'], full_output=True,
+                                                random_generator=signal_random_generator, **kwargs)
                                 # save shower realization to SimShower and hdf5 file
                                 if self._cfg['signal']['model'] in ["ARZ2019", "ARZ2020"]:
                                     if 'shower_realization_ARZ' not in self._mout:
@@ -835,7 +834,7 @@ class simulation:
                                         elif emitter_obj.has_parameter(ep.realization_id):
                                             emitter_kwargs['iN'] = emitter_obj.get_parameter(ep.realization_id)
                                         else:
-                                            emitter_kwargs['rnd'] = self._rnd
+                                            emitter_kwargs['rnd'] = self._rnd if signal_random_generator is None else signal_random_generator
 
                                     (eR, eTheta, ePhi), additional_output = emitter.get_frequency_spectrum(amplitude, self._n_samples, self._dt, emitter_model, **emitter_kwargs, full_output=True)
                                     if emitter_model == "efield_idl1_spice":
@@ -885,7 +884,7 @@ class simulation:
                                 plt.show()
 
                             electric_field = NuRadioReco.framework.electric_field.ElectricField([channel_id],
-                                                position=self._det.get_relative_position(self._sim_station.get_id(), channel_id),
+                                                position=np.copy(station_geometry['relative_positions'][channel_id]),
                                                 shower_id=self._shower_ids[self._shower_index], ray_tracing_id=iS)
                             if iS is None:
                                 a = 1 / 0
@@ -1035,17 +1034,14 @@ class simulation:
 
                         if self._is_simulate_noise():
                             max_freq = 0.5 / self._dt
-                            channel_ids = self._det.get_channel_ids(self._station.get_id())
-                            Vrms = {}
-                            for channel_id in channel_ids:
-                                norm = self._integrated_channel_response[self._station.get_id()][channel_id]
-                                Vrms[channel_id] = self._Vrms_per_channel[self._station.get_id()][channel_id] / (norm / max_freq) ** 0.5  # normalize noise level to the bandwidth its generated for
-                            channelGenericNoiseAdder.run(self._evt, self._station, self._det, amplitude=Vrms, min_freq=0 * units.MHz,
-                                                         max_freq=max_freq, type='rayleigh', excluded_channels=self._noiseless_channels[station_id])
+                            channelGenericNoiseAdder.run(self._evt, self._station, self._det, amplitude=station_geometry['noise_Vrms'], min_freq=0 * units.MHz,
+                                                         max_freq=max_freq, type='rayleigh', excluded_channels=self._noiseless_channels[self._station_id])
 
-                        self._detector_simulation_filter_amp(self._evt, self._station, self._det)
+                        with profiling.span("simulation.detector_simulation_filter_amp", category="simulation"):
+                            self._detector_simulation_filter_amp(self._evt, self._station, self._det)
 
-                        self._detector_simulation_trigger(self._evt, self._station, self._det)
+                        with profiling.span("simulation.detector_simulation_trigger", category="simulation"):
+                            self._detector_simulation_trigger(self._evt, self._station, self._det)
                     if not self._station.has_triggered():
                         continue
 
@@ -1129,10 +1125,60 @@ class simulation:
                                                                                          100 * detSimTime / t_total,
                                                                                          100 * outputTime / t_total,
                                                                                          100 * weightTime / t_total))
+
         triggered = remove_duplicate_triggers(self._mout['triggered'], self._fin['event_group_ids'])
         n_triggered = np.sum(triggered)
         return n_triggered
 
+    def _write_profiling_output(self):
+        """
+        Logs the profiling summary and writes the aggregated statistics and the Chrome trace next to the hdf5 output file
+        """
+        profiler = profiling.get_profiler()
+        profiler.log_summary(level=LOGGING_STATUS)
+        output_base = os.path.splitext(self._outputfilename)[0]
+        profiler.write_json(output_base + ".profile.json")
+        profiler.write_chrome_trace(output_base + ".trace.json")
+        logger.status(f"profiling output written to {output_base}.profile.json and {output_base}.trace.json")
+
+    @profiling.profile(category="simulation")
+    def _compile_station_geometry(self):
+        """
+        Queries the detector description once for all simulated stations and stores everything which is
+        needed in the event loop: the channel positions, the bary center of each station, the sampling
+        settings and the noise levels (normalized to the internal bandwidth) of each channel.
+        """
+        self._station_geometry = {}
+        self._station_barycenter = np.zeros((len(self._station_ids), 3))
+        for iSt, station_id in enumerate(self._station_ids):
+            n_channels = self._det.get_number_of_channels(station_id)
+            relative_positions = np.array([self._det.get_relative_position(station_id, channel_id) for channel_id in range(n_channels)])
+            absolute_position = self._det.get_absolute_position(station_id)
+            channel_positions = relative_positions + absolute_position
+            self._station_barycenter[iSt] = np.mean(relative_positions, axis=0) + absolute_position
+
+            sampling_rate_detector = self._det.get_sampling_frequency(station_id, 0)
+            n_samples = self._det.get_number_of_samples(station_id, 0) / sampling_rate_detector / self._dt
+            n_samples = int(np.ceil(n_samples / 2.) * 2)  # round to nearest even integer
+
+            noise_Vrms = {}
+            if self._is_simulate_noise():
+                max_freq = 0.5 / self._dt
+                for channel_id in self._det.get_channel_ids(station_id):
+                    norm = self._integrated_channel_response[station_id][channel_id]
+                    noise_Vrms[channel_id] = self._Vrms_per_channel[station_id][channel_id] / (norm / max_freq) ** 0.5  # normalize noise level to the bandwidth its generated for
+
+            self._station_geometry[station_id] = {
+                'n_channels': n_channels,
+                'relative_positions': relative_positions,
+                'channel_positions': channel_positions,
+                'sampling_rate_detector': sampling_rate_detector,
+                'n_samples': n_samples,
+                'frequencies': np.fft.rfftfreq(n_samples, self._dt),
+                'times': np.arange(0, n_samples * self._dt, self._dt),
+                'noise_Vrms': noise_Vrms
+            }
+
     def _calculate_emitter_output(self):
         pass
 
@@ -1149,27 +1195,125 @@ class simulation:
         return bool(self._cfg['noise'])
 
     def _is_in_fiducial_volume(self, pos):
-        """ Checks if pos is in fiducial volume """
+        """
+        Checks if pos is in fiducial volume
+
+        Parameters
+        ----------
+        pos: array of shape (3,) or (n, 3)
+            one or several positions
+
+        Returns
+        -------
+        is_in_fiducial_volume: bool or array of bools
+        """
 
         for check_attr in ['fiducial_zmin', 'fiducial_zmax']:
             if not check_attr in self._fin_attrs:
                 logger.warning("Fiducial volume not defined. Return True")
-                return True
+                return np.ones(np.shape(pos)[:-1], dtype=bool) if np.ndim(pos) > 1 else True
 
-        pos = copy.deepcopy(pos) - np.array([self._fin_attrs.get("x0", 0), self._fin_attrs.get("y0", 0), 0])
+        pos = np.array(pos) - np.array([self._fin_attrs.get("x0", 0), self._fin_attrs.get("y0", 0), 0])
 
-        if not (self._fin_attrs["fiducial_zmin"] < pos[2] < self._fin_attrs["fiducial_zmax"]):
-            return False
+        is_in_volume = (self._fin_attrs["fiducial_zmin"] < pos[..., 2]) & (pos[..., 2] < self._fin_attrs["fiducial_zmax"])
 
         if "fiducial_rmax" in self._fin_attrs:
-            radius = np.sqrt(pos[0] ** 2 + pos[1] ** 2)
-            return self._fin_attrs["fiducial_rmin"] < radius < self._fin_attrs["fiducial_rmax"]
+            radius = np.sqrt(pos[..., 0] ** 2 + pos[..., 1] ** 2)
+            is_in_volume &= (self._fin_attrs["fiducial_rmin"] < radius) & (radius < self._fin_attrs["fiducial_rmax"])
         elif "fiducial_xmax" in self._fin_attrs:
-            return (self._fin_attrs["fiducial_xmin"] < pos[0] < self._fin_attrs["fiducial_xmax"] and
-                    self._fin_attrs["fiducial_ymin"] < pos[1] < self._fin_attrs["fiducial_ymax"])
-        else:
+            is_in_volume &= ((self._fin_attrs["fiducial_xmin"] < pos[..., 0]) & (pos[..., 0] < self._fin_attrs["fiducial_xmax"]) &
+                             (self._fin_attrs["fiducial_ymin"] < pos[..., 1]) & (pos[..., 1] < self._fin_attrs["fiducial_ymax"]))
+        elif np.any(is_in_volume):
             raise ValueError("Could not contruct fiducial volume from input file.")
 
+        if np.ndim(is_in_volume) == 0:
+            return bool(is_in_volume)
+        return is_in_volume
+
+    @profiling.profile(category="simulation")
+    def _prefilter_showers(self):
+        """
+        Applies all cuts which do not require a ray tracing solution to all showers at once.
+        These are the fiducial volume, the shower type (if only em or had showers are simulated) and
+        the distance cut between the vertex and the bary center of the station (with a safety margin of 100m).
+        For the distance cut, the energies of all showers of the same event group within
+        `distance_cut_sum_length` are summed up as they can interfere constructively.
+
+        Sets `self._shower_candidates`, a boolean array (one entry per shower) which is True for all showers
+        that pass the fiducial volume and shower type cuts, `self._shower_energy_sums`, the summed shower
+        energies used for the distance cut, `self._shower_distance_cuts`, the maximal distance between vertex
+        and station bary center, and `self._station_tree`, a KD-tree of the station bary centers which is
+        used by `_get_candidate_stations`.
+        """
+        vertices = np.array([self._fin['xx'], self._fin['yy'], self._fin['zz']]).T
+
+        # skip vertices not in fiducial volume. This is required because 'mother' events are added to the event list
+        # if daugthers (e.g. tau decay) have their vertex in the fiducial volume
+        candidates = np.atleast_1d(self._is_in_fiducial_volume(vertices))
+
+        # for special cases where only EM or HAD showers are simulated, skip all events that don't fulfill this criterion
+        if self._cfg['signal']['shower_type'] in ["em", "had"]:
+            candidates = candidates & (np.array(self._fin['shower_type']) == self._cfg['signal']['shower_type'])
+
+        self._shower_vertices = vertices
+        self._shower_candidates = candidates
+        self._shower_energy_sums = None
+        self._shower_distance_cuts = None
+        self._station_tree = None
+        if not self._cfg['speedup']['distance_cut']:
+            return
+
+        # the shower energies of closeby showers will be added as they can constructively interfere
+        shower_energies = np.array(self._fin['shower_energies'])
+        self._shower_energy_sums = np.copy(shower_energies)
+        # group the showers by event group once (in the order of the input file within each group)
+        _, group_indices, counts = np.unique(np.array(self._fin['event_group_ids']), return_inverse=True, return_counts=True)
+        sorted_indices = np.argsort(group_indices.ravel(), kind='stable')
+        for event_indices in np.split(sorted_indices, np.cumsum(counts)[:-1]):
+            if len(event_indices) < 2:
+                continue
+            vertex_distances = np.linalg.norm(vertices[event_indices] - vertices[event_indices[0]], axis=1)
+            for index, vertex_distance in zip(event_indices, vertex_distances):
+                mask_shower_sum = np.abs(vertex_distances - vertex_distance) < self._cfg['speedup']['distance_cut_sum_length']
+                self._shower_energy_sums[index] = np.sum(shower_energies[event_indices][mask_shower_sum])
+
+        # 100m safety margin is added to account for extent of station around bary center.
+        self._shower_distance_cuts = np.array([self._get_distance_cut(energy) for energy in self._shower_energy_sums]) + 100 * units.m
+        self._station_tree = cKDTree(self._station_barycenter)
+
+    def _get_candidate_stations(self, event_indices):
+        """
+        Returns the stations which can possibly see a shower of the event group, see `_prefilter_showers`.
+        With the distance cut enabled, only the stations within the distance cut radius around the
+        shower vertices are returned (looked up in a KD-tree of the station bary centers),
+        so the number of stations that are visited does not scale with the size of the array.
+
+        Parameters
+        ----------
+        event_indices: array of ints
+            the indices of the showers of the event group
+
+        Returns
+        -------
+        candidate_stations: dict
+            the station index (in `self._station_ids`) as key and a boolean array that masks
+            the showers of the event group that can be seen by the station as value
+        """
+        shower_candidates = self._shower_candidates[event_indices]
+        if not np.any(shower_candidates):
+            return {}
+        if self._station_tree is None:
+            return {iSt: shower_candidates for iSt in range(len(self._station_ids))}
+
+        candidate_stations = {}
+        for iSh in np.flatnonzero(shower_candidates):
+            index = event_indices[iSh]
+            for iSt in self._station_tree.query_ball_point(self._shower_vertices[index], self._shower_distance_cuts[index]):
+                if iSt not in candidate_stations:
+                    candidate_stations[iSt] = np.zeros(len(event_indices), dtype=bool)
+                candidate_stations[iSt][iSh] = True
+        return candidate_stations
+
     def _increase_signal(self, channel_id, factor):
         """
         increase the signal of a simulated station by a factor of x
@@ -1320,6 +1464,28 @@ class simulation:
         self._output_trigger_times_station[self._station_id].append(trigger_times)
         self._output_triggered_station[self._station_id].append(np.any(multiple_triggers))
 
+    def get_random_generator(self, name):
+        """
+        Returns an independent random number generator for the current event group and station
+
+        The generator is derived from the seed of the simulation, the event group id, the station id and `name`,
+        so the random numbers do not depend on the order in which the events are simulated. This function can be
+        used in the detector simulation functions, e.g. to pass a generator to the channelGalacticNoiseAdder.
+
+        Parameters
+        ----------
+        name: str
+            identifies the stream, e.g. the name of the module that uses it
+
+        Returns
+        -------
+        generator: numpy.random.Generator or None
+            None if the config option `random_streams` is disabled
+        """
+        if not self._cfg['random_streams']:
+            return None
+        return self._random_streams.get_generator(self._event_group_id, self._station_id, name)
+
     def get_Vrms(self):
         return self._Vrms
 
@@ -1403,6 +1569,46 @@ class simulation:
                 sg[parameter_entry['name']] = np.zeros((n_showers, n_antennas, nS, parameter_entry['ndim'])) * np.nan
         return sg
 
+    @profiling.profile(category="simulation")
+    def _calculate_primary_weights(self, primary_indices):
+        """
+        calculates the weights due to Earth absorption of the primary particles of all event groups
+        in one vectorized pass
+
+        Parameters
+        ----------
+        primary_indices: array of ints
+            the indices of the primary particles (i.e. the first entry of every event group) in the input file
+
+        Returns
+        -------
+        weights: array of floats
+            the weight of every event group
+        """
+        weight_mode = self._cfg['weights']['weight_mode']
+        vertex_positions = np.array([np.array(self._fin['xx'])[primary_indices],
+                                     np.array(self._fin['yy'])[primary_indices],
+                                     np.array(self._fin['zz'])[primary_indices]]).T
+        slant_depth_table = None
+        if self._cfg['weights']['slant_depth_table'] and weight_mode in ["core_mantle_crust", "PREM"]:
+            if weight_mode == "core_mantle_crust":
+                earth = CoreMantleCrustModel()
+            else:
+                earth = PREM()
+            max_depth = max(-vertex_positions[:, 2].min(), 0) + 100 * units.m
+            logger.status(f"tabulating slant depths of the Earth model up to a depth of {max_depth / units.m:.0f}m")
+            slant_depth_table = SlantDepthTable(earth, max_depth=max_depth)
+
+        weights = get_weight(np.array(self._fin['zeniths'])[primary_indices],
+                             np.array(self._fin['energies'])[primary_indices],
+                             np.array(self._fin['flavors'])[primary_indices],
+                             mode=weight_mode,
+                             cross_section_type=self._cfg['weights']['cross_section_type'],
+                             vertex_position=vertex_positions,
+                             phi_nu=np.array(self._fin['azimuths'])[primary_indices],
+                             slant_depth_table=slant_depth_table)
+        return np.broadcast_to(weights, len(primary_indices))
+
     def _read_input_particle_properties(self, idx=None):
         if idx is None:
             idx = self._primary_index
@@ -1468,6 +1674,7 @@ class simulation:
         # interaction chain is currently not populated in the input files.
         self._sim_shower[shp.parent_id] = self.primary.get_id()
 
+    @profiling.profile(category="simulation")
     def _write_output_file(self, empty=False):
         folder = os.path.dirname(self._outputfilename)
         if not os.path.exists(folder) and folder != '':
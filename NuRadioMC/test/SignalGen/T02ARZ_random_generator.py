@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Checks that a random number generator passed to the ARZ model is only used for that call and
+does not change the random shower selection of later calls without a generator (ARZ is a singleton).
+"""
+import numpy as np
+from NuRadioMC.SignalGen.ARZ import ARZ
+from NuRadioReco.utilities import units
+
+n_index = 1.78
+theta = np.arccos(1. / n_index)
+gARZ = ARZ.ARZ(arz_version='ARZ2020')
+
+
+def get_shower_profile_id(random_generator=None):
+    gARZ.get_time_trace(1e18 * units.eV, theta, 256, 0.5 * units.ns, 'HAD', n_index, 1 * units.km,
+                        random_generator=random_generator)
+    return gARZ.get_last_shower_profile_id()['HAD']
+
+
+gARZ.set_seed(10)
+reference = [get_shower_profile_id() for i in range(10)]
+assert len(np.unique(reference)) > 1, "all random showers are the same"
+
+# calls with their own generator in between must not change the showers drawn from the seed
+gARZ.set_seed(10)
+profile_ids = []
+for i in range(10):
+    profile_ids.append(get_shower_profile_id())
+    get_shower_profile_id(np.random.default_rng(i))
+assert profile_ids == reference, f"the showers drawn from the seed changed: {profile_ids} vs. {reference}"
+
+# the shower only depends on the state of the passed generator
+for i in range(10):
+    assert get_shower_profile_id(np.random.default_rng(i)) == get_shower_profile_id(np.random.default_rng(i))
+
+print("ARZ random generator test passed")
@@ -2,3 +2,4 @@
 
 set -e
 NuRadioMC/test/SignalGen/U01unit_test.py NuRadioMC/test/SignalGen/reference_v1.pkl
+NuRadioMC/test/SignalGen/T02ARZ_random_generator.py
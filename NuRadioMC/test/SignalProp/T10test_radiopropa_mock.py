@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Checks the iterative radiopropa ray tracer against reference results without a radiopropa installation. The
+radiopropa module is replaced by `radiopropa_mock`, which propagates rays on straight lines.
+
+The reference results were created with the implementation that created the propagation modules for every
+launch angle scan and ran one ray at a time. The launch angle scans run in batches are compared to the
+reference as well.
+Run with `--create-reference` to create new reference results.
+"""
+import argparse
+import copy
+import os
+import sys
+import numpy as np
+from numpy import testing
+import radiopropa_mock
+sys.modules['radiopropa'] = radiopropa_mock
+
+from NuRadioMC.SignalProp import radioproparaytracing
+from NuRadioMC.utilities import medium
+from NuRadioReco.utilities import units
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_radiopropa_mock.npz')
+
+config = dict(
+    propagation=dict(
+        attenuate_ice=True,
+        focusing_limit=2,
+        focusing=False,
+        birefringence=False,
+        radiopropa=dict(
+            mode='iterative',
+            iter_steps_channel=[25., 2., .5],
+            iter_steps_zenith=[.5, .05, .005],
+            auto_step_size=False,
+            max_traj_length=10000)),
+    speedup=dict(delta_C_cut=40 * units.degree))
+
+# (ice model, number of bottom reflections, start point, end point, shower axis)
+setups = [
+    ('southpole_simple', 0, [-300, 100, -800], [0, 0, -100], None),
+    ('southpole_simple', 0, [500, -200, -1200], [0, 0, -200], None),
+    ('southpole_simple', 0, [500, -200, -1200], [0, 0, -200], [0.5, -0.2, 0.85]),
+    ('southpole_simple', 0, [-1000, 0, -300], [0, 0, -150], None),
+]
+
+
+def get_results(batch_size=None):
+    results = {}
+    for i_setup, (ice_model, n_reflections, x1, x2, shower_axis) in enumerate(setups):
+        ice = medium.get_ice_model(ice_model)
+        setup_config = copy.deepcopy(config)
+        if batch_size is not None:
+            setup_config['propagation']['radiopropa']['batch_size'] = batch_size
+        ray_tracer = radioproparaytracing.radiopropa_ray_tracing(ice, n_reflections=n_reflections, config=setup_config)
+        # trace twice with the same ray tracer
+        for _ in range(2):
+            ray_tracer.reset_solutions()
+            ray_tracer.set_start_and_end_point(np.array(x1) * units.m, np.array(x2) * units.m)
+            if shower_axis is not None:
+                ray_tracer.set_shower_axis(np.array(shower_axis) / np.linalg.norm(shower_axis))
+            ray_tracer.find_solutions()
+
+        n = ray_tracer.get_number_of_solutions()
+        results[f'{i_setup}_solution_type'] = np.array([ray_tracer.get_solution_type(iS) for iS in range(n)])
+        results[f'{i_setup}_launch_vector'] = np.array([ray_tracer.get_launch_vector(iS) for iS in range(n)])
+        results[f'{i_setup}_receive_vector'] = np.array([ray_tracer.get_receive_vector(iS) for iS in range(n)])
+        results[f'{i_setup}_path_length'] = np.array([ray_tracer.get_path_length(iS) for iS in range(n)])
+        results[f'{i_setup}_travel_time'] = np.array([ray_tracer.get_travel_time(iS) for iS in range(n)])
+        results[f'{i_setup}_reflection'] = np.array([ray_tracer.get_results()[iS]['reflection'] for iS in range(n)])
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference results')
+    args = parser.parse_args()
+
+    results = get_results()
+    if args.create_reference:
+        np.savez(reference_file, **results)
+        print(f"reference results written to {reference_file}")
+    else:
+        reference = np.load(reference_file)
+        for i_setup in range(len(setups)):
+            assert len(reference[f'{i_setup}_solution_type']) > 0
+        testing.assert_equal(sorted(reference.keys()), sorted(results.keys()))
+
+        for batch_size in [None, 1, 7, 1000]:
+            results = get_results(batch_size)
+            for key, value in results.items():
+                testing.assert_allclose(value, reference[key], rtol=1e-10, atol=1e-10 * units.ns, err_msg=key)
+
+        # the propagation modules are created once per ray tracer
+        radiopropa_mock.n_created.clear()
+        ice = medium.get_ice_model('southpole_simple')
+        ray_tracer = radioproparaytracing.radiopropa_ray_tracing(ice, config=copy.deepcopy(config))
+        for x1 in [[-300, 100, -800], [500, -200, -1200]]:
+            ray_tracer.reset_solutions()
+            ray_tracer.set_start_and_end_point(np.array(x1) * units.m, np.array([0, 0, -100]) * units.m)
+            ray_tracer.find_solutions()
+        assert radiopropa_mock.n_created['PropagationCK'] == 1, radiopropa_mock.n_created
+        assert radiopropa_mock.n_created['MaximumTrajectoryLength'] == 1, radiopropa_mock.n_created
+        assert radiopropa_mock.n_created['IceModel_Simple'] == 1, radiopropa_mock.n_created
+
+        print("radiopropa ray tracer test with mocked radiopropa passed")
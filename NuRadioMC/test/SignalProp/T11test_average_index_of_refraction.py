@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Checks the generic average index of refraction of `IceModel` (Gauss-Legendre quadrature along the straight
+line and the tabulated integral over depth) against the closed-form average of the exponential
+southpole_2015 model.
+"""
+import numpy as np
+from numpy import testing
+from NuRadioMC.utilities import medium, medium_base
+from NuRadioReco.utilities import units
+
+
+class PointwiseIceModel(medium_base.IceModel):
+    """ southpole_2015 evaluated for single positions only, without calling `IceModel.__init__` """
+
+    def __init__(self):
+        self.ice = medium.get_ice_model('southpole_2015')
+        self.z_air_boundary = self.ice.z_air_boundary
+
+    def get_index_of_refraction(self, position):
+        if np.ndim(position) != 1:
+            raise ValueError("only single positions are supported")
+        return self.ice.get_index_of_refraction(position)
+
+
+ice = medium.get_ice_model('southpole_2015')
+
+rnd = np.random.default_rng(7)
+n_points = 200
+position1 = np.stack([rnd.uniform(-2, 2, n_points) * units.km, rnd.uniform(-2, 2, n_points) * units.km,
+                      rnd.uniform(-2.7, -0.001, n_points) * units.km], axis=1)
+position2 = np.stack([rnd.uniform(-0.1, 0.1, n_points) * units.km, rnd.uniform(-0.1, 0.1, n_points) * units.km,
+                      rnd.uniform(-0.2, -0.001, n_points) * units.km], axis=1)
+n_closed_form = ice.get_average_index_of_refraction(position1, position2)
+
+# Gauss-Legendre quadrature along the line
+n_average = medium_base.IceModel.get_average_index_of_refraction(ice, position1, position2)
+testing.assert_allclose(n_average, n_closed_form, rtol=1e-12)
+for i in range(10):
+    n_single = medium_base.IceModel.get_average_index_of_refraction(ice, position1[i], position2[i])
+    testing.assert_allclose(n_single, n_closed_form[i], rtol=1e-12)
+
+# lines crossing the air boundary
+for z1, z2 in [(-50 * units.m, 20 * units.m), (-1 * units.km, 1 * units.m), (5 * units.m, -300 * units.m)]:
+    p1 = np.array([10, 0, z1])
+    p2 = np.array([-20, 30, z2])
+    testing.assert_allclose(medium_base.IceModel.get_average_index_of_refraction(ice, p1, p2),
+                            ice.get_average_index_of_refraction(p1, p2), rtol=1e-12)
+
+# ice models that only support single positions and do not call IceModel.__init__
+pointwise_ice = PointwiseIceModel()
+testing.assert_allclose(pointwise_ice.get_average_index_of_refraction(position1[:20], position2[:20]),
+                        n_closed_form[:20], rtol=1e-12)
+assert pointwise_ice._index_of_refraction_is_vectorized is False
+
+# tabulated integral over depth, horizontal lines use the quadrature
+ice.create_average_index_of_refraction_table()
+n_average = medium_base.IceModel.get_average_index_of_refraction(ice, position1, position2)
+testing.assert_allclose(n_average, n_closed_form, rtol=1e-6)
+p1 = np.array([0, 0, -150 * units.m])
+p2 = np.array([300 * units.m, 0, -150 * units.m])
+testing.assert_allclose(medium_base.IceModel.get_average_index_of_refraction(ice, p1, p2),
+                        ice.get_index_of_refraction(p1), rtol=1e-12)
+
+print("average index of refraction test passed")
@@ -0,0 +1,293 @@
+"""
+A minimal stand-in for the radiopropa python module, which is used to test the logic of the radiopropa ray
+tracer (module lists, launch angle scans, bundle finding) without a radiopropa installation.
+
+Rays propagate on straight lines with the index of refraction of the ice model at the surface. The air
+boundary creates a reflected secondary ray, reflective layers reflect the ray and observers stop it. This is
+no physical ray tracing, but it exercises the same interface as radiopropa.
+
+Usage (before NuRadioMC is imported)::
+
+    import sys
+    import radiopropa_mock
+    sys.modules['radiopropa'] = radiopropa_mock
+"""
+import numpy as np
+
+meter = 1.
+second = 1.
+rad = 1.
+deg = np.pi / 180.
+DETECTED = 1
+NOTHING = 0
+
+c_light = 299792458.  # m/s
+
+# number of created objects per class, used to check which objects are reused
+n_created = {}
+
+
+def _count(obj):
+    name = type(obj).__name__
+    n_created[name] = n_created.get(name, 0) + 1
+
+
+class Vector3d:
+
+    def __init__(self, x, y, z):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def to_array(self):
+        return np.array([self.x, self.y, self.z])
+
+    def getTheta(self):
+        return np.arccos(self.z / np.linalg.norm(self.to_array()))
+
+
+class Plane:
+
+    def __init__(self, x0, n):
+        self.x0 = x0.to_array()
+        self.n = n.to_array() / np.linalg.norm(n.to_array())
+
+    def intersection(self, position, direction):
+        denominator = np.dot(direction, self.n)
+        if denominator == 0:
+            return np.inf
+        return np.dot(self.x0 - position, self.n) / denominator
+
+
+class Sphere:
+
+    def __init__(self, center, radius):
+        self.center = center.to_array()
+        self.radius = radius
+
+    def intersection(self, position, direction):
+        d = position - self.center
+        b = np.dot(direction, d)
+        discriminant = b ** 2 - (np.dot(d, d) - self.radius ** 2)
+        if discriminant < 0:
+            return np.inf
+        return -b - np.sqrt(discriminant)
+
+
+class ScalarField:
+
+    def __init__(self):
+        _count(self)
+
+
+class IceModel_Simple(ScalarField):
+
+    def __init__(self, z_surface=0, n_ice=1.78, delta_n=0.43, z_0=77., z_shift=0):
+        super().__init__()
+        self.n_surface = n_ice - delta_n
+
+    def getValue(self, position):
+        return self.n_surface
+
+
+class Module:
+
+    def __init__(self):
+        _count(self)
+
+
+class PropagationCK(Module):
+
+    def __init__(self, field, tolerance, min_step, max_step, bire_model=None):
+        super().__init__()
+        self.field = field
+
+
+class MaximumTrajectoryLength(Module):
+
+    def __init__(self, max_length):
+        super().__init__()
+        self.max_length = max_length
+
+
+class ObserverSurface:
+
+    def __init__(self, surface):
+        self.surface = surface
+
+    def checkDetection(self, candidate):
+        if candidate.detected_by is self:
+            return DETECTED
+        return NOTHING
+
+
+class Observer(Module):
+
+    def __init__(self):
+        super().__init__()
+        self.surfaces = []
+
+    def add(self, surface):
+        self.surfaces.append(surface)
+
+    def setDeactivateOnDetection(self, deactivate):
+        pass
+
+
+class Discontinuity(Module):
+
+    def __init__(self, surface, n1, n2):
+        super().__init__()
+        self.surface = surface
+
+
+class ReflectiveLayer(Module):
+
+    def __init__(self, surface, reflection_coefficient):
+        super().__init__()
+        self.surface = surface
+
+    def get_times_reflectedoff(self, candidate):
+        return candidate.n_reflections.get(id(self), 0)
+
+
+class SourcePosition:
+
+    def __init__(self, position):
+        self.position = position.to_array()
+
+
+class SourceDirection:
+
+    def __init__(self, direction):
+        self.direction = direction.to_array() / np.linalg.norm(direction.to_array())
+
+
+class Source:
+
+    def __init__(self):
+        self.features = []
+
+    def add(self, feature):
+        self.features.append(feature)
+
+    def getCandidate(self):
+        position = [f.position for f in self.features if isinstance(f, SourcePosition)][0]
+        direction = [f.direction for f in self.features if isinstance(f, SourceDirection)][0]
+        return Candidate(position, direction)
+
+
+class Candidate:
+
+    def __init__(self, position, direction, launch_direction=None, path=None, trajectory_length=0,
+                 propagation_time=0, n_reflections=None, reflection_angles=None):
+        self.position = np.array(position, dtype=float)
+        self.direction = np.array(direction, dtype=float)
+        self.launch_direction = self.direction if launch_direction is None else launch_direction
+        self.path = [self.position] if path is None else list(path)
+        self.trajectory_length = trajectory_length
+        self.propagation_time = propagation_time
+        self.n_reflections = {} if n_reflections is None else dict(n_reflections)
+        self.reflection_angles = [] if reflection_angles is None else list(reflection_angles)
+        self.secondaries = []
+        self.detected_by = None
+        self.active = True
+
+    def get(self):
+        return self
+
+    def getLaunchVector(self):
+        return Vector3d(*self.launch_direction)
+
+    def getReceiveVector(self):
+        return Vector3d(*self.direction)
+
+    def getPathX(self):
+        return [p[0] for p in self.path]
+
+    def getPathY(self):
+        return [p[1] for p in self.path]
+
+    def getPathZ(self):
+        return [p[2] for p in self.path]
+
+    def getTrajectoryLength(self):
+        return self.trajectory_length
+
+    def getPropagationTime(self):
+        return self.propagation_time
+
+    def getReflectionAngles(self):
+        return self.reflection_angles
+
+    def copy(self):
+        return Candidate(self.position, self.direction, self.launch_direction, self.path, self.trajectory_length,
+                         self.propagation_time, self.n_reflections, self.reflection_angles)
+
+
+class CandidateVector(list):
+    pass
+
+
+class ModuleList:
+
+    def __init__(self):
+        self.modules = []
+
+    def add(self, module):
+        self.modules.append(module)
+
+    def setShowProgress(self, show):
+        pass
+
+    def run(self, candidate, recursive=True):
+        if isinstance(candidate, CandidateVector):
+            # the candidates are independent, the order in which they are run does not matter
+            for c in candidate[::-1]:
+                self.run(c, recursive)
+            return
+
+        propagation = [m for m in self.modules if isinstance(m, PropagationCK)][0]
+        n = propagation.field.getValue(None)
+        max_length = min([m.max_length for m in self.modules if isinstance(m, MaximumTrajectoryLength)])
+        while candidate.active:
+            # find the next surface on the straight line
+            step = max_length - candidate.trajectory_length
+            event = None
+            for module in self.modules:
+                if isinstance(module, Observer):
+                    surfaces = [(s.surface, s) for s in module.surfaces]
+                elif isinstance(module, (Discontinuity, ReflectiveLayer)):
+                    surfaces = [(module.surface, module)]
+                else:
+                    continue
+                for surface, obj in surfaces:
+                    distance = surface.intersection(candidate.position, candidate.direction)
+                    if 1e-6 < distance < step:
+                        step = distance
+                        event = obj
+
+            candidate.position = candidate.position + step * candidate.direction
+            candidate.path.append(candidate.position)
+            candidate.trajectory_length += step
+            candidate.propagation_time += step * n / c_light
+            if event is None:
+                candidate.active = False
+            elif isinstance(event, ObserverSurface):
+                candidate.detected_by = event
+                candidate.active = False
+            else:
+                normal = event.surface.n
+                reflected = candidate.direction - 2 * np.dot(candidate.direction, normal) * normal
+                if isinstance(event, Discontinuity):
+                    secondary = candidate.copy()
+                    secondary.direction = reflected
+                    candidate.secondaries.append(secondary)
+                else:
+                    candidate.n_reflections[id(event)] = candidate.n_reflections.get(id(event), 0) + 1
+                    candidate.reflection_angles.append(np.arccos(abs(np.dot(candidate.direction, normal))))
+                    candidate.direction = reflected
+
+        if recursive:
+            for secondary in candidate.secondaries:
+                self.run(secondary, recursive)
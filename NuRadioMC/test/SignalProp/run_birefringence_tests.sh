@@ -1,6 +1,7 @@
 set -e
 cd NuRadioMC/test/SignalProp/
 python3 T07test_birefringence.py
+python3 T09test_birefringence_path_properties.py
 
 cd emitter_sim_test
 python3 T01_sim_events.py
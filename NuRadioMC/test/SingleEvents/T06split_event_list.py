@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Writes the event list of a NuRadioMC file into one input file and, split up by event groups,
+into several input files (<outputfilename>.part0000, .part0001, ...). The output of previous
+simulations (station groups, triggers and weights) is not copied.
+"""
+import argparse
+import h5py
+from NuRadioMC.EvtGen.generator import write_events_to_hdf5
+
+parser = argparse.ArgumentParser(description='split a NuRadioMC event list by event groups')
+parser.add_argument('inputfilename', type=str, help='path to NuRadioMC input event list')
+parser.add_argument('outputfilename', type=str, help='filename of the unsplit input file')
+parser.add_argument('n_event_groups_per_file', type=int, help='number of event groups per split file')
+args = parser.parse_args()
+
+simulation_output = ['triggered', 'multiple_triggers', 'trigger_times', 'weights']
+
+with h5py.File(args.inputfilename, 'r') as fin:
+    attributes = dict(fin.attrs)
+    data_sets = {key: fin[key][...] for key in fin if isinstance(fin[key], h5py.Dataset) and key not in simulation_output}
+
+write_events_to_hdf5(args.outputfilename, dict(data_sets), dict(attributes))
+write_events_to_hdf5(args.outputfilename, dict(data_sets), dict(attributes), n_events_per_file=args.n_event_groups_per_file)
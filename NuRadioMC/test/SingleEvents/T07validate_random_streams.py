@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Checks that the events of simulations of parts of an event list are identical to the events of the
+simulation of the full event list. This is only the case if the simulation uses independent random
+number streams per event group and station (config option `random_streams`).
+
+Usage: T07validate_random_streams.py full.nur part1.nur [part2.nur ...]
+"""
+import sys
+import numpy as np
+from numpy import testing
+import NuRadioReco.modules.io.eventReader
+
+# Setup logging
+from NuRadioReco.utilities.logging import setup_logger
+logger = setup_logger(name="")
+
+
+def read_events(filename):
+    """ returns the stations of all events in the file, with the event group id, event id and station id as key """
+    eventReader = NuRadioReco.modules.io.eventReader.eventReader()
+    eventReader.begin(filename)
+    stations = {}
+    for event in eventReader.run():
+        for station in event.get_stations():
+            stations[(event.get_run_number(), event.get_id(), station.get_id())] = station
+    eventReader.end()
+    return stations
+
+
+def compare_stations(station1, station2):
+    testing.assert_equal(station1.get_channel_ids(), station2.get_channel_ids())
+    for channel_id in station1.get_channel_ids():
+        # the traces contain the noise, i.e., they are only identical if the same random numbers were used
+        testing.assert_equal(station1.get_channel(channel_id).get_trace(), station2.get_channel(channel_id).get_trace())
+    testing.assert_equal(station1.has_triggered(), station2.has_triggered())
+
+    # the electric fields of the signal
+    efields1 = sorted(station1.get_sim_station().get_electric_fields(), key=lambda e: e.get_unique_identifier())
+    efields2 = sorted(station2.get_sim_station().get_electric_fields(), key=lambda e: e.get_unique_identifier())
+    testing.assert_equal([e.get_unique_identifier() for e in efields1], [e.get_unique_identifier() for e in efields2])
+    for efield1, efield2 in zip(efields1, efields2):
+        testing.assert_equal(efield1.get_trace(), efield2.get_trace())
+
+
+full_file = sys.argv[1]
+part_files = sys.argv[2:]
+print("Testing the files {} against the file {}".format(part_files, full_file))
+
+stations_full = read_events(full_file)
+stations_parts = {}
+for part_file in part_files:
+    stations_parts.update(read_events(part_file))
+
+if len(stations_parts) == 0:
+    print("The split simulations did not produce any events")
+    sys.exit(-1)
+
+# the parts have to contain exactly the events of the full simulation with the same event group ids
+event_group_ids_parts = np.unique([key[0] for key in stations_parts])
+keys_full = sorted([key for key in stations_full if key[0] in event_group_ids_parts])
+testing.assert_equal(sorted(stations_parts.keys()), keys_full)
+
+for key in keys_full:
+    compare_stations(stations_full[key], stations_parts[key])
+
+print("The {} stations of the split simulations are identical to the full simulation".format(len(keys_full)))
@@ -0,0 +1,11 @@
+#!/bin/bash
+set -e
+
+# simulate the full event list and only the event groups of the second part of the split event list
+NuRadioMC/test/SingleEvents/T06split_event_list.py NuRadioMC/test/SingleEvents/1e18_output_reference.hdf5 NuRadioMC/test/SingleEvents/1e18_input_random_streams.hdf5 6
+NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_input_random_streams.hdf5 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config_random_streams.yaml NuRadioMC/test/SingleEvents/1e18_output_random_streams.hdf5 NuRadioMC/test/SingleEvents/1e18_output_random_streams.nur
+NuRadioMC/test/SingleEvents/T02RunSimulation.py NuRadioMC/test/SingleEvents/1e18_input_random_streams.hdf5.part0001 NuRadioMC/test/SingleEvents/surface_station_1GHz.json NuRadioMC/test/SingleEvents/config_random_streams.yaml NuRadioMC/test/SingleEvents/1e18_output_random_streams_part0001.hdf5 NuRadioMC/test/SingleEvents/1e18_output_random_streams_part0001.nur
+NuRadioMC/test/SingleEvents/T07validate_random_streams.py NuRadioMC/test/SingleEvents/1e18_output_random_streams.nur NuRadioMC/test/SingleEvents/1e18_output_random_streams_part0001.nur
+
+# cleanup
+rm -v NuRadioMC/test/SingleEvents/1e18_input_random_streams.hdf5* NuRadioMC/test/SingleEvents/1e18_output_random_streams*
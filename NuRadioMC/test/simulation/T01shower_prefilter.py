@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Checks the cuts which the simulation applies to all showers before the event loop (`_prefilter_showers`):
+the fiducial volume and shower type cuts and the summed shower energies used for the distance cut have to
+agree with a shower-by-shower evaluation.
+"""
+import os
+import shutil
+import tempfile
+import numpy as np
+from numpy import testing
+from NuRadioReco.utilities import units
+from simulation_test_helpers import create_detector, create_event_list, get_simulation, get_energy_sums
+
+
+if __name__ == "__main__":
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        create_detector(os.path.join(tmp_dir, 'detector.json'))
+        data, attributes = create_event_list(300, np.random.default_rng(42))
+        vertices = np.array([data['xx'], data['yy'], data['zz']]).T
+
+        for shower_type in [None, 'had']:
+            sim = get_simulation(tmp_dir, data, attributes, shower_type)
+
+            candidates = np.array([sim._is_in_fiducial_volume(vertex) for vertex in vertices])
+            if shower_type is not None:
+                candidates &= data['shower_type'] == shower_type
+            assert 0 < np.sum(candidates) < len(candidates)
+            testing.assert_equal(sim._shower_candidates, candidates)
+
+            energy_sums = get_energy_sums(data)
+            assert np.sum(energy_sums > data['shower_energies']) > 0, "no shower energies were summed up"
+            testing.assert_allclose(sim._shower_energy_sums, energy_sums, rtol=1e-12)
+            testing.assert_allclose(sim._shower_distance_cuts,
+                                    [sim._get_distance_cut(energy) + 100 * units.m for energy in energy_sums], rtol=1e-12)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print("shower prefilter test passed")
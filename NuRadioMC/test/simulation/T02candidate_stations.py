@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Checks that the stations which are visited for an event group (`_get_candidate_stations`, looked up in a
+KD-tree of the station bary centers) are exactly the stations within the distance cut of a shower, found by
+calculating the distances of all showers to all stations.
+"""
+import shutil
+import tempfile
+import os
+import numpy as np
+from numpy import testing
+from simulation_test_helpers import create_detector, create_event_list, get_simulation
+
+tmp_dir = tempfile.mkdtemp()
+try:
+    create_detector(os.path.join(tmp_dir, 'detector.json'))
+    data, attributes = create_event_list(300, np.random.default_rng(43))
+    vertices = np.array([data['xx'], data['yy'], data['zz']]).T
+    sim = get_simulation(tmp_dir, data, attributes)
+
+    # bary centers of the stations, queried from the detector
+    barycenters = []
+    for station_id in sim._station_ids:
+        relative_positions = [sim._det.get_relative_position(station_id, channel_id)
+                              for channel_id in sim._det.get_channel_ids(station_id)]
+        barycenters.append(np.mean(relative_positions, axis=0) + sim._det.get_absolute_position(station_id))
+    barycenters = np.array(barycenters)
+    testing.assert_allclose(sim._station_barycenter, barycenters)
+
+    n_visited = 0
+    for event_group_id in np.unique(data['event_group_ids']):
+        event_indices = np.flatnonzero(data['event_group_ids'] == event_group_id)
+        candidate_stations = sim._get_candidate_stations(event_indices)
+
+        # brute force: distances of all showers of the event group to all stations
+        distances = np.linalg.norm(vertices[event_indices][:, None] - barycenters[None], axis=-1)
+        visible = (distances <= sim._shower_distance_cuts[event_indices][:, None]) & sim._shower_candidates[event_indices][:, None]
+        expected = {iSt: visible[:, iSt] for iSt in np.flatnonzero(np.any(visible, axis=0))}
+
+        testing.assert_equal(sorted(candidate_stations.keys()), sorted(expected.keys()))
+        for iSt in expected:
+            testing.assert_equal(candidate_stations[iSt], expected[iSt])
+        n_visited += len(expected)
+
+    # the test is only meaningful if most, but not all stations are cut away
+    n_all = len(np.unique(data['event_group_ids'])) * len(sim._station_ids)
+    assert 0 < n_visited < 0.5 * n_all, f"{n_visited} of {n_all} stations are visited"
+
+    # without the distance cut, all stations are visited for all showers that pass the other cuts
+    sim._station_tree = None
+    for event_group_id in np.unique(data['event_group_ids'])[:20]:
+        event_indices = np.flatnonzero(data['event_group_ids'] == event_group_id)
+        candidate_stations = sim._get_candidate_stations(event_indices)
+        if np.any(sim._shower_candidates[event_indices]):
+            testing.assert_equal(sorted(candidate_stations.keys()), list(range(len(sim._station_ids))))
+        else:
+            assert candidate_stations == {}
+finally:
+    shutil.rmtree(tmp_dir)
+
+print(f"candidate stations test passed ({n_visited} of {n_all} stations visited)")
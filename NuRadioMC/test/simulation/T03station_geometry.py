@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Checks the station geometry which the simulation queries from the detector once per run
+(`_compile_station_geometry`) against values taken independently from the detector description:
+the channel and station positions written to the detector file, the ADC settings and the thermal
+noise level of the configured noise temperature.
+"""
+import json
+import shutil
+import tempfile
+import os
+import numpy as np
+from numpy import testing
+from scipy import constants
+from NuRadioReco.utilities import units
+from simulation_test_helpers import create_detector, create_event_list, get_simulation, noise_temperature
+
+tmp_dir = tempfile.mkdtemp()
+try:
+    detector_filename = os.path.join(tmp_dir, 'detector.json')
+    create_detector(detector_filename)
+    with open(detector_filename) as f:
+        detector_description = json.load(f)
+    data, attributes = create_event_list(10, np.random.default_rng(44))
+    sim = get_simulation(tmp_dir, data, attributes, noise=True)
+    det = sim._det
+    dt = sim._dt
+    max_freq = 0.5 / dt
+
+    stations = {station['station_id']: station for station in detector_description['stations'].values()}
+    # all stations use the channels of station 101
+    channels = {channel['channel_id']: channel for channel in detector_description['channels'].values()
+                if channel['station_id'] == 101}
+    assert len(sim._station_ids) == len(stations)
+
+    for station_id in sim._station_ids:
+        geometry = sim._station_geometry[station_id]
+        assert geometry['n_channels'] == len(channels)
+
+        station_position = np.array([stations[station_id]['pos_easting'], stations[station_id]['pos_northing'],
+                                     stations[station_id]['pos_altitude']]) * units.m
+        for channel_id, channel in channels.items():
+            relative_position = np.array([channel['ant_position_x'], channel['ant_position_y'],
+                                          channel['ant_position_z']]) * units.m
+            testing.assert_allclose(geometry['relative_positions'][channel_id], relative_position, atol=1e-9 * units.m)
+            testing.assert_allclose(geometry['channel_positions'][channel_id], relative_position + station_position,
+                                    atol=1e-9 * units.m)
+
+        # the simulated traces cover the ADC trace length with an even number of samples
+        sampling_rate_detector = channels[0]['adc_sampling_frequency'] * units.GHz
+        trace_length = channels[0]['adc_n_samples'] / sampling_rate_detector
+        n_samples = geometry['n_samples']
+        assert geometry['sampling_rate_detector'] == sampling_rate_detector
+        assert n_samples % 2 == 0
+        assert trace_length <= n_samples * dt + 1e-9 * units.ns < trace_length + 2 * dt
+        testing.assert_equal(len(geometry['times']), n_samples)
+        testing.assert_allclose(np.diff(geometry['times']), dt, rtol=1e-9)
+        assert geometry['times'][0] == 0
+        testing.assert_equal(len(geometry['frequencies']), n_samples // 2 + 1)
+        testing.assert_allclose(np.diff(geometry['frequencies']), 1 / (n_samples * dt), rtol=1e-9)
+        testing.assert_allclose(geometry['frequencies'][-1], max_freq, rtol=1e-12)
+
+        # thermal noise (Johnson-Nyquist, 50 Ohm) of the noise temperature in the bandwidth it is generated for
+        testing.assert_equal(sorted(geometry['noise_Vrms'].keys()), sorted(channels.keys()))
+        Vrms = (noise_temperature * 50 * constants.k * max_freq / units.Hz) ** 0.5 * units.V
+        for channel_id in channels:
+            testing.assert_allclose(geometry['noise_Vrms'][channel_id], Vrms, rtol=1e-9)
+finally:
+    shutil.rmtree(tmp_dir)
+
+print("station geometry test passed")
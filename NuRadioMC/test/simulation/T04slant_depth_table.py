@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Checks the interpolated slant depths of the SlantDepthTable against the exact integral
+through the Core-Mantle-Crust model (which has a constant density per layer) and against
+the explicit integration with a fine step size for the PREM model.
+"""
+import numpy as np
+from numpy import testing
+from NuRadioReco.utilities import units
+from NuRadioMC.utilities.earth_attenuation import SlantDepthTable, PREM, CoreMantleCrustModel
+
+
+def get_exact_slant_depths(earth, depths, cos_zeniths):
+    """
+    sums up the density times the length of the chord within every layer of constant density
+    """
+    r = earth.earth_radius - depths
+    slant_depths = np.zeros_like(depths)
+    inner_lengths = np.zeros_like(depths)
+    for radius, density in zip(earth.radii, earth.densities):
+        discriminant = (r * cos_zeniths) ** 2 - r ** 2 + radius ** 2
+        root = np.sqrt(np.maximum(discriminant, 0))
+        lengths = np.maximum(-r * cos_zeniths + root - np.maximum(-r * cos_zeniths - root, 0), 0)
+        slant_depths += density * (lengths - inner_lengths)
+        inner_lengths = lengths
+    return slant_depths
+
+
+def get_chords(depths, cos_zeniths):
+    endpoints = np.zeros((len(depths), 3))
+    endpoints[:, 2] = -depths
+    directions = np.array([np.sqrt(1 - cos_zeniths ** 2), np.zeros_like(cos_zeniths), cos_zeniths]).T
+    return endpoints, directions
+
+
+rnd = np.random.default_rng(42)
+max_depth = 3 * units.km
+n = 10000
+depths = rnd.uniform(0, max_depth, n)
+# all directions and the (near) horizontal directions for which the chords change rapidly
+cos_zeniths = np.append(rnd.uniform(-1, 1, n // 2), rnd.uniform(-0.1, 0.1, n // 2))
+# directions tangent to the core and to the mantle
+earth = CoreMantleCrustModel()
+for i, radius in enumerate(earth.radii[:2]):
+    tangent = slice(i * 100, (i + 1) * 100)
+    cos_zeniths[tangent] = -np.sqrt(1 - (radius / (earth.earth_radius - depths[tangent])) ** 2) + \
+        rnd.normal(0, 1e-4, 100)
+
+table = SlantDepthTable(earth, max_depth=max_depth)
+endpoints, directions = get_chords(depths, cos_zeniths)
+testing.assert_allclose(table(endpoints, directions), get_exact_slant_depths(earth, depths, cos_zeniths),
+                        rtol=1e-4, atol=1 * units.g / units.cm ** 2)
+# single chords
+testing.assert_allclose(table(endpoints[0], directions[0]), get_exact_slant_depths(earth, depths, cos_zeniths)[0],
+                        rtol=1e-4)
+
+# chords with endpoints outside of the table are integrated explicitly
+deep_endpoints = endpoints[:100] - np.array([0, 0, max_depth])
+testing.assert_equal(table(deep_endpoints, directions[:100]), earth.slant_depth(deep_endpoints, directions[:100]))
+
+# the PREM model has layers just below the surface
+earth = PREM()
+table = SlantDepthTable(earth, max_depth=max_depth)
+endpoints, directions = get_chords(depths[::50], cos_zeniths[::50])
+testing.assert_allclose(table(endpoints, directions), earth.slant_depth(endpoints, directions, step=20 * units.m),
+                        rtol=1e-4, atol=1 * units.g / units.cm ** 2)
+
+print("slant depth table test passed")
@@ -0,0 +1,7 @@
+#!/bin/bash
+set -e
+
+python3 NuRadioMC/test/simulation/T01shower_prefilter.py
+python3 NuRadioMC/test/simulation/T02candidate_stations.py
+python3 NuRadioMC/test/simulation/T03station_geometry.py
+python3 NuRadioMC/test/simulation/T04slant_depth_table.py
@@ -0,0 +1,122 @@
+"""
+Helper functions shared by the simulation tests: a grid of stations, a list of event groups with several
+showers and a simulation object which is set up up to (and including) the prefiltering of the showers.
+"""
+import json
+import os
+import numpy as np
+import yaml
+import NuRadioReco.modules.channelBandPassFilter
+from NuRadioMC.simulation import simulation
+from NuRadioReco.utilities import units
+from NuRadioReco.utilities.logging import setup_logger
+import logging
+
+logger = setup_logger(name="", level=logging.WARNING)
+
+detector_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../SingleEvents/surface_station_1GHz.json')
+
+distance_cut_sum_length = 50 * units.m
+grid_spacing = 2 * units.km
+n_grid = 6
+noise_temperature = 300  # in K
+
+
+channelBandPassFilter = NuRadioReco.modules.channelBandPassFilter.channelBandPassFilter()
+
+
+class mySimulation(simulation.simulation):
+
+    def _detector_simulation_filter_amp(self, evt, station, det):
+        channelBandPassFilter.run(evt, station, det, passband=[80 * units.MHz, 500 * units.MHz],
+                                  filter_type='butter', order=2)
+
+    def _detector_simulation_trigger(self, evt, station, det):
+        pass
+
+
+def create_detector(filename):
+    """ a 6 x 6 grid of stations, all of them use the channels of station 101 """
+    with open(detector_file) as f:
+        det = json.load(f)
+    reference_station = det['stations']['1']
+    stations = {}
+    for i in range(n_grid ** 2):
+        station = dict(reference_station)
+        station['station_id'] = 101 + i
+        station['pos_easting'] = (i % n_grid) * grid_spacing / units.m
+        station['pos_northing'] = (i // n_grid) * grid_spacing / units.m
+        station['reference_station'] = 101
+        stations[str(i + 1)] = station
+    det['stations'] = stations
+    with open(filename, 'w') as f:
+        json.dump(det, f)
+
+
+def create_event_list(n_event_groups, rnd):
+    """ event groups with up to four showers, some of them close to each other, in random order """
+    data = {key: [] for key in ['event_group_ids', 'shower_ids', 'xx', 'yy', 'zz', 'shower_energies', 'shower_type']}
+    shower_id = 0
+    for event_group_id in range(n_event_groups):
+        n_showers = rnd.choice([1, 1, 2, 3, 4])
+        vertex = rnd.uniform([-3 * units.km, -3 * units.km, -2.7 * units.km], [13 * units.km, 13 * units.km, 0])
+        direction = rnd.normal(size=3)
+        direction /= np.linalg.norm(direction)
+        for distance in np.sort(rnd.uniform(0, 3 * distance_cut_sum_length, n_showers)):
+            data['event_group_ids'].append(event_group_id)
+            data['shower_ids'].append(shower_id)
+            data['xx'].append(vertex[0] + distance * direction[0])
+            data['yy'].append(vertex[1] + distance * direction[1])
+            data['zz'].append(min(vertex[2] + distance * direction[2], 0))
+            data['shower_energies'].append(10 ** rnd.uniform(16, 19.5) * units.eV)
+            data['shower_type'].append(rnd.choice(['em', 'had']))
+            shower_id += 1
+
+    # the showers of an event group do not have to be next to each other in the input
+    order = rnd.permutation(shower_id)
+    data = {key: np.array(value)[order] for key, value in data.items()}
+
+    n_showers = len(order)
+    data['flavors'] = np.full(n_showers, 12)
+    data['energies'] = data['shower_energies']
+    data['zeniths'] = rnd.uniform(0, np.pi, n_showers)
+    data['azimuths'] = rnd.uniform(0, 2 * np.pi, n_showers)
+    data['interaction_type'] = np.full(n_showers, 'cc')
+    data['inelasticity'] = np.full(n_showers, 0.5)
+    data['n_interaction'] = np.ones(n_showers, dtype=int)
+    data['vertex_times'] = np.zeros(n_showers)
+
+    attributes = {'n_events': n_event_groups, 'start_event_id': 0, 'total_number_of_events': n_event_groups,
+                  'fiducial_rmin': 0, 'fiducial_rmax': 14 * units.km,
+                  'fiducial_zmin': -2.5 * units.km, 'fiducial_zmax': 0,
+                  'Emin': 1e16 * units.eV, 'Emax': 1e20 * units.eV}
+    return data, attributes
+
+
+def get_simulation(tmp_dir, data, attributes, shower_type=None, noise=False):
+    config = {'noise': noise, 'speedup': {'distance_cut': True, 'distance_cut_sum_length': distance_cut_sum_length},
+              'propagation': {'ice_model': 'ARAsim_southpole'}, 'signal': {'shower_type': shower_type},
+              'trigger': {'noise_temperature': noise_temperature}}
+    config_file = os.path.join(tmp_dir, 'config.yaml')
+    with open(config_file, 'w') as f:
+        yaml.dump(config, f)
+
+    sim = mySimulation(inputfilename=(data, attributes), outputfilename=os.path.join(tmp_dir, 'output.hdf5'),
+                       detectorfile=os.path.join(tmp_dir, 'detector.json'), config_file=config_file,
+                       file_overwrite=True, log_level=logging.WARNING)
+    sim._compile_station_geometry()
+    sim._prefilter_showers()
+    return sim
+
+
+def get_energy_sums(data):
+    """ sums up the energies of the showers of an event group which are close to each other, shower by shower """
+    energy_sums = np.zeros(len(data['xx']))
+    vertices = np.array([data['xx'], data['yy'], data['zz']]).T
+    for index in range(len(energy_sums)):
+        event_indices = np.flatnonzero(data['event_group_ids'] == data['event_group_ids'][index])
+        # the distances are measured from the first shower of the event group in the input
+        distances = np.linalg.norm(vertices[event_indices] - vertices[event_indices[0]], axis=1)
+        distance = np.linalg.norm(vertices[index] - vertices[event_indices[0]])
+        energy_sums[index] = np.sum(data['shower_energies'][event_indices][np.abs(distances - distance) < distance_cut_sum_length])
+    return energy_sums
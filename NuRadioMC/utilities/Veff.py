@@ -8,6 +8,7 @@ import json
 import os
 import copy
 import time
+import collections
 
 from NuRadioReco.utilities import units
 
@@ -167,6 +168,155 @@ def get_veff_output(volume, counts, all_events):
     return [v_eff, v_eff_error, counts, v_eff_low, v_eff_high]
 
 
+# cache of the content of NuRadioMC hdf5 files that is relevant for the effective volume calculation,
+# see `read_Veff_file`. The cache is keyed by the absolute filename, an entry is only reused
+# if the file was not modified since it was read. The least recently used files are removed first
+# when the cache exceeds its maximum size (see `_read_Veff_files`).
+_file_cache = collections.OrderedDict()
+
+
+def read_Veff_file(filename):
+    """
+    reads the quantities of a NuRadioMC hdf5 file that are needed for the effective volume calculation
+
+    The data is stored in a compact columnar representation, i.e., a dictionary of numpy arrays
+    (triggers, weights, zenith angles and event group ids) and the file attributes. Quantities that are
+    only needed for specific trigger combinations (e.g. amplitudes for efficiency cuts) are read on
+    demand by `get_Veff_column`.
+
+    Parameters
+    ----------
+    filename: string
+        filename of the hdf5 file
+
+    Returns
+    -------
+    dict
+        the content of the file
+    """
+    data = {'filename': filename}
+    with h5py.File(filename, 'r') as fin:
+        data['attrs'] = dict(fin.attrs)
+        for key in ['weights', 'triggered', 'multiple_triggers', 'event_group_ids', 'zeniths']:
+            if key in fin:
+                data[key] = np.array(fin[key])
+    return data
+
+
+def get_Veff_column(data, key):
+    """
+    returns a dataset of the hdf5 file which was read with `read_Veff_file`
+
+    The dataset is read from the file when it is requested for the first time and is cached afterwards.
+
+    Parameters
+    ----------
+    data: dict
+        the output of `read_Veff_file`
+    key: string
+        the name of the dataset, e.g. 'max_amp_ray_solution' or 'station_101/ray_tracing_reflection'
+    """
+    if key not in data:
+        with h5py.File(data['filename'], 'r') as fin:
+            data[key] = np.array(fin[key])
+    return data[key]
+
+
+def _get_station_amplitudes(data):
+    """
+    returns the event group ids and maximum amplitudes (of the envelope) of all station groups of the file
+    which was read with `read_Veff_file`. The result is cached.
+    """
+    if 'station_amplitudes' not in data:
+        station_amplitudes = {}
+        with h5py.File(data['filename'], 'r') as fin:
+            for key in fin.keys():
+                if key.startswith("station_"):
+                    if 'event_group_ids' not in fin[key]:
+                        continue  # the station might have no triggers
+                    station_amplitudes[key] = (np.array(fin[key]['event_group_ids']),
+                                               np.nan_to_num(np.array(fin[key]['maximum_amplitudes_envelope'])))
+        data['station_amplitudes'] = station_amplitudes
+    return data['station_amplitudes']
+
+
+def _get_Veff_data_size(data):
+    """
+    returns the size (in bytes) of the arrays of a file which was read with `read_Veff_file`
+    """
+    size = 0
+    for key, value in data.items():
+        if key == 'station_amplitudes':
+            size += sum(ids.nbytes + amplitudes.nbytes for ids, amplitudes in value.values())
+        elif isinstance(value, np.ndarray):
+            size += value.nbytes
+    return size
+
+
+def _read_Veff_files(filenames, n_cores=1, use_cache=True, cache_size=1073741824):
+    """
+    reads the relevant content of all files, files that are already in the cache are not read again
+
+    Parameters
+    ----------
+    filenames: list of strings
+        the hdf5 files
+    n_cores: int
+        the number of processes used to read the files
+    use_cache: bool
+        if True, the file content is stored in (and reused from) the module level cache
+    cache_size: int
+        the maximum size (in bytes of the cached arrays) of the module level cache. If exceeded,
+        the least recently used files are removed from the cache. Datasets that are read on demand
+        (see `get_Veff_column`) are accounted for in the next call.
+
+    Returns
+    -------
+    list of dicts
+        the output of `read_Veff_file` for every file
+    """
+    output = {}
+    signatures = {}
+    for filename in filenames:
+        stat = os.stat(filename)
+        signatures[filename] = (stat.st_mtime, stat.st_size)
+        cache_key = os.path.abspath(filename)
+        if use_cache and cache_key in _file_cache and _file_cache[cache_key][0] == signatures[filename]:
+            output[filename] = _file_cache[cache_key][1]
+            _file_cache.move_to_end(cache_key)
+
+    missing = [filename for filename in filenames if filename not in output]
+    if len(missing):
+        logger.info(f"reading {len(missing)} of {len(filenames)} files")
+    if n_cores > 1 and len(missing) > 1:
+        from multiprocessing import Pool
+        with Pool(n_cores) as p:
+            new_data = p.map(read_Veff_file, missing)
+    else:
+        new_data = [read_Veff_file(filename) for filename in missing]
+
+    for filename, data in zip(missing, new_data):
+        output[filename] = data
+        if use_cache:
+            _file_cache[os.path.abspath(filename)] = (signatures[filename], data)
+            _file_cache.move_to_end(os.path.abspath(filename))
+
+    if use_cache:
+        cache_bytes = sum(_get_Veff_data_size(data) for _, data in _file_cache.values())
+        while cache_bytes > cache_size:
+            _, (_, data) = _file_cache.popitem(last=False)
+            cache_bytes -= _get_Veff_data_size(data)
+
+    return [output[filename] for filename in filenames]
+
+
+def clear_Veff_cache():
+    """
+    removes all files from the cache used by `get_Veff_Aeff`
+    """
+    _file_cache.clear()
+
+
 def get_Veff_Aeff_single(
         filename, trigger_names, trigger_names_dict, trigger_combinations, 
         deposited, station, veff_aeff="veff", bounds_theta=[0, np.pi]):
@@ -179,8 +329,8 @@ def get_Veff_Aeff_single(
 
     Parameters
     ----------
-    filename: string
-        filename of the hdf5 file
+    filename: string or dict
+        filename of the hdf5 file, or its content as returned by `read_Veff_file`
         
     trigger_names: list of strings
         list of the trigger names contained in the file
@@ -232,267 +382,276 @@ def get_Veff_Aeff_single(
         Each file is one entry. The dictionary keys store all relevant properties
     
     """
+    if isinstance(filename, dict):
+        data = filename
+    else:
+        data = read_Veff_file(filename)
+    return get_Veff_Aeff_bins(data, trigger_names, trigger_names_dict, trigger_combinations,
+                              deposited, station, veff_aeff, [bounds_theta])[0]
+
+
+def _get_triggered(data, trigger_name, values, trigger_names_dict, station, Vrms, SNRs):
+    """
+    returns the triggered mask of one trigger combination (one entry per shower, duplicate
+    triggers of the same event group are removed) and the analysis efficiency of the triggered entries
+    (None if no efficiency is requested)
+    """
+    multiple_triggers = data['multiple_triggers']
+    gids = data['event_group_ids']
+
+    def get_trigger(name):
+        return np.array(multiple_triggers[:, trigger_names_dict[name]], dtype=bool)
+
+    indiv_triggers = values['triggers']
+    triggered = np.zeros(multiple_triggers.shape[0], dtype=bool)
+    if isinstance(indiv_triggers, str):
+        triggered = triggered | get_trigger(indiv_triggers)
+    else:
+        for indiv_trigger in indiv_triggers:
+            triggered = triggered | get_trigger(indiv_trigger)
+
+    if 'triggerAND' in values:
+        triggered = triggered & get_trigger(values['triggerAND'])
+
+    if 'notriggers' in values:
+        indiv_triggers = values['notriggers']
+        if(isinstance(indiv_triggers, str)):
+            triggered = triggered & ~get_trigger(indiv_triggers)
+        else:
+            for indiv_trigger in indiv_triggers:
+                triggered = triggered & ~get_trigger(indiv_trigger)
+
+    if 'min_sigma' in values.keys():
+        As = np.max(np.nan_to_num(get_Veff_column(data, 'max_amp_ray_solution')), axis=-1)  # we use the this quantity because it is always computed before noise is added!
+        if isinstance(values['min_sigma'], list):
+            SNRs[trigger_name] = {}
+            masks = np.zeros_like(triggered)
+            for iS in range(len(values['min_sigma'])):
+                As_sorted = np.sort(As[:, values['channels'][iS]], axis=1)
+                # the smallest of the three largest amplitudes
+                max_amplitude = As_sorted[:, -values['n_channels'][iS]]
+                mask = np.sum(
+                    As[:, values['channels'][iS]] >= (values['min_sigma'][iS] * Vrms), axis=1) >= values['n_channels'][iS]
+                masks = masks | mask
+                SNRs[trigger_name][iS] = max_amplitude[mask] / Vrms
+
+            triggered = triggered & masks
+        else:
+            As_sorted = np.sort(As[:, values['channels']], axis=1)
+            mask = np.sum(As[:, values['channels']] >= (values['min_sigma'] * Vrms), axis=1) >= values['n_channels']
+            SNRs[trigger_name] = As_sorted[mask] / Vrms
+            triggered = triggered & mask
+
+    if 'ray_solution' in values.keys():
+        As = get_Veff_column(data, 'max_amp_ray_solution')
+        max_amps = np.argmax(As[:, values['ray_channel']], axis=-1)
+        sol = get_Veff_column(data, 'ray_tracing_solution_type')
+        mask = sol[np.arange(len(max_amps)), values['ray_channel'], max_amps] == values['ray_solution']
+        triggered = triggered & mask
+
+    if 'n_reflections' in values.keys():
+        if(np.sum(triggered)):
+            As = get_Veff_column(data, f'station_{station:d}/max_amp_ray_solution')
+            # find the ray tracing solution that produces the largest amplitude
+            max_amps = np.argmax(np.argmax(As[:, :], axis=-1), axis=-1)
+            # advanced indexing: selects the ray tracing solution per event with the highest amplitude
+            triggered = triggered & (get_Veff_column(data, f'station_{station:d}/ray_tracing_reflection')[..., max_amps, 0][:, 0] == values['n_reflections'])
+
+    triggered = remove_duplicate_triggers(triggered, gids)
+
+    efficiency = None
+    if 'efficiency' in values.keys() and np.any(triggered):
+        get_efficiency = values['efficiency']['func']
+        channel_ids = values['efficiency']['channel_ids']
+
+        # the event group ids that triggered (sorted)
+        ugids_triggered = np.unique(gids[triggered])
+        max_amplitudes = np.zeros(len(ugids_triggered))
+        for sgids, max_amps_per_event_channel in _get_station_amplitudes(data).values():
+            common_mask = np.isin(sgids, ugids_triggered)  # select only the gids that triggered
+            if not np.any(common_mask):  # skip stations that don't have any trigger for this trigger combination
+                continue
+            # each station might have multiple triggeres per event group id. We select the event with the largest amplitude
+            max_amps_per_event = np.amax(max_amps_per_event_channel[common_mask][:, channel_ids], axis=1)  # select the maximum amplitude of all considered channels
+            np.maximum.at(max_amplitudes, np.searchsorted(ugids_triggered, sgids[common_mask]), max_amps_per_event)
+
+        if 'scale' in values['efficiency']:
+            max_amplitudes *= values['efficiency']['scale']
+        Vrms_efficiency = values['efficiency'].get('Vrms', Vrms)
+
+        e = get_efficiency(max_amplitudes / Vrms_efficiency)  # we calculated the maximum amplitudes for all gids that triggered
+        efficiency = np.asarray(e)[np.searchsorted(ugids_triggered, gids[triggered])]
+
+    return triggered, efficiency
+
+
+def get_Veff_Aeff_bins(data, trigger_names, trigger_names_dict, trigger_combinations,
+                       deposited, station, veff_aeff="veff", bounds_thetas=[[0, np.pi]]):
+    """
+    Calculates the effective volume or effective area from surface muons for several zenith angle
+    bins of a single NuRadioMC hdf5 file
+
+    The trigger masks of all trigger combinations are calculated only once and are used for all zenith bins.
+    See `get_Veff_Aeff_single` for a description of the parameters.
+
+    Parameters
+    ----------
+    data: dict
+        the content of the hdf5 file as returned by `read_Veff_file`
+    bounds_thetas: list of lists of floats
+        the zenith angle bins, see parameter `bounds_theta` of `get_Veff_Aeff_single`
+
+    Returns
+    -------
+    list of dictionaries
+        one entry per zenith angle bin
+    """
     if(veff_aeff not in ["veff", "aeff_surface_muons"]):
         raise AttributeError(f"the paramter `veff_aeff` needs to be one of either `veff` or `aeff_surface_muons`")
-    
+
+    filename = data['filename']
+    attrs = data['attrs']
     logger.warning(f"processing file  {filename}")
-    fin = h5py.File(filename, 'r')
-    n_events = fin.attrs['n_events']
-
-    out = {}
-    Emin = fin.attrs['Emin']
-    Emax = fin.attrs['Emax']
-    out['energy'] = 10 ** (0.5 * (np.log10(Emin) + np.log10(Emax)))
-    out['energy_min'] = Emin
-    out['energy_max'] = Emax
-
-    # calculate effective
-    phimin = fin.attrs['phimin']
-    phimax = fin.attrs['phimax']
-    thetamin = fin.attrs['thetamin']
-    thetamax = fin.attrs['thetamax']
-
-    theta_width_file = abs(np.cos(thetamin) - np.cos(thetamax))
-    # restrict the theta range, if requested
-    if min(bounds_theta) > thetamin:
-        logger.info("restricting thetamin from {} to {}".format(thetamin, min(bounds_theta)))
-        thetamin = min(bounds_theta)
-    if max(bounds_theta) < thetamax:
-        logger.info("restricting thetamax from {} to {}".format(thetamax, max(bounds_theta)))
-        thetamax = max(bounds_theta)
-    
-    # The restriction assumes isotropic event generation in cos(theta) band
-    theta_fraction = abs(np.cos(thetamin) - np.cos(thetamax)) / theta_width_file
-    if theta_fraction < 1:
-        # adjust n_events to account for solid angle fraction in the requested theta range
-        n_events *= theta_fraction
-
-    if veff_aeff == "veff":
-        volume_proj_area = fin.attrs['volume']
-    elif veff_aeff == "aeff_surface_muons":
-        area = fin.attrs['area']
-        # The used area must be the projected area, perpendicular to the incoming
-        # flux, which leaves us with the following correction. Remember that the
-        # zenith bins must be small for the effective area to be correct.
-        volume_proj_area = area * 0.5 * (np.abs(np.cos(thetamin)) + np.abs(np.cos(thetamax)))
-    else:
-        raise AttributeError(f"attributes do neither contain volume nor area")
-
-    Vrms = fin.attrs['Vrms']
-
-    # Solid angle needed for the effective volume calculations
-    out['domega'] = np.abs(phimax - phimin) * np.abs(np.cos(thetamin) - np.cos(thetamax))
-    out['thetamin'] = thetamin
-    out['thetamax'] = thetamax
-    out['deposited'] = deposited
-    out[veff_aeff] = {}
-    out['n_triggered_weighted'] = {}
-    out['SNRs'] = {}
-    
-    fc_low_0, fc_high_0 = FC_limits(0)
-    v_eff_low_0 = volume_proj_area * fc_low_0 / n_events
-    v_eff_high_0 = volume_proj_area * fc_high_0 / n_events
 
-    if 'weights' not in fin.keys():
+    outputs = []
+    n_events_bins = []
+    volume_proj_areas = []
+    theta_masks = []
+    for bounds_theta in bounds_thetas:
+        n_events = attrs['n_events']
+
+        out = {}
+        Emin = attrs['Emin']
+        Emax = attrs['Emax']
+        out['energy'] = 10 ** (0.5 * (np.log10(Emin) + np.log10(Emax)))
+        out['energy_min'] = Emin
+        out['energy_max'] = Emax
+
+        # calculate effective
+        phimin = attrs['phimin']
+        phimax = attrs['phimax']
+        thetamin = attrs['thetamin']
+        thetamax = attrs['thetamax']
+
+        theta_width_file = abs(np.cos(thetamin) - np.cos(thetamax))
+        # restrict the theta range, if requested
+        if min(bounds_theta) > thetamin:
+            logger.info("restricting thetamin from {} to {}".format(thetamin, min(bounds_theta)))
+            thetamin = min(bounds_theta)
+        if max(bounds_theta) < thetamax:
+            logger.info("restricting thetamax from {} to {}".format(thetamax, max(bounds_theta)))
+            thetamax = max(bounds_theta)
+
+        # The restriction assumes isotropic event generation in cos(theta) band
+        theta_fraction = abs(np.cos(thetamin) - np.cos(thetamax)) / theta_width_file
+        if theta_fraction < 1:
+            # adjust n_events to account for solid angle fraction in the requested theta range
+            n_events *= theta_fraction
+            if 'weights' in data:
+                # generate boolean mask for events inside selected theta range, events outside are zero-weighted
+                theta_masks.append((data['zeniths'] > thetamin) & (data['zeniths'] < thetamax))
+        elif 'weights' in data:
+            theta_masks.append(np.ones_like(data['weights'], dtype=bool))
+
+        if veff_aeff == "veff":
+            volume_proj_area = attrs['volume']
+        elif veff_aeff == "aeff_surface_muons":
+            area = attrs['area']
+            # The used area must be the projected area, perpendicular to the incoming
+            # flux, which leaves us with the following correction. Remember that the
+            # zenith bins must be small for the effective area to be correct.
+            volume_proj_area = area * 0.5 * (np.abs(np.cos(thetamin)) + np.abs(np.cos(thetamax)))
+        else:
+            raise AttributeError(f"attributes do neither contain volume nor area")
+
+        # Solid angle needed for the effective volume calculations
+        out['domega'] = np.abs(phimax - phimin) * np.abs(np.cos(thetamin) - np.cos(thetamax))
+        out['thetamin'] = thetamin
+        out['thetamax'] = thetamax
+        out['deposited'] = deposited
+        out[veff_aeff] = {}
+        out['n_triggered_weighted'] = {}
+        out['SNRs'] = {}
+
+        outputs.append(out)
+        n_events_bins.append(n_events)
+        volume_proj_areas.append(volume_proj_area)
+
+    def set_zero_output():
+        for out, n_events, volume_proj_area in zip(outputs, n_events_bins, volume_proj_areas):
+            fc_low_0, fc_high_0 = FC_limits(0)
+            v_eff_low_0 = volume_proj_area * fc_low_0 / n_events
+            v_eff_high_0 = volume_proj_area * fc_high_0 / n_events
+            for trigger_name in trigger_names:
+                out[veff_aeff][trigger_name] = [0, 0, 0, v_eff_low_0, v_eff_high_0]
+            for trigger_name in trigger_combinations:
+                out[veff_aeff][trigger_name] = [0, 0, 0, v_eff_low_0, v_eff_high_0]
+        return outputs
+
+    if 'weights' not in data:
         logger.warning(f"file {filename} is empty")
-        for iT, trigger_name in enumerate(trigger_names):
-            out[veff_aeff][trigger_name] = [0, 0, 0, v_eff_low_0, v_eff_high_0]
-        for trigger_name, values in iteritems(trigger_combinations):
-            out[veff_aeff][trigger_name] = [0, 0, 0, v_eff_low_0, v_eff_high_0]
-        
-        return out
+        return set_zero_output()
 
-    triggered = np.array(fin['triggered'])
-    if 'trigger_names' in fin.attrs:
-        if np.any(trigger_names != fin.attrs['trigger_names']):
-            if triggered.size == 0 and fin.attrs['trigger_names'].size == 0:
+    triggered = data['triggered']
+    if 'trigger_names' in attrs:
+        if np.any(trigger_names != attrs['trigger_names']):
+            if triggered.size == 0 and attrs['trigger_names'].size == 0:
                 logger.warning("file {} has no triggering events. "
                                "Using trigger names from another file".format(filename))
             else:
                 error_msg = ("file {} has inconsistent trigger names: "
                              "{}\ncurrent trigger names {}").format(
-                                 filename, fin.attrs['trigger_names'], trigger_names)
+                                 filename, attrs['trigger_names'], trigger_names)
                 logger.error(error_msg)
                 raise AttributeError(error_msg)
     else:
         logger.warning(f"file {filename} has no triggering events. "
                        "Using trigger names from a different file: {trigger_names}")
 
-    weights = np.array(fin['weights'])
-    # if theta range is restricted, select events in that range
-    if theta_fraction < 1:
-        # generate boolean mask for events in fin inside selected theta range
-        mask_theta = np.array((fin['zeniths'] > thetamin) & (fin['zeniths'] < thetamax))
-        # multiply events with mask, events outside are zero-weighted
-        weights *= mask_theta
-
     if triggered.size == 0:
-        for iT, trigger_name in enumerate(trigger_names):
-            out[veff_aeff][trigger_name] = [0, 0, 0, v_eff_low_0, v_eff_high_0]
-        for trigger_name, values in iteritems(trigger_combinations):
-            out[veff_aeff][trigger_name] = [0, 0, 0, v_eff_low_0, v_eff_high_0]
-        
-        return out
-        
-    for iT, trigger_name in enumerate(trigger_names):
-        triggered = np.array(fin['multiple_triggers'][:, iT], dtype=bool)
-        triggered = remove_duplicate_triggers(triggered, fin['event_group_ids'])
-        out[veff_aeff][trigger_name] = get_veff_output(volume_proj_area, np.sum(weights[triggered]), n_events)
-
-    for trigger_name, values in iteritems(trigger_combinations):
-        indiv_triggers = values['triggers']
-        triggered = np.zeros_like(fin['multiple_triggers'][:, 0], dtype=bool)
-        
-        if isinstance(indiv_triggers, str):
-            triggered = triggered | \
-                np.array(fin['multiple_triggers'][:, trigger_names_dict[indiv_triggers]], dtype=bool)
-        else:
-            for indiv_trigger in indiv_triggers:
-                triggered = triggered | \
-                    np.array(fin['multiple_triggers'][:, trigger_names_dict[indiv_trigger]], dtype=bool)
-        
-        if 'triggerAND' in values:
-            triggered = triggered & \
-                np.array(fin['multiple_triggers'][:, trigger_names_dict[values['triggerAND']]], dtype=bool)
-        
-        if 'notriggers' in values:
-            indiv_triggers = values['notriggers']
-            if(isinstance(indiv_triggers, str)):
-                triggered = triggered & \
-                    ~np.array(fin['multiple_triggers'][:, trigger_names_dict[indiv_triggers]], dtype=bool)
-            else:
-                for indiv_trigger in indiv_triggers:
-                    triggered = triggered & \
-                        ~np.array(fin['multiple_triggers'][:, trigger_names_dict[indiv_trigger]], dtype=bool)
-        
-        if 'min_sigma' in values.keys():
-            if isinstance(values['min_sigma'], list):
-                if trigger_name not in out['SNR']:
-                    out['SNR'][trigger_name] = {}
-                
-                masks = np.zeros_like(triggered)
-                for iS in range(len(values['min_sigma'])):
-                    As = np.max(np.nan_to_num(fin['max_amp_ray_solution']), axis=-1)  # we use the this quantity because it is always computed before noise is added!
-                    As_sorted = np.sort(As[:, values['channels'][iS]], axis=1)
-                    # the smallest of the three largest amplitudes
-                    max_amplitude = As_sorted[:, -values['n_channels'][iS]]
-                    mask = np.sum(
-                        As[:, values['channels'][iS]] >= (values['min_sigma'][iS] * Vrms), axis=1) >= values['n_channels'][iS]
-                    masks = masks | mask
-                    out['SNR'][trigger_name][iS] = max_amplitude[mask] / Vrms
-                
-                triggered = triggered & masks
-            else:
-                As = np.max(np.nan_to_num(fin['max_amp_ray_solution']), axis=-1)  # we use the this quantity because it is always computed before noise is added!
+        return set_zero_output()
 
-                As_sorted = np.sort(As[:, values['channels']], axis=1)
-                max_amplitude = As_sorted[:, -values['n_channels']]  # the smallest of the three largest amplitudes
+    # the weights of all events in all zenith bins, shape (n_bins, n_events)
+    weights = data['weights'][np.newaxis, :] * np.array(theta_masks)
+    Vrms = attrs['Vrms']
+    SNRs = {}
 
-                mask = np.sum(As[:, values['channels']] >= (values['min_sigma'] * Vrms), axis=1) >= values['n_channels']
-                out['SNR'][trigger_name] = As_sorted[mask] / Vrms
-                triggered = triggered & mask
-        
-        if 'ray_solution' in values.keys():
-            As = np.array(fin['max_amp_ray_solution'])
-            max_amps = np.argmax(As[:, values['ray_channel']], axis=-1)
-            sol = np.array(fin['ray_tracing_solution_type'])
-            mask = np.array([sol[i, values['ray_channel'], max_amps[i]] == values['ray_solution'] for i in range(len(max_amps))], dtype=bool)
-            triggered = triggered & mask
-
-        if 'n_reflections' in values.keys():
-            if(np.sum(triggered)):
-                As = np.array(fin[f'station_{station:d}/max_amp_ray_solution'])
-                # find the ray tracing solution that produces the largest amplitude
-                max_amps = np.argmax(np.argmax(As[:,:], axis=-1), axis=-1)
-                # advanced indexing: selects the ray tracing solution per event with the highest amplitude
-                triggered = triggered & (np.array(fin[f'station_{station:d}/ray_tracing_reflection'])[..., max_amps, 0][:, 0] == values['n_reflections'])
-
-        triggered = remove_duplicate_triggers(triggered, fin['event_group_ids'])
-     
-        v_eff, v_eff_err, count, v_eff_low, v_eff_high = \
-            get_veff_output(volume_proj_area, np.sum(weights[triggered]), n_events)
-
-        if 'efficiency' in values.keys() and v_eff > 0:
-            get_efficiency = values['efficiency']['func']
-            channel_ids = values['efficiency']['channel_ids']
-            gids = np.array(fin['event_group_ids'])
-            ugids = np.unique(np.array(fin['event_group_ids']))
-
-            # calculate the group event ids that triggered
-            ugids_triggered_index = []
-            ugids_triggered = []
-            for i_ugid, ugid in enumerate(ugids):
-                mask = ugid == gids
-                if(np.any(triggered[mask])):
-                    ugids_triggered_index.append(i_ugid)
-                    ugids_triggered.append(ugid)
-            ugids_triggered = np.array(ugids_triggered)
-            ugids_triggered_index = np.array(ugids_triggered_index)
-
-            n_unique_gids = len(ugids_triggered)
-            sorter = np.argsort(ugids_triggered)
-            max_amplitudes = np.zeros(n_unique_gids)
-            for key in fin.keys():
-                if key.startswith("station_"):
-                    if 'event_group_ids' not in fin[key]:
-                        continue  # the station might have no triggers
-                    
-                    sgids = np.array(fin[key]['event_group_ids'])
-                    usgids = np.unique(sgids)
-                    usgids, comm1, comm2 = np.intersect1d(usgids, ugids_triggered, assume_unique=True, return_indices=True)  # select only the gids that triggered
-                    common_mask = np.isin(sgids, usgids)
-                    sgids = sgids[common_mask]  # also reduce gids array to the event groups that triggered
-                    
-                    if(len(usgids) == 0):  # skip stations that don't have any trigger for this trigger combination
-                        continue
-                    
-                    usgids_index = sorter[np.searchsorted(ugids_triggered, usgids, sorter=sorter)]
-                    # each station might have multiple triggeres per event group id. We need to select the one
-                    # event with the largest amplitude. Let's first check if one event group created more than one event
-                    max_amps_per_event_channel = np.nan_to_num(np.array(fin[key]['maximum_amplitudes_envelope'])[common_mask])
-                    max_amps_per_event = np.amax(max_amps_per_event_channel[:, channel_ids], axis=1)  # select the maximum amplitude of all considered channels
-                    
-                    if len(sgids) != len(usgids):
-                        # at least one event group created more than one event. Let's calculate it the slow but correct way
-                        for sgid in np.unique(sgids):  # loop over all event groups which triggered this station
-                            
-                            if(sgid not in usgids):
-                                continue
-                            
-                            mask_gid = sgid == sgids  # select all event that are part of this event group
-                            index = np.squeeze(np.argwhere(ugids_triggered == sgid))
-                            max_amplitudes[index] = max(max_amplitudes[index], max_amps_per_event[mask_gid].max())
-                    else:
-                        max_amplitudes[usgids_index] = np.maximum(max_amplitudes[usgids_index], max_amps_per_event)
-            
-            if 'scale' in values['efficiency']:
-                max_amplitudes *= values['efficiency']['scale']
-            if "Vrms" in values['efficiency']:
-                Vrms = values['efficiency']['Vrms']
-            
-            e = get_efficiency(max_amplitudes / Vrms)  # we calculated the maximum amplitudes for all gids, now we select only those that triggered
-            v_eff, v_eff_err, count, v_eff_low, v_eff_high = \
-                get_veff_output(volume_proj_area, np.sum(weights[triggered] * e), n_events)
+    def set_output(trigger_name, triggered, efficiency=None):
+        if efficiency is None:
+            counts = np.sum(weights[:, triggered], axis=1)
+        else:
+            counts = np.dot(weights[:, triggered], efficiency)
+        for out, count, n_events, volume_proj_area in zip(outputs, counts, n_events_bins, volume_proj_areas):
+            out[veff_aeff][trigger_name] = get_veff_output(volume_proj_area, count, n_events)
 
-        out[veff_aeff][trigger_name] = [v_eff, v_eff_err, count, v_eff_low, v_eff_high]
+    for iT, trigger_name in enumerate(trigger_names):
+        triggered = np.array(data['multiple_triggers'][:, iT], dtype=bool)
+        set_output(trigger_name, remove_duplicate_triggers(triggered, data['event_group_ids']))
 
-    return out
+    for trigger_name, values in iteritems(trigger_combinations):
+        triggered, efficiency = _get_triggered(data, trigger_name, values, trigger_names_dict, station, Vrms, SNRs)
+        set_output(trigger_name, triggered, efficiency)
 
+    for out in outputs:
+        out['SNRs'] = copy.copy(SNRs)
 
-def get_Veff_Aeff_single_wrapper(args):
-    return get_Veff_Aeff_single(*args)
+    return outputs
 
 
 def get_Veff_Aeff(folder,
              trigger_combinations={},
              station=101,
              veff_aeff="veff",
-             n_cores=1, oversampling_theta=1):
+             n_cores=1, oversampling_theta=1, use_cache=True, cache_size=1073741824):
     """
     calculates the effective volume or effective area from surface muons from NuRadioMC hdf5 files
 
     the effective volume is NOT normalized to a water equivalent. It is also NOT multiplied with the solid angle (typically 4pi).
 
+    Each file is read only once into a compact columnar representation which is kept in memory (see `use_cache`).
+    When the function is called again (e.g. with different trigger combinations, or when new files were added
+    to the folder by a running production) only new or modified files are read.
+
     Parameters
     ----------
     folder: string
@@ -528,7 +687,7 @@ def get_Veff_Aeff(folder,
         * "aeff_surface_muons"
         
     n_cores: int
-        the number of cores to use
+        the number of cores used to read the files
 
     oversampling_theta: int
         calculate the effective volume for finer binning (<oversampling_theta> data points per file):
@@ -537,6 +696,12 @@ def get_Veff_Aeff(folder,
         * >1: oversampling with <oversampling_theta> equal-size cos(theta) bins within thetamin/max of the input file
         
         .. Note:: oversampling assumes that events were simulated uniformly in cos(theta)
+
+    use_cache: bool
+        if True (default), the content of the files is cached between calls. Use `clear_Veff_cache` to free the memory.
+    cache_size: int
+        the maximum size of the cache in bytes (default: 1GB). If exceeded, the least recently used files are
+        removed from the cache.
     
     Returns
     -------
@@ -558,24 +723,25 @@ def get_Veff_Aeff(folder,
         
         filenames = sorted(filenames)
 
-    for iF, filename in enumerate(filenames):
-        fin = h5py.File(filename, 'r')
-        if 'deposited' in fin.attrs:
-            deposited = fin.attrs['deposited']
+    logger.warning(f"reading {len(filenames)} files on {n_cores} cores")
+    file_data = _read_Veff_files(filenames, n_cores=n_cores, use_cache=use_cache, cache_size=cache_size)
+
+    for data in file_data:
+        if 'deposited' in data['attrs']:
+            deposited = data['attrs']['deposited']
             if prev_deposited is None:
                 prev_deposited = deposited
             elif prev_deposited != deposited:
                 raise AttributeError("The deposited parameter is not consistent among the input files!")
 
-    for iF, filename in enumerate(filenames):
-        fin = h5py.File(filename, 'r')
-        if 'trigger_names' in fin.attrs:
-            trigger_names = fin.attrs['trigger_names']
+    for data in file_data:
+        if 'trigger_names' in data['attrs']:
+            trigger_names = data['attrs']['trigger_names']
             if len(trigger_names) > 0:
                 for iT, trigger_name in enumerate(trigger_names):
                     trigger_names_dict[trigger_name] = iT
                 
-                logger.info(f"first file with triggernames {filename}: {trigger_names}")
+                logger.info(f"first file with triggernames {data['filename']}: {trigger_names}")
                 break
 
     trigger_combinations['all_triggers'] = {'triggers': trigger_names}
@@ -588,37 +754,23 @@ def get_Veff_Aeff(folder,
                 logger.warning(f"trigger {value} not available, removing this trigger from the trigger combination {key}")
                 trigger_combinations[key]['triggers'].pop(i)
                 i -= 1
-    from multiprocessing import Pool
-    logger.warning(f"running {len(filenames)} jobs on {n_cores} cores")
 
-    args = []
-    if oversampling_theta == 1:
-        for f in filenames:
-            args.append([f, trigger_names, trigger_names_dict, trigger_combinations, deposited, station, veff_aeff])
-    else:
-        # get the thetamin, thetamax from the files and do oversampling
+    if oversampling_theta != 1:
         logger.info("Calculating effective volumes with finer binning, {} bins per input file".format(oversampling_theta))
-        for f in filenames:
-            fin = h5py.File(f, 'r')
-            costhetamin = np.cos(fin.attrs['thetamin'])
-            costhetamax = np.cos(fin.attrs['thetamax'])
+
+    output = []
+    for data in file_data:
+        if oversampling_theta == 1:
+            bounds_thetas = [[0, np.pi]]
+        else:
+            # get the thetamin, thetamax from the files and do oversampling
+            costhetamin = np.cos(data['attrs']['thetamin'])
+            costhetamax = np.cos(data['attrs']['thetamax'])
             thetas = np.arccos(np.linspace(costhetamin, costhetamax, oversampling_theta + 1))
-            thetas_min = thetas[:-1]
-            thetas_max = thetas[1:]
-            for bounds_theta in zip(thetas_min, thetas_max):
-                args.append([f, trigger_names, trigger_names_dict, trigger_combinations, deposited, station, veff_aeff, bounds_theta])
-
-    if n_cores == 1:
-        output = []
-        for arg in args:
-            output.append(get_Veff_Aeff_single_wrapper(arg))
-        return output
-    else:
-        with Pool(n_cores) as p:
-            output = p.map(get_Veff_Aeff_single_wrapper, args)
-            print("output")
-            print(output)
-            return output
+            bounds_thetas = list(zip(thetas[:-1], thetas[1:]))
+        output.extend(get_Veff_Aeff_bins(data, trigger_names, trigger_names_dict, trigger_combinations,
+                                         deposited, station, veff_aeff, bounds_thetas))
+    return output
 
 
 def get_Veff_Aeff_array(data):
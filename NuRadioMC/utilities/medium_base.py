@@ -1,6 +1,5 @@
 from __future__ import absolute_import, division, print_function
 import numpy as np
-from scipy import integrate, linalg
 from NuRadioReco.utilities import units
 from scipy import interpolate
 import os
@@ -19,6 +18,13 @@ class IceModel():
     """
     Base class from which all ice models should inheret
     """
+
+    # number of Gauss-Legendre nodes used to average the index of refraction along a straight line
+    n_quadrature_points = 32
+    # class-level defaults, also for ice models which do not call `IceModel.__init__`
+    _index_of_refraction_is_vectorized = None
+    _integrated_index_of_refraction_table = None
+
     def __init__(self, z_air_boundary=0*units.meter, z_bottom=None):
         """
         initiaion of a basic ice model
@@ -83,33 +89,156 @@ class IceModel():
     def get_average_index_of_refraction(self, position1, position2):
         """
         returns the average index of refraction between two points
-        Reimplement everytime in the specific model
+
+        The index of refraction is integrated along the straight line between the two points
+        with a Gauss-Legendre quadrature (`n_quadrature_points` nodes, the line is split at the
+        air boundary). If a table was created with `create_average_index_of_refraction_table`,
+        it is used instead for all pairs of points inside the tabulated depth range.
+        Reimplement in the specific model if a closed-form expression exists.
 
         Parameters
         ----------
-        position1: 3dim np.array
-                    point
-        position2: 3dim np.array
-                    point
+        position1: 1D (3,) or 2D (n,3) numpy array
+                    Either one position or an array
+                    of positions for which the indices
+                    of average refraction are returned
+        position2: 1D (3,) or 2D (n,3) numpy array
+                    Either one position or an array
+                    of positions for which the indices
+                    of average refraction are returned
 
         Returns
         -------
-        n_average:  float
+        n_average:  float or 1D numpy array (n,)
                     averaged index of refraction between the two points
         """
-        logger.warning('Using general implementation of function which might be slow. For faster calculation, overwrite with an ice model specific function')
+        position1 = np.array(position1, dtype=float)
+        position2 = np.array(position2, dtype=float)
+        is_single_pair = position1.ndim == 1 and position2.ndim == 1
+        position1, position2 = np.broadcast_arrays(np.atleast_2d(position1), np.atleast_2d(position2))
+
+        if self._integrated_index_of_refraction_table is None:
+            n_average = self._integrate_index_of_refraction(position1, position2)
+        else:
+            z_table, integral_table = self._integrated_index_of_refraction_table
+            z1 = position1[:, 2]
+            z2 = position2[:, 2]
+            # for (almost) horizontal lines the difference of the integrals is not precise
+            use_table = ((np.minimum(z1, z2) >= z_table[0]) & (np.maximum(z1, z2) <= z_table[-1]) &
+                         (np.abs(z2 - z1) > z_table[1] - z_table[0]))
+
+            n_average = np.zeros(len(position1))
+            n_average[use_table] = (
+                (np.interp(z2[use_table], z_table, integral_table) - np.interp(z1[use_table], z_table, integral_table)) /
+                (z2[use_table] - z1[use_table]))
+            n_average[~use_table] = self._integrate_index_of_refraction(position1[~use_table], position2[~use_table])
+
+        if is_single_pair:
+            return n_average[0]
+        return n_average
+
+    def create_average_index_of_refraction_table(self, z_min=None, z_max=None, n_points=10000):
+        """
+        Tabulates the integral of the index of refraction over depth. This is only valid for ice models
+        in which the index of refraction does only depend on the depth (z). Afterwards,
+        `get_average_index_of_refraction` is obtained from differences of this table for all pairs of
+        points within [z_min, z_max].
 
-        def get_index_of_refraction(x,y,z):
-            pos = np.array([x,y,z])
-            return self.get_index_of_refraction(pos)
+        Parameters
+        ----------
+        z_min: float or None
+            lower end of the table. If None, the bottom of the ice (or -3 km if not defined) is used
+        z_max: float or None
+            upper end of the table. If None, the air boundary is used
+        n_points: int
+            number of tabulated depths
+        """
+        if z_min is None:
+            z_min = self.z_bottom if self.z_bottom is not None else -3 * units.km
+        if z_max is None:
+            z_max = self.z_air_boundary
+
+        z_table = np.linspace(z_min, z_max, n_points)
+        positions1 = np.zeros((n_points - 1, 3))
+        positions2 = np.zeros((n_points - 1, 3))
+        positions1[:, 2] = z_table[:-1]
+        positions2[:, 2] = z_table[1:]
+        n_average = self._integrate_index_of_refraction(positions1, positions2)
+
+        integral_table = np.concatenate([[0], np.cumsum(n_average * np.diff(z_table))])
+        self._integrated_index_of_refraction_table = (z_table, integral_table)
+
+    def _integrate_index_of_refraction(self, position1, position2):
+        """
+        Averages the index of refraction along the straight lines between pairs of points with a
+        Gauss-Legendre quadrature. Lines crossing the air boundary are split at the boundary.
+
+        Parameters
+        ----------
+        position1: 2D (n,3) numpy array
+            start points of the lines
+        position2: 2D (n,3) numpy array
+            end points of the lines
+
+        Returns
+        -------
+        n_average: 1D numpy array (n,)
+            averaged index of refraction along the lines
+        """
+        if len(position1) == 0:
+            return np.zeros(0)
+
+        nodes, weights = np.polynomial.legendre.leggauss(self.n_quadrature_points)
+        nodes = 0.5 * (nodes + 1)
+        weights = 0.5 * weights
+
+        # fraction of the line below the air boundary (or above if the line starts in the air)
+        dz = position2[:, 2] - position1[:, 2]
+        crosses_boundary = (position1[:, 2] - self.z_air_boundary) * (position2[:, 2] - self.z_air_boundary) < 0
+        t_boundary = np.ones(len(position1))
+        t_boundary[crosses_boundary] = (self.z_air_boundary - position1[crosses_boundary, 2]) / dz[crosses_boundary]
+
+        segments = [(np.zeros(len(position1)), t_boundary)]
+        if np.any(crosses_boundary):
+            segments.append((t_boundary, np.ones(len(position1))))
+
+        n_average = np.zeros(len(position1))
+        for t_start, t_stop in segments:
+            t = t_start[:, None] + (t_stop - t_start)[:, None] * nodes[None, :]
+            positions = position1[:, None, :] + t[:, :, None] * (position2 - position1)[:, None, :]
+            n = self._get_index_of_refraction_array(positions.reshape(-1, 3)).reshape(t.shape)
+            n_average += (t_stop - t_start) * np.sum(n * weights, axis=1)
 
-        ranges = [[position1[0],position2[0]],
-                  [position1[1],position2[1]],
-                  [position1[2],position2[2]]]
-        int_result = integrate.nquad(get_index_of_refraction,ranges)
-        n_average = int_result[0] / linalg.norm(position2-position1)
         return n_average
 
+    def _get_index_of_refraction_array(self, positions):
+        """
+        Returns the index of refraction for an array of positions. Ice models whose
+        `get_index_of_refraction` does only support single positions are evaluated point by point.
+
+        Parameters
+        ----------
+        positions: 2D (n,3) numpy array
+
+        Returns
+        -------
+        n: 1D numpy array (n,)
+        """
+        if self._index_of_refraction_is_vectorized:
+            return np.asarray(self.get_index_of_refraction(positions), dtype=float)
+
+        if self._index_of_refraction_is_vectorized is None:
+            try:
+                n = np.asarray(self.get_index_of_refraction(positions), dtype=float)
+                self._index_of_refraction_is_vectorized = n.shape == (len(positions),)
+            except (TypeError, ValueError, IndexError, AttributeError):
+                self._index_of_refraction_is_vectorized = False
+
+            if self._index_of_refraction_is_vectorized:
+                return n
+
+        return np.array([self.get_index_of_refraction(position) for position in positions], dtype=float)
+
     def get_gradient_of_index_of_refraction(self, position):
         """
         returns the gradient of index of refraction at position
@@ -114,6 +114,9 @@ class Detector():
         self.selected_stations = select_stations
         self.logger.info(f"Select the following stations (if possible): {select_stations}")
 
+        # Station descriptions of all time periods, only filled when importing a snapshot (see `export_snapshot`)
+        self.__snapshot = None
+
         if detector_file is None:
             self._det_imported_from_file = False
 
@@ -152,8 +155,11 @@ class Detector():
         else:
             self._query_all = None  # specific case for file imported detector descriptions
             self._det_imported_from_file = True
+            self.__detector_time = None
             self._import_from_file(detector_file)
 
+        self._build_time_period_index()
+
         # Allow overwriting the hard-coded values
         self.__default_values.update(over_write_handset_values)
 
@@ -217,6 +223,81 @@ class Detector():
         with lzma.open(filename, "w") as f:
             f.write(json.dumps(export_dict, **json_kwargs).encode('utf-8'))
 
+    def export_snapshot(self, filename, json_kwargs=None):
+        """
+        Export the complete detector description of all (selected) stations for all time periods.
+
+        In contrast to `export`, which only stores the currently buffered description, this queries the
+        database once for every station and every period between two modification timestamps. The resulting
+        file can be passed as `detector_file` to the constructor and replaces the database connection, i.e.,
+        `update(time)` can switch between all periods without a connection to the database.
+
+        Parameters
+        ----------
+
+        filename: str
+            Filename of the exported detector description
+
+        json_kwargs: dict
+            Arguments passed to json.dumps(..). (Default: None -> dict(indent=0, default=_json_serial))
+        """
+        if self._det_imported_from_file:
+            raise ValueError("A snapshot can only be exported from a detector which is connected to the database.")
+
+        detector_time = self.__detector_time
+
+        periods = {}
+        data = {}
+        for station_id, station_periods in self._time_periods_per_station.items():
+            modification_timestamps = station_periods["modification_timestamps"]
+            data[station_id] = {}
+            for period in range(1, len(modification_timestamps)):
+                # Query the description in the middle of each period
+                time = modification_timestamps[period - 1] + \
+                    (modification_timestamps[period] - modification_timestamps[period - 1]) / 2
+
+                self.__set_detector_time(time)
+                if not self.has_station(station_id):
+                    continue
+
+                self.logger.info(f"Query information for station {station_id} (period: {period}) at {time}")
+                self.__db.set_detector_time(time)
+                station_information = self.__db.get_complete_station_information(station_id)
+
+                if len(station_information) != 1:
+                    raise ValueError(f"Could not query information of station {station_id} at {time}. "
+                                     f"Found {len(station_information)} entries in database.")
+
+                data[station_id][period] = station_information[station_id]
+
+            periods[station_id] = {key: list(value) for key, value in station_periods.items()}
+
+        # Restore the detector time
+        self.__detector_time = detector_time
+        if detector_time is not None:
+            self.__db.set_detector_time(detector_time)
+
+        export_dict = {
+            "version": 2,
+            "data": data,
+            "periods": periods,
+            "default_values": self.__default_values
+        }
+
+        if not filename.endswith(".xz"):
+            if not filename.endswith(".json"):
+                filename += ".json"
+            filename += ".xz"
+        elif not filename.endswith(".json.xz"):
+            filename = filename.replace(".xz", ".json.xz")
+
+        if json_kwargs is None:
+            json_kwargs = dict(indent=0, default=_json_serial)
+
+        self.logger.info(f"Export detector snapshot to {filename}")
+        with lzma.open(filename, "w") as f:
+            f.write(json.dumps(export_dict, **json_kwargs).encode('utf-8'))
+
 
     def export_as_string(self, skip_signal_chain_response=True, dumps_kwargs=None):
         """
@@ -285,11 +366,69 @@ class Detector():
             self._time_period_index_per_station = {
                 st_id: 1 for st_id in self.__buffered_stations}
             self.__default_values = import_dict["default_values"]
+
+        elif "version" in import_dict and import_dict["version"] == 2:
+            # Snapshot of all time periods, see `export_snapshot`. The description of a period is moved to the
+            # buffer by `_query_station_information` (instead of querying the database)
+            self.__snapshot = collections.defaultdict(dict)
+
+            for station_id, station_periods in import_dict["data"].items():
+                if self.selected_stations is not None and int(station_id) not in self.selected_stations:
+                    continue
+
+                for period, station_data in station_periods.items():
+                    station_data["channels"] = {
+                        int(channel_id): channel_data for channel_id, channel_data in station_data["channels"].items()}
+                    if "devices" in station_data:
+                        station_data["devices"] = {
+                            int(device_id): device_data for device_id, device_data in station_data["devices"].items()}
+
+                    self.__snapshot[int(station_id)][int(period)] = station_data
+
+            # need to convert all timestamps back to datetime objects
+            self._time_periods_per_station = {
+                int(station_id): {key: [datetime.datetime.fromisoformat(v) for v in timestamps]
+                                  for key, timestamps in value.items()}
+                for station_id, value in import_dict["periods"].items() if self.selected_stations is None
+                or int(station_id) in self.selected_stations
+            }
+
+            self._time_period_index_per_station = collections.defaultdict(int)
+            self.__buffered_stations = collections.defaultdict(dict)
+            self.__default_values = import_dict["default_values"]
         else:
             self.logger.error(f"{detector_file} with unknown version.")
             raise ReferenceError(f"{detector_file} with unknown version.")
 
 
+    def _build_time_period_index(self):
+        """
+        Converts the modification and (de)commission timestamps of all stations into sorted arrays of unix
+        timestamps. Those are used to find the time period (and whether a station is commissioned) with a
+        binary search instead of looping over all timestamps for each call.
+        """
+        self._time_period_index = {}
+        for station_id, station_data in self._time_periods_per_station.items():
+            self._time_period_index[station_id] = {
+                key: np.sort([dt.timestamp() for dt in station_data[key]]).astype(float)
+                for key in ["modification_timestamps", "station_commission_timestamps",
+                            "station_decommission_timestamps"]}
+
+    def _is_commissioned(self, station_id):
+        """
+        Returns true if the station is commissioned at the detector time.
+
+        Assumes that the commission periods of a station do not overlap, i.e., the n-th commission
+        timestamp belongs to the n-th decommission timestamp.
+        """
+        time = self.get_detector_time().timestamp()
+        index = self._time_period_index[station_id]
+
+        # last commission timestamp before the detector time
+        idx = np.searchsorted(index["station_commission_timestamps"], time, side="left") - 1
+        return bool(0 <= idx < len(index["station_decommission_timestamps"]) and
+                    time < index["station_decommission_timestamps"][idx])
+
     def _check_update_buffer(self):
         """
         Checks whether the correct detector description per station in in the current period.
@@ -302,10 +441,11 @@ class Detector():
         """
         need_update = collections.defaultdict(bool)
 
+        time = self.get_detector_time().timestamp()
         for station_id in self._time_periods_per_station:
-            period = np.digitize(self.get_detector_time().timestamp(),
-                                 [dt.timestamp() for dt in
-                                  self._time_periods_per_station[station_id]["modification_timestamps"]])
+            # same as np.digitize: modification_timestamps[period - 1] <= time < modification_timestamps[period]
+            period = int(np.searchsorted(
+                self._time_period_index[station_id]["modification_timestamps"], time, side="right"))
 
             if period != self._time_period_index_per_station[station_id]:
                 need_update[station_id] = True
@@ -380,7 +520,7 @@ class Detector():
         update_buffer_for_station = self._check_update_buffer()
         any_update = np.any([v for v in update_buffer_for_station.values()])
 
-        if self._det_imported_from_file and any_update:
+        if self._det_imported_from_file and self.__snapshot is None and any_update:
             self.logger.error(
                 "You have imported the detector description from a pickle/json file but it is not valid anymore. Full stop!")
             raise ValueError(
@@ -392,9 +532,11 @@ class Detector():
                     # remove everything (could be handled smarter ...)
                     self.__buffered_stations[key] = {}
 
-            for station_id, need_update in update_buffer_for_station.items():
-                if need_update and self.has_station(station_id):
-                    self._query_station_information(station_id)
+        for station_id, need_update in update_buffer_for_station.items():
+            # A station can also be commissioned within a period (e.g., if the commission timestamp
+            # is also a modification timestamp), then it is not in the buffer yet
+            if (need_update or not self.__buffered_stations.get(station_id)) and self.has_station(station_id):
+                self._query_station_information(station_id)
 
         # Return when buffer is not empty. This has to come first ...
         for station_id in self.__buffered_stations:
@@ -420,16 +562,7 @@ class Detector():
         station_ids: list(int)
             List of all commissioned station ids.
         """
-        commissioned_stations = []
-
-        for station_id, station_data in self._time_periods_per_station.items():
-            for comm, decomm in zip(station_data["station_commission_timestamps"],
-                                    station_data["station_decommission_timestamps"]):
-
-                if comm < self.get_detector_time() and self.get_detector_time() < decomm:
-                    commissioned_stations.append(station_id)
-
-        return commissioned_stations
+        return [station_id for station_id in self._time_periods_per_station if self._is_commissioned(station_id)]
 
     @_check_detector_time
     def has_station(self, station_id):
@@ -457,13 +590,9 @@ class Detector():
             self.logger.debug(f"Station {station_id} not found in database.")
             return False
 
-        station_data = self._time_periods_per_station[station_id]
-        for comm, decomm in zip(station_data["station_commission_timestamps"],
-                                station_data["station_decommission_timestamps"]):
-
-            if comm < self.get_detector_time() and self.get_detector_time() < decomm:
-                self.logger.debug(f"Station {station_id} is commissioned!")
-                return True
+        if self._is_commissioned(station_id):
+            self.logger.debug(f"Station {station_id} is commissioned!")
+            return True
 
         self.logger.debug(f"Station {station_id} not commissioned!")
         return False
@@ -494,6 +623,17 @@ class Detector():
             raise ValueError(
                 f"Query information for station {station_id} which is still in buffer.")
 
+        if self.__snapshot is not None:
+            period = self._time_period_index_per_station[station_id]
+            if period not in self.__snapshot[station_id]:
+                raise ValueError(f"Could not find information of station {station_id} at {self.get_detector_time()} "
+                                 f"(period: {period}) in the imported detector snapshot.")
+
+            self.logger.info(
+                f"Load information for station {station_id} at {self.get_detector_time()} from snapshot")
+            self.__buffered_stations[station_id] = self.__snapshot[station_id][period]
+            return
+
         self.logger.info(
             f"Query information for station {station_id} at {self.get_detector_time()}")
         if self._query_all:
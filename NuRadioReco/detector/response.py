@@ -6,6 +6,7 @@ from scipy import interpolate
 import numpy as np
 import logging
 import datetime
+import collections
 import copy
 
 
@@ -29,8 +30,13 @@ class Response:
         freq = np.arange(50, 1000) * units.MHz
         complex_resp = response(freq)
 
+    The evaluated complex response is buffered for the last `max_cache_size` frequency arrays
+    (and component selections) per object. Hence, the returned arrays are read-only.
+
     """
 
+    max_cache_size = 16
+
     def __init__(self, frequency, y, y_unit, time_delay=0, weight=1,
                  name="default", station_id=None, channel_id=None,
                  remove_time_delay=True, debug_plot=False,
@@ -137,6 +143,9 @@ class Response:
         self.__weights = [weight]
         self.__time_delays = [weight * time_delay]
 
+        # Buffer of evaluated responses, see `__call__`
+        self.__cache = collections.OrderedDict()
+
         # Debug plotting
         if debug_plot:
             from matplotlib import pyplot as plt
@@ -197,14 +206,23 @@ class Response:
         -------
 
         response: np.array(np.complex128)
-            The complex response at the desired frequencies
+            The complex response at the desired frequencies (read-only)
         """
-        response = np.ones_like(freq, dtype=np.complex128)
+        freq = np.asarray(freq)
 
         if component_names is not None:
             if isinstance(component_names, str):
                 component_names = [component_names]
 
+        key = (freq.dtype.str, freq.shape, freq.tobytes(),
+               None if component_names is None else tuple(component_names), blacklist)
+
+        if self.max_cache_size > 0 and key in self.__cache:
+            self.__cache.move_to_end(key)
+            return self.__cache[key]
+
+        response = np.ones_like(freq, dtype=np.complex128)
+
         for gain, phase, weight, name in zip(self.__gains, self.__phases, self.__weights, self.__names):
 
             if component_names is not None:
@@ -231,6 +249,12 @@ class Response:
             else:
                 self.logger.warning("Returned response is equal to 1.")
 
+        if self.max_cache_size > 0:
+            response.setflags(write=False)
+            self.__cache[key] = response
+            if len(self.__cache) > self.max_cache_size:
+                self.__cache.popitem(last=False)
+
         return response
 
     def get_names(self):
@@ -258,6 +282,8 @@ class Response:
             self.__phases += other.__phases
             self.__weights += other.__weights
             self.__time_delays += other.__time_delays
+            # The buffered responses of the copied object are not valid for the combined response
+            self.__cache = collections.OrderedDict()
             return self
 
         elif isinstance(other, NuRadioReco.framework.base_trace.BaseTrace):
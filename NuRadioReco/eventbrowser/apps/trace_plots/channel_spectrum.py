@@ -3,7 +3,6 @@ import json
 import plotly.subplots
 from NuRadioReco.utilities import units
 from NuRadioReco.eventbrowser.default_layout import default_layout
-import numpy as np
 from dash import dcc, callback
 from dash.dependencies import State
 # from NuRadioReco.eventbrowser.app import app
@@ -30,24 +29,20 @@ def update_channel_spectrum(trigger, evt_counter, filename, station_id, juser_id
         return {}
     user_id = json.loads(juser_id)
     colors = plotly.colors.DEFAULT_PLOTLY_COLORS
-    nurio = provider.get_file_handler(user_id, filename)
-    evt = nurio.get_event_i(evt_counter)
-    station = evt.get_station(station_id)
+    plot_data = provider.get_channel_plot_data(user_id, filename, evt_counter, station_id)
     fig = plotly.subplots.make_subplots(rows=1, cols=1)
-    for i, channel in enumerate(station.iter_channels()):
-        spec = channel.get_frequency_spectrum()
-        if spec is None:
+    for i, (channel_id, channel_plot_data) in enumerate(plot_data.items()):
+        if channel_plot_data is None:
             continue
-        freqs = channel.get_frequencies()
         fig.append_trace(plotly.graph_objs.Scatter(
-            x=freqs / units.MHz,
-            y=np.abs(spec) / units.mV,
+            x=channel_plot_data['frequencies'] / units.MHz,
+            y=channel_plot_data['spectrum'] / units.mV,
             opacity=0.7,
             marker={
                 'color': colors[i % len(colors)],
                 'line': {'color': colors[i % len(colors)]}
             },
-            name='Channel {}'.format(channel.get_id())
+            name='Channel {}'.format(channel_id)
         ), 1, 1)
     fig['layout'].update(default_layout)
     fig['layout']['legend']['uirevision'] = filename
@@ -28,23 +28,22 @@ def update_time_trace(trigger, evt_counter, filename, station_id, juser_id):
         return {}
     user_id = json.loads(juser_id)
     colors = plotly.colors.DEFAULT_PLOTLY_COLORS
-    nurio = provider.get_file_handler(user_id, filename)
-    evt = nurio.get_event_i(evt_counter)
-    station = evt.get_station(station_id)
+    plot_data = provider.get_channel_plot_data(user_id, filename, evt_counter, station_id)
     fig = plotly.subplots.make_subplots(rows=1, cols=1)
     trace_start_times = []
-    for channel in station.iter_channels():
-        trace_start_times.append(channel.get_trace_start_time())
+    for channel_plot_data in plot_data.values():
+        if channel_plot_data is not None:
+            trace_start_times.append(channel_plot_data['trace_start_time'])
     if np.min(trace_start_times) > 1000. * units.ns:
         trace_start_time_offset = np.floor(np.min(trace_start_times) / 1000.) * 1000.
     else:
         trace_start_time_offset = 0
-    for i, channel in enumerate(station.iter_channels()):
-        if channel.get_trace() is None:
+    for i, (channel_id, channel_plot_data) in enumerate(plot_data.items()):
+        if channel_plot_data is None:
             continue
         fig.append_trace(plotly.graph_objs.Scatter(
-            x=channel.get_times() - trace_start_time_offset / units.ns,
-            y=channel.get_trace() / units.mV,
+            x=channel_plot_data['times'] - trace_start_time_offset / units.ns,
+            y=channel_plot_data['trace'] / units.mV,
             # text=df_by_continent['country'],
             # mode='markers',
             opacity=0.7,
@@ -52,8 +51,8 @@ def update_time_trace(trigger, evt_counter, filename, station_id, juser_id):
                 'color': colors[i % len(colors)],
                 'line': {'color': colors[i % len(colors)]}
             },
-            name='Channel {}'.format(channel.get_id()),
-            uid='Channel {}'.format(channel.get_id())
+            name='Channel {}'.format(channel_id),
+            uid='Channel {}'.format(channel_id)
         ), 1, 1)
     fig['layout'].update(default_layout)
     fig['layout']['legend']['uirevision'] = filename # only update channel selection on changing files.
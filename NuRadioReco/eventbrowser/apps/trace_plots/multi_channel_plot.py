@@ -134,9 +134,10 @@ def update_multi_channel_plot(evt_counter, filename, dropdown_traces, dropdown_i
         return {}
     user_id = json.loads(juser_id)
     colors = plotly.colors.DEFAULT_PLOTLY_COLORS
-    nurio = provider.get_file_handler(user_id, filename)
-    evt = nurio.get_event_i(evt_counter)
+    evt = provider.get_event_i(user_id, filename, evt_counter)
     station = evt.get_station(station_id)
+    # traces, envelopes and spectra are calculated only once per event
+    plot_data = provider.get_channel_plot_data(user_id, filename, evt_counter, station_id, station=station)
     ymax = 0
     n_channels = 0
     plot_titles = []
@@ -147,13 +148,11 @@ def update_multi_channel_plot(evt_counter, filename, dropdown_traces, dropdown_i
                                         vertical_spacing=0.05/n_rows, subplot_titles=plot_titles)
     for i, channel in enumerate(station.iter_channels()):
         n_channels += 1
-        trace = channel.get_trace() / units.mV
-        ymax = max(ymax, np.max(np.abs(trace)))
         plot_titles.append('Channel {}'.format(channel.get_id()))
         plot_titles.append('Channel {}'.format(channel.get_id()))
         trace_start_times.append(channel.get_trace_start_time())
-        if channel.get_trace() is not None:
-            trace = channel.get_trace() / units.mV
+        if plot_data[channel.get_id()] is not None:
+            trace = plot_data[channel.get_id()]['trace'] / units.mV
             ymax = max(ymax, np.max(np.abs(trace)))
     if np.min(trace_start_times) > 1000. * units.ns:
         trace_start_time_offset = np.floor(np.min(trace_start_times) / 1000.) * 1000.
@@ -165,11 +164,11 @@ def update_multi_channel_plot(evt_counter, filename, dropdown_traces, dropdown_i
     channel_ids = sorted(channel_ids)
     if 'trace' in dropdown_traces:
         for i, channel_id in enumerate(channel_ids):
-            channel = station.get_channel(channel_id)
-            tt = channel.get_times() - trace_start_time_offset / units.ns
-            if channel.get_trace() is None:
+            channel_plot_data = plot_data[channel_id]
+            if channel_plot_data is None:
                 continue
-            trace = channel.get_trace() / units.mV
+            tt = channel_plot_data['times'] - trace_start_time_offset / units.ns
+            trace = channel_plot_data['trace'] / units.mV
             fig.append_trace(plotly.graph_objs.Scatter(
                 x=tt,
                 y=trace,
@@ -182,27 +181,25 @@ def update_multi_channel_plot(evt_counter, filename, dropdown_traces, dropdown_i
             ), i + 1, 1)
             if 'RMS' in dropdown_info:
                 fig.add_annotation(
-                    text=r'mu = {:.2g}, STD={:.2g}'.format(np.mean(trace), np.std(trace)),
+                    text=r'mu = {:.2g}, STD={:.2g}'.format(
+                        channel_plot_data['mean'] / units.mV, channel_plot_data['std'] / units.mV),
                     x=0.99, y=0.98, xanchor='right', yanchor='top', showarrow=False,
                     xref='x domain', yref='y domain',
                     row=i+1, col=1)
             if 'int_power' in dropdown_info:
                 fig.add_annotation(
-                    text=r'E ~ {:.3g}'.format(np.sum(trace**2)),
+                    text=r'E ~ {:.3g}'.format(channel_plot_data['power'] / units.mV ** 2),
                     x=0.99, y=0.3, xanchor='right', yanchor='top', showarrow=False,
                     xref='x domain', yref='y domain',
                     row=i+1, col=1)
     if 'envelope' in dropdown_traces:
         for i, channel_id in enumerate(channel_ids):
-            channel = station.get_channel(channel_id)
-            if channel.get_trace() is None:
+            channel_plot_data = plot_data[channel_id]
+            if channel_plot_data is None:
                 continue
-            trace = channel.get_trace() / units.mV
-            from scipy import signal
-            yy = np.abs(signal.hilbert(trace))
             fig.append_trace(plotly.graph_objs.Scatter(
-                x=channel.get_times() - trace_start_time_offset / units.ns,
-                y=yy,
+                x=channel_plot_data['envelope_times'] - trace_start_time_offset / units.ns,
+                y=channel_plot_data['envelope'] / units.mV,
                 opacity=0.7,
                 line=dict(
                     width=4,
@@ -423,13 +420,13 @@ def update_multi_channel_plot(evt_counter, filename, dropdown_traces, dropdown_i
         )
         fig['layout']['yaxis{:d}'.format(i * 2 + 2)].update(type=yscale)
 
-        if channel.get_trace() is None:
+        if plot_data[channel_id] is None:
             continue
-        spec = channel.get_frequency_spectrum()
-        ff = channel.get_frequencies()
+        spec = plot_data[channel_id]['spectrum']
+        ff = plot_data[channel_id]['frequencies']
         fig.append_trace(plotly.graph_objs.Scatter(
             x=ff / units.MHz,
-            y=np.abs(spec) / units.mV,
+            y=spec / units.mV,
             opacity=0.7,
             marker={
                 'color': colors[i % len(colors)],
@@ -441,15 +438,15 @@ def update_multi_channel_plot(evt_counter, filename, dropdown_traces, dropdown_i
             fig.append_trace(
                 plotly.graph_objs.Scatter(
                     x=[0.9 * ff.max() / units.MHz],
-                    y=[0.8 * np.abs(spec).max() / units.mV],
+                    y=[0.8 * spec.max() / units.mV],
                     mode='text',
-                    text=['max L1 = {:.2f}'.format(get_L1(spec))],
+                    text=['max L1 = {:.2f}'.format(get_L1(channel.get_frequency_spectrum()))],
                     textposition='top center'
                 ),
                 i + 1, 2)
         if 'freq_RMS' in dropdown_info:
             fig.add_hline(
-                .25 * np.max(np.abs(spec)[5:]) / units.MHz,
+                .25 * np.max(spec[5:]) / units.MHz,
                 row=i+1, col=2
             )
     if trace_start_time_offset > 0:
@@ -0,0 +1,116 @@
+"""
+Replays a sequence of clicks through the events of a file against the trace plots of the eventbrowser
+and measures the time it takes to update the plots.
+
+Example::
+
+    python NuRadioReco/eventbrowser/benchmark.py my_file.nur --station-id 11 --n-clicks 50 --pause 0.5
+
+"""
+import argparse
+import json
+import time
+import logging
+import numpy as np
+from NuRadioReco.eventbrowser.dataprovider import DataProvider
+
+logging.basicConfig()
+logger = logging.getLogger('eventbrowser.benchmark')
+logger.setLevel(logging.INFO)
+
+
+def get_click_sequence(n_events, n_clicks, sequence='next', seed=None):
+    """
+    Returns the event numbers that are requested one after the other
+
+    Parameters
+    ----------
+    n_events: int
+        number of events in the file
+    n_clicks: int
+        number of clicks
+    sequence: 'next' | 'back-and-forth' | 'random'
+        'next' steps through the events one by one, 'back-and-forth' alternates between
+        two steps forward and one step back and 'random' jumps to random events
+    seed: int or None
+        seed for the 'random' sequence
+
+    Returns
+    -------
+    event_numbers: list of ints
+    """
+    if sequence == 'next':
+        steps = np.ones(n_clicks, dtype=int)
+    elif sequence == 'back-and-forth':
+        steps = np.tile([1, 1, -1], n_clicks // 3 + 1)[:n_clicks]
+    elif sequence == 'random':
+        return list(np.random.default_rng(seed).integers(0, n_events, n_clicks))
+    else:
+        raise ValueError(f"Unknown click sequence {sequence}")
+
+    return list(np.cumsum(np.concatenate([[0], steps[:-1]])) % n_events)
+
+
+def replay_clicks(filename, station_id, event_numbers, pause=0, user_id='benchmark'):
+    """
+    Updates the trace plots for each event in `event_numbers` and measures the time per click
+
+    Parameters
+    ----------
+    filename: str
+        the file to read
+    station_id: int
+        the station that is shown
+    event_numbers: list of ints
+        the sequence of events
+    pause: float
+        time (in seconds) between two clicks, i.e., the time the user looks at the plots
+    user_id: str
+        the user id that is used for the requests
+
+    Returns
+    -------
+    times: array of floats
+        the time (in seconds) it took to update all plots for each click
+    """
+    # importing the plots registers the dash callbacks, which is not needed otherwise
+    from NuRadioReco.eventbrowser.apps.trace_plots import multi_channel_plot, channel_time_trace, channel_spectrum
+
+    juser_id = json.dumps(user_id)
+    times = []
+    for event_number in event_numbers:
+        t = time.time()
+        channel_time_trace.update_time_trace(None, event_number, filename, station_id, juser_id)
+        channel_spectrum.update_channel_spectrum(None, event_number, filename, station_id, juser_id, 'log')
+        multi_channel_plot.update_multi_channel_plot(
+            event_number, filename, ['trace', 'envelope'], ['RMS', 'L1'], station_id,
+            None, juser_id, None, 'log')
+        times.append(time.time() - t)
+        time.sleep(pause)
+
+    return np.array(times)
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser(description="Measures the time to update the eventbrowser trace plots")
+    argparser.add_argument('filename', type=str, help="Path of the .nur file")
+    argparser.add_argument('--station-id', type=int, default=None,
+                           help="Station to show, default is the first station of the first event")
+    argparser.add_argument('--n-clicks', type=int, default=20, help="Number of clicks")
+    argparser.add_argument('--sequence', type=str, default='next', choices=['next', 'back-and-forth', 'random'],
+                           help="Order in which the events are requested")
+    argparser.add_argument('--pause', type=float, default=0.2, help="Time between two clicks in seconds")
+    argparser.add_argument('--n-prefetch', type=int, default=3,
+                           help="Number of events which are prefetched in the background (0 disables prefetching)")
+    args = argparser.parse_args()
+
+    provider = DataProvider(n_prefetch=args.n_prefetch)
+    n_events = provider.get_file_handler('benchmark', args.filename).get_n_events()
+    station_id = args.station_id
+    if station_id is None:
+        station_id = provider.get_event_i('benchmark', args.filename, 0).get_station_ids()[0]
+
+    event_numbers = get_click_sequence(n_events, args.n_clicks, args.sequence)
+    times = replay_clicks(args.filename, station_id, event_numbers, args.pause)
+    logger.info(f"{len(times)} clicks: mean {np.mean(times) * 1e3:.1f} ms, median {np.median(times) * 1e3:.1f} ms, "
+                f"max {np.max(times) * 1e3:.1f} ms (first click {times[0] * 1e3:.1f} ms)")
@@ -4,6 +4,12 @@ import six
 import NuRadioReco.utilities.metaclasses
 import os
 import time
+import collections
+import copy
+import concurrent.futures
+import numpy as np
+import scipy.signal
+from NuRadioReco.utilities import fft
 from NuRadioReco.modules.io import NuRadioRecoio
 
 logging.basicConfig()
@@ -21,11 +27,97 @@ except ImportError as e:
     )
     _readRNOGData_eventbrowser = None # if we don't define this we'll raise more errors later
 
+def downsample_trace(times, trace, max_samples):
+    """
+    Reduces the number of samples of a trace for plotting
+
+    The trace is divided into segments and the minimum and maximum of each segment
+    are kept, i.e., the envelope of the trace is preserved.
+
+    Parameters
+    ----------
+    times: array of floats
+        the times of the samples
+    trace: array of floats
+        the trace
+    max_samples: int or None
+        the maximum number of samples. If None or if the trace is shorter, the trace
+        is returned unchanged
+
+    Returns
+    -------
+    times: array of floats
+    trace: array of floats
+    """
+    n_samples = len(trace)
+    if max_samples is None or n_samples <= max_samples:
+        return times, trace
+
+    segment_length = int(np.ceil(2 * n_samples / max_samples))
+    n_segments = n_samples // segment_length
+    segments = trace[:n_segments * segment_length].reshape(n_segments, segment_length)
+    offsets = np.arange(n_segments) * segment_length
+    indices = np.concatenate([
+        offsets + np.argmin(segments, axis=1),
+        offsets + np.argmax(segments, axis=1),
+        np.arange(n_segments * segment_length, n_samples)])
+    indices = np.unique(indices)  # sorted and without duplicates
+    return times[indices], trace[indices]
+
+
+def calculate_channel_plot_data(station, max_plot_samples=None):
+    """
+    Calculates the quantities of all channels of a station that are shown in the trace plots
+
+    Parameters
+    ----------
+    station: Station
+        the station
+    max_plot_samples: int or None
+        the maximum number of samples of the traces and envelopes for plotting,
+        see `downsample_trace`
+
+    Returns
+    -------
+    plot_data: dict
+        dictionary with the channel ids as keys. Each entry is a dictionary with the keys
+        'trace_start_time', 'times', 'trace', 'envelope_times', 'envelope', 'frequencies', 'spectrum'
+        (the absolute value of the frequency spectrum), and the 'mean', 'std' and 'power'
+        (i.e., the sum of the squared amplitudes) of the full-resolution trace.
+        The entry is None if the channel does not have a trace.
+    """
+    plot_data = {}
+    for channel in station.iter_channels():
+        trace = channel.get_trace()
+        if trace is None:
+            plot_data[channel.get_id()] = None
+            continue
+        times = channel.get_times()
+        sampling_rate = channel.get_sampling_rate()
+        envelope = np.abs(scipy.signal.hilbert(trace))
+        plot_times, plot_trace = downsample_trace(times, trace, max_plot_samples)
+        envelope_times, envelope = downsample_trace(times, envelope, max_plot_samples)
+        plot_data[channel.get_id()] = {
+            'trace_start_time': channel.get_trace_start_time(),
+            'times': plot_times,
+            'trace': plot_trace,
+            'envelope_times': envelope_times,
+            'envelope': envelope,
+            'frequencies': np.fft.rfftfreq(len(trace), 1. / sampling_rate),
+            'spectrum': np.abs(fft.time2freq(trace, sampling_rate)),
+            'mean': np.mean(trace),
+            'std': np.std(trace),
+            'power': np.sum(trace ** 2)
+        }
+    return plot_data
+
+
 @six.add_metaclass(NuRadioReco.utilities.metaclasses.Singleton)
 class DataProvider(object):
     __lock = threading.Lock()
 
-    def __init__(self, filetype='auto', max_user_instances=6):
+    def __init__(self, filetype='auto', max_user_instances=6, n_prefetch=3,
+                 max_plot_data_cache=64, max_plot_samples=4096):
         """"
         Interface to .nur or .root file IO for the eventbrowser
 
@@ -45,12 +137,29 @@ class DataProvider(object):
             Each unique session id gets its own reader, up to a maximum
             of ``max_user_instances`` concurrent readers. Subsequent
             requests for new readers drop older readers.
+        n_prefetch: int (default: 3)
+            Number of following and preceding events that are read (and for which the
+            plot data is calculated) in a background thread after an event was requested.
+            Only supported for `.nur` files. Set to 0 to disable prefetching.
+        max_plot_data_cache: int (default: 64)
+            Maximum number of stations for which the plot data
+            (see `get_channel_plot_data`) is cached.
+        max_plot_samples: int or None (default: 4096)
+            Traces with more samples are downsampled (keeping the minimum and maximum
+            of each segment) for plotting.
 
         """
         logger.info("Creating new DataProvider instance")
         self.__max_user_instances = max_user_instances
         self.__user_instances = {}
         self.__filetype = filetype
+        self.__n_prefetch = n_prefetch
+        self.__max_plot_data_cache = max_plot_data_cache
+        self.__max_plot_samples = max_plot_samples
+        self.__plot_data_cache = collections.OrderedDict()
+        self.__plot_data_lock = threading.Lock()
+        self.__prefetch_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.__prefetch_request = {}
 
     def set_filetype(self, use_root):
         """
@@ -126,7 +235,10 @@ class DataProvider(object):
                     reader.begin([os.path.dirname(f) for f in filename], overwrite_sampling_rate=3.2)
                     reader.get_event_ids()
                 else:
-                    reader = NuRadioRecoio.NuRadioRecoio(filename) # NuRadioRecoio takes filenames as argument to __init__
+                    # NuRadioRecoio takes filenames as argument to __init__. The event cache stays disabled,
+                    # because cached events are shared objects and the dash callbacks modify them (e.g. by
+                    # switching the domain of the traces). The plot data is cached instead.
+                    reader = NuRadioRecoio.NuRadioRecoio(filename)
                 self.__user_instances[user_id] = dict(
                     reader=reader, filename=filename,
                 )
@@ -146,3 +258,138 @@ class DataProvider(object):
 
         logger.debug(f"Returning file_handler and releasing lock")
         return self.__user_instances[user_id]['reader']
+
+    def get_event_i(self, user_id, filename, event_number):
+        """
+        Returns the i-th event of the file(s)
+
+        In addition, the neighbouring events are read in a background thread (see ``n_prefetch``)
+
+        Parameters
+        ----------
+        user_id: str
+            unique user_id to allow multiple users to use the dataprovider at once
+        filename: str | list
+            path or paths to files to read in
+        event_number: int
+            the index of the event
+
+        Returns
+        -------
+        event: Event
+        """
+        reader = self.get_file_handler(user_id, filename)
+        event = reader.get_event_i(event_number)
+        self.prefetch(user_id, filename, event_number)
+        return event
+
+    def get_channel_plot_data(self, user_id, filename, event_number, station_id, station=None):
+        """
+        Returns the plot data (traces, envelopes and spectra) of all channels of a station
+
+        The plot data is calculated only once per event and station and kept in a cache.
+
+        Parameters
+        ----------
+        user_id: str
+            unique user_id to allow multiple users to use the dataprovider at once
+        filename: str | list
+            path or paths to files to read in
+        event_number: int
+            the index of the event
+        station_id: int
+            the station id
+        station: `NuRadioReco.framework.station.Station` | None
+            the station, if the caller has already read the event. It is used to calculate
+            the plot data if they are not cached, to avoid reading the event a second time.
+            If None (default), the event is read from the file if necessary.
+
+        Returns
+        -------
+        plot_data: dict
+            see `calculate_channel_plot_data`
+        """
+        key = self.__get_plot_data_key(filename, event_number, station_id)
+        with self.__plot_data_lock:
+            plot_data = self.__plot_data_cache.get(key, None)
+            if plot_data is not None:
+                self.__plot_data_cache.move_to_end(key)
+
+        if plot_data is not None:
+            self.prefetch(user_id, filename, event_number)
+            return plot_data
+
+        if station is None:
+            station = self.get_event_i(user_id, filename, event_number).get_station(station_id)
+        return self.__calculate_plot_data(key, station)
+
+    def prefetch(self, user_id, filename, event_number):
+        """
+        Reads the events around `event_number` and calculates their plot data in a background thread
+
+        Only the most recent request of each user is processed, i.e., when the user moves on
+        to another event, prefetching the events around the previous event is stopped.
+
+        Parameters
+        ----------
+        user_id: str
+            unique user_id to allow multiple users to use the dataprovider at once
+        filename: str | list
+            path or paths to files to read in
+        event_number: int
+            the index of the event around which events are prefetched
+        """
+        if self.__n_prefetch <= 0:
+            return
+
+        reader = self.get_file_handler(user_id, filename)
+        if not isinstance(reader, NuRadioRecoio.NuRadioRecoio):
+            return  # the reader of .root files does not support reading events in the background
+
+        request = (user_id, event_number)
+        with self.__plot_data_lock:
+            if self.__prefetch_request.get(user_id, None) == request:
+                return
+            self.__prefetch_request[user_id] = request
+
+        # order the events by distance, first the next, then the previous event
+        event_numbers = []
+        for i in range(1, self.__n_prefetch + 1):
+            event_numbers += [event_number + i, event_number - i]
+        event_numbers = [i for i in event_numbers if 0 <= i < reader.get_n_events()]
+        self.__prefetch_executor.submit(self.__prefetch, reader, user_id, request, filename, event_numbers)
+
+    def __prefetch(self, reader, user_id, request, filename, event_numbers):
+        try:
+            for event_number in event_numbers:
+                if self.__prefetch_request.get(user_id, None) != request:
+                    logger.debug(f"Stop prefetching events for user {user_id}, newer request available")
+                    return
+                event = reader.get_event_i(event_number, set_current_event=False)
+                for station in event.get_stations():
+                    key = self.__get_plot_data_key(filename, event_number, station.get_id())
+                    with self.__plot_data_lock:
+                        if key in self.__plot_data_cache:
+                            continue
+                    self.__calculate_plot_data(key, station)
+        except Exception as e:
+            # errors should surface in the callbacks, not in the background thread
+            logger.warning(f"Prefetching events failed: {e}")
+
+    def __calculate_plot_data(self, key, station):
+        # `get_trace` can switch the domain of the channels, which is not thread-safe. The station might be
+        # used by a dash callback at the same time (this function also runs in the prefetch thread),
+        # so the plot data is calculated from a copy
+        plot_data = calculate_channel_plot_data(copy.deepcopy(station), self.__max_plot_samples)
+        with self.__plot_data_lock:
+            self.__plot_data_cache[key] = plot_data
+            self.__plot_data_cache.move_to_end(key)
+            while len(self.__plot_data_cache) > self.__max_plot_data_cache:
+                self.__plot_data_cache.popitem(last=False)
+        return plot_data
+
+    @staticmethod
+    def __get_plot_data_key(filename, event_number, station_id):
+        if isinstance(filename, str):
+            filename = [filename]
+        return (tuple(filename), event_number, station_id)
@@ -13,18 +13,19 @@ logger = logging.getLogger('NuRadioReco.stationRFIFilter')
 
 
 def num_double_zeros(data, threshold=None, ave_shift=False):
-    """if data is a numpy array, give number of points that have  zero preceded by a zero"""
+    """if data is a numpy array, give number of points that have  zero preceded by a zero.
+    For multi-dimensional arrays the points are counted along the last axis."""
 
     if ave_shift:
-        data = data - np.average(data)
+        data = data - np.average(data, axis=-1)[..., np.newaxis]
 
     if threshold is None:
         is_zero = data == 0
     else:
         is_zero = np.abs(data) < threshold
 
-    bad = np.logical_and(is_zero[:-1], is_zero[1:])
-    return np.sum(bad)
+    bad = np.logical_and(is_zero[..., :-1], is_zero[..., 1:])
+    return np.sum(bad, axis=-1)
 
 
 def median_sorted_by_power(psort):
@@ -76,6 +77,8 @@ def FindRFI_LOFAR(
         rfi_cleaning_trace_length=8192,
         flagged_antenna_ids=None,
         num_dbl_z=1000,
+        num_blocks_per_read=16,
+        use_memmap=False,
 ):
     """
     A code that basically reads given LOFAR TBB H5 file and returns an array of dirty channels.
@@ -95,6 +98,10 @@ def FindRFI_LOFAR(
         List of antennas which are already flagged. These will not be considered for the RFI detection process.
     num_dbl_z : int, default=100
         The number of double zeros allowed in a block, if there are too many, then there could be data loss.
+    num_blocks_per_read : int, default=16
+        The number of consecutive blocks which are read and processed at once for all antennas.
+    use_memmap : bool, default=False
+        If True, the TBB data is read through memory maps of the files (see `MultiFile_Dal1.get_data_blocks`).
 
     Raises
     ------
@@ -162,59 +169,50 @@ def FindRFI_LOFAR(
     antenna_ids = [id for id in antenna_ids if id not in flagged_antenna_ids]
     num_antennas = len(antenna_ids)
 
-    # step one: find which blocks are good, and find average power
-    oneAnt_data = np.zeros(rfi_cleaning_trace_length, dtype=np.double) # initialize at zero
+    def iterate_data(blocks):
+        """
+        Reads the blocks for all antennas, `num_blocks_per_read` consecutive blocks at a time.
+        Yields the indices of the blocks and the data with shape (num_antennas, len(block_indices), block length).
+        """
+        for first_block in range(0, max_blocks, num_blocks_per_read):
+            block_indices = np.arange(first_block, min(first_block + num_blocks_per_read, max_blocks))
+            block_indices = block_indices[np.isin(block_indices, blocks)]
+            if not len(block_indices):
+                continue
+            block_data = tbb_file.get_data_blocks(
+                rfi_cleaning_trace_length * (block_indices[0] + initial_block), rfi_cleaning_trace_length,
+                block_indices[-1] - block_indices[0] + 1, antenna_IDs=antenna_ids, use_memmap=use_memmap
+            )
+            yield block_indices, block_data[:, block_indices - block_indices[0]]
 
+    # step one: find which blocks are good, and find average power
     logger.info("finding good blocks")
     blocks_good = np.zeros((num_antennas, max_blocks), dtype=bool)
-    num_good_blocks = np.zeros(num_antennas, dtype=int)
     average_power = np.zeros(num_antennas, dtype=np.double)
-    for block_i in range(max_blocks):
-        block = block_i + initial_block
-
-        for ant_i in range(num_antennas):
-            try:
-                oneAnt_data[:] = tbb_file.get_data(
-                    rfi_cleaning_trace_length * block, rfi_cleaning_trace_length, antenna_ID=antenna_ids[ant_i]
-                )
-            except: # TODO: more specific exception
-                logger.warning('Could not read data for antenna %s block %d' % (antenna_ids[ant_i], block_i))
-                # proceed with zeros in the block
-            #oneAnt_data[:] = tbb_file.get_data(
-            #    rfi_cleaning_trace_length * block, rfi_cleaning_trace_length, antenna_index=ant_i
-            #)
-            if (
-                    num_double_zeros(oneAnt_data) < num_dbl_z
-            ):  # this antenna on this block is good
-                blocks_good[ant_i, block_i] = True
-                num_good_blocks[ant_i] += 1
-
-                oneAnt_data *= window_function
-
-                FFT_data = np.fft.fft(oneAnt_data)
-                np.abs(FFT_data, out=FFT_data)
-                magnitude = FFT_data
-                magnitude *= magnitude
-                average_power[ant_i] += np.real(np.sum(magnitude))
+    for block_indices, block_data in iterate_data(np.arange(max_blocks)):
+        # an antenna is good on a block if there are not too many double zeros
+        is_good = num_double_zeros(block_data) < num_dbl_z
+        blocks_good[:, block_indices] = is_good
 
+        # total power of the windowed data, the sum over the power spectrum of the FFT
+        # equals the sum over the squared trace times the number of samples (Parseval)
+        power = np.sum(np.square(block_data * window_function), axis=-1) * rfi_cleaning_trace_length
+        average_power += np.sum(power * is_good, axis=1)
+
+    num_good_blocks = np.sum(blocks_good, axis=1)
     average_power[num_good_blocks != 0] /= num_good_blocks[num_good_blocks != 0]
 
     # Now we try to find the best reference antenna, require that antenna allows for maximum number of good antennas,
     # and has **best** average received power
-    allowed_num_antennas = np.empty(
-        num_antennas, dtype=int
-    )
     # If ant_i is chosen to be your reference antenna, then allowed_num_antennas[ ant_i ] is the number of
     # antennas with num_blocks good blocks
-    for ant_i in range(num_antennas):  # fill allowed_num_antennas
-        blocks_can_use = np.where(blocks_good[ant_i])[0]
-        num_good_blocks_per_antenna = np.sum(blocks_good[:, blocks_can_use], axis=1)
-        allowed_num_antennas[ant_i] = np.sum(num_good_blocks_per_antenna >= num_blocks)
+    num_good_blocks_per_antenna = blocks_good.astype(int) @ blocks_good.T.astype(int)
+    allowed_num_antennas = np.sum(num_good_blocks_per_antenna >= num_blocks, axis=0)
 
     max_allowed_antennas = np.max(allowed_num_antennas)
 
     if max_allowed_antennas < 2:
-        logger.error("ERROR: station", tbb_file.get_station_name(), "cannot find RFI")
+        logger.error(f"ERROR: station {tbb_file.get_station_name()} cannot find RFI")
         return
 
     # Pick a reference antenna that allows max number of antennas, and has most median amount of power
@@ -239,7 +237,6 @@ def FindRFI_LOFAR(
     blocks_good[np.logical_not(antenna_is_good), :] = False
 
     # Process data
-    num_processed_blocks = np.zeros(num_antennas, dtype=int)
     frequencies = np.fft.fftfreq(rfi_cleaning_trace_length, 1.0 / tbb_file.get_sample_frequency())
     frequencies *= units.Hz
     lower_frequency_index = np.searchsorted(
@@ -256,62 +253,29 @@ def FindRFI_LOFAR(
         (num_antennas, upper_frequency_index - lower_frequency_index), dtype=np.double
     )
 
-    data = np.empty((num_antennas, len(frequencies)), dtype=complex)
-    temp_mag_spectrum = np.empty((num_antennas, len(frequencies)), dtype=np.double)
-    temp_phase_spectrum = np.empty((num_antennas, len(frequencies)), dtype=complex)
-    for block_i in good_blocks:
-        logger.info("Doing block %d" % block_i)
-        block = block_i + initial_block
-
-        for ant_i in range(num_antennas):
-            if (
-                    num_processed_blocks[ant_i] == num_blocks
-                    or not blocks_good[ant_i, block_i]
-            ):
-                continue
-            oneAnt_data[:] = tbb_file.get_data(
-                rfi_cleaning_trace_length * block, rfi_cleaning_trace_length, antenna_index=ant_i
-            )
+    for block_indices, block_data in iterate_data(good_blocks):
+        logger.info("Doing blocks %d to %d" % (block_indices[0], block_indices[-1]))
 
-            # Window the data
-            # Note: No hanning window if we want to measure power accurately from spectrum in the same units
-            # as power from timeseries. Applying a window gives (at least) a scale factor difference!
-            # But no window makes the cleaning less effective... :(
-            oneAnt_data *= window_function
-            data[ant_i] = np.fft.fft(oneAnt_data)
+        # Window the data
+        # Note: No hanning window if we want to measure power accurately from spectrum in the same units
+        # as power from timeseries. Applying a window gives (at least) a scale factor difference!
+        # But no window makes the cleaning less effective... :(
+        # All frequencies of interest are below the Nyquist frequency, so the real FFT is sufficient
+        data = np.fft.rfft(block_data * window_function, axis=-1)[..., lower_frequency_index:upper_frequency_index]
 
-        np.abs(data, out=temp_mag_spectrum)
-        temp_phase_spectrum[:] = data
-        temp_phase_spectrum /= temp_mag_spectrum + 1.0e-15
-        temp_phase_spectrum[:, :] /= temp_phase_spectrum[ref_antenna, :]
+        temp_mag_spectrum = np.abs(data)
+        temp_phase_spectrum = data / (temp_mag_spectrum + 1.0e-15)
+        temp_phase_spectrum /= temp_phase_spectrum[ref_antenna]
 
         temp_mag_spectrum *= temp_mag_spectrum
 
-        for ant_i in range(num_antennas):
-            if (
-                    num_processed_blocks[ant_i] == num_blocks
-                    or not blocks_good[ant_i, block_i]
-            ):
-                continue
-
-            phase_mean[ant_i, :] += temp_phase_spectrum[ant_i][
-                                    lower_frequency_index:upper_frequency_index
-                                    ]
-            spectrum_mean[ant_i, :] += temp_mag_spectrum[ant_i][
-                                       lower_frequency_index:upper_frequency_index
-                                       ]
-
-            num_processed_blocks[ant_i] += 1
-
-        if np.min(num_processed_blocks[antenna_is_good]) == num_blocks:
-            break
+        # only use the blocks which are good for the respective antenna
+        use_block = blocks_good[:, block_indices, np.newaxis]
+        phase_mean += np.sum(temp_phase_spectrum * use_block, axis=1)
+        spectrum_mean += np.sum(temp_mag_spectrum * use_block, axis=1)
 
     logger.info(
-        num_blocks,
-        "analyzed blocks",
-        np.sum(antenna_is_good),
-        "analyzed antennas out of",
-        len(antenna_is_good),
+        f"{num_blocks} analyzed blocks, {np.sum(antenna_is_good)} analyzed antennas out of {len(antenna_is_good)}"
     )
 
     # Get only good antennas
@@ -342,16 +306,11 @@ def FindRFI_LOFAR(
     )[0]
 
     # Extend dirty channels by some size, in order to account for shoulders
+    # (the channels i - half_flagwidth, ..., i + half_flagwidth - 1, within 0, ..., N - 2)
     extend_dirty_channels = np.zeros(N, dtype=bool)
     half_flagwidth = int(rfi_cleaning_trace_length / 8192)
-    for i in dirty_channels:
-        flag_min = i - half_flagwidth
-        flag_max = i + half_flagwidth
-        if flag_min < 0:
-            flag_min = 0
-        if flag_max >= N:
-            flag_max = N - 1
-        extend_dirty_channels[flag_min:flag_max] = True
+    flagged = (dirty_channels[:, np.newaxis] + np.arange(-half_flagwidth, half_flagwidth)).flatten()
+    extend_dirty_channels[flagged[(flagged >= 0) & (flagged < N - 1)]] = True
 
     dirty_channels = np.where(extend_dirty_channels)
 
@@ -373,14 +332,10 @@ def FindRFI_LOFAR(
 
     dirty_channels += lower_frequency_index
     dirty_channels = dirty_channels[0]
-    multiplied_channels = []
     multiplied_blocks = target_trace_length // rfi_cleaning_trace_length
-    for ch in dirty_channels:  # TODO: could be done more efficiently...?
-        this_channel_list = np.arange(multiplied_blocks * ch, multiplied_blocks * ch + multiplied_blocks, 1)
-        this_channel_list = list(this_channel_list)
-        multiplied_channels.extend(this_channel_list)
+    multiplied_channels = (multiplied_blocks * dirty_channels[:, np.newaxis] + np.arange(multiplied_blocks)).flatten()
 
-    dirty_channels = np.sort(np.array(multiplied_channels))
+    dirty_channels = np.sort(multiplied_channels)
     dirty_channels_block_size = target_trace_length
 
     # Use dictionary to avoid indexing mistakes
@@ -418,6 +373,7 @@ class stationRFIFilter:
         self.__rfi_trace_length = None
         self.__station_list = None
         self.__metadata_dir = None
+        self.__use_memmap = False
 
     @property
     def station_list(self):
@@ -435,7 +391,7 @@ class stationRFIFilter:
     def metadata_dir(self, new_dir):
         self.__metadata_dir = new_dir
 
-    def begin(self, rfi_cleaning_trace_length=65536, reader=None, logger_level=logging.WARNING):
+    def begin(self, rfi_cleaning_trace_length=65536, reader=None, logger_level=logging.WARNING, use_memmap=False):
         """
         Set the variables used for RFI detection. The `reader` object can be used to retrieve the filenames associated
         with the loaded stations, as well as the metadata directory.
@@ -448,6 +404,8 @@ class stationRFIFilter:
             If provided, the reader will be used to set the metadata directory and find the TBB files paths.
         logger_level : int, default=logging.WARNING
             The logging level to use for the module.
+        use_memmap : bool, default=False
+            If True, the TBB files are read through memory maps (only possible for uncompressed files).
 
         Notes
         -----
@@ -455,6 +413,7 @@ class stationRFIFilter:
         manually before attempting to execute the `stationRFIFilter.run()` function.
         """
         self.__rfi_trace_length = rfi_cleaning_trace_length
+        self.__use_memmap = use_memmap
 
         if reader is not None:
             self.station_list = reader.get_stations()
@@ -498,7 +457,8 @@ class stationRFIFilter:
                                    self.metadata_dir,
                                    station_trace_length,
                                    self.__rfi_trace_length,
-                                   flagged_antenna_ids=flagged_channel_ids
+                                   flagged_antenna_ids=flagged_channel_ids,
+                                   use_memmap=self.__use_memmap
                                    )
 
             # Extract the necessary information from FindRFI
@@ -14,6 +14,7 @@ from NuRadioReco.framework.base_trace import BaseTrace
 from NuRadioReco.framework.parameters import channelParameters
 import numpy as np
 import scipy.optimize
+import functools
 
 class channelBlockOffsets:
 
@@ -95,7 +96,7 @@ class channelBlockOffsets:
                 channel.get_sampling_rate()
             )
 
-    def remove_offsets(self, event, station, mode='fit', channel_ids=None, maxiter=5):
+    def remove_offsets(self, event, station, mode='fit', channel_ids=None, maxiter=5, method='lstsq'):
         """
         Remove block offsets from an event
 
@@ -124,7 +125,11 @@ class channelBlockOffsets:
             (Only if mode=='fit') The maximum number of fit iterations.
             This can be increased to more accurately remove the block offsets
             at the cost of performance. (The default value removes 'most' offsets
-            to about 1%)
+            to about 1%). Only used if method=='minimize'
+        method: 'lstsq' | 'minimize', default 'lstsq'
+            (Only if mode=='fit') Solve the (linear) fit directly with
+            least squares, or use the minimizer (slow).
+            See `fit_block_offsets` for details.
 
         """
         if channel_ids  is None:
@@ -136,16 +141,23 @@ class channelBlockOffsets:
                 channel_id: -station.get_channel(channel_id).get_parameter(channelParameters.block_offsets)
                 for channel_id in channel_ids}
         else: # fit & remove offsets
+            # channels with the same trace length and sampling rate are fitted together
+            channel_groups = {}
             for channel_id in channel_ids:
                 channel = station.get_channel(channel_id)
-                trace = channel.get_trace()
+                key = (channel.get_number_of_samples(), channel.get_sampling_rate())
+                channel_groups.setdefault(key, []).append(channel_id)
+
+            for (_, sampling_rate), group_channel_ids in channel_groups.items():
+                traces = np.array([station.get_channel(channel_id).get_trace() for channel_id in group_channel_ids])
 
                 block_offsets = fit_block_offsets(
-                    trace, self.block_size,
-                    channel.get_sampling_rate(), self._max_frequency,
-                    mode=mode, maxiter=maxiter
+                    traces, self.block_size,
+                    sampling_rate, self._max_frequency,
+                    mode=mode, maxiter=maxiter, method=method
                 )
-                offsets[channel_id] = -block_offsets
+                for channel_id, channel_block_offsets in zip(group_channel_ids, block_offsets):
+                    offsets[channel_id] = -channel_block_offsets
         
         self.add_offsets(event, station, offsets, channel_ids)
 
@@ -153,7 +165,7 @@ class channelBlockOffsets:
 def fit_block_offsets(
         trace, block_size=128, sampling_rate=3.2*units.GHz,
         max_frequency=50*units.MHz, mode='fit', return_trace = False,
-        maxiter=5, tol=1e-6):
+        maxiter=5, tol=1e-6, method='lstsq'):
     """
     Fit 'block' offsets for a voltage trace
 
@@ -163,7 +175,9 @@ def fit_block_offsets(
     Parameters
     ----------
     trace: numpy Array
-        the voltage trace
+        the voltage trace. Can also be an array of shape (..., n_samples),
+        e.g. (n_events, n_channels, n_samples), in which case the block
+        offsets of all traces are fitted at once.
     block_size: int (default: 128)
         the number of samples in one block
     sampling_rate: float (default: 3.2 GHz)
@@ -181,15 +195,24 @@ def fit_block_offsets(
         where the output_trace is the input trace with
         fitted block offsets removed
     maxiter: int (default: 5)
-        (Only if mode=='fit') The maximum number of fit iterations.
+        (Only if mode=='fit' and method=='minimize') The maximum number of fit iterations.
         This can be increased to more accurately remove the block offsets
         at the cost of performance. (The default value removes 'most' offsets
         to about 1%)
+    method: 'lstsq' | 'minimize'
+        (Only if mode=='fit') How to perform the fit.
+
+        - 'lstsq' (default): the out-of-band spectrum is linear in the
+          block offsets, so the best fit is obtained directly by linear
+          least squares. The solution is a single matrix product,
+          which is evaluated for all traces at once.
+        - 'minimize': fit each trace with ``scipy.optimize.minimize``
+          (slow, kept for comparison)
 
     Returns
     -------
     block_offsets: numpy array
-        The fitted block offsets.
+        The fitted block offsets, of shape (..., n_blocks)
     output_trace: numpy array or None
         The input trace with the fitted block offsets removed.
         Returned only if return_trace=True
@@ -197,67 +220,99 @@ def fit_block_offsets(
     Other Parameters
     ----------------
     tol: float (default: 1e-6)
-        tolerance parameter passed on to scipy.optimize.minimize
+        (Only if method=='minimize') tolerance parameter passed on to scipy.optimize.minimize
     """
-    dt = 1. / sampling_rate
+    trace = np.asarray(trace)
+    n_samples = trace.shape[-1]
+    n_blocks = n_samples // block_size
     spectrum = fft.time2freq(trace, sampling_rate)
-    frequencies = np.fft.rfftfreq(len(trace), dt)
-    n_blocks = len(trace) // block_size
-
-    mask = (frequencies > 0) & (frequencies < max_frequency) #  a simple rectangular filter
-    frequencies_oob = frequencies[mask]
-    spectrum_oob = spectrum[mask]
+    mask, const_fft_term, fit_matrix = _get_block_offset_fit_terms(
+        n_samples, block_size, sampling_rate, max_frequency)
+    spectrum_oob = spectrum[..., mask]
 
     # we use the bandpass-filtered trace to get a first estimate of
     # the block offsets, by simply averaging over each block.
     filtered_trace_fft = np.copy(spectrum)
-    filtered_trace_fft[~mask] = 0
-    filtered_trace = fft.freq2time(filtered_trace_fft, sampling_rate)
+    filtered_trace_fft[..., ~mask] = 0
+    filtered_trace = fft.freq2time(filtered_trace_fft, sampling_rate, n=n_samples)
 
     # obtain guesses for block offsets
-    a_guess = np.mean(np.split(filtered_trace, n_blocks), axis=1)
+    a_guess = np.mean(np.reshape(filtered_trace, trace.shape[:-1] + (n_blocks, -1)), axis=-1)
+    trace_mean = np.mean(trace, axis=-1, keepdims=True)
     if mode == 'approximate':
-        block_offsets = a_guess + np.mean(trace)
+        block_offsets = a_guess + trace_mean
     elif mode == 'fit':
-        # self._offset_guess[channel_id] = a_guess
-        # we can get rid of one parameter through a global shift
-        a_guess = a_guess[:-1] - a_guess[-1]
-
         # we perform the fit out-of-band, in order to avoid
-        # distorting any actual signal
-
-        # most of the terms in the fit depend only on the frequencies,
-        # sampling rate and number of blocks. We therefore calculate these
-        # only once, outside the fit function.
-        pre_factor_exponent = np.array([
-            -2.j * np.pi * frequencies_oob * dt * ((j+.5) * block_size - .5)
-                for j in range(len(a_guess))
-        ])
-        const_fft_term = (
-                1 / sampling_rate * np.sqrt(2) # NuRadio FFT normalization
-            * np.exp(pre_factor_exponent)
-            * np.sin(np.pi*frequencies_oob*block_size*dt)[None]
-            / np.sin(np.pi*frequencies_oob*dt)[None]
-        )
-
-        def pedestal_fit(a):
-            fit = np.sum(a[:, None] * const_fft_term, axis=0)
-            chi2 = np.sum(np.abs(fit-spectrum_oob)**2)
-            return chi2
-
-        res = scipy.optimize.minimize(pedestal_fit, a_guess, tol=tol, options=dict(maxiter=maxiter)).x
-
-        block_offsets = np.zeros(len(res) + 1)
-        block_offsets[:-1] = res
+        # distorting any actual signal. We can get rid of one
+        # parameter through a global shift, i.e. the offset of
+        # the last block is fixed to zero.
+        block_offsets = np.zeros(trace.shape[:-1] + (n_blocks,))
+        if method == 'lstsq':
+            spectrum_oob_real = np.concatenate([spectrum_oob.real, spectrum_oob.imag], axis=-1)
+            block_offsets[..., :-1] = spectrum_oob_real @ fit_matrix.T
+        elif method == 'minimize':
+            a_guess = a_guess[..., :-1] - a_guess[..., -1:]
+            for i in np.ndindex(trace.shape[:-1]):
+                def pedestal_fit(a):
+                    fit = np.sum(a[:, None] * const_fft_term, axis=0)
+                    chi2 = np.sum(np.abs(fit-spectrum_oob[i])**2)
+                    return chi2
+
+                res = scipy.optimize.minimize(pedestal_fit, a_guess[i], tol=tol, options=dict(maxiter=maxiter)).x
+                block_offsets[i][:-1] = res
+        else:
+            raise ValueError(f'Invalid value for method={method}. Accepted values are {{"lstsq", "minimize"}}')
 
         # the fit is not sensitive to an overall shift,
         # so we include the zero-meaning here
-        block_offsets += np.mean(trace) - np.mean(block_offsets)
+        block_offsets += trace_mean - np.mean(block_offsets, axis=-1, keepdims=True)
     else:
         raise ValueError(f'Invalid value for mode={mode}. Accepted values are {{"fit", "approximate"}}')
 
     if return_trace:
-        output_trace = trace - np.repeat(block_offsets, block_size)
+        output_trace = trace - np.repeat(block_offsets, block_size, axis=-1)
         return block_offsets, output_trace
 
-    return block_offsets
\ No newline at end of file
+    return block_offsets
+
+
+@functools.lru_cache(maxsize=32)
+def _get_block_offset_fit_terms(n_samples, block_size, sampling_rate, max_frequency):
+    """
+    Returns the terms of the out-of-band block offset fit that only depend on the trace properties
+
+    Returns
+    -------
+    mask: array of bools
+        the out-of-band frequencies
+    const_fft_term: complex array of shape (n_blocks - 1, n_frequencies_oob)
+        the out-of-band spectrum of a unit offset in each block (except the last one)
+    fit_matrix: array of shape (n_blocks - 1, 2 * n_frequencies_oob)
+        the pseudo-inverse of the (real-valued) linear model, i.e. the matrix that
+        maps the real and imaginary parts of the out-of-band spectrum to the
+        least-squares block offsets
+    """
+    dt = 1. / sampling_rate
+    frequencies = np.fft.rfftfreq(n_samples, dt)
+    n_blocks = n_samples // block_size
+
+    mask = (frequencies > 0) & (frequencies < max_frequency) #  a simple rectangular filter
+    frequencies_oob = frequencies[mask]
+
+    # most of the terms in the fit depend only on the frequencies,
+    # sampling rate and number of blocks. We therefore calculate these
+    # only once, outside the fit function.
+    pre_factor_exponent = np.array([
+        -2.j * np.pi * frequencies_oob * dt * ((j+.5) * block_size - .5)
+            for j in range(n_blocks - 1)
+    ])
+    const_fft_term = (
+            1 / sampling_rate * np.sqrt(2) # NuRadio FFT normalization
+        * np.exp(pre_factor_exponent)
+        * np.sin(np.pi*frequencies_oob*block_size*dt)[None]
+        / np.sin(np.pi*frequencies_oob*dt)[None]
+    )
+    model = np.concatenate([const_fft_term.real, const_fft_term.imag], axis=-1)
+    fit_matrix = np.linalg.pinv(model.T)
+
+    return mask, const_fft_term, fit_matrix
@@ -97,10 +97,10 @@ class hardwareResponseIncorporator:
         if mingainlin is not None:
             mingainlin = float(mingainlin)
             ampmax = np.max(np.abs(amp_response))
-            iamp_gain_low = np.where(
-                np.abs(amp_response) < (mingainlin * ampmax))
-            amp_response[iamp_gain_low] = (
-                mingainlin * ampmax) * np.exp(1j * np.angle(amp_response[iamp_gain_low]))
+            # do not modify the response in place, it might be buffered (read-only) by the detector
+            amp_response = np.where(
+                np.abs(amp_response) < (mingainlin * ampmax),
+                (mingainlin * ampmax) * np.exp(1j * np.angle(amp_response)), amp_response)
 
         cable_response = 1
         if mode == 'phase_only':
@@ -109,7 +109,7 @@ class hardwareResponseIncorporator:
             amp_response = np.ones_like(amp_response) * np.angle(amp_response)
         elif mode == 'relative':
             ampmax = np.max(np.abs(amp_response))
-            amp_response /= ampmax
+            amp_response = amp_response / ampmax
 
         if sim_to_data:
             return amp_response * cable_response
@@ -1,8 +1,8 @@
 import logging
 import time
+import collections
 import numpy as np
 from NuRadioReco.utilities import units
-from scipy.interpolate import interp1d
 from scipy.signal import resample
 from NuRadioReco.modules.base.module import register_run
 from NuRadioReco.utilities.trace_utilities import delay_trace
@@ -182,56 +182,20 @@ class analogToDigitalConverter:
 
         self.logger = logging.getLogger('NuRadioReco.analogToDigitalConverter')
 
-    def get_digital_trace(self, station, det, channel,
-                          Vrms=None,
-                          trigger_adc=False,
-                          clock_offset=0.0,
-                          adc_type='perfect_floor_comparator',
-                          return_sampling_frequency=False,
-                          adc_output='voltage',
-                          trigger_filter=None):
+    def _get_adc_parameters(self, station, det, channel, Vrms=None, trigger_adc=False, clock_offset=0.0):
         """
-        Returns the digital trace for a channel, without setting it. This allows
-        the creation of a digital trace that can be used for triggering purposes
-        without removing the original information on the channel.
-
-        Parameters
-        ----------
-        station: framework.station.Station object
-        det: detector.detector.Detector object
-        channel: framework.channel.Channel object
-        Vrms: float
-            If supplied, overrides adc_reference_voltage as supplied in the detector description file
-        trigger_adc: bool
-            If True, the relevant ADC parameters in the config file are the ones
-            that start with `'trigger_'`
-        random_clock_offset: bool
-            If True, a random clock offset between -1 and 1 clock cycles is added
-        adc_type: string
-            The type of ADC used. The following are available:
-
-            * perfect_floor_comparator
-            * perfect_ceiling_comparator
-
-            See functions with the same name on this module for documentation
-        return_sampling_frequency: bool
-            If True, returns the trace and the ADC sampling frequency
-        adc_output: string
-            Options:
-
-            * 'voltage' to store the ADC output as discretised voltage trace
-            * 'counts' to store the ADC output in ADC counts
-        
-        trigger_filter: array floats
-            Freq. domain of the response to be applied to post-ADC traces
-            Must be length for "MC freq"
+        Reads the ADC parameters of a channel from the detector description
 
         Returns
         -------
-        digital_trace: array of floats
-            Digitised voltage trace
+        adc_n_bits: int
+            Number of bits of the ADC
+        adc_ref_voltage: float
+            Reference voltage of the ADC
         adc_sampling_frequency: float
             ADC sampling frequency for the channel
+        adc_time_delay: float
+            Time delay of the ADC clock, including the clock offset
         """
 
         station_id = station.get_id()
@@ -244,15 +208,10 @@ class analogToDigitalConverter:
             else:
                 field_check = field
             if(field_check) not in det_channel:
-                channel_id = channel.get_id()
                 error_msg = "The field {} is not present in channel {}. ".format(field_check, channel_id)
                 error_msg += "Please specify it on your detector file"
                 raise ValueError(error_msg)
 
-        times = channel.get_times()[:]
-        trace = channel.get_trace()[:]
-        MC_sampling_frequency = channel.get_sampling_rate()
-
         if(trigger_adc):  # assumes that the trigger uses
             adc_time_delay_label = "trigger_adc_time_delay"
             adc_n_bits_label = "trigger_adc_nbits"
@@ -262,7 +221,6 @@ class analogToDigitalConverter:
         else:
             adc_time_delay_label = "adc_time_delay"
             adc_n_bits_label = "adc_nbits"
-            adc_noise_n_bits = "adc_noise_nbits"
             adc_noise_n_bits_label = "adc_noise_nbits"
             adc_ref_voltage_label = "adc_reference_voltage"
             adc_sampling_frequency_label = "adc_sampling_frequency"
@@ -293,68 +251,220 @@ class analogToDigitalConverter:
             error_msg += 'Please change the ADC sampling rate.'
             raise ValueError(error_msg)
 
+        return adc_n_bits, adc_ref_voltage, adc_sampling_frequency, adc_time_delay
+
+    def _digitize_traces(self, traces, MC_sampling_frequency, adc_n_bits, adc_ref_voltage,
+                         adc_sampling_frequency, adc_time_delay,
+                         adc_type='perfect_floor_comparator',
+                         adc_output='voltage',
+                         trigger_filter=None,
+                         adc_counts_dtype=None):
+        """
+        Digitises several traces with the same sampling rate, number of samples and ADC settings at once
+
+        Parameters
+        ----------
+        traces: 2-dim array of floats
+            The traces, shape (n_channels, n_samples)
+
+        See `get_digital_trace` and `_get_adc_parameters` for the other parameters.
+
+        Returns
+        -------
+        digital_traces: 2-dim array
+            The digitised traces, shape (n_channels, n_adc_samples)
+        """
+
         if trigger_filter is not None:
 
-            trace_fft = np.fft.rfft(trace)
-            if len(trace_fft) != len(trigger_filter):
+            traces_fft = np.fft.rfft(traces, axis=-1)
+            if traces_fft.shape[-1] != len(trigger_filter):
                 raise ValueError("Wrong filter length to apply to traces")
 
-            trace = np.fft.irfft(trace_fft * trigger_filter)
+            traces = np.fft.irfft(traces_fft * trigger_filter, axis=-1)
 
         # Random clock offset
-        delayed_samples = len(trace) - int(np.round(MC_sampling_frequency / adc_sampling_frequency)) - 1
-        trace = delay_trace(trace, MC_sampling_frequency, adc_time_delay, delayed_samples)
-
-        times = times + 1.0 / adc_sampling_frequency
-        times = times[:len(trace)]
+        delayed_samples = traces.shape[-1] - int(np.round(MC_sampling_frequency / adc_sampling_frequency)) - 1
+        traces = delay_trace(traces, MC_sampling_frequency, adc_time_delay, delayed_samples)
 
         # Upsampling to 5 GHz before downsampling using interpolation.
         # We cannot downsample with a Fourier method because we want to keep
         # the higher Nyquist zones.
         upsampling_frequency = 5.0 * units.GHz
 
+        # All times are relative to the trace start time. The first sample of
+        # the delayed trace corresponds to one ADC clock cycle after the start.
         if(upsampling_frequency > MC_sampling_frequency):
-            upsampling_nsamples = int(upsampling_frequency * len(trace) / MC_sampling_frequency)
-            perfectly_upsampled_trace = resample(trace, upsampling_nsamples)
-
-            perfectly_upsampled_times = np.arange(len(perfectly_upsampled_trace)) / upsampling_frequency
-            perfectly_upsampled_times += times[0]
+            upsampling_nsamples = int(upsampling_frequency * traces.shape[-1] / MC_sampling_frequency)
+            perfectly_upsampled_traces = resample(traces, upsampling_nsamples, axis=-1)
+            perfectly_upsampled_times = np.arange(upsampling_nsamples) / upsampling_frequency
         else:
-            perfectly_upsampled_trace = trace[:]
-            perfectly_upsampled_times = times[:]
+            perfectly_upsampled_traces = traces
+            perfectly_upsampled_times = np.arange(traces.shape[-1]) / MC_sampling_frequency
+        perfectly_upsampled_times += 1.0 / adc_sampling_frequency
 
-        interpolate_delayed_trace = interp1d(perfectly_upsampled_times, perfectly_upsampled_trace,
-                                             kind='linear',
-                                             fill_value=(perfectly_upsampled_trace[0], perfectly_upsampled_trace[-1]),
-                                             bounds_error=False)
-
-        # Downsampling to ADC frequency
-        new_n_samples = int((adc_sampling_frequency / MC_sampling_frequency) * len(trace))
+        # Downsampling to ADC frequency with a linear interpolation, values outside
+        # of the trace are set to the first or last sample
+        new_n_samples = int((adc_sampling_frequency / MC_sampling_frequency) * traces.shape[-1])
         resampled_times = np.arange(new_n_samples) / adc_sampling_frequency
-        resampled_times += channel.get_trace_start_time()
-        resampled_trace = interpolate_delayed_trace(resampled_times)
+        i_low = np.clip(np.searchsorted(perfectly_upsampled_times, resampled_times, side='right') - 1,
+                        0, len(perfectly_upsampled_times) - 2)
+        weights = (resampled_times - perfectly_upsampled_times[i_low]) / \
+            (perfectly_upsampled_times[i_low + 1] - perfectly_upsampled_times[i_low])
+        weights = np.clip(weights, 0, 1)
+        resampled_traces = perfectly_upsampled_traces[:, i_low] + \
+            (perfectly_upsampled_traces[:, i_low + 1] - perfectly_upsampled_traces[:, i_low]) * weights
 
         # Digitisation
-        digital_trace = self._adc_types[adc_type](resampled_trace, adc_n_bits, adc_ref_voltage, adc_output)
+        digital_traces = self._adc_types[adc_type](resampled_traces, adc_n_bits, adc_ref_voltage, adc_output)
+
+        if adc_output == 'counts' and adc_counts_dtype is not None:
+            dtype_info = np.iinfo(adc_counts_dtype)
+            if dtype_info.min > -2 ** (adc_n_bits - 1) or dtype_info.max < 2 ** (adc_n_bits - 1) - 1:
+                raise ValueError(f"A {adc_n_bits} bit ADC does not fit into {np.dtype(adc_counts_dtype).name}")
+            digital_traces = digital_traces.astype(adc_counts_dtype)
 
         # Ensuring trace has an even number of samples
-        if(len(digital_trace) % 2 == 1):
-            digital_trace = digital_trace[:-1]
+        if(digital_traces.shape[-1] % 2 == 1):
+            digital_traces = digital_traces[:, :-1]
+
+        return digital_traces
+
+    def get_digital_trace(self, station, det, channel,
+                          Vrms=None,
+                          trigger_adc=False,
+                          clock_offset=0.0,
+                          adc_type='perfect_floor_comparator',
+                          return_sampling_frequency=False,
+                          adc_output='voltage',
+                          trigger_filter=None,
+                          adc_counts_dtype=None):
+        """
+        Returns the digital trace for a channel, without setting it. This allows
+        the creation of a digital trace that can be used for triggering purposes
+        without removing the original information on the channel.
+
+        Parameters
+        ----------
+        station: framework.station.Station object
+        det: detector.detector.Detector object
+        channel: framework.channel.Channel object
+        Vrms: float
+            If supplied, overrides adc_reference_voltage as supplied in the detector description file
+        trigger_adc: bool
+            If True, the relevant ADC parameters in the config file are the ones
+            that start with `'trigger_'`
+        random_clock_offset: bool
+            If True, a random clock offset between -1 and 1 clock cycles is added
+        adc_type: string
+            The type of ADC used. The following are available:
+
+            * perfect_floor_comparator
+            * perfect_ceiling_comparator
+
+            See functions with the same name on this module for documentation
+        return_sampling_frequency: bool
+            If True, returns the trace and the ADC sampling frequency
+        adc_output: string
+            Options:
+
+            * 'voltage' to store the ADC output as discretised voltage trace
+            * 'counts' to store the ADC output in ADC counts
+        
+        trigger_filter: array floats
+            Freq. domain of the response to be applied to post-ADC traces
+            Must be length for "MC freq"
+        adc_counts_dtype: numpy integer type or None
+            Only used if `adc_output` is 'counts'. If not None, the ADC counts are
+            returned with this data type, e.g. `np.int16` to reduce the memory footprint.
+
+        Returns
+        -------
+        digital_trace: array of floats
+            Digitised voltage trace
+        adc_sampling_frequency: float
+            ADC sampling frequency for the channel
+        """
+
+        adc_n_bits, adc_ref_voltage, adc_sampling_frequency, adc_time_delay = self._get_adc_parameters(
+            station, det, channel, Vrms=Vrms, trigger_adc=trigger_adc, clock_offset=clock_offset)
+
+        digital_trace = self._digitize_traces(
+            channel.get_trace()[np.newaxis], channel.get_sampling_rate(),
+            adc_n_bits, adc_ref_voltage, adc_sampling_frequency, adc_time_delay,
+            adc_type=adc_type, adc_output=adc_output, trigger_filter=trigger_filter,
+            adc_counts_dtype=adc_counts_dtype)[0]
 
         if return_sampling_frequency:
             return digital_trace, adc_sampling_frequency
         else:
             return digital_trace
 
+    def get_digital_traces(self, station, det,
+                           channel_ids=None,
+                           Vrms=None,
+                           trigger_adc=False,
+                           clock_offset=0.0,
+                           adc_type='perfect_floor_comparator',
+                           adc_output='voltage',
+                           trigger_filter=None,
+                           adc_counts_dtype=None):
+        """
+        Returns the digital traces of several channels, without setting them.
+        Same as `get_digital_trace`, but all channels with the same sampling rate,
+        number of samples and ADC settings are digitised at once.
+
+        Parameters
+        ----------
+        station: framework.station.Station object
+        det: detector.detector.Detector object
+        channel_ids: list of ints or None
+            The channels to digitise. If None, all channels of the station are used.
+
+        See `get_digital_trace` for the other parameters.
+
+        Returns
+        -------
+        digital_traces: dict
+            The digitised trace of each channel (keys are the channel ids)
+        adc_sampling_frequencies: dict
+            The ADC sampling frequency of each channel (keys are the channel ids)
+        """
+
+        # group channels with identical ADC settings
+        groups = collections.defaultdict(list)
+        for channel in station.iter_channels(use_channels=channel_ids):
+            adc_parameters = self._get_adc_parameters(
+                station, det, channel, Vrms=Vrms, trigger_adc=trigger_adc, clock_offset=clock_offset)
+            key = (channel.get_sampling_rate(), channel.get_number_of_samples()) + adc_parameters
+            groups[key].append(channel)
+
+        digital_traces = {}
+        adc_sampling_frequencies = {}
+        for key, channels in groups.items():
+            MC_sampling_frequency, _, adc_n_bits, adc_ref_voltage, adc_sampling_frequency, adc_time_delay = key
+            traces = np.array([channel.get_trace() for channel in channels])
+            group_traces = self._digitize_traces(
+                traces, MC_sampling_frequency, adc_n_bits, adc_ref_voltage, adc_sampling_frequency, adc_time_delay,
+                adc_type=adc_type, adc_output=adc_output, trigger_filter=trigger_filter,
+                adc_counts_dtype=adc_counts_dtype)
+            for channel, digital_trace in zip(channels, group_traces):
+                digital_traces[channel.get_id()] = digital_trace
+                adc_sampling_frequencies[channel.get_id()] = adc_sampling_frequency
+
+        return digital_traces, adc_sampling_frequencies
+
     @register_run()
     def run(self, evt, station, det,
             clock_offset=0.0,
             adc_type='perfect_floor_comparator',
             adc_output='voltage',
-            trigger_filter=None):
+            trigger_filter=None,
+            adc_counts_dtype=None):
         """
         Runs the analogToDigitalConverter and transforms the traces from all
         the channels of an input station to digital voltage values.
+        All channels with identical ADC settings are digitised at once.
 
         Parameters
         ----------
@@ -375,23 +485,27 @@ class analogToDigitalConverter:
             * 'voltage' to store the ADC output as discretised voltage trace
             * 'counts' to store the ADC output in ADC counts
 
-        upsampling_factor: integer
-            Upsampling factor. The digital trace will be a upsampled to a
-            sampling frequency int_factor times higher than the original one
+        trigger_filter: array floats
+            Freq. domain of the response to be applied to post-ADC traces
+        adc_counts_dtype: numpy integer type or None
+            Only used if `adc_output` is 'counts'. If not None, the ADC counts are
+            stored with this data type, e.g. `np.int16` to reduce the memory footprint.
 
         """
 
         t = time.time()
 
+        digital_traces, adc_sampling_frequencies = self.get_digital_traces(
+            station, det,
+            clock_offset=clock_offset,
+            adc_type=adc_type,
+            adc_output=adc_output,
+            trigger_filter=trigger_filter,
+            adc_counts_dtype=adc_counts_dtype)
+
         for channel in station.iter_channels():
-            digital_trace, adc_sampling_frequency = self.get_digital_trace(station, det, channel,
-                                                                           clock_offset=clock_offset,
-                                                                           adc_type=adc_type,
-                                                                           return_sampling_frequency=True,
-                                                                           adc_output=adc_output,
-                                                                           trigger_filter=trigger_filter)
-
-            channel.set_trace(digital_trace, adc_sampling_frequency)
+            channel_id = channel.get_id()
+            channel.set_trace(digital_traces[channel_id], adc_sampling_frequencies[channel_id])
 
         self.__t += time.time() - t
 
@@ -3,6 +3,7 @@ from timeit import default_timer as timer
 import NuRadioReco.framework.event
 import NuRadioReco.framework.base_station
 import NuRadioReco.detector.detector_base
+from NuRadioReco.utilities import profiling
 import inspect
 import pickle
 
@@ -30,14 +31,34 @@ def setup_logger(name="NuRadioReco", level=None):
                              "This function will be removed in v2.4.0 .")
 
 
+def _profile_generator(generator, span_name):
+    """
+    Yields the items of `generator` and records every iteration (i.e., the time spent in the code
+    of the generator) as a span of the profiler
+    """
+    try:
+        while True:
+            with profiling.span(span_name, category="module"):
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        generator.close()
+
+
 def register_run(level=None):
     """
     Decorator for run methods. This decorator registers the run methods. It allows to keep track of
     which module is executed in which order and with what parameters. Also the execution time of each
-    module is tracked.
+    module is tracked. If the profiler of `NuRadioReco.utilities.profiling` is enabled, each call
+    is recorded as a span named `<module class>.run`. If the run method is a generator (e.g. of a reader
+    module), every iteration of the generator is recorded as a span instead.
     """
 
     def run_decorator(run):
+        is_generator_function = inspect.isgeneratorfunction(run)
 
         @wraps(run)
         def register_run_method(self, *args, **kwargs):
@@ -99,7 +120,15 @@ def register_run(level=None):
                 # not sure what to do... function returns generator, not sure how to access the event...
                 pass
 
-            res = run(self, *args, **kwargs)
+            span_name = self.__class__.__name__ + ".run"
+            if is_generator_function:
+                # calling a generator function does not execute any of its code
+                res = run(self, *args, **kwargs)
+                if profiling.get_profiler().enabled:
+                    res = _profile_generator(res, span_name)
+            else:
+                with profiling.span(span_name, category="module"):
+                    res = run(self, *args, **kwargs)
 
             end = timer()
 
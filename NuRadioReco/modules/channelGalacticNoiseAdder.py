@@ -34,6 +34,7 @@ class channelGalacticNoiseAdder:
         self.__n_side = None
         self.__interpolaiton_frequencies = None
         self.__gdsm = None
+        self.__random_generator = None
         self.__antenna_pattern_provider = NuRadioReco.detector.antennapattern.AntennaPatternProvider()
         self.begin()
 
@@ -41,7 +42,8 @@ class channelGalacticNoiseAdder:
         self,
         debug=False,
         n_side=4,
-        interpolation_frequencies=np.arange(10, 1100, 100) * units.MHz
+        interpolation_frequencies=np.arange(10, 1100, 100) * units.MHz,
+        seed=None
     ):
         """
         Set up important parameters for the module
@@ -63,10 +65,30 @@ class channelGalacticNoiseAdder:
             calculated by interpolation the log10 of the temperature
             The interpolation_frequencies have to cover the entire passband
             specified in the run method.
+        seed: int, default: None
+            Seed for the random number generator of the phases and polarizations of the noise.
+            If None, the global numpy random state is used (i.e., the noise can be made
+            reproducible with `np.random.seed`)
         """
         self.__debug = debug
         self.__n_side = n_side
         self.__interpolaiton_frequencies = interpolation_frequencies
+        if seed is None:
+            self.__random_generator = np.random  # the functions of the global random state
+        else:
+            self.__random_generator = np.random.Generator(np.random.Philox(seed))
+
+    def set_random_generator(self, random_generator):
+        """
+        Replaces the random number generator that was created in `begin`
+
+        Parameters
+        ----------
+        random_generator: numpy.random.Generator
+            the random number generator used for all following noise realizations,
+            e.g. an independent stream per event from `NuRadioReco.utilities.random_streams`
+        """
+        self.__random_generator = random_generator
 
     @register_run()
     def run(
@@ -178,8 +200,8 @@ class channelGalacticNoiseAdder:
 
                 # assign random phases and polarizations to electric field
                 noise_spectrum = np.zeros((3, freqs.shape[0]), dtype=complex)
-                phases = np.random.uniform(0, 2. * np.pi, len(S))
-                polarizations = np.random.uniform(0, 2. * np.pi, len(S))
+                phases = self.__random_generator.uniform(0, 2. * np.pi, len(S))
+                polarizations = self.__random_generator.uniform(0, 2. * np.pi, len(S))
 
                 noise_spectrum[1][passband_filter] = np.exp(1j * phases) * E * np.cos(polarizations)
                 noise_spectrum[2][passband_filter] = np.exp(1j * phases) * E * np.sin(polarizations)
@@ -312,6 +312,18 @@ class channelGenericNoiseAdder:
         if debug:
             self.logger.setLevel(logging.DEBUG)
 
+    def set_random_generator(self, random_generator):
+        """
+        Replaces the random number generator that was created in `begin`
+
+        Parameters
+        ----------
+        random_generator: numpy.random.Generator
+            the random number generator used for all following noise realizations,
+            e.g. an independent stream per event from `NuRadioReco.utilities.random_streams`
+        """
+        self.__random_generator = random_generator
+
     @register_run()
     def run(self, event, station, detector,
             amplitude=1 * units.mV,
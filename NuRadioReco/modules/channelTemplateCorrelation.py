@@ -3,7 +3,7 @@ import numpy as np
 import fractions
 from decimal import Decimal
 from NuRadioReco.utilities import units
-from scipy import signal
+from scipy import signal, fft
 from radiotools import helper as hp
 from NuRadioReco.utilities import templates
 from NuRadioReco.framework.parameters import stationParameters as stnp
@@ -23,12 +23,14 @@ class channelTemplateCorrelation:
         self.__templates = templates.Templates(template_directory)
         self.__cr_templates = None
         self.__ref_cr_template = None
+        self.__template_spectra = None
         self.__debug = None
         self.begin()
 
     def begin(self, debug=False):
         self.__cr_templates = {}
         self.__ref_cr_template = {}
+        self.__template_spectra = {}
         self.__debug = debug
 
     def match_sampling(self, ref_template, resampling_factor):
@@ -40,6 +42,81 @@ class channelTemplateCorrelation:
             ref_template_resampled = signal.resample(ref_template_resampled, len(ref_template_resampled) / resampling_factor.denominator)
         return ref_template_resampled
 
+    def __get_template_spectra(self, key, ref_templates, resampling_factor, n_samples):
+        """
+        Returns the resampled, time reversed and Fourier transformed templates. They are
+        calculated once and buffered (until `begin` is called again).
+
+        Parameters
+        ----------
+        key: tuple
+            identifier of the set of templates, resampling factor and trace length
+        ref_templates: list of arrays
+            the templates (only used if the spectra are not yet buffered)
+        resampling_factor: fractions.Fraction
+            the resampling factor passed to `match_sampling`
+        n_samples: int
+            number of samples of the traces which are correlated with the templates
+
+        Returns
+        -------
+        template_spectra: list of tuples
+            For every group of templates with the same length: the indices of the templates,
+            their length, the length of the FFT, the spectra of the templates and their squared norms.
+        """
+        if key not in self.__template_spectra:
+            groups = {}
+            for idx, ref_template in enumerate(ref_templates):
+                ref_template_resampled = self.match_sampling(ref_template, resampling_factor)
+                groups.setdefault(len(ref_template_resampled), []).append((idx, ref_template_resampled))
+
+            template_spectra = []
+            for length, group in groups.items():
+                group_templates = np.array([ref_template for _, ref_template in group])
+                n_fft = fft.next_fast_len(n_samples + length - 1)
+                template_spectra.append((
+                    np.array([idx for idx, _ in group]), length, n_fft,
+                    fft.rfft(group_templates[:, ::-1], n_fft, axis=-1),
+                    np.sum(group_templates ** 2, axis=-1)))
+
+            self.__template_spectra[key] = template_spectra
+
+        return self.__template_spectra[key]
+
+    def __get_max_normalized_xcorrs(self, trace, template_spectra, n_templates):
+        """
+        Calculates the normalized cross correlation (same as `radiotools.helper.get_normalized_xcorr`)
+        of the trace with all templates at once and returns the maximum of each
+
+        Parameters
+        ----------
+        trace: array
+            the channel trace
+        template_spectra: list of tuples
+            see `__get_template_spectra`
+        n_templates: int
+            the total number of templates
+
+        Returns
+        -------
+        xcorrs: array of floats
+            the value of the cross correlation at the position of its maximum absolute value, for each template
+        xcorrpos: array of ints
+            the position of the maximum absolute value of the cross correlation, for each template
+        """
+        xcorrs = np.zeros(n_templates)
+        xcorrpos = np.zeros(n_templates, dtype=int)
+        trace_norm = np.sum(trace ** 2)
+        for idx, length, n_fft, spectra, norms in template_spectra:
+            # the FFT might be longer than the full cross correlation
+            xcorr_traces = fft.irfft(fft.rfft(trace, n_fft) * spectra, n_fft, axis=-1)[:, :len(trace) + length - 1]
+            xcorr_traces /= (trace_norm * norms[:, None]) ** 0.5
+            pos = np.argmax(np.abs(xcorr_traces), axis=-1)
+            xcorrs[idx] = xcorr_traces[np.arange(len(idx)), pos]
+            xcorrpos[idx] = pos
+
+        return xcorrs, xcorrpos
+
     @register_run()
     def run(self, evt, station, det, channels_to_use=None, cosmic_ray=False,
             n_templates=1):
@@ -107,11 +184,11 @@ class channelTemplateCorrelation:
 
             if n_templates == 1:
 
-                ref_template_resampled = self.match_sampling(ref_template, resampling_factor)
-                xcorr_trace = hp.get_normalized_xcorr(trace, ref_template_resampled)
-
-                xcorrpos = np.argmax(np.abs(xcorr_trace))
-                xcorr = xcorr_trace[xcorrpos]
+                template_spectra = self.__get_template_spectra(
+                    (ref_str, station_id, resampling_factor, len(trace)), [ref_template], resampling_factor, len(trace))
+                xcorr, xcorrpos = self.__get_max_normalized_xcorrs(trace, template_spectra, 1)
+                xcorr = xcorr[0]
+                xcorrpos = xcorrpos[0]
                 flip = np.sign(xcorr)
                 xcorrelations['{}_ref_xcorr'.format(ref_str)] = xcorr
                 xcorrs.append(xcorr)
@@ -119,6 +196,7 @@ class channelTemplateCorrelation:
 
                 if self.__debug:
                     if(xcorr > 0.1):
+                        ref_template_resampled = self.match_sampling(ref_template, resampling_factor)
                         fig, (ax, ax2) = plt.subplots(2, 1)
                         ax.set_title('channel {}, xcorr = {:.2f}'.format(channel_id, xcorr))
                         ax.plot(times, trace, label='measurement')
@@ -133,20 +211,14 @@ class channelTemplateCorrelation:
                         plt.show()
 
             else:
-                template_key = []
-
-                for key in ref_templates:
-
-                    ref_template = ref_templates[key][channel.get_id()]
-                    ref_template_resampled = self.match_sampling(ref_template, resampling_factor)
-
-                    xcorr_trace = hp.get_normalized_xcorr(trace, ref_template_resampled)
-                    xcorrpos = np.argmax(np.abs(xcorr_trace))
-                    xcorr = np.abs(xcorr_trace[xcorrpos])
-
-                    xcorrpos_ch.append(xcorrpos)
-                    xcorrs_ch.append(xcorr)
-                    template_key.append(key)
+                template_key = list(ref_templates.keys())
+
+                # the correlation with all templates is calculated at once
+                template_spectra = self.__get_template_spectra(
+                    (ref_str, station_id, n_templates, channel_id, resampling_factor, len(trace)),
+                    [ref_templates[key][channel_id] for key in template_key], resampling_factor, len(trace))
+                xcorrs_ch, xcorrpos_ch = self.__get_max_normalized_xcorrs(trace, template_spectra, len(template_key))
+                xcorrs_ch = np.abs(xcorrs_ch)
 
                 if self.__debug:
                     print(event_id)
@@ -9,6 +9,8 @@ from NuRadioReco.framework.parameters import stationParameters as stnp
 from NuRadioReco.framework.parameters import electricFieldParameters as efp
 import scipy.optimize as opt
 from radiotools import helper as hp
+from scipy import constants
+import collections
 import logging
 
 
@@ -17,6 +19,9 @@ class correlationDirectionFitter:
     Fits the direction using correlation of parallel channels.
     """
 
+    # maximum number of grids of time delays (station geometries) that are cached, see `get_time_delays_on_grid`
+    max_cache_size = 16
+
     def __init__(self):
         self.__zenith = []
         self.__azimuth = []
@@ -24,12 +29,60 @@ class correlationDirectionFitter:
         self.__delta_azimuth = []
         self.logger = logging.getLogger('correlationDirectionFitter')
         self.__debug = None
+        self.__time_delays_cache = collections.OrderedDict()
         self.begin()
 
     def begin(self, debug=False, log_level=None):
         if(log_level is not None):
             self.logger.setLevel(log_level)
         self.__debug = debug
+        self.__time_delays_cache.clear()
+
+    def get_time_delays_on_grid(self, positions_pairs, n_index, zenith_range, azimuth_range):
+        """
+        Calculates the expected time delays between the two channels of each channel pair for
+        all directions of a zenith/azimuth grid
+
+        The time delays only depend on the station geometry, the index of refraction and the grid.
+        They are therefore cached and only calculated once, e.g., for all events of a station. The grids of
+        the last `max_cache_size` station geometries are kept, the cache is cleared in `begin`.
+
+        Parameters
+        ----------
+        positions_pairs: array of floats, shape (n_pairs, 2, 3)
+            the (relative) positions of the two channels of each channel pair
+        n_index: float
+            the index of refraction
+        zenith_range: tuple of floats
+            (start, stop, step) of the zenith angles of the grid, same convention as for `np.arange`
+        azimuth_range: tuple of floats
+            (start, stop, step) of the azimuth angles of the grid
+
+        Returns
+        -------
+        zeniths: 2-dim array of floats
+            the zenith angles of the grid points
+        azimuths: 2-dim array of floats
+            the azimuth angles of the grid points
+        time_delays: array of floats, shape (n_pairs, ) + zeniths.shape
+            the time delay of the second with respect to the first channel of each pair
+        """
+        positions_pairs = np.asarray(positions_pairs, dtype=float)
+        key = (positions_pairs.tobytes(), n_index, tuple(zenith_range), tuple(azimuth_range))
+        if key in self.__time_delays_cache:
+            self.__time_delays_cache.move_to_end(key)
+        else:
+            zeniths, azimuths = np.mgrid[zenith_range[0]:zenith_range[1]:zenith_range[2],
+                                         azimuth_range[0]:azimuth_range[1]:azimuth_range[2]]
+            shower_axis = np.array([np.sin(zeniths) * np.cos(azimuths),
+                                    np.sin(zeniths) * np.sin(azimuths),
+                                    np.cos(zeniths)])
+            # same as geometryUtilities.get_time_delay_from_direction for all grid points at once
+            times = -(1 / (constants.c / n_index)) * np.tensordot(positions_pairs, shower_axis, axes=1) * units.s
+            self.__time_delays_cache[key] = zeniths, azimuths, times[:, 1] - times[:, 0]
+            if len(self.__time_delays_cache) > self.max_cache_size:
+                self.__time_delays_cache.popitem(last=False)
+        return self.__time_delays_cache[key]
 
     @register_run()
     def run(self, evt, station, det, n_index=None, ZenLim=None,
@@ -104,6 +157,27 @@ class correlationDirectionFitter:
 
             return likelihood
 
+        def ll_regular_station_grid(zenith_range, azimuth_range, corr_02, corr_13, sampling_rate, positions, trace_start_times):
+            """
+            Same as `ll_regular_station` but evaluated for all points of a grid at once. The expected
+            time delays are precomputed, so that the likelihood is a lookup in the correlation arrays.
+            """
+            zeniths, azimuths, time_delays = self.get_time_delays_on_grid(positions, n_index, zenith_range, azimuth_range)
+            likelihood = 0
+            for iPair, corr in enumerate([corr_02, corr_13]):
+                delta_t = time_delays[iPair] - (trace_start_times[iPair][1] - trace_start_times[iPair][0])
+                delta_t = delta_t * sampling_rate
+                pos = (corr.shape[0] / 2 - delta_t).astype(int)
+                # same indexing as corr[pos] in `ll_regular_station`: negative positions count from the
+                # end of the array, positions outside of the array are an error
+                if np.any(pos < -corr.shape[0]) or np.any(pos >= corr.shape[0]):
+                    raise IndexError("expected time delays of channel pair {} are outside of the cross "
+                                     "correlation (length {})".format(iPair, corr.shape[0]))
+                pos[pos < 0] += corr.shape[0]
+                likelihood = likelihood - np.take(corr, pos, mode='clip') / np.sum(np.abs(corr))
+
+            return zeniths, azimuths, likelihood
+
         def ll_regular_station_fft(angles, corr_02_fft, corr_13_fft, sampling_rate, positions, trace_start_times):
             """
             Likelihood function for a four antenna ARIANNA station, using FFT convolution
@@ -174,12 +248,16 @@ class correlationDirectionFitter:
             corr_13_fft = fftpack.ifft(-1 * fftpack.fft(station.get_channel(channel_pairs[1][0]).get_trace()).conjugate() * fftpack.fft(station.get_channel(channel_pairs[1][1]).get_trace()))
 
         if use_correlation:
-            # Using correlation
-            ll = opt.brute(
-                ll_regular_station,
-                ranges=(slice(ZenLim[0], ZenLim[1], 0.01), slice(AziLim[0], AziLim[1], 0.01)),
+            # Using correlation. Grid search (same grid as scipy.optimize.brute) with a vectorized
+            # likelihood, the best grid point is the starting point of the final minimization
+            zeniths, azimuths, likelihood = ll_regular_station_grid(
+                (ZenLim[0], ZenLim[1], 0.01), (AziLim[0], AziLim[1], 0.01), corr_02, corr_13, sampling_rate,
+                positions_pairs, trace_start_time_pairs)
+            index = np.unravel_index(np.argmin(likelihood), likelihood.shape)
+            ll = opt.fmin(
+                ll_regular_station, np.array([zeniths[index], azimuths[index]]),
                 args=(corr_02, corr_13, sampling_rate, positions_pairs, trace_start_time_pairs),
-                full_output=True, finish=opt.fmin)  # slow but does the trick
+                full_output=True, disp=False)
         else:
             ll = opt.brute(ll_regular_station_fft, ranges=(slice(ZenLim[0], ZenLim[1], 0.05),
                                                            slice(AziLim[0], AziLim[1], 0.05)),
@@ -284,23 +362,18 @@ class correlationDirectionFitter:
             self.logger.debug("Result of direction fitting: [zenith, azimuth] {}".format(np.rad2deg(ll[0])))
 
             # Show fit space
-            zen = np.arange(ZenLim[0], ZenLim[1], 1 * units.deg)
-            az = np.arange(AziLim[0], AziLim[1], 2 * units.deg)
-
-            x_plot = np.zeros(zen.shape[0] * az.shape[0])
-            y_plot = np.zeros(zen.shape[0] * az.shape[0])
-            z_plot = np.zeros(zen.shape[0] * az.shape[0])
-            i = 0
-            for a in az:
-                for z in zen:
-                    # Evaluate fit function for grid
-                    if use_correlation:
-                        z_plot[i] = ll_regular_station([z, a], corr_02, corr_13, sampling_rate, positions_pairs, trace_start_time_pairs)
-                    else:
-                        z_plot[i] = ll_regular_station_fft([z, a], corr_02_fft, corr_13_fft, sampling_rate, positions_pairs, trace_start_time_pairs)
-                    x_plot[i] = a
-                    y_plot[i] = z
-                    i += 1
+            zen_range = (ZenLim[0], ZenLim[1], 1 * units.deg)
+            az_range = (AziLim[0], AziLim[1], 2 * units.deg)
+
+            # Evaluate fit function for grid
+            if use_correlation:
+                y_plot, x_plot, z_plot = [x.flatten() for x in ll_regular_station_grid(
+                    zen_range, az_range, corr_02, corr_13, sampling_rate, positions_pairs, trace_start_time_pairs)]
+            else:
+                y_plot, x_plot = [x.flatten() for x in np.mgrid[zen_range[0]:zen_range[1]:zen_range[2],
+                                                               az_range[0]:az_range[1]:az_range[2]]]
+                z_plot = np.array([ll_regular_station_fft([z, a], corr_02_fft, corr_13_fft, sampling_rate, positions_pairs, trace_start_time_pairs)
+                                   for a, z in zip(x_plot, y_plot)])
 
             fig, ax = plt.subplots(1, 1)
             ax.scatter(np.rad2deg(x_plot), np.rad2deg(y_plot), c=z_plot, cmap='gnuplot2_r', lw=0)
@@ -320,7 +393,6 @@ class correlationDirectionFitter:
             toffset = -(np.arange(0, corr_13.shape[0]) - corr_13.shape[0] / 2.) / sampling_rate
             indices = peakutils.indexes(corr_13, thres=0.8, min_dist=5)
             t13s = toffset[indices][np.argsort(corr_13[indices])[::-1]] + (trace_start_time_pairs[1][1] - trace_start_time_pairs[1][0])
-            from scipy import constants
             c = constants.c * units.m / units.s
             dx = -6 * units.m
 
@@ -126,37 +126,34 @@ class efieldInterferometricDepthReco:
             signals = np.zeros(len(distances))
             depths_or_distances = distances
 
+        dists = np.full(len(depths_or_distances), -1.)
         for idx, dod in enumerate(depths_or_distances):
             if depths is not None:
                 try:
                     # here z coordinate of core has to be the altitude of the observation_level
-                    dist = self._at.get_distance_xmax_geometric(
+                    dists[idx] = self._at.get_distance_xmax_geometric(
                         zenith, dod, observation_level=core[-1])
                 except ValueError:
-                    signals[idx] = 0
                     continue
             else:
-                dist = dod
-
-            if dist < 0:
-                signals[idx] = 0
-                continue
-
-            point_on_axis = shower_axis * dist + core
-            if self._interpolation:
-                sum_trace = interferometry.interfere_traces_interpolation(
-                    point_on_axis, station_positions, traces, times, tab=self._tab)
-            else:
-                # sum_trace = interferometry.interfere_traces_padding(
-                #     point_on_axis, station_positions, core, traces, times, tab=self._tab)
-                sys.exit("Not implemented")
-
-            # plt.title(dod)
-            # plt.plot(sum_trace)
-            # plt.show()
+                dists[idx] = dod
+
+        # points with a negative distance (or outside of the atmosphere) have no signal
+        mask = dists >= 0
+        if not np.any(mask):
+            return signals
+
+        points_on_axis = shower_axis[None] * dists[mask, None] + core
+        if self._interpolation:
+            # interfere the traces for all points along the axis at once
+            sum_traces, trace_lengths = interferometry.interfere_traces_interpolation_multiple_targets(
+                points_on_axis, station_positions, traces, times, tab=self._tab)
+        else:
+            # sum_trace = interferometry.interfere_traces_padding(
+            #     point_on_axis, station_positions, core, traces, times, tab=self._tab)
+            sys.exit("Not implemented")
 
-            signal = interferometry.get_signal(sum_trace, tstep, kind=self._signal_kind)
-            signals[idx] = signal
+        signals[mask] = interferometry.get_signals(sum_traces, trace_lengths, tstep, kind=self._signal_kind)
 
         return signals
 
@@ -432,18 +429,17 @@ class efieldInterferometricAxisReco(efieldInterferometricDepthReco):
             Interferometric signal
 
         """
-        signals = np.zeros((len(xs), len(ys)))
         tstep = times[0, 1] - times[0, 0]
 
-        for xdx, x in enumerate(xs):
-            for ydx, y in enumerate(ys):
-                p = p_axis + cs.transform_from_vxB_vxvxB(np.array([x, y, 0]))
+        # all grid points (in the same order as signals.flatten())
+        xx, yy = np.meshgrid(xs, ys, indexing='ij')
+        points = np.array([xx.flatten(), yy.flatten(), np.zeros(xx.size)]).T
+        points = p_axis + np.array([cs.transform_from_vxB_vxvxB(point) for point in points])
 
-                sum_trace = interferometry.interfere_traces_interpolation(
-                    p, station_positions, traces, times, tab=self._tab)
-                signal = interferometry.get_signal(
-                    sum_trace, tstep, kind=self._signal_kind)
-                signals[xdx, ydx] = signal
+        sum_traces, trace_lengths = interferometry.interfere_traces_interpolation_multiple_targets(
+            points, station_positions, traces, times, tab=self._tab)
+        signals = interferometry.get_signals(
+            sum_traces, trace_lengths, tstep, kind=self._signal_kind).reshape(len(xs), len(ys))
 
         idx = np.argmax(signals)
         return idx, signals
@@ -668,6 +668,8 @@ class MultiFile_Dal1:
             self.set_polarization_flips(polarization_flips)
         self.additional_ant_delays = additional_ant_delays
 
+        self._memory_maps = {}  # memory maps of the antenna datasets, used by get_data_blocks
+
     def set_polarization_flips(self, even_antenna_names):
         """given a set of names(IDs) of even antennas, flip the data between the even and odd antennas"""
         self.even_ant_pol_flips = even_antenna_names
@@ -724,6 +726,7 @@ class MultiFile_Dal1:
         """
         Properly close all the TBBData_Dal1 files.
         """
+        self._memory_maps = {}
         for file in self.files:
             file.close_file()
 
@@ -968,3 +971,74 @@ class MultiFile_Dal1:
             )
 
         return TBB_file.file[TBB_file.stationKey][antenna_ID][initial_point:final_point]
+
+    def _get_antenna_dataset(self, antenna_ID, use_memmap=False):
+        """
+        Returns the dataset of an antenna (accounting for polarization flips) and the sample offset of the antenna.
+        If `use_memmap` is True and the dataset is stored contiguously and uncompressed, a read-only memory map
+        of the dataset is returned instead of the h5py dataset.
+        """
+        antenna_index = self.index_adjusts[self.dipoleNames.index(antenna_ID)]  # in case of polarization flips
+
+        to_file = self.antenna_to_file[antenna_index]
+        if to_file is None:
+            raise LookupError("do not have data for antenna %s" % antenna_ID)
+        TBB_file, station_antenna_index = to_file
+        antenna_ID = self.dipoleNames[antenna_index]
+        dataset = TBB_file.file[TBB_file.stationKey][antenna_ID]
+
+        if use_memmap:
+            key = (TBB_file.filename, antenna_ID)
+            if key not in self._memory_maps:
+                offset = dataset.id.get_offset()
+                if dataset.chunks is None and dataset.compression is None and offset is not None:
+                    self._memory_maps[key] = np.memmap(TBB_file.filename, dtype=dataset.dtype, mode="r",
+                                                       offset=offset, shape=dataset.shape)
+                else:
+                    logger.debug(f"Dataset of antenna {antenna_ID} can not be memory mapped")
+                    self._memory_maps[key] = dataset
+            dataset = self._memory_maps[key]
+
+        return dataset, self.sample_offsets[antenna_index]
+
+    def get_data_blocks(self, start_index, block_size, num_blocks, antenna_IDs=None, use_memmap=False):
+        """
+        return the raw data of consecutive blocks for several antennas at once, as a 3D int16 numpy array with shape
+        (number of antennas, num_blocks, block_size).
+
+        The data of each antenna is read with a single read (hyperslab) instead of one read per block. Data points
+        that are off the end of the file are set to zero.
+
+        Parameters
+        ----------
+        start_index : int
+            The first point returned is start_index past get_nominal_sample_number()
+        block_size : int
+            The number of data points per block
+        num_blocks : int
+            The number of blocks
+        antenna_IDs : list of str, default=None
+            The antennas to read, same as output from get_antenna_names(). If None, all antennas are read.
+        use_memmap : bool, default=False
+            If True, the data is read through a memory map of the file, which avoids the overhead of h5py.
+            This only works if the data is stored contiguously and uncompressed in the file, otherwise h5py is used.
+        """
+        if antenna_IDs is None:
+            antenna_IDs = self.dipoleNames
+
+        num_points = block_size * num_blocks
+        data = np.zeros((len(antenna_IDs), num_points), dtype=np.int16)
+        for ant_i, antenna_ID in enumerate(antenna_IDs):
+            dataset, sample_offset = self._get_antenna_dataset(antenna_ID, use_memmap=use_memmap)
+
+            initial_point = sample_offset + start_index
+            final_point = min(initial_point + num_points, len(dataset))
+            if final_point - initial_point < num_points:
+                logger.warning(
+                    f"data point {initial_point + num_points} is off end of file {len(dataset)} "
+                    f"for antenna {antenna_ID}, setting missing data to zero"
+                )
+            if final_point > initial_point:
+                data[ant_i, :final_point - initial_point] = dataset[initial_point:final_point]
+
+        return data.reshape((len(antenna_IDs), num_blocks, block_size))
@@ -8,6 +8,8 @@ import astropy.time
 
 import logging
 
+import collections
+import threading
 import time
 import os
 
@@ -19,7 +21,7 @@ class NuRadioRecoio(object):
 
     def __init__(self, filenames, parse_header=True, parse_detector=True, fail_on_version_mismatch=True,
                  fail_on_minor_version_mismatch=False,
-                 max_open_files=10, log_level=None, buffer_size=104857600):
+                 max_open_files=10, log_level=None, buffer_size=104857600, event_cache_size=0):
         """
         Initialize NuRadioReco io
 
@@ -43,6 +45,11 @@ class NuRadioRecoio(object):
             the log level of this class
         buffer_size: int
             the size of the read buffer in bytes (default 100MB)
+        event_cache_size: int
+            the maximum size (in bytes of the serialized events) of the cache of deserialized events
+            returned by `get_event_i` and `get_event`. The least recently used events are dropped
+            first. Note that events returned from the cache are the same objects, i.e., changes
+            to an event are visible in subsequent calls. Default 0, i.e., no caching.
         """
         if not isinstance(filenames, list):
             filenames = [filenames]
@@ -73,9 +80,20 @@ class NuRadioRecoio(object):
         self.__fail_on_minor_version_mismatch = fail_on_minor_version_mismatch
         self.__parse_header = parse_header
         self._parse_detector = parse_detector
-        self.__read_lock = False
+        # protects the bookkeeping of open files, the event cache and scanning of the files
+        self.__lock = threading.RLock()
+        # number of ongoing reads per open file object. Files that are closed (because too many files
+        # are open) while they are read are closed by the last reader
+        self.__file_readers = collections.Counter()
+        self.__files_to_close = set()
+        # protects the file position of each file object for reads without os.pread
+        self.__file_position_locks = collections.defaultdict(threading.Lock)
         self.__max_open_files = max_open_files
         self.__buffer_size = buffer_size
+        self.__event_cache_size = event_cache_size
+        self.__event_cache = collections.OrderedDict()
+        self.__event_cache_bytes = 0
+        self._event_offsets = None
         self.openFile(filenames)
         self._current_file_id = 0
         self.logger.info("... finished in {:.0f} seconds".format(time.time() - t))
@@ -98,8 +116,7 @@ class NuRadioRecoio(object):
                         tnow = value['time']
                         iF_close = key
                 self.logger.debug("closing file {} that was opened at {}".format(iF_close, tnow))
-                self.__open_files[iF_close]['file'].close()
-                del self.__open_files[iF_close]
+                self.__close_file(self.__open_files.pop(iF_close)['file'])
 
         return self.__open_files[iF]['file']
 
@@ -156,18 +173,49 @@ class NuRadioRecoio(object):
         self._bytes_length_header = [[]]
         self._bytes_start = [[]]
         self._bytes_length = [[]]
+        self._event_offsets = None
         self.__open_files = {}
         self._detector_dicts = {}
         self.__detectors = {}
         self._event_specific_detector_changes = {}
+        self.clear_event_cache()
 
         self.__event_headers = {}
         if self.__parse_header:
             self.__scan_files()
 
     def close_files(self):
-        for f in self.__open_files.values():
-            f['file'].close()
+        with self.__lock:
+            for f in self.__open_files.values():
+                self.__close_file(f['file'])
+            self.__open_files = {}
+
+    def __close_file(self, f):
+        """ Closes the file object `f`, or defers closing to the last ongoing read of this file """
+        with self.__lock:
+            if self.__file_readers[f] > 0:
+                self.__files_to_close.add(f)
+            else:
+                self.__file_position_locks.pop(f, None)
+                f.close()
+
+    def __release_file(self, f):
+        """ Ends a read of the file object `f` that was started in `get_event_i` """
+        with self.__lock:
+            self.__file_readers[f] -= 1
+            if self.__file_readers[f] <= 0:
+                del self.__file_readers[f]
+                if f in self.__files_to_close:
+                    self.__files_to_close.remove(f)
+                    self.__close_file(f)
+
+    def clear_event_cache(self):
+        """
+        Removes all events from the cache of deserialized events
+        """
+        with self.__lock:
+            self.__event_cache = collections.OrderedDict()
+            self.__event_cache_bytes = 0
 
     def get_filenames(self):
         return self._filenames
@@ -230,11 +278,9 @@ class NuRadioRecoio(object):
         self.__event_ids = np.array(self.__event_ids)
         self.__file_scanned = True
 
-        # compute number of events
-        n = 0
-        for b in self._bytes_start:
-            n += len(b)
-        self.__n_events = n
+        # compute number of events and the index of the first event of each file
+        self._event_offsets = np.cumsum([0] + [len(b) for b in self._bytes_start])
+        self.__n_events = int(self._event_offsets[-1])
 
         # convert lists to numpy arrays for convenience
         for station_id, station in self.__event_headers.items():
@@ -256,46 +302,95 @@ class NuRadioRecoio(object):
 
         return self.__event_ids
 
-    def get_event_i(self, event_number):
-        while self.__read_lock:
-            time.sleep(1)
-            self.logger.debug("read lock waiting 1ms")
-        self.__read_lock = True
+    def get_event_i(self, event_number, set_current_event=True):
+        """
+        Returns the i-th event of the files
 
-        if not self.__file_scanned:
-            self.__scan_files()
+        This function can be called from multiple threads simultaneously.
+
+        Parameters
+        ----------
+        event_number: int
+            the index of the event (counting over all files)
+        set_current_event: bool
+            If True (default), the event becomes the current event, i.e., the detector returned by
+            `get_detector` is set to this event. Set to False to read events in the background
+            (e.g. to fill the event cache) without changing the state of the reader.
+
+        Returns
+        -------
+        event: Event or None
+            the event, None if the event number is out of bounds
+        """
+        with self.__lock:
+            if not self.__file_scanned:
+                self.__scan_files()
 
         if event_number < 0 or event_number >= self.get_n_events():
             self.logger.error(
                 'event number {} out of bounds, only {} present in file'.format(
                     event_number, self.get_n_events()))
-            self.__read_lock = False
             return None
 
         # determine in which file event i is
-        istart = 0
-        file_id = 0
-        for iF in range(len(self._filenames)):
-            istop = istart + len(self._bytes_start[iF])
-            if (event_number >= istart) and (event_number < istop):
-                file_id = iF
-                event_id = event_number - istart
-                break
+        file_id = int(np.searchsorted(self._event_offsets, event_number, side='right')) - 1
+        event_id = int(event_number - self._event_offsets[file_id])
+
+        key = (file_id, event_id)
+        with self.__lock:
+            event = None
+            if key in self.__event_cache:
+                event = self.__event_cache[key][0]
+                self.__event_cache.move_to_end(key)
             else:
-                istart = istop
-
-        self._get_file(file_id).seek(self._bytes_start[file_id][event_id])
-        evtstr = self._get_file(file_id).read(self._bytes_length[file_id][event_id])
-        event = NuRadioReco.framework.event.Event(0, 0)
-        event.deserialize(evtstr)
-        self.__read_lock = False
-        self._current_file_id = file_id
-        self._current_event_id = event.get_id()
-        self._current_run_number = event.get_run_number()
-
-        self.__set_event_to_detector()
+                f = self._get_file(file_id)
+                # register the read, so that the file is not closed before the read is finished
+                self.__file_readers[f] += 1
+
+        if event is None:
+            # the global lock is not held while reading, so reads from the same or other files run concurrently
+            try:
+                evtstr = self.__read_bytes(f, self._bytes_start[file_id][event_id], self._bytes_length[file_id][event_id])
+            finally:
+                self.__release_file(f)
+            event = NuRadioReco.framework.event.Event(0, 0)
+            event.deserialize(evtstr)
+            self.__add_to_event_cache(key, event, len(evtstr))
+
+        if set_current_event:
+            with self.__lock:
+                self._current_file_id = file_id
+                self._current_event_id = event.get_id()
+                self._current_run_number = event.get_run_number()
+                self.__set_event_to_detector()
+
         return event
 
+    def __read_bytes(self, f, start, length):
+        """ Reads `length` bytes starting at `start` without changing the position of the file (if supported) """
+        if hasattr(os, 'pread'):
+            return os.pread(f.fileno(), length, start)
+
+        with self.__lock:
+            position_lock = self.__file_position_locks[f]
+        with position_lock:
+            f.seek(start)
+            return f.read(length)
+
+    def __add_to_event_cache(self, key, event, size):
+        if size > self.__event_cache_size:
+            return
+
+        with self.__lock:
+            if key in self.__event_cache:
+                return
+
+            self.__event_cache[key] = (event, size)
+            self.__event_cache_bytes += size
+            while self.__event_cache_bytes > self.__event_cache_size:
+                _, (_, size_removed) = self.__event_cache.popitem(last=False)
+                self.__event_cache_bytes -= size_removed
+
     def get_event(self, event_id):
         if not self.__file_scanned:
             self.__scan_files()
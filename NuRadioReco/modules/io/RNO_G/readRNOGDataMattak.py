@@ -4,6 +4,9 @@ import os
 import time
 import astropy.time
 import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from inspect import signature
 
@@ -245,7 +248,9 @@ class readRNOGData:
             max_trigger_rate=0 * units.Hz,
             mattak_kwargs={},
             overwrite_sampling_rate=None,
-            max_in_mem=256):
+            max_in_mem=256,
+            n_threads=0,
+            max_prefetch=32):
         """
         Parameters
         ----------
@@ -274,7 +279,7 @@ class readRNOGData:
             Options are, in order of decreasing precision and increasing performance:
 
             * 'fit' : do a full out-of-band fit to determine the block offsets; for more details,
-              see :mod:`NuRadioReco.modules.RNO_G.channelBlockOffsetFitter` (slow)
+              see :mod:`NuRadioReco.modules.RNO_G.channelBlockOffsetFitter`
             * 'approximate' : estimate block offsets by looking at the low-pass filtered trace (default)
             * 'median' : subtract the median of each block (faster)
             * 'none' : do not apply a baseline correction (fastest)
@@ -316,6 +321,16 @@ class readRNOGData:
             Set the maximum number of events that can be stored in memory. The datareader will divide
             the data in batches based on this number.
             NOTE: This is only relevant for the mattak uproot backend
+
+        n_threads: int
+            If larger than 0, ``run()`` reads the upcoming events in a background thread and builds
+            the ``Event`` objects (including the voltage conversion and baseline correction) in a pool of
+            ``n_threads`` worker threads. The events are still returned in order. (Default: 0, i.e.,
+            everything is done in the main thread)
+
+        max_prefetch: int
+            Only used if ``n_threads > 0``. The maximum number of events which are read ahead and kept
+            in memory. (Default: 32)
         """
 
         t0 = time.time()
@@ -340,6 +355,9 @@ class readRNOGData:
         # set max wavform array size that can be loaded in memory
         self._max_in_mem = max_in_mem
 
+        self._n_threads = n_threads
+        self._max_prefetch = max_prefetch
+
         # Set parameter for run selection
         self.__max_trigger_rate = max_trigger_rate
         self.__run_types = run_types
@@ -683,6 +701,7 @@ class readRNOGData:
                 if not sampling_rate: # invalid sampling rate - overwrite
                     sampling_rate = self._overwrite_sampling_rate
 
+            dataset_waveforms = []
             for idx, (_, wfs) in enumerate(dataset.iterate(
                 calibrated=self._read_calibrated_data,
                 selectors=self._select_events)):
@@ -697,19 +716,23 @@ class readRNOGData:
 
                 if apply_baseline_correction == 'median':
                     wfs = _baseline_correction(wfs)
-                elif apply_baseline_correction in ['fit', 'approximate']:
-                    wfs = np.vstack([
-                        fit_block_offsets(
-                            wf, mode=self._apply_baseline_correction,
-                            sampling_rate=sampling_rate, return_trace=True)[1]
-                        for wf in wfs])
 
-                events_waveforms.append(wfs)
-                if (max_events is not None) and (len(events_waveforms) >= max_events):
-                    self.logger.warning(
-                        f"Number of waveforms {len(events_waveforms)} exceeds max_events. Returning first {max_events} waveforms only."
-                        )
-                    return np.array(events_waveforms)
+                dataset_waveforms.append(wfs)
+                if (max_events is not None) and (len(events_waveforms) + len(dataset_waveforms) >= max_events):
+                    break
+
+            if apply_baseline_correction in ['fit', 'approximate'] and len(dataset_waveforms):
+                # the block offsets of all channels of all events are fitted at once
+                dataset_waveforms = fit_block_offsets(
+                    np.array(dataset_waveforms), mode=apply_baseline_correction,
+                    sampling_rate=sampling_rate, return_trace=True)[1]
+
+            events_waveforms.extend(dataset_waveforms)
+            if (max_events is not None) and (len(events_waveforms) >= max_events):
+                self.logger.warning(
+                    f"Number of waveforms {len(events_waveforms)} exceeds max_events. Returning first {max_events} waveforms only."
+                    )
+                return np.array(events_waveforms)
 
         return np.array(events_waveforms)
 
@@ -822,6 +845,10 @@ class readRNOGData:
         evt: `NuRadioReco.framework.event.Event`
         """
 
+        if self._n_threads:
+            yield from self._run_prefetched()
+            return
+
         for dataset in self._datasets:
             dataset.setEntries((0, dataset.N()))
 
@@ -835,6 +862,138 @@ class readRNOGData:
                 yield evt
 
 
+    def _run_prefetched(self):
+        """
+        Loop over all events, reading ahead in a background thread.
+
+        A reader thread iterates over the datasets and submits the creation of each ``Event`` to a pool
+        of worker threads. The pending events are passed to the main thread through a bounded queue, so
+        at most ``max_prefetch`` events are kept in memory and the events are yielded in order.
+
+        Yields
+        ------
+
+        evt: `NuRadioReco.framework.event.Event`
+        """
+        prefetch_queue = queue.Queue(maxsize=self._max_prefetch)
+        stop_reading = threading.Event()
+        end_of_data = object()
+
+        def put(item):
+            # wait for a free slot in the queue, give up if the consumer stopped iterating
+            while not stop_reading.is_set():
+                try:
+                    prefetch_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        with ThreadPoolExecutor(max_workers=self._n_threads) as executor:
+
+            def read():
+                try:
+                    for dataset in self._datasets:
+                        dataset.setEntries((0, dataset.N()))
+                        for evtinfo, wf in dataset.iterate(calibrated=self._read_calibrated_data,
+                                                           selectors=self._select_events,
+                                                           max_entries_in_mem=self._max_in_mem):
+                            # copy the waveforms, the backend might reuse its buffer for the next entries
+                            if not put(executor.submit(self._get_event, evtinfo, np.array(wf))):
+                                return
+                    put(end_of_data)
+                except Exception as e:
+                    put(e)
+
+            reader = threading.Thread(target=read, daemon=True)
+            reader.start()
+            try:
+                while True:
+                    item = prefetch_queue.get()
+                    if item is end_of_data:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+
+                    yield item.result()
+            finally:
+                stop_reading.set()
+                reader.join()
+
+
+    def iterate_waveform_blocks(self, block_size=256, keys=["station", "run", "eventNumber", "triggerTime", "triggerType"]):
+        """
+        Loop over all events in blocks of numpy arrays, without creating ``Event`` objects
+
+        The voltage conversion and baseline correction configured in ``begin()`` are applied to
+        the whole block at once. This is much faster than ``run()`` for analyses which only need
+        the waveforms and some event information.
+
+        Parameters
+        ----------
+
+        block_size: int
+            The number of entries which are read from a dataset at once. As events which do not pass
+            the selectors are removed, the returned blocks can contain fewer events. (Default: 256)
+
+        keys: list(str)
+            The attributes of the mattak.Dataset.EventInfo class which are returned for each event.
+            (Default: ["station", "run", "eventNumber", "triggerTime", "triggerType"])
+
+        Yields
+        ------
+
+        waveforms: np.array(n_events, n_channels, n_samples)
+            The (baseline corrected) waveforms of the selected events of the block
+
+        events_information: dict
+            The keys are the requested attributes, the values are arrays with one entry per event.
+            In addition, the key "sampling_rate" contains the sampling rate of each event (taking into
+            account ``overwrite_sampling_rate``).
+        """
+        for dataset in self._datasets:
+            n_events = dataset.N()
+            for start in range(0, n_events, block_size):
+                dataset.setEntries((start, min(start + block_size, n_events)))
+                event_infos = dataset.eventInfo()
+                if not isinstance(event_infos, list):  # a single entry was read
+                    event_infos = [event_infos]
+
+                selected = np.array([self._select_events(evtinfo) for evtinfo in event_infos], dtype=bool)
+                if not np.any(selected):
+                    continue
+
+                event_infos = [evtinfo for evtinfo, is_selected in zip(event_infos, selected) if is_selected]
+                wfs = np.asarray(dataset.wfs(calibrated=self._read_calibrated_data))
+                wfs = wfs.reshape((-1,) + wfs.shape[-2:])[selected]
+
+                if self._read_calibrated_data:
+                    wfs = wfs * units.mV
+                elif self._convert_to_voltage:
+                    # convert adc to voltage
+                    wfs = wfs * (self._adc_ref_voltage_range / (2 ** (self._adc_n_bits) - 1))
+
+                sampling_rates = np.array([
+                    self._overwrite_sampling_rate
+                    if self._overwrite_sampling_rate is not None and evtinfo.sampleRate in [0, None]
+                    else evtinfo.sampleRate for evtinfo in event_infos], dtype=float) * units.GHz
+
+                if self._apply_baseline_correction == 'median':
+                    wfs = _baseline_correction(wfs)
+                elif self._apply_baseline_correction in ['fit', 'approximate']:
+                    wfs = wfs.astype(float)
+                    for sampling_rate in np.unique(sampling_rates):
+                        mask = sampling_rates == sampling_rate
+                        wfs[mask] = fit_block_offsets(
+                            wfs[mask], mode=self._apply_baseline_correction,
+                            sampling_rate=sampling_rate, return_trace=True)[1]
+
+                events_information = {key: np.array([getattr(evtinfo, key) for evtinfo in event_infos]) for key in keys}
+                events_information["sampling_rate"] = sampling_rates
+
+                yield wfs, events_information
+
+
     def get_event_by_index(self, event_index):
         """ Allows to read a specific event identifed by its index
 
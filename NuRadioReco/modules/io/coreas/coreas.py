@@ -1,4 +1,6 @@
 import numpy as np
+import fractions
+import decimal
 import matplotlib.pyplot as plt
 from radiotools import helper as hp
 from radiotools import coordinatesystems
@@ -40,7 +42,13 @@ def get_angles(corsika):
 def calculate_simulation_weights(positions, zenith, azimuth, site='summit', debug=False):
     """Calculate weights according to the area that one simulated position represents.
     Weights are therefore given in units of area.
-    Note: The volume of a 2d convex hull is the area."""
+    Note: The volume of a 2d convex hull is the area.
+
+    The areas of all bounded voronoi cells are calculated at once in the shower plane and
+    projected to the ground. The ground coordinates are a linear function of the shower plane
+    coordinates, hence the area on ground is the area in the shower plane times the absolute
+    determinant of this mapping. Only the unbounded cells at the edge of the star shape are
+    treated individually."""
 
     import scipy.spatial as spatial
 
@@ -65,36 +73,63 @@ def calculate_simulation_weights(positions, zenith, azimuth, site='summit', debu
         ax1.set_xlabel(r'Position in $\vec{v} \times \vec{B}$ - direction [m]')
         ax1.set_ylabel(r'Position in $\vec{v} \times \vec{v} \times \vec{B}$ - direction [m]')
 
-    weights = np.zeros_like(positions[:, 0])
-    for p in range(0, weights.shape[0]):  # loop over all observer positions
-        vertices_shower_2d = vor.vertices[vor.regions[vor.point_region[p]]]
-
-        # x_vertice_ground = x_trafo_from_shower[0] * x_vertice_shower + y_trafo_from_shower[0] * y_vertice_shower + z_trafo_from_shower[0] * z_vertice_shower
-        # y_vertice_ground = x_trafo_from_shower[1] * x_vertice_shower + y_trafo_from_shower[1] * y_vertice_shower + z_trafo_from_shower[1] * z_vertice_shower
-        # z_vertice_ground = x_trafo_from_shower[2] * x_vertice_shower + y_trafo_from_shower[2] * y_vertice_shower + z_trafo_from_shower[2] * z_vertice_shower
-
-        x_vertice_shower = vertices_shower_2d[:, 0]
-        y_vertice_shower = vertices_shower_2d[:, 1]
+    def vertices_to_ground(vertices_shower_2d):
+        # the vertices lie in the plane z_ground = 0
+        x_vertice_shower = vertices_shower_2d[..., 0]
+        y_vertice_shower = vertices_shower_2d[..., 1]
         z_vertice_shower = -(x_trafo_from_shower[2] * x_vertice_shower + y_trafo_from_shower[2] * y_vertice_shower) / z_trafo_from_shower[2]
+        return np.outer(x_vertice_shower, x_trafo_from_shower) + np.outer(y_vertice_shower, y_trafo_from_shower) + \
+            np.outer(z_vertice_shower, z_trafo_from_shower)
 
-        vertices_shower_3d = []
-        for iter in range(len(x_vertice_shower)):
-            vertices_shower_3d.append([x_vertice_shower[iter], y_vertice_shower[iter], z_vertice_shower[iter]])
-        vertices_shower_3d = np.array(vertices_shower_3d)
-        vertices_ground = cstrafo.transform_from_vxB_vxvxB(station_position=vertices_shower_3d)
+    # (x, y) on ground as a function of (x, y) in the shower plane
+    a = -x_trafo_from_shower[2] / z_trafo_from_shower[2]
+    b = -y_trafo_from_shower[2] / z_trafo_from_shower[2]
+    jacobian = np.array([[x_trafo_from_shower[0] + a * z_trafo_from_shower[0], y_trafo_from_shower[0] + b * z_trafo_from_shower[0]],
+                         [x_trafo_from_shower[1] + a * z_trafo_from_shower[1], y_trafo_from_shower[1] + b * z_trafo_from_shower[1]]])
 
-        n_arms = 8  # mask last observer position of each arm
-        length_shower = np.sqrt(shower[:, 0] ** 2 + shower[:, 1] ** 2)
-        ind = np.argpartition(length_shower, -n_arms)[-n_arms:]
+    regions = [vor.regions[i_region] for i_region in vor.point_region]
+    n_vertices = np.array([len(region) for region in regions])
+    bounded = np.array([len(region) > 2 and -1 not in region for region in regions], dtype=bool)
 
-        weight = spatial.ConvexHull(vertices_ground[:, :2])
-        weights[p] = weight.volume  # volume of a 2d dataset is the area, area of a 2d data set is the perimeter
-        weights[ind] = 0
+    weights = np.zeros_like(positions[:, 0])
+    if np.any(bounded):
+        # pad all bounded regions to the same number of vertices
+        n_max = n_vertices[bounded].max()
+        mask = np.arange(n_max) < n_vertices[bounded, np.newaxis]
+        indices = np.zeros((np.sum(bounded), n_max), dtype=int)
+        indices[mask] = np.concatenate([regions[i] for i in np.flatnonzero(bounded)])
+        vertices = vor.vertices[indices]
+
+        # sort the vertices of each (convex) cell counterclockwise, padded entries go to the end
+        centers = np.sum(vertices * mask[..., np.newaxis], axis=1) / n_vertices[bounded, np.newaxis]
+        angles = np.arctan2(vertices[..., 1] - centers[:, 1, np.newaxis], vertices[..., 0] - centers[:, 0, np.newaxis])
+        angles[~mask] = np.inf
+        order = np.argsort(angles, axis=1)
+        vertices = np.take_along_axis(vertices, order[..., np.newaxis], axis=1)
+        # padded entries repeat the first vertex and therefore do not contribute to the area
+        vertices = np.where(mask[..., np.newaxis], vertices, vertices[:, :1])
+
+        # shoelace formula
+        x = vertices[..., 0]
+        y = vertices[..., 1]
+        area_shower = 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1))
+        weights[bounded] = area_shower * np.abs(np.linalg.det(jacobian))
+
+    for p in np.flatnonzero(~bounded):
+        # cells at the edge are not closed. The missing vertex (index -1) refers to the last vertex in the list.
+        vertices_ground = vertices_to_ground(vor.vertices[regions[p]])
+        weights[p] = spatial.ConvexHull(vertices_ground[:, :2]).volume  # volume of a 2d dataset is the area, area of a 2d data set is the perimeter
+
+    n_arms = 8  # mask last observer position of each arm
+    length_shower = np.sqrt(shower[:, 0] ** 2 + shower[:, 1] ** 2)
+    ind = np.argpartition(length_shower, -n_arms)[-n_arms:]
+    weights[ind] = 0
 
-        if debug:
+    if debug:
+        for region in regions:
+            vertices_ground = vertices_to_ground(vor.vertices[region])
             ax2.plot(vertices_ground[:, 0], vertices_ground[:, 1], c='grey', zorder=1)
             ax2.scatter(vertices_ground[:, 0], vertices_ground[:, 1], c='tab:orange', zorder=2)
-    if debug:
         ax2.scatter(positions[:, 0], positions[:, 1], c='tab:blue', s=10, label='Position of observer')
         ax2.scatter(vertices_ground[:, 0], vertices_ground[:, 1], c='tab:orange', label='Vertices of cell')
         ax2.set_aspect('equal')
@@ -123,6 +158,110 @@ def calculate_simulation_weights(positions, zenith, azimuth, site='summit', debu
     return weights
 
 
+def get_observers(corsika):
+    """
+    reads the names, positions and traces of all observers of a coreas hdf5 file at once
+
+    Parameters
+    ----------
+    corsika : hdf5 file object
+        the open hdf5 file object of the corsika hdf5 file
+
+    Returns
+    -------
+    keys: list of str
+        the names of the observers
+    positions: array of floats, shape (n_observers, 3)
+        the observer positions in the corsika coordinate system (in cm)
+    traces: array of floats, shape (n_observers, n_samples, 4)
+        the time (in s) and the three electric field components (in statVolt/cm) of all observers
+        in the corsika coordinate system. All observers need to have the same number of samples.
+    """
+    observers = corsika['CoREAS']['observers']
+    keys = list(observers.keys())
+    positions = np.array([observers[key].attrs['position'] for key in keys])
+    traces = np.array([observers[key][()] for key in keys])
+    return keys, positions, traces
+
+
+def resample_traces(traces, sampling_rate, new_sampling_rate):
+    """
+    resamples many traces at once, following the same procedure as `BaseTrace.resample`
+
+    Parameters
+    ----------
+    traces: array of floats
+        the traces, the time axis is the last axis
+    sampling_rate: float
+        the current sampling rate
+    new_sampling_rate: float
+        the sampling rate after the resampling
+
+    Returns
+    -------
+    traces: array of floats
+        the resampled traces
+    """
+    import scipy.signal
+    if new_sampling_rate == sampling_rate:
+        return traces
+    resampling_factor = fractions.Fraction(decimal.Decimal(new_sampling_rate / sampling_rate)).limit_denominator(5000)
+    if resampling_factor.numerator != 1:
+        traces = scipy.signal.resample(traces, resampling_factor.numerator * traces.shape[-1], axis=-1)
+    if resampling_factor.denominator != 1:
+        traces = scipy.signal.resample(traces, traces.shape[-1] // resampling_factor.denominator, axis=-1)
+    if traces.shape[-1] % 2 != 0:
+        traces = traces[..., :-1]
+    return traces
+
+
+def get_efields(corsika, traces, sampling_rate=None):
+    """
+    converts the traces of many observers at once into electric fields in on-sky coordinates
+    (eR, eTheta, ePhi) and NuRadioReco units. This is the same conversion as done in `make_sim_station`,
+    including the zeros which are prepended to the traces.
+
+    Parameters
+    ----------
+    corsika : hdf5 file object
+        the open hdf5 file object of the corsika hdf5 file
+    traces: array of floats, shape (n_observers, n_samples, 4)
+        the observer traces as returned by `get_observers`
+    sampling_rate: float or None
+        if not None, the electric fields are resampled to this sampling rate
+
+    Returns
+    -------
+    efields: array of floats, shape (n_observers, 3, n_samples_out)
+        the electric fields
+    trace_start_times: array of floats, shape (n_observers,)
+        the start times of the electric fields
+    sampling_rate: float
+        the sampling rate of the electric fields
+    """
+    zenith, azimuth, magnetic_field_vector = get_angles(corsika)
+    traces = np.asarray(traces)
+    n_observers, n_samples = traces.shape[:2]
+
+    # convert to SI units and rotate (x, y, z) -> (-y, x, z)
+    trace_start_times = traces[:, 0, 0] * units.second
+    data = np.array([-traces[:, :, 2], traces[:, :, 1], traces[:, :, 3]]) * conversion_fieldstrength_cgs_to_SI
+
+    cs = coordinatesystems.cstrafo(zenith, azimuth, magnetic_field_vector=magnetic_field_vector)
+    efields = cs.transform_from_magnetic_to_geographic(data.reshape(3, -1))
+    efields = cs.transform_from_ground_to_onsky(efields).reshape(3, n_observers, n_samples)
+
+    # prepend trace with zeros to not have the pulse directly at the start
+    efields = np.concatenate([np.zeros_like(efields), efields], axis=-1).transpose(1, 0, 2)
+
+    coreas_sampling_rate = 1. / (corsika['CoREAS'].attrs['TimeResolution'] * units.second)
+    if sampling_rate is None:
+        sampling_rate = coreas_sampling_rate
+    efields = resample_traces(efields, coreas_sampling_rate, sampling_rate)
+
+    return efields, trace_start_times, sampling_rate
+
+
 def make_sim_station(station_id, corsika, observer, channel_ids, weight=None):
     """
     creates an NuRadioReco sim station from the (interpolated) observer object of the coreas hdf5 file
@@ -143,38 +282,48 @@ def make_sim_station(station_id, corsika, observer, channel_ids, weight=None):
     sim_station: sim station
         simulated station object
     """
-
-    zenith, azimuth, magnetic_field_vector = get_angles(corsika)
-
     if(observer is None):
         data = np.zeros((512, 4))
         data[:, 0] = np.arange(0, 512) * units.ns / units.second
     else:
-        data = np.copy(observer)
-        data[:, 1], data[:, 2] = -observer[:, 2], observer[:, 1]
+        data = np.asarray(observer)
 
-    # convert to SI units
-    data[:, 0] *= units.second
-    data[:, 1] *= conversion_fieldstrength_cgs_to_SI
-    data[:, 2] *= conversion_fieldstrength_cgs_to_SI
-    data[:, 3] *= conversion_fieldstrength_cgs_to_SI
+    efields, trace_start_times, sampling_rate = get_efields(corsika, data[np.newaxis])
+    return make_sim_station_from_efield(station_id, corsika, efields[0], trace_start_times[0], sampling_rate,
+                                        channel_ids, weight)
 
-    cs = coordinatesystems.cstrafo(zenith, azimuth, magnetic_field_vector=magnetic_field_vector)
-    efield = cs.transform_from_magnetic_to_geographic(data[:, 1:].T)
-    efield = cs.transform_from_ground_to_onsky(efield)
 
-    # prepend trace with zeros to not have the pulse directly at the start
-    n_samples_prepend = efield.shape[1]
-    efield2 = np.zeros((3, n_samples_prepend + efield.shape[1]))
-    efield2[0] = np.append(np.zeros(n_samples_prepend), efield[0])
-    efield2[1] = np.append(np.zeros(n_samples_prepend), efield[1])
-    efield2[2] = np.append(np.zeros(n_samples_prepend), efield[2])
+def make_sim_station_from_efield(station_id, corsika, efield, trace_start_time, sampling_rate, channel_ids, weight=None):
+    """
+    creates an NuRadioReco sim station from an electric field that was already converted with `get_efields`
+
+    Parameters
+    ----------
+    station_id : station id
+        the id of the station to create
+    corsika : hdf5 file object
+        the open hdf5 file object of the corsika hdf5 file
+    efield : array of floats, shape (3, n_samples)
+        the electric field in on-sky coordinates
+    trace_start_time : float
+        the start time of the electric field
+    sampling_rate : float
+        the sampling rate of the electric field
+    channel_ids :
+    weight : weight of individual station
+        weight corresponds to area covered by station
+
+    Returns
+    -------
+    sim_station: sim station
+        simulated station object
+    """
+    zenith, azimuth, magnetic_field_vector = get_angles(corsika)
 
-    sampling_rate = 1. / (corsika['CoREAS'].attrs['TimeResolution'] * units.second)
     sim_station = NuRadioReco.framework.sim_station.SimStation(station_id)
     electric_field = NuRadioReco.framework.electric_field.ElectricField(channel_ids)
-    electric_field.set_trace(efield2, sampling_rate)
-    electric_field.set_trace_start_time(data[0, 0])
+    electric_field.set_trace(np.copy(efield), sampling_rate)
+    electric_field.set_trace_start_time(trace_start_time)
     electric_field.set_parameter(efp.ray_path_type, 'direct')
     electric_field.set_parameter(efp.zenith, zenith)
     electric_field.set_parameter(efp.azimuth, azimuth)
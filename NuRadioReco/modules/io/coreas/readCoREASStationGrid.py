@@ -32,9 +32,11 @@ class readCoREAS:
         self.__max_distace = None
         self.__current_input_file = None
         self.__random_generator = None
+        self.__sampling_rate = None
         self.logger = logging.getLogger('NuRadioReco.readCoREAS')
 
-    def begin(self, input_files, xmin, xmax, ymin, ymax, n_cores=10, seed=None, log_level=logging.INFO):
+    def begin(self, input_files, xmin, xmax, ymin, ymax, n_cores=10, seed=None, log_level=logging.INFO,
+              sampling_rate=None):
         """
         begin method
 
@@ -56,6 +58,9 @@ class readCoREAS:
             the number of random core positions to generate for each input file
         seed: int (default: None)
             Seed for the random number generation. If None is passed, no seed is set
+        sampling_rate: float or None (default: None)
+            If not None, the electric fields of all observers are resampled to this sampling rate
+            when a file is read. Otherwise the sampling rate of the CoREAS simulation is used.
         """
         self.__input_files = input_files
         self.__n_cores = n_cores
@@ -63,6 +68,7 @@ class readCoREAS:
         self.__area = [xmin, xmax, ymin, ymax]
 
         self.__random_generator = numpy.random.RandomState(seed)
+        self.__sampling_rate = sampling_rate
         self.logger.setLevel(log_level)
 
     @register_run()
@@ -107,20 +113,17 @@ class readCoREAS:
                     corsika['inputs'].attrs["THETAP"][0]
                 )
             )
-            positions = []
-            for i, observer in enumerate(corsika['CoREAS']['observers'].values()):
-                position = observer.attrs['position']
-                positions.append(np.array([-position[1], position[0], 0]) * units.cm)
-#                 self.logger.debug("({:.0f}, {:.0f})".format(positions[i][0], positions[i][1]))
-            positions = np.array(positions)
+            # read all observers at once and convert their traces in one go, the sim stations are only
+            # created for the observers that are closest to a detector station
+            keys, observer_positions, traces = coreas.get_observers(corsika)
+            positions = np.array([-observer_positions[:, 1], observer_positions[:, 0],
+                                  np.zeros(len(keys))]).T * units.cm
+            efields, trace_start_times, sampling_rate = coreas.get_efields(corsika, traces, self.__sampling_rate)
 
             zenith, azimuth, magnetic_field_vector = coreas.get_angles(corsika)
             cs = cstrafo.cstrafo(zenith, azimuth, magnetic_field_vector)
             positions_vBvvB = cs.transform_from_magnetic_to_geographic(positions.T)
             positions_vBvvB = cs.transform_to_vxB_vxvxB(positions_vBvvB).T
-#             for i, pos in enumerate(positions_vBvvB):
-#                 self.logger.debug("star shape")
-#                 self.logger.debug("({:.0f}, {:.0f}); ({:.0f}, {:.0f})".format(positions[i, 0], positions[i, 1], pos[0], pos[1]))
 
             dd = (positions_vBvvB[:, 0] ** 2 + positions_vBvvB[:, 1] ** 2) ** 0.5
             ddmax = dd.max()
@@ -135,6 +138,9 @@ class readCoREAS:
             self.__t += time.time() - t
 
             station_ids = detector.get_station_ids()
+            channel_ids = {station_id: detector.get_channel_ids(station_id) for station_id in station_ids}
+            det_station_positions = np.array([detector.get_absolute_position(station_id) for station_id in station_ids])
+            det_station_positions[:, 2] = 0
             for iCore, core in enumerate(cores):
                 t = time.time()
                 evt = NuRadioReco.framework.event.Event(self.__current_input_file, iCore)  # create empty event
@@ -143,37 +149,34 @@ class readCoREAS:
                 evt.add_sim_shower(sim_shower)
                 rd_shower = NuRadioReco.framework.radio_shower.RadioShower(station_ids=station_ids)
                 evt.add_shower(rd_shower)
-                for station_id in station_ids:
-                    # convert into vxvxB frame to calculate closests simulated station to detecor station
-                    det_station_position = detector.get_absolute_position(station_id)
-                    det_station_position[2] = 0
-                    core_rel_to_station = core - det_station_position
-        #             core_rel_to_station_vBvvB = cs.transform_from_magnetic_to_geographic(core_rel_to_station)
-                    core_rel_to_station_vBvvB = cs.transform_to_vxB_vxvxB(core_rel_to_station)
-                    dcore = (core_rel_to_station_vBvvB[0] ** 2 + core_rel_to_station_vBvvB[1] ** 2) ** 0.5
-#                     print(f"{core_rel_to_station}, {core_rel_to_station_vBvvB} -> {dcore}")
-                    if(dcore > ddmax):
+
+                # convert into vxvxB frame to calculate closests simulated station to detecor station
+                cores_rel_to_station = core - det_station_positions
+                cores_rel_to_station_vBvvB = np.atleast_2d(cs.transform_to_vxB_vxvxB(cores_rel_to_station))
+                dcores = (cores_rel_to_station_vBvvB[:, 0] ** 2 + cores_rel_to_station_vBvvB[:, 1] ** 2) ** 0.5
+                distances = np.linalg.norm(cores_rel_to_station_vBvvB[:, np.newaxis, :2] - positions_vBvvB[np.newaxis, :, :2], axis=-1)
+                indices = np.argmin(distances, axis=1)
+
+                for iStation, station_id in enumerate(station_ids):
+                    station = NuRadioReco.framework.station.Station(station_id)
+                    if(dcores[iStation] > ddmax):
                         # station is outside of the star shape pattern, create empty station
-                        station = NuRadioReco.framework.station.Station(station_id)
-                        channel_ids = detector.get_channel_ids(station_id)
-                        sim_station = coreas.make_sim_station(station_id, corsika, None, channel_ids)
-                        station.set_sim_station(sim_station)
-                        evt.set_station(station)
-                        self.logger.debug(f"station {station_id} is outside of star shape, channel_ids {channel_ids}")
+                        sim_station = coreas.make_sim_station(station_id, corsika, None, channel_ids[station_id])
+                        if self.__sampling_rate is not None:
+                            for electric_field in sim_station.get_electric_fields():
+                                electric_field.resample(self.__sampling_rate)
+                        self.logger.debug(f"station {station_id} is outside of star shape, channel_ids {channel_ids[station_id]}")
                     else:
-                        distances = np.linalg.norm(core_rel_to_station_vBvvB[:2] - positions_vBvvB[:,:2], axis=1)
-                        index = np.argmin(distances)
-                        distance = distances[index]
-                        key = list(corsika['CoREAS']['observers'].keys())[index]
+                        index = indices[iStation]
                         self.logger.debug(
                             "generating core at ground ({:.0f}, {:.0f}), rel to station ({:.0f}, {:.0f}) vBvvB({:.0f}, {:.0f}), nearest simulated station is {:.0f}m away at ground ({:.0f}, {:.0f}), vBvvB({:.0f}, {:.0f})".format(
                                 cores[iCore][0],
                                 cores[iCore][1],
-                                core_rel_to_station[0],
-                                core_rel_to_station[1],
-                                core_rel_to_station_vBvvB[0],
-                                core_rel_to_station_vBvvB[1],
-                                distance / units.m,
+                                cores_rel_to_station[iStation][0],
+                                cores_rel_to_station[iStation][1],
+                                cores_rel_to_station_vBvvB[iStation][0],
+                                cores_rel_to_station_vBvvB[iStation][1],
+                                distances[iStation, index] / units.m,
                                 positions[index][0],
                                 positions[index][1],
                                 positions_vBvvB[index][0],
@@ -181,13 +184,11 @@ class readCoREAS:
                             )
                         )
                         t_event_structure = time.time()
-                        observer = corsika['CoREAS']['observers'].get(key)
-
-                        station = NuRadioReco.framework.station.Station(station_id)
-                        channel_ids = detector.get_channel_ids(station_id)
-                        sim_station = coreas.make_sim_station(station_id, corsika, observer, channel_ids)
-                        station.set_sim_station(sim_station)
-                        evt.set_station(station)
+                        sim_station = coreas.make_sim_station_from_efield(
+                            station_id, corsika, efields[index], trace_start_times[index], sampling_rate,
+                            channel_ids[station_id])
+                    station.set_sim_station(sim_station)
+                    evt.set_station(station)
                 if(output_mode == 0):
                     self.__t += time.time() - t
                     yield evt
@@ -1,6 +1,8 @@
 import numpy as np
 import logging
 import glob
+import json
+import os
 
 from NuRadioReco.modules.base.module import register_run
 import NuRadioReco.modules.io.NuRadioRecoio
@@ -15,6 +17,16 @@ class channelMeasuredNoiseAdder:
     The waveforms from the channels in the noise files need to be at least as long as the
     waveforms to which the noise is added, so it is recommended to cut them to the right size
     first, for example using the channelLengthAdjuster.
+
+    Reading and checking the noise events is slow. For large simulations, the suitable noise
+    traces can be extracted once with `create_noise_bank`. The resulting noise bank is passed
+    to `begin` and the noise traces are drawn directly from it (memory mapped)::
+
+        noise_adder.begin(filenames=noise_files)
+        noise_adder.create_noise_bank("noise_bank.npy", station_id=11, channel_ids=range(24),
+                                      sampling_rate=3.2 * units.GHz, n_samples=2048)
+
+        noise_adder.begin(noise_bank="noise_bank.npy")
     """
     def __init__(self):
         self.__filenames = None
@@ -23,13 +35,15 @@ class channelMeasuredNoiseAdder:
         self.__max_iterations = None
         self.logger = logging.getLogger('NuRadioReco.channelMeasuredNoiseAdder')
         self.__noise_data = None
+        self.__noise_bank = None
+        self.__noise_bank_info = None
 
 
     def begin(self, filenames=None, folder=None, file_pattern="*", 
               random_seed=None, max_iterations=100, debug=False, 
               draw_noise_statistics=False, channel_mapping=None, log_level=logging.WARNING, 
               restrict_station_id=True, station_id=None, allow_noise_resampling=False, 
-              baseline_substraction=True, allowed_triggers=["FORCE"]):
+              baseline_substraction=True, allowed_triggers=["FORCE"], noise_bank=None):
         """
         Set up module parameters
 
@@ -84,22 +98,37 @@ class channelMeasuredNoiseAdder:
             
         allowed_triggers: list(str)
             List of trigger names which should be used, events with other triggers are not used. (Default: ["FORCE"])
+
+        noise_bank: str or None
+            Path to a noise bank created with `create_noise_bank`. If given, the noise traces are drawn from
+            the noise bank and "filenames" and "folder" are ignored. (Default: None)
         """
         
         self.logger.setLevel(log_level)
-        
-        self.__filenames = filenames
-        if self.__filenames is None:
+
+        self.__noise_bank = None
+        self.__noise_bank_info = None
+        if noise_bank is not None:
+            self.__noise_bank = np.load(noise_bank, mmap_mode='r')
+            with open(os.path.splitext(noise_bank)[0] + ".json") as f:
+                self.__noise_bank_info = json.load(f)
+            self.__noise_bank_info["channel_index"] = {
+                channel_id: idx for idx, channel_id in enumerate(self.__noise_bank_info["channel_ids"])}
+            self.logger.info(f"Read noise bank with {len(self.__noise_bank)} events ...")
+
+        elif filenames is None:
             if folder is None:
                 err = "Both, \"filenames\" and \"folder\" are None, you have to specify at least one ..."
                 self.logger.error(err)
                 raise ValueError(err)
                 
-            self.__filenames = glob.glob(f"{folder}/**/{file_pattern}.nur", recursive=True)
-            
-        self.logger.info(f"Found {len(self.__filenames)} noise file(s) ...")
-        
-        self.__io = NuRadioReco.modules.io.NuRadioRecoio.NuRadioRecoio(self.__filenames)
+            filenames = glob.glob(f"{folder}/**/{file_pattern}.nur", recursive=True)
+
+        self.__filenames = filenames
+        if self.__filenames is not None:
+            self.logger.info(f"Found {len(self.__filenames)} noise file(s) ...")
+            self.__io = NuRadioReco.modules.io.NuRadioRecoio.NuRadioRecoio(self.__filenames)
+
         self.__random_state = np.random.Generator(np.random.Philox(random_seed))
         self.__max_iterations = max_iterations
         
@@ -114,7 +143,8 @@ class channelMeasuredNoiseAdder:
 
         if debug:
             self.logger.setLevel(logging.DEBUG)
-            self.logger.debug('Reading noise from {} files containing {} events'.format(len(filenames), self.__io.get_n_events()))
+            if self.__noise_bank is None:
+                self.logger.debug('Reading noise from {} files containing {} events'.format(len(filenames), self.__io.get_n_events()))
         
         if draw_noise_statistics:
             self.__noise_data = []
@@ -138,30 +168,38 @@ class channelMeasuredNoiseAdder:
         station: station object
         det: detector description
         """
-        noise_station = None
-        
-        for _ in range(self.__max_iterations):
-            noise_station = self.get_noise_station(station)
-            # Get random station from noise file. If we got a suitable station, we continue,
-            # otherwise we try again
-            if noise_station is not None:
-                break
-        
-        # To avoid infinite loops, if no suitable noise station was found after a number of iterations we raise an error
-        if noise_station is None:
-            raise ValueError('Could not find suitable noise event in noise files after {} iterations'.format(self.__max_iterations))
-        
+        if self.__noise_bank is not None:
+            noise_traces = self.get_noise_traces_from_bank(station)
+            resampled = False
+        else:
+            noise_station = None
+
+            for _ in range(self.__max_iterations):
+                noise_station = self.get_noise_station(station)
+                # Get random station from noise file. If we got a suitable station, we continue,
+                # otherwise we try again
+                if noise_station is not None:
+                    break
+
+            # To avoid infinite loops, if no suitable noise station was found after a number of iterations we raise an error
+            if noise_station is None:
+                raise ValueError('Could not find suitable noise event in noise files after {} iterations'.format(self.__max_iterations))
+
+            noise_traces = {}
+            for channel in station.iter_channels():
+                noise_channel = noise_station.get_channel(self.__get_noise_channel(channel.get_id()))
+
+                # if resampling is not desired no channel with wrong sampling rate is selected in get_noise_station()
+                resampled = False
+                if noise_channel.get_sampling_rate() != channel.get_sampling_rate():
+                    noise_channel.resample(channel.get_sampling_rate())
+                    resampled = True
+
+                noise_traces[channel.get_id()] = noise_channel.get_trace()
+
         for channel in station.iter_channels():
-            noise_channel = noise_station.get_channel(self.__get_noise_channel(channel.get_id()))
             channel_trace = channel.get_trace()
-            
-            # if resampling is not desired no channel with wrong sampling rate is selected in get_noise_station()
-            resampled = False
-            if noise_channel.get_sampling_rate() != channel.get_sampling_rate():
-                noise_channel.resample(channel.get_sampling_rate())
-                resampled = True
-            
-            noise_trace = noise_channel.get_trace()
+            noise_trace = noise_traces[channel.get_id()]
             
             if self.__baseline_substraction:
                 mean = noise_trace.mean()
@@ -184,6 +222,7 @@ class channelMeasuredNoiseAdder:
                 pass
 
             channel_trace += noise_trace
+            channel.set_trace(channel_trace, channel.get_sampling_rate())
 
             # if draw_noise_statistics == True
             if self.__noise_data is not None:
@@ -219,14 +258,8 @@ class channelMeasuredNoiseAdder:
             # If __noise_station_id == None get first station stored in event
             noise_station = noise_event.get_station(self.__noise_station_id)
 
-        for trigger_name in noise_station.get_triggers():
-            if trigger_name in self._allowed_triggers:
-                continue
-            
-            trigger = noise_station.get_trigger(trigger_name)
-            if trigger.has_triggered():
-                self.logger.debug(f'Noise station has triggered ({trigger_name}), reject noise event.')
-                return None
+        if self.__has_triggered(noise_station):
+            return None
         
         for channel_id in station.get_channel_ids():
             noise_channel_id = self.__get_noise_channel(channel_id)
@@ -252,6 +285,147 @@ class channelMeasuredNoiseAdder:
         return noise_station
 
 
+    def __has_triggered(self, noise_station):
+        """ Returns True if any trigger of the noise station, which is not in the allowed triggers, has triggered """
+        for trigger_name in noise_station.get_triggers():
+            if trigger_name in self._allowed_triggers:
+                continue
+
+            trigger = noise_station.get_trigger(trigger_name)
+            if trigger.has_triggered():
+                self.logger.debug(f'Noise station has triggered ({trigger_name}), reject noise event.')
+                return True
+
+        return False
+
+    def get_noise_traces_from_bank(self, station):
+        """
+        Returns the noise traces of a random event from the noise bank for all channels of the station
+
+        Parameters
+        ----------
+        station: Station class
+            The station to which the noise shall be added
+
+        Returns
+        -------
+        noise_traces: dict
+            The noise trace (copied from the noise bank) for each channel id of the station
+        """
+        info = self.__noise_bank_info
+        # a noise bank without station id contains noise of different stations, it can not be restricted
+        if self.__restrict_station_id and info["station_id"] is not None and station.get_id() != info["station_id"]:
+            err = f"The noise bank contains noise of station {info['station_id']}, not of station {station.get_id()}."
+            self.logger.error(err)
+            raise ValueError(err)
+
+        noise_event = self.__noise_bank[self.__random_state.integers(0, len(self.__noise_bank))]
+
+        noise_traces = {}
+        for channel in station.iter_channels():
+            noise_channel_id = self.__get_noise_channel(channel.get_id())
+            if noise_channel_id not in info["channel_index"]:
+                err = f"Channel {noise_channel_id} is not contained in the noise bank."
+                self.logger.error(err)
+                raise ValueError(err)
+
+            if channel.get_sampling_rate() != info["sampling_rate"]:
+                err = (f"The noise bank has a sampling rate of {info['sampling_rate'] / units.GHz:.2f}GHz, "
+                       f"channel {channel.get_id()} has {channel.get_sampling_rate() / units.GHz:.2f}GHz.")
+                self.logger.error(err)
+                raise ValueError(err)
+
+            noise_traces[channel.get_id()] = np.array(noise_event[info["channel_index"][noise_channel_id]], dtype=float)
+
+        return noise_traces
+
+    def create_noise_bank(self, filename, station_id, channel_ids, sampling_rate, n_samples, dtype=np.float64):
+        """
+        Scans all events of the noise files (specified in `begin`) once and stores the noise traces of all
+        suitable stations in a numpy file of shape (n_events, n_channels, n_samples) which can be
+        memory mapped, see the `noise_bank` argument of `begin`. Some meta data is stored in a json file
+        next to it (same name but with the extension ".json").
+
+        A station is suitable if it has no trigger (besides the allowed triggers) that has triggered and
+        contains all requested channels. The traces are resampled to `sampling_rate` and clipped to
+        `n_samples`, traces which are shorter are rejected. Note that the baseline subtraction in `run`
+        then only uses the stored samples, i.e., the noise is identical to the noise drawn from the
+        noise files if `n_samples` is the length of the noise traces.
+
+        Parameters
+        ----------
+        filename: str
+            Path of the noise bank (should end with ".npy")
+        station_id: int or None
+            The station id of the noise stations. If None, the first station of each event is used
+            and the noise of this bank is added to any station, regardless of `restrict_station_id`.
+        channel_ids: list of int
+            The (noise) channel ids which are stored
+        sampling_rate: float
+            The sampling rate of the stored noise traces
+        n_samples: int
+            The number of samples of the stored noise traces
+        dtype: numpy dtype
+            The data type of the stored traces. (Default: np.float64)
+
+        Returns
+        -------
+        n_events: int
+            The number of events in the noise bank
+        """
+        channel_ids = [int(channel_id) for channel_id in channel_ids]
+        n_max = self.__io.get_n_events()
+
+        # the number of suitable events is not known in advance, the events are written to a
+        # temporary file first which is large enough to hold all events
+        tmp_filename = filename + ".tmp"
+        tmp_bank = np.lib.format.open_memmap(
+            tmp_filename, mode='w+', dtype=dtype, shape=(n_max, len(channel_ids), n_samples))
+
+        n_events = 0
+        for event in self.__io.get_events():
+            if station_id is not None and station_id not in event.get_station_ids():
+                continue
+
+            noise_station = event.get_station(station_id)
+            if self.__has_triggered(noise_station):
+                continue
+
+            if not set(channel_ids).issubset(noise_station.get_channel_ids()):
+                self.logger.debug(f'Event {event.get_id()}: Not all requested channels found.')
+                continue
+
+            traces = []
+            for channel_id in channel_ids:
+                noise_channel = noise_station.get_channel(channel_id)
+                if noise_channel.get_sampling_rate() != sampling_rate:
+                    noise_channel.resample(sampling_rate)
+                traces.append(noise_channel.get_trace())
+
+            if min(len(trace) for trace in traces) < n_samples:
+                self.logger.debug(f'Event {event.get_id()}: Noise traces are too short.')
+                continue
+
+            for idx, trace in enumerate(traces):
+                tmp_bank[n_events, idx] = trace[:n_samples]
+            n_events += 1
+
+        bank = np.lib.format.open_memmap(
+            filename, mode='w+', dtype=dtype, shape=(n_events, len(channel_ids), n_samples))
+        bank[:] = tmp_bank[:n_events]
+        bank.flush()
+        del bank, tmp_bank
+        os.remove(tmp_filename)
+
+        with open(os.path.splitext(filename)[0] + ".json", "w") as f:
+            json.dump({
+                "station_id": station_id, "channel_ids": channel_ids,
+                "sampling_rate": sampling_rate, "n_samples": n_samples,
+                "filenames": list(self.__filenames)}, f)
+
+        self.logger.info(f"Stored {n_events} of {n_max} noise events in {filename}")
+        return n_events
+
     def end(self):
         """
         End method. Draws a histogram of the noise statistics and fits a
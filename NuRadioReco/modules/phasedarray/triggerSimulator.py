@@ -354,20 +354,22 @@ class triggerSimulator:
 
         logger.debug(f"trigger channels: {triggered_channels}")
 
+        # digitise all channels with the same ADC settings at once
+        digital_traces, adc_sampling_frequencies = ADC.get_digital_traces(station, det,
+                                                                          channel_ids=triggered_channels,
+                                                                          Vrms=Vrms,
+                                                                          trigger_adc=trigger_adc,
+                                                                          clock_offset=clock_offset,
+                                                                          adc_type='perfect_floor_comparator',
+                                                                          adc_output=adc_output,
+                                                                          trigger_filter=None)
+
         traces = {}
         for channel in station.iter_channels(use_channels=triggered_channels):
             channel_id = channel.get_id()
 
-            trace = np.array(channel.get_trace())
-
-            trace, adc_sampling_frequency = ADC.get_digital_trace(station, det, channel,
-                                                                  Vrms=Vrms,
-                                                                  trigger_adc=trigger_adc,
-                                                                  clock_offset=clock_offset,
-                                                                  return_sampling_frequency=True,
-                                                                  adc_type='perfect_floor_comparator',
-                                                                  adc_output=adc_output,
-                                                                  trigger_filter=None)
+            trace = digital_traces[channel_id]
+            adc_sampling_frequency = adc_sampling_frequencies[channel_id]
 
             # Upsampling here, linear interpolate to mimic an FPGA internal upsampling
             if not isinstance(upsampling_factor, int):
@@ -8,18 +8,54 @@ import logging
 logger = logging.getLogger('HighLowTriggerSimulator')
 
 
+def get_coincidence_window_sum(tts, n_bins_coincidence):
+    """
+    calculates the sum over a sliding coincidence window for all traces at once
+
+    The value in bin i is the sum of the bins i - n_bins_coincidence + 1 ... i (i.e., the window
+    extends into the past). This is equivalent to ``np.convolve(tt, np.ones(n_bins_coincidence), mode='full')``
+    truncated to the length of the trace but is computed via a cumulative sum along the last axis.
+
+    Parameters
+    ----------
+    tts: array of bools or floats
+        the trace(s), can have an arbitrary shape, the window is computed along the last axis
+    n_bins_coincidence: int
+        the length of the coincidence window in bins
+
+    Returns
+    -------
+    window_sum: array of ints or floats
+        the sum over the coincidence window, same shape as `tts`
+    """
+    tts = np.asarray(tts)
+    if tts.dtype == bool:
+        window_sum = np.cumsum(tts, axis=-1, dtype=int)
+    else:
+        window_sum = np.cumsum(tts, axis=-1)
+    if n_bins_coincidence < tts.shape[-1]:
+        window_sum[..., n_bins_coincidence:] -= window_sum[..., :-n_bins_coincidence].copy()
+    return window_sum
+
+
 def get_high_low_triggers(trace, high_threshold, low_threshold,
                           time_coincidence=5 * units.ns, dt=1 * units.ns):
     """
     calculats a high low trigger in a time coincidence window
 
+    Multiple channels can be evaluated at once by passing a stacked array of
+    shape (n_channels, n_samples). The thresholds are broadcasted against all but the last axis of
+    `trace`, i.e., they can be given per channel as arrays of shape (n_channels,). To evaluate many pairs
+    of thresholds in one pass (e.g. for a threshold scan), pass ``trace[np.newaxis]`` and thresholds
+    of shape (n_thresholds, 1) or (n_thresholds, n_channels).
+
     Parameters
     ----------
     trace: array of floats
-        the signal trace
-    high_threshold: float
+        the signal trace, or a stacked array of traces with the time axis as last axis
+    high_threshold: float or array of floats
         the high threshold
-    low_threshold: float
+    low_threshold: float or array of floats
         the low threshold
     time_coincidence: float
         the time coincidence window between a high + low
@@ -31,14 +67,16 @@ def get_high_low_triggers(trace, high_threshold, low_threshold,
     triggered bins: array of bools
         the bins where the trigger condition is satisfied
     """
+    trace = np.asarray(trace)
     n_bins_coincidence = int(np.round(time_coincidence / dt)) + 1
-    c = np.ones(n_bins_coincidence, dtype=bool)
-    logger.debug("length of trace {} bins, coincidence window {} bins".format(len(trace), len(c)))
+    logger.debug("length of trace {} bins, coincidence window {} bins".format(trace.shape[-1], n_bins_coincidence))
 
-    c2 = np.array([1, -1])
-    m1 = np.convolve(trace > high_threshold, c, mode='full')[:-(n_bins_coincidence - 1)]
-    m2 = np.convolve(trace < low_threshold, c, mode='full')[:-(n_bins_coincidence - 1)]
-    return np.convolve(m1 & m2, c2, mode='same') > 0
+    m1 = get_coincidence_window_sum(trace > np.asarray(high_threshold)[..., np.newaxis], n_bins_coincidence) > 0
+    m2 = get_coincidence_window_sum(trace < np.asarray(low_threshold)[..., np.newaxis], n_bins_coincidence) > 0
+    # only the first bin of each period in which the high-low condition is fulfilled counts as a trigger
+    m = m1 & m2
+    m[..., 1:] &= ~m[..., :-1].copy()
+    return m
 
 
 def get_majority_logic(tts, number_of_coincidences=2, time_coincidence=32 * units.ns, dt=1 * units.ns):
@@ -48,7 +86,8 @@ def get_majority_logic(tts, number_of_coincidences=2, time_coincidence=32 * unit
     Parameters
     ----------
     tts: array/list of array of bools
-        an array of bools that indicate a single channel trigger per channel
+        an array of bools that indicate a single channel trigger per channel,
+        i.e., a stacked array of shape (n_channels, n_samples)
     number_of_coincidences: int (default: 2)
         the number of coincidences between channels
     time_coincidence: float
@@ -65,20 +104,84 @@ def get_majority_logic(tts, number_of_coincidences=2, time_coincidence=32 * unit
     triggered_times: array of floats
         the trigger times
     """
-    n = len(tts[0])
+    tts = np.asarray(tts)
+    n_coincidences = get_majority_logic_coincidences(tts, time_coincidence, dt)
+    triggered_bins = np.flatnonzero(n_coincidences >= number_of_coincidences)
+    return len(triggered_bins) > 0, triggered_bins, triggered_bins * dt
+
+
+def get_majority_logic_coincidences(tts, time_coincidence=32 * units.ns, dt=1 * units.ns):
+    """
+    calculates the number of channels in coincidence for each bin
+
+    Parameters
+    ----------
+    tts: array of bools
+        the single channel triggers, array of shape (..., n_channels, n_samples). Additional leading
+        axes (e.g. for different thresholds) are evaluated in the same pass.
+    time_coincidence: float
+        the time coincidence window between channels
+    dt: float
+        the width of a time bin (inverse of sampling rate)
+
+    Returns
+    -------
+    n_coincidences: array
+        the number of channels in coincidence, array of shape (..., n_samples)
+    """
+    tts = np.asarray(tts)
+    n = tts.shape[-1]
     n_bins_coincidence = int(np.round(time_coincidence / dt)) + 1
     if(n_bins_coincidence > n):  # reduce coincidence window to maximum trace length
         n_bins_coincidence = n
         logger.debug("specified coincidence window longer than tracelenght, reducing coincidence window to trace length")
-    c = np.ones(n_bins_coincidence, dtype=bool)
+    logger.debug("get_majority_logic() length of trace {} bins, coincidence window {} bins".format(n, n_bins_coincidence))
+
+    window_sum = get_coincidence_window_sum(tts, n_bins_coincidence)
+    if tts.dtype == bool:
+        window_sum = window_sum > 0
+    return np.sum(window_sum, axis=-2)
+
+
+def get_high_low_threshold_scan(traces, thresholds_high, thresholds_low,
+                                high_low_window=5 * units.ns, coinc_window=200 * units.ns,
+                                number_concidences=2, dt=1 * units.ns):
+    """
+    evaluates the station level high/low trigger for many pairs of thresholds in one pass
 
-    for i in range(len(tts)):
-        logger.debug("get_majority_logic() length of trace {} bins, coincidence window {} bins".format(len(tts[i]), len(c)))
-        tts[i] = np.convolve(tts[i], c, mode='full')[:-(n_bins_coincidence - 1)]
-    tts = np.sum(tts, axis=0)
-    ttt = tts >= number_of_coincidences
-    triggered_bins = np.atleast_1d(np.squeeze(np.argwhere(tts >= number_of_coincidences)))
-    return np.any(ttt), triggered_bins, triggered_bins * dt
+    Parameters
+    ----------
+    traces: 2D array of floats
+        the stacked traces of all channels that are triggered on, shape (n_channels, n_samples)
+    thresholds_high: array of floats
+        the high thresholds, shape (n_thresholds,) or (n_thresholds, n_channels)
+    thresholds_low: array of floats
+        the low thresholds, shape (n_thresholds,) or (n_thresholds, n_channels)
+    high_low_window: float
+        time window in which a high+low crossing needs to occur to trigger a channel
+    coinc_window: float
+        time window in which number_concidences channels need to trigger
+    number_concidences: int
+        number of channels that are requried in coincidence to trigger a station
+    dt: float
+        the width of a time bin (inverse of sampling rate)
+
+    Returns
+    -------
+    triggered: array of bools
+        True for each pair of thresholds for which the station triggered, shape (n_thresholds,)
+    """
+    traces = np.asarray(traces)
+    thresholds_high = np.asarray(thresholds_high, dtype=float)
+    thresholds_low = np.asarray(thresholds_low, dtype=float)
+    if thresholds_high.ndim == 1:
+        thresholds_high = thresholds_high[:, np.newaxis]
+    if thresholds_low.ndim == 1:
+        thresholds_low = thresholds_low[:, np.newaxis]
+    triggered_bins = get_high_low_triggers(traces[np.newaxis], thresholds_high, thresholds_low,
+                                           high_low_window, dt)
+    n_coincidences = get_majority_logic_coincidences(triggered_bins, coinc_window, dt)
+    return np.any(n_coincidences >= number_concidences, axis=-1)
 
 
 class triggerSimulator:
@@ -142,7 +245,6 @@ class triggerSimulator:
         sampling_rate = station.get_channel(station.get_channel_ids()[0]).get_sampling_rate()
         channels_that_passed_trigger = []
         if not set_not_triggered:
-            triggerd_bins_channels = []
             dt = 1. / sampling_rate
             if triggered_channels is None:
                 for channel in station.iter_channels():
@@ -150,27 +252,30 @@ class triggerSimulator:
                     break
             else:
                 channel_trace_start_time = station.get_channel(triggered_channels[0]).get_trace_start_time()
+            channel_ids = []
+            traces = []
             for channel in station.iter_channels():
                 channel_id = channel.get_id()
                 if triggered_channels is not None and channel_id not in triggered_channels:
                     continue
                 if channel.get_trace_start_time() != channel_trace_start_time:
                     logger.warning('Channel has a trace_start_time that differs from the other channels. The trigger simulator may not work properly')
-                trace = channel.get_trace()
-                if(isinstance(threshold_high, dict)):
-                    threshold_high_tmp = threshold_high[channel_id]
-                else:
-                    threshold_high_tmp = threshold_high
-                if(isinstance(threshold_low, dict)):
-                    threshold_low_tmp = threshold_low[channel_id]
-                else:
-                    threshold_low_tmp = threshold_low
-                triggerd_bins = get_high_low_triggers(trace, threshold_high_tmp, threshold_low_tmp,
-                                                      high_low_window, dt)
-                if True in triggerd_bins:
-                    channels_that_passed_trigger.append(channel.get_id())
-                triggerd_bins_channels.append(triggerd_bins)
-                logger.debug("channel {}, len(triggerd_bins) = {}".format(channel_id, len(triggerd_bins)))
+                channel_ids.append(channel_id)
+                traces.append(channel.get_trace())
+            if(isinstance(threshold_high, dict)):
+                threshold_high_tmp = np.array([threshold_high[channel_id] for channel_id in channel_ids])
+            else:
+                threshold_high_tmp = threshold_high
+            if(isinstance(threshold_low, dict)):
+                threshold_low_tmp = np.array([threshold_low[channel_id] for channel_id in channel_ids])
+            else:
+                threshold_low_tmp = threshold_low
+            # evaluate all channels at once
+            triggerd_bins_channels = get_high_low_triggers(np.array(traces), threshold_high_tmp, threshold_low_tmp,
+                                                           high_low_window, dt)
+            for channel_id, triggerd_bins in zip(channel_ids, triggerd_bins_channels):
+                if np.any(triggerd_bins):
+                    channels_that_passed_trigger.append(channel_id)
 
             has_triggered, triggered_bins, triggered_times = get_majority_logic(
                 triggerd_bins_channels, number_concidences, coinc_window, dt)
@@ -15,17 +15,18 @@ def get_threshold_triggers(trace, threshold):
     Parameters
     ----------
     trace: array of floats
-        the signal trace
-    threshold: float
-        the threshold
-    
+        the signal trace, or a stacked array of traces of shape (n_channels, n_samples)
+    threshold: float or array of floats
+        the threshold, is broadcasted against all but the last axis of `trace`, i.e.,
+        a different threshold per channel can be given as an array of shape (n_channels,)
+
     Returns
     -------
     triggered bins: array of bools
         the bins where the trigger condition is satisfied
     """
 
-    return np.abs(trace) >= threshold
+    return np.abs(trace) >= np.asarray(threshold)[..., np.newaxis]
 
 
 class triggerSimulator:
@@ -75,7 +76,6 @@ class triggerSimulator:
 
         sampling_rate = station.get_channel(station.get_channel_ids()[0]).get_sampling_rate()
         dt = 1. / sampling_rate
-        triggerd_bins_channels = []
         if triggered_channels is None:
             for channel in station.iter_channels():
                 channel_trace_start_time = channel.get_trace_start_time()
@@ -83,6 +83,8 @@ class triggerSimulator:
         else:
             channel_trace_start_time = station.get_channel(triggered_channels[0]).get_trace_start_time()
         channels_that_passed_trigger = []
+        channel_ids = []
+        traces = []
         for channel in station.iter_channels():
             channel_id = channel.get_id()
             if triggered_channels is not None and channel_id not in triggered_channels:
@@ -90,15 +92,17 @@ class triggerSimulator:
                 continue
             if channel.get_trace_start_time() != channel_trace_start_time:
                 self.logger.warning('Channel has a trace_start_time that differs from the other channels. The trigger simulator may not work properly')
-            trace = channel.get_trace()
-            if(isinstance(threshold, dict)):
-                threshold_tmp = threshold[channel_id]
-            else:
-                threshold_tmp = threshold
-            triggerd_bins = get_threshold_triggers(trace, threshold_tmp)
-            triggerd_bins_channels.append(triggerd_bins)
-            if True in triggerd_bins:
-                channels_that_passed_trigger.append(channel.get_id())
+            channel_ids.append(channel_id)
+            traces.append(channel.get_trace())
+        if(isinstance(threshold, dict)):
+            threshold_tmp = np.array([threshold[channel_id] for channel_id in channel_ids])
+        else:
+            threshold_tmp = threshold
+        # evaluate all channels at once
+        triggerd_bins_channels = get_threshold_triggers(np.array(traces), threshold_tmp)
+        for channel_id, triggerd_bins in zip(channel_ids, triggerd_bins_channels):
+            if np.any(triggerd_bins):
+                channels_that_passed_trigger.append(channel_id)
 
         has_triggered, triggered_bins, triggered_times = get_majority_logic(
             triggerd_bins_channels, number_concidences, coinc_window, dt)
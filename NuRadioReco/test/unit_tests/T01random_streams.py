@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Checks that the random number streams of NuRadioReco.utilities.random_streams only depend on the seed
+and on their key, but not on which other streams were created or used before.
+"""
+import numpy as np
+from numpy import testing
+from NuRadioReco.utilities.random_streams import RandomStreams
+
+seed = 1234
+keys = [(0, 101, 'signal'), (0, 101, 'channelGenericNoiseAdder'), (0, 102, 'signal'),
+        (7, 101, 'signal'), (7, 101, 'channelGenericNoiseAdder'), (2 ** 40, 13, 'some_module')]
+
+# reference: every stream is drawn from a freshly created RandomStreams object
+reference = {}
+for key in keys:
+    reference[key] = RandomStreams(seed).get_generator(*key).normal(size=100)
+
+# the streams have to be independent of each other
+for i, key in enumerate(keys):
+    for key2 in keys[i + 1:]:
+        assert not np.allclose(reference[key], reference[key2]), f"streams {key} and {key2} are identical"
+
+# the same streams in a different order, with other streams created and used in between
+random_streams = RandomStreams(seed)
+for i, key in enumerate(keys[::-1]):
+    random_streams.get_generator(i, 999, 'unrelated').normal(size=1000)
+    testing.assert_equal(random_streams.get_generator(*key).normal(size=100), reference[key])
+
+# asking for a stream twice gives two generators with the same random numbers
+testing.assert_equal(random_streams.get_generator(*keys[0]).normal(size=100), reference[keys[0]])
+
+# a different seed gives different streams
+assert not np.allclose(RandomStreams(seed + 1).get_generator(*keys[0]).normal(size=100), reference[keys[0]])
+
+# the derivation of the streams from the seed and the key must not change between versions,
+# otherwise existing simulations can not be reproduced
+testing.assert_allclose(RandomStreams(seed).get_generator(7, 101, 'channelGenericNoiseAdder').uniform(size=3),
+                        [0.5472029617248454, 0.1417156385997279, 0.00815388300093201], rtol=1e-14)
+
+# negative keys are not allowed
+try:
+    RandomStreams(seed).get_generator(-1, 101)
+except ValueError:
+    pass
+else:
+    raise AssertionError("a negative stream key did not raise a ValueError")
+
+print("random streams test passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Checks the analogToDigitalConverter: all channels of a station digitised at once with `get_digital_traces`
+have to agree with the single channels digitised with `get_digital_trace`, and both with reference traces.
+
+The reference traces were created with the implementation that digitised every channel on its own.
+Run with `--create-reference` to create new reference traces.
+"""
+import argparse
+import datetime
+import os
+import numpy as np
+from numpy import testing
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+from NuRadioReco.detector import detector
+from NuRadioReco.modules.analogToDigitalConverter import analogToDigitalConverter
+from NuRadioReco.utilities import units
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_adc.npz')
+
+sampling_rate = 5 * units.GHz
+n_samples = 1024
+Vrms = 0.1 * units.V
+
+# channels 0 and 1 have identical ADCs, the ADCs of channel 2 and 3 differ in the number of bits,
+# reference voltage, time delay and sampling frequency
+adc_settings = {
+    0: dict(adc_nbits=8, adc_noise_nbits=5, adc_reference_voltage=1., adc_sampling_frequency=1., adc_time_delay=None),
+    1: dict(adc_nbits=8, adc_noise_nbits=5, adc_reference_voltage=1., adc_sampling_frequency=1., adc_time_delay=None),
+    2: dict(adc_nbits=12, adc_noise_nbits=6, adc_reference_voltage=0.8, adc_sampling_frequency=1., adc_time_delay=0.3),
+    3: dict(adc_nbits=8, adc_noise_nbits=5, adc_reference_voltage=1., adc_sampling_frequency=2., adc_time_delay=None),
+}
+trigger_adc_settings = dict(trigger_adc_nbits=4, trigger_adc_noise_nbits=2, trigger_adc_reference_voltage=0.5,
+                            trigger_adc_sampling_frequency=0.5, trigger_adc_time_delay=None)
+
+frequencies = np.fft.rfftfreq(n_samples, 1. / sampling_rate)
+trigger_filter = 1. / (1. + (frequencies / (300 * units.MHz)) ** 8)
+
+# keyword arguments of the digitisation to test
+digitisation_settings = {
+    'default': dict(),
+    'ceiling': dict(adc_type='perfect_ceiling_comparator'),
+    'Vrms_counts': dict(Vrms=Vrms, adc_output='counts'),
+    'trigger_clock_offset': dict(trigger_adc=True, clock_offset=0.3),
+    'trigger_filter': dict(trigger_filter=trigger_filter),
+}
+
+
+def get_detector():
+    channels = {}
+    for channel_id, settings in adc_settings.items():
+        channels[str(channel_id)] = dict(station_id=1, channel_id=channel_id,
+                                         commission_time=datetime.datetime(2017, 11, 4),
+                                         decommission_time=datetime.datetime(2038, 1, 1),
+                                         **settings, **trigger_adc_settings)
+    stations = {'1': dict(station_id=1, pos_easting=0, pos_northing=0, pos_altitude=0, pos_site='greenland',
+                          commission_time=datetime.datetime(2017, 11, 4),
+                          decommission_time=datetime.datetime(2038, 1, 1))}
+    det = detector.Detector(source='dictionary', dictionary={'channels': channels, 'stations': stations})
+    det.update(datetime.datetime(2020, 1, 1))
+    return det
+
+
+def get_station():
+    rnd = np.random.default_rng(42)
+    station = NuRadioReco.framework.station.Station(1)
+    for channel_id in adc_settings:
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        trace = rnd.normal(0, Vrms, n_samples)
+        # add a pulse which saturates the ADCs
+        trace[300 + 20 * channel_id:310 + 20 * channel_id] += 1.5 * units.V * np.array([1, -1] * 5)
+        channel.set_trace(trace, sampling_rate)
+        station.add_channel(channel)
+    return station
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference traces')
+    args = parser.parse_args()
+
+    det = get_detector()
+    station = get_station()
+    adc = analogToDigitalConverter()
+
+    single_traces = {}
+    for name, kwargs in digitisation_settings.items():
+        for channel in station.iter_channels():
+            single_traces[f'{name}_{channel.get_id()}'] = adc.get_digital_trace(station, det, channel, **kwargs)
+
+    if args.create_reference:
+        np.savez(reference_file, **single_traces)
+        print(f"reference traces written to {reference_file}")
+    else:
+        reference = np.load(reference_file)
+        testing.assert_equal(sorted(reference.keys()), sorted(single_traces.keys()))
+        for key, trace in single_traces.items():
+            testing.assert_allclose(trace, reference[key], rtol=1e-12, atol=1e-12 * units.V, err_msg=key)
+
+        for name, kwargs in digitisation_settings.items():
+            digital_traces, adc_sampling_frequencies = adc.get_digital_traces(station, det, **kwargs)
+            testing.assert_equal(sorted(digital_traces.keys()), station.get_channel_ids())
+            for channel in station.iter_channels():
+                testing.assert_equal(digital_traces[channel.get_id()], single_traces[f'{name}_{channel.get_id()}'],
+                                     err_msg=f'{name}, channel {channel.get_id()}')
+                sampling_frequency_label = 'trigger_adc_sampling_frequency' if kwargs.get('trigger_adc') else 'adc_sampling_frequency'
+                expected_sampling_frequency = det.get_channel(1, channel.get_id())[sampling_frequency_label] * units.GHz
+                testing.assert_equal(adc_sampling_frequencies[channel.get_id()], expected_sampling_frequency)
+
+            # a subset of channels
+            digital_traces, _ = adc.get_digital_traces(station, det, channel_ids=[1, 3], **kwargs)
+            testing.assert_equal(sorted(digital_traces.keys()), [1, 3])
+            for channel_id in [1, 3]:
+                testing.assert_equal(digital_traces[channel_id], single_traces[f'{name}_{channel_id}'])
+
+        # ADC counts stored as small integers
+        digital_traces, _ = adc.get_digital_traces(station, det, Vrms=Vrms, adc_output='counts', adc_counts_dtype=np.int16)
+        for channel_id, trace in digital_traces.items():
+            assert trace.dtype == np.int16
+            testing.assert_equal(trace, single_traces[f'Vrms_counts_{channel_id}'])
+
+        print("ADC digitisation test passed")
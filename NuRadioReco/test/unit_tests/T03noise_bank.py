@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Checks the noise bank of the channelMeasuredNoiseAdder: `create_noise_bank` has to store exactly the suitable
+noise events, and the noise drawn from the noise bank (`begin(noise_bank=...)`) has to be identical to the
+noise drawn from the noise files.
+"""
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from numpy import testing
+import NuRadioReco.framework.event
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+import NuRadioReco.framework.trigger
+import NuRadioReco.modules.io.eventWriter
+from NuRadioReco.modules.measured_noise.channelMeasuredNoiseAdder import channelMeasuredNoiseAdder
+from NuRadioReco.utilities import units
+
+station_id = 11
+channel_ids = [0, 1, 2, 3]
+sampling_rate = 3.2 * units.GHz
+n_samples = 1024
+
+
+def create_noise_event(event_id, rnd, station_id=station_id, channel_ids=channel_ids, sampling_rate=sampling_rate,
+                       n_samples=n_samples, triggers={'FORCE': True}):
+    event = NuRadioReco.framework.event.Event(1, event_id)
+    station = NuRadioReco.framework.station.Station(station_id)
+    for channel_id in channel_ids:
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        channel.set_trace(rnd.normal(0, 10 * units.mV, n_samples), sampling_rate)
+        station.add_channel(channel)
+    for trigger_name, has_triggered in triggers.items():
+        trigger = NuRadioReco.framework.trigger.Trigger(trigger_name)
+        trigger.set_triggered(has_triggered)
+        station.set_trigger(trigger)
+    event.set_station(station)
+    return event
+
+
+def get_station(sampling_rate=sampling_rate):
+    """ a station without signal to which the noise is added """
+    station = NuRadioReco.framework.station.Station(station_id)
+    for channel_id in channel_ids:
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        channel.set_trace(np.zeros(n_samples), sampling_rate)
+        station.add_channel(channel)
+    return station
+
+
+def add_noise(noise_adder, n_draws):
+    """ returns the noise traces of `n_draws` runs of the noise adder, shape (n_draws, n_channels, n_samples) """
+    noise = []
+    for i in range(n_draws):
+        station = get_station()
+        noise_adder.run(NuRadioReco.framework.event.Event(1, i), station, None)
+        noise.append([station.get_channel(channel_id).get_trace() for channel_id in channel_ids])
+    return np.array(noise)
+
+
+tmp_dir = tempfile.mkdtemp()
+try:
+    rnd = np.random.default_rng(1)
+    events = [
+        create_noise_event(0, rnd),
+        create_noise_event(1, rnd, triggers={'FORCE': False, 'LT': True}),  # not a forced trigger
+        create_noise_event(2, rnd, channel_ids=[0, 1, 2]),  # channel 3 is missing
+        create_noise_event(3, rnd, sampling_rate=1.6 * units.GHz, n_samples=n_samples // 2),  # has to be resampled
+        create_noise_event(4, rnd, station_id=12),  # another station
+        create_noise_event(5, rnd),
+        create_noise_event(6, rnd, triggers={}),
+    ]
+    suitable_events = [0, 3, 5, 6]
+
+    noise_file = os.path.join(tmp_dir, 'noise.nur')
+    eventWriter = NuRadioReco.modules.io.eventWriter.eventWriter()
+    eventWriter.begin(noise_file)
+    for event in events:
+        eventWriter.run(event)
+    eventWriter.end()
+
+    # the noise bank has to contain the (resampled) traces of the suitable events
+    noise_bank_file = os.path.join(tmp_dir, 'noise_bank.npy')
+    noise_adder = channelMeasuredNoiseAdder()
+    noise_adder.begin(filenames=[noise_file])
+    n_events = noise_adder.create_noise_bank(noise_bank_file, station_id, channel_ids, sampling_rate, n_samples)
+    assert n_events == len(suitable_events)
+
+    bank = np.load(noise_bank_file)
+    testing.assert_equal(bank.shape, (len(suitable_events), len(channel_ids), n_samples))
+    for i, event_id in enumerate(suitable_events):
+        noise_station = events[event_id].get_station(station_id)
+        for j, channel_id in enumerate(channel_ids):
+            channel = noise_station.get_channel(channel_id)
+            if channel.get_sampling_rate() != sampling_rate:
+                channel.resample(sampling_rate)
+            testing.assert_allclose(bank[i, j], channel.get_trace(), rtol=1e-12, atol=1e-12 * units.mV)
+
+    with open(os.path.join(tmp_dir, 'noise_bank.json')) as f:
+        info = json.load(f)
+    assert info['station_id'] == station_id and info['channel_ids'] == channel_ids
+    assert info['sampling_rate'] == sampling_rate and info['n_samples'] == n_samples
+    assert not os.path.exists(noise_bank_file + ".tmp")
+
+    # the noise drawn from the files and from the noise bank has to be from the same suitable events
+    n_draws = 40
+    noise_adder_files = channelMeasuredNoiseAdder()
+    noise_adder_files.begin(filenames=[noise_file], random_seed=10, allow_noise_resampling=True)
+    noise_files = add_noise(noise_adder_files, n_draws)
+
+    noise_adder_bank = channelMeasuredNoiseAdder()
+    noise_adder_bank.begin(noise_bank=noise_bank_file, random_seed=10)
+    noise_bank = add_noise(noise_adder_bank, n_draws)
+
+    expected_noise = bank - bank.mean(axis=-1, keepdims=True)  # baseline subtraction
+    for noise in [noise_files, noise_bank]:
+        for traces in noise:
+            differences = np.max(np.abs(expected_noise - traces[None]), axis=(1, 2))
+            assert np.min(differences) < 1e-9 * units.mV, "the added noise is not from a suitable noise event"
+
+    # all suitable events are used
+    for noise in [noise_files, noise_bank]:
+        used_events = {np.argmin(np.max(np.abs(expected_noise - traces[None]), axis=(1, 2))) for traces in noise}
+        assert used_events == set(range(len(suitable_events)))
+
+    # the noise bank has to be read-only, drawing noise must not change it
+    testing.assert_equal(np.load(noise_bank_file), bank)
+
+    # stations and sampling rates which do not match the noise bank are rejected
+    for station in [NuRadioReco.framework.station.Station(12), get_station(sampling_rate=2.4 * units.GHz)]:
+        if station.get_id() == 12:
+            station.add_channel(get_station().get_channel(0))
+        try:
+            noise_adder_bank.run(NuRadioReco.framework.event.Event(1, 0), station, None)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("noise from the noise bank was added to a station that does not match the noise bank")
+
+    # a noise bank without station id uses the first station of each event and is added to any station
+    noise_bank_file_any = os.path.join(tmp_dir, 'noise_bank_any_station.npy')
+    n_events = noise_adder.create_noise_bank(noise_bank_file_any, None, channel_ids, sampling_rate, n_samples)
+    suitable_events_any = [0, 3, 4, 5, 6]
+    assert n_events == len(suitable_events_any)
+    with open(os.path.join(tmp_dir, 'noise_bank_any_station.json')) as f:
+        assert json.load(f)['station_id'] is None
+    bank_any = np.load(noise_bank_file_any)
+    testing.assert_allclose(bank_any[[0, 1, 3, 4]], bank, rtol=1e-12, atol=1e-12 * units.mV)
+
+    noise_adder_any = channelMeasuredNoiseAdder()
+    noise_adder_any.begin(noise_bank=noise_bank_file_any, random_seed=10, restrict_station_id=True)
+    expected_noise = bank_any - bank_any.mean(axis=-1, keepdims=True)
+    for traces in add_noise(noise_adder_any, n_draws):
+        differences = np.max(np.abs(expected_noise - traces[None]), axis=(1, 2))
+        assert np.min(differences) < 1e-9 * units.mV, "the added noise is not from the noise bank"
+finally:
+    shutil.rmtree(tmp_dir)
+
+print("noise bank test passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Checks that the profiler only stops `tracemalloc` if it was started by the profiler and that
+modules whose run method is a generator are recorded once per iteration.
+"""
+import time
+import tracemalloc
+import NuRadioReco.detector.detector  # register_run compares the arguments with the detector classes
+from NuRadioReco.modules.base.module import register_run
+from NuRadioReco.utilities import profiling
+
+profiler = profiling.Profiler()
+
+# tracemalloc is started and stopped by the profiler
+assert not tracemalloc.is_tracing()
+profiler.enable(trace_allocations=True)
+assert tracemalloc.is_tracing()
+with profiler.span("allocation"):
+    data = [0] * 100000
+profiler.disable()
+assert not tracemalloc.is_tracing()
+assert profiler.get_statistics()["allocation"]["memory_delta"] > 0
+
+# tracemalloc was started by the user and is kept running
+tracemalloc.start()
+profiler.enable(trace_allocations=True)
+profiler.disable()
+assert tracemalloc.is_tracing()
+profiler.enable(trace_allocations=False)
+profiler.disable()
+assert tracemalloc.is_tracing()
+tracemalloc.stop()
+
+
+class readerModule:
+
+    @register_run()
+    def run(self, n_events, sleep):
+        for i in range(n_events):
+            time.sleep(sleep)
+            yield i
+
+
+class otherModule:
+
+    @register_run()
+    def run(self, sleep):
+        time.sleep(sleep)
+
+
+profiler = profiling.get_profiler()
+profiler.reset()
+profiler.enable()
+reader = readerModule()
+assert list(reader.run(5, 0.01)) == list(range(5))
+otherModule().run(0.01)
+# the reader stops after the second event
+for i in reader.run(5, 0.01):
+    if i == 1:
+        break
+profiler.disable()
+
+statistics = profiler.get_statistics()
+# every event and the end of the iteration are recorded
+assert statistics["readerModule.run"]["calls"] == 6 + 2
+assert statistics["readerModule.run"]["total_time"] >= 7 * 0.01
+assert statistics["readerModule.run"]["min_time"] < 0.01
+assert statistics["otherModule.run"]["calls"] == 1
+assert statistics["otherModule.run"]["total_time"] >= 0.01
+
+print("profiling test passed")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Checks the high/low and simple threshold triggers, which evaluate all channels at once, against
+reference results, and the threshold scan against evaluating every pair of thresholds on its own.
+
+The reference results were created with the implementation that evaluated every channel on its own.
+Run with `--create-reference` to create new reference results.
+"""
+import argparse
+import os
+import numpy as np
+from numpy import testing
+import NuRadioReco.framework.event
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+import NuRadioReco.detector.detector  # register_run compares the arguments with the detector classes
+from NuRadioReco.modules.trigger import highLowThreshold, simpleThreshold
+from NuRadioReco.utilities import units
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_threshold_triggers.npz')
+
+sampling_rate = 1 * units.GHz
+n_samples = 512
+channel_ids = [0, 1, 2, 3]
+
+# keyword arguments of the trigger modules to test
+high_low_settings = {
+    'default': dict(),
+    'two_channels': dict(threshold_high=40 * units.mV, threshold_low=-40 * units.mV, number_concidences=2),
+    'three_channels': dict(threshold_high=40 * units.mV, threshold_low=-40 * units.mV, number_concidences=3),
+    'per_channel': dict(threshold_high={0: 30 * units.mV, 1: 50 * units.mV, 2: 35 * units.mV, 3: 80 * units.mV},
+                        threshold_low={0: -30 * units.mV, 1: -50 * units.mV, 2: -35 * units.mV, 3: -80 * units.mV},
+                        number_concidences=1),
+    'subset': dict(threshold_high=30 * units.mV, threshold_low=-30 * units.mV, triggered_channels=[1, 3],
+                   high_low_window=10 * units.ns, coinc_window=30 * units.ns),
+}
+simple_threshold_settings = {
+    'default': dict(),
+    'two_channels': dict(threshold=45 * units.mV, number_concidences=2, coinc_window=50 * units.ns),
+    'per_channel': dict(threshold={0: 30 * units.mV, 1: 50 * units.mV, 2: 35 * units.mV, 3: 80 * units.mV},
+                        number_concidences=1),
+    'subset': dict(threshold=30 * units.mV, triggered_channels=[0, 2]),
+}
+
+
+def get_event(seed):
+    rnd = np.random.default_rng(seed)
+    event = NuRadioReco.framework.event.Event(1, seed)
+    station = NuRadioReco.framework.station.Station(1)
+    for channel_id in channel_ids:
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        trace = rnd.normal(0, 10 * units.mV, n_samples)
+        # bipolar pulses with random amplitudes and positions
+        for _ in range(2):
+            i_pulse = rnd.integers(20, n_samples - 20)
+            trace[i_pulse:i_pulse + 6] += rnd.uniform(0, 80 * units.mV) * np.array([1, 1, -1, -1, 1, -1])
+        channel.set_trace(trace, sampling_rate)
+        station.add_channel(channel)
+    event.set_station(station)
+    return event, station
+
+
+def get_trigger_results():
+    results = {}
+    high_low = highLowThreshold.triggerSimulator()
+    simple = simpleThreshold.triggerSimulator()
+    for seed in range(20):
+        event, station = get_event(seed)
+        for name, kwargs in high_low_settings.items():
+            high_low.run(event, station, None, trigger_name=f'high_low_{name}', **kwargs)
+        for name, kwargs in simple_threshold_settings.items():
+            simple.run(event, station, None, trigger_name=f'simple_{name}', **kwargs)
+        for trigger in station.get_triggers().values():
+            key = f'{trigger.get_name()}_{seed}'
+            results[key + '_triggered'] = trigger.has_triggered()
+            results[key + '_channels'] = np.array(trigger.get_triggered_channels(), dtype=int)
+            if trigger.has_triggered():
+                results[key + '_times'] = trigger.get_trigger_times()
+
+        traces = np.array([channel.get_trace() for channel in station.iter_channels()])
+        for channel_id, trace in zip(channel_ids, traces):
+            results[f'high_low_bins_{seed}_{channel_id}'] = highLowThreshold.get_high_low_triggers(
+                trace, 30 * units.mV, -30 * units.mV, 5 * units.ns, 1 / sampling_rate)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference results')
+    args = parser.parse_args()
+
+    results = get_trigger_results()
+    if args.create_reference:
+        np.savez(reference_file, **results)
+        print(f"reference results written to {reference_file}")
+    else:
+        reference = np.load(reference_file)
+        testing.assert_equal(sorted(reference.keys()), sorted(results.keys()))
+        for key, value in results.items():
+            testing.assert_allclose(value, reference[key], rtol=1e-12, err_msg=key)
+
+        # all channels at once
+        for seed in range(20):
+            event, station = get_event(seed)
+            traces = np.array([channel.get_trace() for channel in station.iter_channels()])
+            triggered_bins = highLowThreshold.get_high_low_triggers(traces, 30 * units.mV, -30 * units.mV,
+                                                                    5 * units.ns, 1 / sampling_rate)
+            for channel_id in channel_ids:
+                testing.assert_equal(triggered_bins[channel_id], results[f'high_low_bins_{seed}_{channel_id}'])
+
+            # threshold scan
+            thresholds = np.linspace(10, 90, 17) * units.mV
+            triggered = highLowThreshold.get_high_low_threshold_scan(traces, thresholds, -thresholds,
+                                                                     number_concidences=2)
+            for threshold, has_triggered in zip(thresholds, triggered):
+                bins = [highLowThreshold.get_high_low_triggers(trace, threshold, -threshold) for trace in traces]
+                assert highLowThreshold.get_majority_logic(bins, 2, 200 * units.ns)[0] == has_triggered
+
+        print("threshold trigger test passed")
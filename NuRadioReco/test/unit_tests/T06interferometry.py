@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Checks the interferometric beamforming for many targets at once: the time shifts have to agree with the
+effective refractivities of the table evaluated for every pair of target and observer, and the summed
+traces and signals with the beamforming of one target at a time.
+"""
+import numpy as np
+from numpy import testing
+from scipy import constants
+from radiotools.atmosphere import refractivity
+from NuRadioReco.utilities import interferometry, units
+
+rnd = np.random.default_rng(7)
+
+# star-shaped layout of observers at an altitude of 1.5km
+radii = np.repeat([50, 100, 200, 400], 8) * units.m
+angles = np.tile(np.arange(8) * np.pi / 4, 4)
+positions = np.array([radii * np.cos(angles), radii * np.sin(angles), np.full_like(radii, 1.5 * units.km)]).T
+
+# targets along shower axes with different zenith angles
+targets = []
+for zenith in np.deg2rad([20, 45, 60, 70, 80]):
+    axis = np.array([np.sin(zenith) * np.cos(0.3), np.sin(zenith) * np.sin(0.3), np.cos(zenith)])
+    for distance in np.linspace(2, 30, 8) * units.km:
+        targets.append(distance * axis + np.array([0, 0, 1.5 * units.km]) + rnd.normal(0, 20, 3) * units.m)
+targets = np.array(targets)
+
+# traces with a pulse
+n_samples = 256
+tstep = 0.5 * units.ns
+times = np.arange(n_samples)[None, :] * tstep + rnd.uniform(0, 20, len(positions))[:, None] * units.ns
+traces = rnd.normal(0, 1e-6, (len(positions), n_samples))
+traces[:, 100:104] += np.array([1, 3, -2, -1]) * 1e-5
+
+for curved in [False, True]:
+    tab = refractivity.RefractivityTable(atm_model=27, curved=curved, number_of_zenith_bins=50,
+                                         distance_increment=1000)
+
+    # every pair of target and observer on its own
+    tshifts = np.zeros((len(targets), len(positions)))
+    for i, target in enumerate(targets):
+        for j, position in enumerate(positions):
+            effective_refractivity = tab.get_refractivity_between_two_points_tabulated(target, position)
+            tshifts[i, j] = np.linalg.norm(target - position) * (effective_refractivity + 1) / constants.c * units.s
+
+    testing.assert_allclose(interferometry.get_time_shifts(targets, positions, tab), tshifts,
+                            rtol=0, atol=1e-9 * units.ns)
+    testing.assert_allclose(interferometry.get_time_shifts(targets[3], positions, tab), tshifts[3],
+                            rtol=0, atol=1e-9 * units.ns)
+
+    # small chunks to check that the targets are split up correctly
+    sum_traces, trace_lengths = interferometry.interfere_traces_interpolation_multiple_targets(
+        targets, positions, traces, times, tab, max_chunk_size=3 * len(positions) * n_samples)
+    for i, target in enumerate(targets):
+        sum_trace = interferometry.interfere_traces_interpolation(target, positions, traces, times, tab)
+        assert trace_lengths[i] == len(sum_trace)
+        testing.assert_allclose(sum_traces[i, :trace_lengths[i]], sum_trace, rtol=1e-12, atol=1e-18)
+        testing.assert_equal(sum_traces[i, trace_lengths[i]:], 0)
+
+    for kind in ["amplitude", "power", "hilbert_sum"]:
+        for window_width in [20 * units.ns, 1000 * units.ns]:
+            signals = interferometry.get_signals(sum_traces, trace_lengths, tstep, window_width, kind)
+            for i in range(len(targets)):
+                signal = interferometry.get_signal(sum_traces[i, :trace_lengths[i]], tstep, window_width, kind)
+                testing.assert_allclose(signals[i], signal, rtol=1e-12, err_msg=kind)
+
+print("interferometry test passed")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Checks the CoREAS simulation weights, which are calculated for all voronoi cells at once, and the
+conversion of the observer traces into electric fields against reference results. The observer traces
+are written to a synthetic CoREAS hdf5 file.
+
+The reference results were created with the implementation that calculated the area of every voronoi
+cell with its own convex hull and converted every observer on its own.
+Run with `--create-reference` to create new reference results.
+"""
+import argparse
+import os
+import tempfile
+import h5py
+import numpy as np
+from numpy import testing
+import radiotools.coordinatesystems
+from NuRadioReco.modules.io.coreas import coreas
+from NuRadioReco.utilities import units
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_coreas.npz')
+
+# (zenith, azimuth) of the synthetic showers
+shower_directions = [(0 * units.deg, 0 * units.deg), (25 * units.deg, 40 * units.deg),
+                     (50 * units.deg, 200 * units.deg), (70 * units.deg, 300 * units.deg)]
+n_samples = 128
+time_resolution = 2e-10  # in s
+
+
+def get_star_shape(zenith, azimuth, n_arms=8, n_rings=15, spacing=25 * units.m):
+    """ observer positions on ground, arranged on a star shape in the shower plane """
+    cs = radiotools.coordinatesystems.cstrafo(zenith=zenith, azimuth=azimuth, magnetic_field_vector=None,
+                                              site='summit')
+    radii = np.arange(1, n_rings + 1) * spacing
+    phis = np.arange(n_arms) * 2 * np.pi / n_arms
+    shower = np.zeros((n_rings * n_arms, 3))
+    shower[:, 0] = np.outer(radii, np.cos(phis)).flatten()
+    shower[:, 1] = np.outer(radii, np.sin(phis)).flatten()
+    ground = cs.transform_from_vxB_vxvxB_2D(shower)
+    return ground
+
+
+def write_coreas_file(filename, rnd, zenith, azimuth, n_observers=3):
+    """ writes a minimal CoREAS hdf5 file with random observer traces """
+    with h5py.File(filename, 'w') as f:
+        inputs = f.create_group('inputs')
+        inputs.attrs['THETAP'] = np.array([zenith / units.deg, zenith / units.deg])
+        inputs.attrs['PHIP'] = np.array([azimuth / units.deg, azimuth / units.deg])
+        inputs.attrs['MAGNET'] = np.array([16.7, -51.9])
+        inputs.attrs['ERANGE'] = np.array([1e8, 1e8])
+        corsika = f.create_group('CoREAS')
+        corsika.attrs['TimeResolution'] = time_resolution
+        corsika.attrs['DepthOfShowerMaximum'] = 700.
+        observers = corsika.create_group('observers')
+        for i_observer in range(n_observers):
+            data = np.zeros((n_samples, 4))
+            data[:, 0] = (1e-7 * rnd.uniform() + np.arange(n_samples) * time_resolution)
+            data[:, 1:] = rnd.normal(0, 1e-6, (n_samples, 3))
+            data[n_samples // 2:n_samples // 2 + 5, 1:] += rnd.uniform(-1e-4, 1e-4, (5, 3))
+            observer = observers.create_dataset(f'pos_{i_observer}', data=data)
+            observer.attrs['position'] = rnd.uniform(-1e4, 1e4, 3)
+
+
+def get_results(filename):
+    results = {}
+    for i_direction, (zenith, azimuth) in enumerate(shower_directions):
+        positions = get_star_shape(zenith, azimuth)
+        results[f'weights_{i_direction}'] = coreas.calculate_simulation_weights(positions, zenith, azimuth)
+
+    rnd = np.random.default_rng(42)
+    for i_direction, (zenith, azimuth) in enumerate(shower_directions):
+        write_coreas_file(filename, rnd, zenith, azimuth)
+        with h5py.File(filename, 'r') as corsika:
+            for i_observer, observer in enumerate(corsika['CoREAS']['observers'].values()):
+                sim_station = coreas.make_sim_station(1, corsika, observer, [0, 1])
+                electric_field = sim_station.get_electric_fields()[0]
+                key = f'efield_{i_direction}_{i_observer}'
+                results[key] = electric_field.get_trace()
+                results[key + '_start_time'] = electric_field.get_trace_start_time()
+                results[key + '_sampling_rate'] = electric_field.get_sampling_rate()
+                electric_field.resample(1 * units.GHz)
+                results[key + '_resampled'] = electric_field.get_trace()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'coreas.hdf5')
+        results = get_results(filename)
+        if args.create_reference:
+            np.savez(reference_file, **results)
+            print(f"reference results written to {reference_file}")
+        else:
+            reference = np.load(reference_file)
+            testing.assert_equal(sorted(reference.keys()), sorted(results.keys()))
+            for key, value in results.items():
+                testing.assert_allclose(value, reference[key], rtol=1e-10, atol=1e-12 * np.max(np.abs(reference[key])),
+                                        err_msg=key)
+
+            # all observers of a file at once
+            rnd = np.random.default_rng(42)
+            for i_direction, (zenith, azimuth) in enumerate(shower_directions):
+                write_coreas_file(filename, rnd, zenith, azimuth)
+                with h5py.File(filename, 'r') as corsika:
+                    keys, positions, traces = coreas.get_observers(corsika)
+                    testing.assert_equal(keys, list(corsika['CoREAS']['observers'].keys()))
+                    for sampling_rate, suffix in [(None, ''), (1 * units.GHz, '_resampled')]:
+                        efields, trace_start_times, efield_sampling_rate = coreas.get_efields(corsika, traces, sampling_rate)
+                        for i_observer in range(len(keys)):
+                            key = f'efield_{i_direction}_{i_observer}'
+                            testing.assert_allclose(efields[i_observer], reference[key + suffix], rtol=1e-10,
+                                                    atol=1e-10 * np.max(np.abs(reference[key + suffix])), err_msg=key)
+                            testing.assert_allclose(trace_start_times[i_observer], reference[key + '_start_time'])
+                        if sampling_rate is None:
+                            testing.assert_allclose(efield_sampling_rate, reference[key + '_sampling_rate'])
+
+        print("CoREAS test passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Checks the LOFAR RFI detection, which processes several blocks of all antennas at once, against reference
+results, and the block reading of `MultiFile_Dal1.get_data_blocks` against reading every block with `get_data`.
+The TBB data and the antenna metadata are synthetic.
+
+The reference results were created with the implementation that read and processed every block of every
+antenna on its own.
+Run with `--create-reference` to create new reference results.
+"""
+import argparse
+import os
+import tempfile
+import h5py
+import numpy as np
+from numpy import testing
+from NuRadioReco.modules.LOFAR.stationRFIFilter import FindRFI_LOFAR
+from NuRadioReco.modules.io.LOFAR.rawTBBio import MultiFile_Dal1
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_LOFAR_rfi_filter.npz')
+
+station_id = 2
+station_name = 'CS002'
+rcu_ids = np.arange(8)
+sample_numbers = [1000, 1000, 1003, 1003, 1000, 1000, 1010, 1010]
+block_size = 8192
+n_blocks = 12
+sampling_frequency = 200.  # MHz
+
+
+def write_metadata(metadata_dir):
+    """ writes a minimal antenna field file with the positions of all 96 LBA antennas """
+    antenna_fields = os.path.join(metadata_dir, 'lofar', 'StaticMetaData', 'AntennaFields')
+    os.makedirs(antenna_fields)
+    rnd = np.random.default_rng(1)
+    with open(os.path.join(antenna_fields, f'{station_name}-AntennaField.conf'), 'w') as f:
+        f.write('LBA\n')
+        f.write('3 [ 3826577.0 461022.9 5064892.7 ]\n')
+        f.write('96 x 2 x 3 [\n')
+        for position in rnd.uniform(-40, 40, (96, 3)):
+            f.write(' '.join(['{:.3f}'.format(x) for x in np.concatenate([position, position])]) + '\n')
+
+
+def write_tbb_file(filename, dipole_names):
+    """ writes a TBB file with noise and narrow band RFI, which has the same phase in all antennas """
+    rnd = np.random.default_rng(2)
+    n_total = n_blocks * block_size + max(sample_numbers) - min(sample_numbers)
+    t = np.arange(n_total) / (sampling_frequency * 1e6)
+    rfi = 20 * np.sin(2 * np.pi * 30.1e6 * t) + 30 * np.sin(2 * np.pi * 62.3e6 * t + 1) + \
+        10 * np.sin(2 * np.pi * 77.7e6 * t + 2)
+    with h5py.File(filename, 'w') as f:
+        f.attrs['ANTENNA_SET'] = np.array([b'LBA_OUTER'])
+        f.attrs['FILTER_SELECTION'] = np.array([b'LBA_10_90'])
+        station = f.create_group(f'Station{station_name}')
+        for dipole_name, rcu_id in zip(dipole_names, rcu_ids):
+            sample_number = sample_numbers[rcu_id]
+            offset = max(sample_numbers) - sample_number
+            data = rnd.normal(0, 50, n_total) + np.roll(rfi, -offset)
+            if rcu_id == 3:
+                # data loss in two blocks
+                data[2 * block_size + offset:3 * block_size + offset] = 0
+                data[7 * block_size + offset + 100:7 * block_size + offset + 3000] = 0
+            data = np.round(data[:n_blocks * block_size + offset]).astype(np.int16)
+            dataset = station.create_dataset(dipole_name, data=data)
+            dataset.attrs['STATION_ID'] = np.array([station_id])
+            dataset.attrs['SAMPLE_FREQUENCY_VALUE'] = np.array([sampling_frequency])
+            dataset.attrs['SAMPLE_FREQUENCY_UNIT'] = np.array([b'MHz'])
+            dataset.attrs['TIME'] = np.array([1500000000])
+            dataset.attrs['DATA_LENGTH'] = np.array([len(data)])
+            dataset.attrs['SAMPLE_NUMBER'] = np.array([sample_number])
+
+
+def get_results(tmp_dir):
+    filename = os.path.join(tmp_dir, 'tbb.h5')
+    dipole_names = [f'{station_id:03d}000{rcu_id:03d}' for rcu_id in rcu_ids]
+    write_metadata(tmp_dir)
+    write_tbb_file(filename, dipole_names)
+
+    results = {}
+    output = FindRFI_LOFAR([filename], tmp_dir, target_trace_length=4 * block_size, rfi_cleaning_trace_length=block_size)
+    for key, value in output.items():
+        results[key] = np.array(value)
+    return results, filename
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results, filename = get_results(tmp_dir)
+        if args.create_reference:
+            np.savez(reference_file, **results)
+            print(f"reference results written to {reference_file}")
+        else:
+            reference = np.load(reference_file)
+            testing.assert_equal(sorted(reference.keys()), sorted(results.keys()))
+            assert len(reference['dirty_channels']) > 0
+            testing.assert_equal(results['antenna_names'], reference['antenna_names'])
+            testing.assert_equal(results['dirty_channels'], reference['dirty_channels'])
+            testing.assert_equal(results['dirty_channels_block_size'], reference['dirty_channels_block_size'])
+            for key in ['avg_power_spectrum', 'avg_antenna_power', 'cleaned_power', 'phase_stability']:
+                testing.assert_allclose(results[key], reference[key], rtol=1e-9, err_msg=key)
+
+            # memory maps and different numbers of blocks per read give the same result
+            for num_blocks_per_read, use_memmap in [(1, False), (5, True), (n_blocks, True)]:
+                output = FindRFI_LOFAR([filename], tmp_dir, target_trace_length=4 * block_size,
+                                       rfi_cleaning_trace_length=block_size, num_blocks_per_read=num_blocks_per_read,
+                                       use_memmap=use_memmap)
+                testing.assert_equal(output['dirty_channels'], reference['dirty_channels'])
+                for key in ['avg_power_spectrum', 'avg_antenna_power', 'cleaned_power', 'phase_stability']:
+                    testing.assert_allclose(output[key], reference[key], rtol=1e-9, err_msg=key)
+
+            # reading blocks of all antennas at once
+            tbb_file = MultiFile_Dal1([filename], metadata_dir=tmp_dir)
+            antenna_ids = tbb_file.get_antenna_names()
+            for use_memmap in [False, True]:
+                for start_block, num_blocks in [(0, n_blocks), (3, 4), (n_blocks - 2, 4)]:
+                    data = tbb_file.get_data_blocks(start_block * block_size, block_size, num_blocks,
+                                                    antenna_IDs=antenna_ids[::-1], use_memmap=use_memmap)
+                    testing.assert_equal(data.shape, (len(antenna_ids), num_blocks, block_size))
+                    for ant_i, antenna_id in enumerate(antenna_ids[::-1]):
+                        for block_i in range(num_blocks):
+                            expected = tbb_file.get_data((start_block + block_i) * block_size, block_size,
+                                                         antenna_ID=antenna_id)
+                            # data points off the end of the file are zero
+                            expected = np.concatenate([expected, np.zeros(block_size - len(expected), dtype=np.int16)])
+                            testing.assert_equal(data[ant_i, block_i], expected)
+            tbb_file.close_file()
+
+        print("LOFAR RFI filter test passed")
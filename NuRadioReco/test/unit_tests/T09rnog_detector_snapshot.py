@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Imports a synthetic RNO-G detector snapshot (version 2, see `Detector.export_snapshot`) without a database
+connection and checks that `update(time)` switches between the periods of all stations. The commissioned
+stations and their channels are compared with looping over all (de)commission and modification timestamps,
+as done before the time periods were indexed.
+"""
+import datetime
+import json
+import logging
+import lzma
+import os
+import tempfile
+import numpy as np
+from numpy import testing
+from NuRadioReco.detector.RNO_G.rnog_detector import Detector, _json_serial
+
+
+def get_time(year, month, day=1):
+    return datetime.datetime(year, month, day)
+
+
+# modification, commission and decommission timestamps of the synthetic stations. Station 13 is
+# decommissioned and commissioned again, station 21 is commissioned later and station 23 is only commissioned
+# after all other stations are decommissioned.
+periods = {
+    11: {"modification_timestamps": [get_time(2021, 1), get_time(2021, 6), get_time(2022, 3), get_time(2023, 1)],
+         "station_commission_timestamps": [get_time(2021, 1)],
+         "station_decommission_timestamps": [get_time(2023, 1)]},
+    13: {"modification_timestamps": [get_time(2021, 1), get_time(2021, 9), get_time(2022, 1), get_time(2022, 7),
+                                     get_time(2023, 1)],
+         "station_commission_timestamps": [get_time(2021, 1), get_time(2022, 1)],
+         "station_decommission_timestamps": [get_time(2021, 9), get_time(2023, 1)]},
+    21: {"modification_timestamps": [get_time(2021, 8), get_time(2022, 5), get_time(2023, 1)],
+         "station_commission_timestamps": [get_time(2021, 8)],
+         "station_decommission_timestamps": [get_time(2023, 1)]},
+    23: {"modification_timestamps": [get_time(2024, 1), get_time(2025, 1)],
+         "station_commission_timestamps": [get_time(2024, 1)],
+         "station_decommission_timestamps": [get_time(2025, 1)]},
+}
+
+
+def get_channel_ids(station_id, period):
+    """ the channels of a station differ from period to period """
+    return [channel_id for channel_id in range(24) if (channel_id + station_id + period) % 5 != 0]
+
+
+def write_snapshot(filename):
+    data = {}
+    for station_id, station_periods in periods.items():
+        data[station_id] = {}
+        for period in range(1, len(station_periods["modification_timestamps"])):
+            data[station_id][period] = {
+                "id": station_id,
+                "channels": {channel_id: {"id": channel_id} for channel_id in get_channel_ids(station_id, period)}}
+
+    export_dict = {"version": 2, "data": data, "periods": periods, "default_values": {}}
+    with lzma.open(filename, "w") as f:
+        f.write(json.dumps(export_dict, indent=0, default=_json_serial).encode('utf-8'))
+
+
+def get_commissioned_stations(time):
+    """ per-entry comparison of the (de)commission timestamps """
+    commissioned_stations = []
+    for station_id, station_data in periods.items():
+        for comm, decomm in zip(station_data["station_commission_timestamps"],
+                                station_data["station_decommission_timestamps"]):
+            if comm < time and time < decomm:
+                commissioned_stations.append(station_id)
+    return commissioned_stations
+
+
+def get_period(station_id, time):
+    return np.digitize(time.timestamp(), [dt.timestamp() for dt in periods[station_id]["modification_timestamps"]])
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "detector_snapshot.json.xz")
+        write_snapshot(filename)
+        det = Detector(detector_file=filename, log_level=logging.WARNING)
+
+        # every month, every (de)commission and modification timestamp and one second before and after it,
+        # going forward and backward in time
+        times = [get_time(year, month, 15) for year in [2021, 2022] for month in range(1, 13)]
+        for station_data in periods.values():
+            for timestamps in station_data.values():
+                for timestamp in timestamps:
+                    times += [timestamp - datetime.timedelta(seconds=1), timestamp,
+                              timestamp + datetime.timedelta(seconds=1)]
+        times = [time for time in sorted(times) if get_commissioned_stations(time)]
+        times += times[::-1]
+
+        for time in times:
+            det.update(time)
+            commissioned_stations = get_commissioned_stations(time)
+            testing.assert_equal(det.get_station_ids(), commissioned_stations, err_msg=str(time))
+            for station_id in periods:
+                assert det.has_station(station_id) == (station_id in commissioned_stations), (station_id, time)
+                assert det._time_period_index_per_station[station_id] == get_period(station_id, time), (station_id, time)
+
+            for station_id in commissioned_stations:
+                channel_ids = get_channel_ids(station_id, get_period(station_id, time))
+                testing.assert_equal(det.get_channel_ids(station_id), channel_ids, err_msg=f"{station_id} {time}")
+                assert det.get_number_of_channels(station_id) == len(channel_ids)
+
+        print("RNO-G detector snapshot test passed")
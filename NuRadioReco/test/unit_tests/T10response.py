@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Checks the buffered evaluation of `Response` objects against reference results, that the buffered responses
+are read-only and that the buffer is not used for responses combined with the multiplication operator.
+
+The reference results were created with the implementation that evaluated the response at every call.
+Run with `--create-reference` to create new reference results.
+"""
+import argparse
+import logging
+import os
+import numpy as np
+from numpy import testing
+import NuRadioReco.framework.base_trace
+from NuRadioReco.detector.response import Response
+from NuRadioReco.utilities import units
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_response.npz')
+
+frequency_arrays = {
+    'coarse': np.linspace(0, 1.2, 61) * units.GHz,
+    'fine': np.fft.rfftfreq(2048, 1 / (3.2 * units.GHz)),
+    'scalar': np.array(0.35 * units.GHz),
+}
+# (component names, blacklist) passed to `Response.__call__`
+selections = {
+    'all': (None, True),
+    'without_amp': (['amp'], True),
+    'only_cable': ('cable', False),
+}
+
+
+def get_responses():
+    rnd = np.random.default_rng(5)
+    frequency = np.linspace(0.05, 1.0, 96)  # in GHz
+    amp = Response(frequency, [40 + rnd.normal(0, 1, 96), np.cumsum(rnd.uniform(-20, -5, 96))], ["dB", "deg"],
+                   time_delay=10 * units.ns, name="amp", station_id=1, channel_id=0, log_level=logging.ERROR)
+    cable = Response(frequency, [np.linspace(0.9, 0.4, 96), -0.2 * np.arange(96)], ["mag", "rad"],
+                     time_delay=35 * units.ns, name="cable", station_id=1, channel_id=0, log_level=logging.ERROR)
+    filt = Response(frequency, [np.exp(-((frequency - 0.4) / 0.3) ** 2), np.zeros(96)], ["mag", "rad"],
+                    name="filter", station_id=1, channel_id=0, weight=-1, remove_time_delay=False,
+                    log_level=logging.ERROR)
+    return {'amp': amp, 'cable': cable, 'filter': filt, 'amp_cable': amp * cable, 'chain': amp * cable * filt}
+
+
+def get_results():
+    results = {}
+    responses = get_responses()
+    for response_name, response in responses.items():
+        for frequency_name, frequencies in frequency_arrays.items():
+            for selection_name, (component_names, blacklist) in selections.items():
+                if component_names is not None and not any(
+                        (name in np.atleast_1d(component_names)) != blacklist for name in response.get_names()):
+                    continue  # selects no component
+                # evaluate twice, the second call is buffered
+                for _ in range(2):
+                    results[f'{response_name}_{frequency_name}_{selection_name}'] = np.array(
+                        response(frequencies, component_names=component_names, blacklist=blacklist))
+
+    trace = NuRadioReco.framework.base_trace.BaseTrace()
+    trace.set_trace(np.random.default_rng(6).normal(0, 1, 2048), 3.2 * units.GHz)
+    for _ in range(2):
+        trace_with_response = responses['chain'] * trace
+    results['trace'] = trace_with_response.get_trace()
+    results['trace_start_time'] = trace_with_response.get_trace_start_time()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference results')
+    args = parser.parse_args()
+
+    results = get_results()
+    if args.create_reference:
+        np.savez(reference_file, **results)
+        print(f"reference results written to {reference_file}")
+    else:
+        reference = np.load(reference_file)
+        testing.assert_equal(sorted(reference.keys()), sorted(results.keys()))
+        for key, value in results.items():
+            testing.assert_allclose(value, reference[key], rtol=1e-12, atol=1e-15, err_msg=key)
+
+        # buffered responses are read-only
+        responses = get_responses()
+        frequencies = frequency_arrays['fine']
+        response = responses['amp'](frequencies)
+        assert not response.flags.writeable
+        assert responses['amp'](frequencies) is response
+        try:
+            response[0] = 0
+            raise AssertionError("buffered response is writeable")
+        except ValueError:
+            pass
+
+        # the same frequencies in a new array, the buffered response is returned
+        assert responses['amp'](np.copy(frequencies)) is response
+
+        # combining responses does not return the buffered response of the first factor ...
+        amp_cable = responses['amp'] * responses['cable']
+        testing.assert_allclose(amp_cable(frequencies), reference['amp_cable_fine_all'], rtol=1e-12, atol=1e-15)
+        # ... and does not change the factors
+        assert responses['amp'](frequencies) is response
+        testing.assert_allclose(responses['cable'](frequencies), reference['cable_fine_all'], rtol=1e-12, atol=1e-15)
+        chain = amp_cable * responses['filter']
+        testing.assert_allclose(chain(frequencies), reference['chain_fine_all'], rtol=1e-12, atol=1e-15)
+        testing.assert_allclose(amp_cable(frequencies), reference['amp_cable_fine_all'], rtol=1e-12, atol=1e-15)
+
+        # a trace multiplied with a response is still writeable
+        trace = NuRadioReco.framework.base_trace.BaseTrace()
+        trace.set_trace(np.random.default_rng(6).normal(0, 1, 2048), 3.2 * units.GHz)
+        trace = chain * trace
+        spectrum = trace.get_frequency_spectrum()
+        spectrum *= 2
+
+        # the buffer is limited
+        for i in range(2 * Response.max_cache_size):
+            responses['cable'](frequencies + i * units.MHz)
+        assert responses['cable'](frequencies + i * units.MHz) is responses['cable'](frequencies + i * units.MHz)
+        testing.assert_allclose(responses['cable'](frequencies), reference['cable_fine_all'], rtol=1e-12, atol=1e-15)
+
+        print("Response test passed")
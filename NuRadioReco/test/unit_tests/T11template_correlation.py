@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Checks the template correlation of `channelTemplateCorrelation`, which correlates a channel with all templates
+of a set in one batched FFT, against reference results. The templates and traces are synthetic.
+
+The reference results were created with the implementation that called `radiotools.helper.get_normalized_xcorr`
+for every template.
+Run with `--create-reference` to create new reference results.
+"""
+import argparse
+import datetime
+import os
+import pickle
+import tempfile
+import numpy as np
+from numpy import testing
+import NuRadioReco.framework.event
+import NuRadioReco.framework.station
+import NuRadioReco.framework.channel
+from NuRadioReco.detector import detector
+from NuRadioReco.modules.channelTemplateCorrelation import channelTemplateCorrelation
+from NuRadioReco.framework.parameters import stationParameters as stnp
+from NuRadioReco.framework.parameters import channelParameters as chp
+from NuRadioReco.utilities import units
+
+reference_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reference_template_correlation.npz')
+
+station_id = 32
+channel_ids = [0, 1, 2, 3]
+detector_sampling_rate = 1 * units.GHz
+sampling_rate = 2 * units.GHz
+n_samples = 512
+
+
+def get_pulse(rnd, length):
+    """ a damped oscillation with random frequency and phase """
+    t = np.arange(length) / detector_sampling_rate
+    t0 = rnd.uniform(0.2, 0.4) * length / detector_sampling_rate
+    frequency = rnd.uniform(80, 300) * units.MHz
+    pulse = np.exp(-np.abs(t - t0) / (rnd.uniform(3, 10) * units.ns)) * np.sin(
+        2 * np.pi * frequency * (t - t0) + rnd.uniform(0, 2 * np.pi))
+    return pulse
+
+
+def write_templates(template_dir):
+    """ writes cosmic-ray and neutrino templates in the format read by `NuRadioReco.utilities.templates` """
+    rnd = np.random.default_rng(3)
+    cr_templates = []
+    for i_pulse in range(4):
+        # templates of different lengths
+        length = [256, 200][i_pulse % 2]
+        cr_templates.append({zen: {az: {channel_id: get_pulse(rnd, length) for channel_id in channel_ids}
+                                   for az in np.deg2rad([0, 22.5, 45])} for zen in np.deg2rad([60, 50, 70])})
+    with open(os.path.join(template_dir, f'templates_cr_station_{station_id}.pickle'), 'wb') as f:
+        pickle.dump(cr_templates, f)
+
+    nu_templates = {np.deg2rad(140): {np.deg2rad(45): {0.0: {channel_id: get_pulse(rnd, 256)
+                                                             for channel_id in channel_ids}}}}
+    with open(os.path.join(template_dir, f'templates_nu_station_{station_id}.pickle'), 'wb') as f:
+        pickle.dump(nu_templates, f)
+
+
+def get_detector():
+    channels = {}
+    for channel_id in channel_ids:
+        channels[str(channel_id)] = dict(
+            station_id=station_id, channel_id=channel_id, adc_sampling_frequency=detector_sampling_rate,
+            ant_type='createLPDA_100MHz_InfFirn', ant_orientation_phi=90 * (channel_id % 2), ant_orientation_theta=0,
+            ant_rotation_phi=90 * (channel_id % 2) + 90, ant_rotation_theta=90,
+            commission_time=datetime.datetime(2017, 11, 4), decommission_time=datetime.datetime(2038, 1, 1))
+    stations = {str(station_id): dict(station_id=station_id, pos_easting=0, pos_northing=0, pos_altitude=0,
+                                      pos_site='arianna', commission_time=datetime.datetime(2017, 11, 4),
+                                      decommission_time=datetime.datetime(2038, 1, 1))}
+    det = detector.Detector(source='dictionary', dictionary={'channels': channels, 'stations': stations})
+    det.update(datetime.datetime(2020, 1, 1))
+    return det
+
+
+def get_station(rnd):
+    """ noise and an upsampled pulse """
+    station = NuRadioReco.framework.station.Station(station_id)
+    for channel_id in channel_ids:
+        channel = NuRadioReco.framework.channel.Channel(channel_id)
+        trace = rnd.normal(0, 0.2, n_samples)
+        pulse = np.repeat(get_pulse(rnd, 128), 2)
+        start = rnd.integers(0, n_samples - len(pulse))
+        trace[start:start + len(pulse)] += rnd.uniform(-3, 3) * pulse
+        channel.set_trace(trace * units.mV, sampling_rate)
+        station.add_channel(channel)
+    return station
+
+
+def get_results(template_dir):
+    det = get_detector()
+    template_correlation = channelTemplateCorrelation(template_dir)
+    template_correlation.begin()
+    rnd = np.random.default_rng(4)
+    results = {}
+    for name, kwargs in [('nu', dict(cosmic_ray=False)), ('cr', dict(cosmic_ray=True)),
+                         ('cr_set', dict(cosmic_ray=True, n_templates=20))]:
+        # the buffered template spectra are used for the second event
+        for event_id in range(2):
+            station = get_station(rnd)
+            template_correlation.run(NuRadioReco.framework.event.Event(1, event_id), station, det,
+                                     channels_to_use=[0, 1, 2], **kwargs)
+            prefix = f'{name}_{event_id}'
+            station_parameter = stnp.cr_xcorrelations if kwargs['cosmic_ray'] else stnp.nu_xcorrelations
+            channel_parameter = chp.cr_xcorrelations if kwargs['cosmic_ray'] else chp.nu_xcorrelations
+            for key, value in station[station_parameter].items():
+                results[f'{prefix}_station_{key}'] = np.array(value)
+            for channel in station.iter_channels():
+                for key, value in channel[channel_parameter].items():
+                    results[f'{prefix}_channel{channel.get_id()}_{key}'] = np.array(value)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--create-reference', action='store_true', help='create new reference results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as template_dir:
+        write_templates(template_dir)
+        results = get_results(template_dir)
+
+    if args.create_reference:
+        np.savez(reference_file, **results)
+        print(f"reference results written to {reference_file}")
+    else:
+        reference = np.load(reference_file)
+        testing.assert_equal(sorted(reference.keys()), sorted(results.keys()))
+        for key, value in results.items():
+            if value.dtype.kind in 'iu':
+                testing.assert_equal(value, reference[key], err_msg=key)
+            else:
+                testing.assert_allclose(value, reference[key], rtol=1e-10, atol=1e-12, err_msg=key)
+
+        print("template correlation test passed")
@@ -0,0 +1,14 @@
+#!/bin/bash
+set -e
+
+python3 NuRadioReco/test/unit_tests/T01random_streams.py
+python3 NuRadioReco/test/unit_tests/T02adc_digitization.py
+python3 NuRadioReco/test/unit_tests/T03noise_bank.py
+python3 NuRadioReco/test/unit_tests/T04profiling.py
+python3 NuRadioReco/test/unit_tests/T05threshold_triggers.py
+python3 NuRadioReco/test/unit_tests/T06interferometry.py
+python3 NuRadioReco/test/unit_tests/T07coreas.py
+python3 NuRadioReco/test/unit_tests/T08LOFAR_rfi_filter.py
+python3 NuRadioReco/test/unit_tests/T09rnog_detector_snapshot.py
+python3 NuRadioReco/test/unit_tests/T10response.py
+python3 NuRadioReco/test/unit_tests/T11template_correlation.py
@@ -1,9 +1,14 @@
 import numpy as np
 import sys
+import weakref
+import logging
 from scipy import signal, constants
 from radiotools import helper as hp
+from radiotools.atmosphere import models as atm
 from NuRadioReco.utilities import units
 
+logger = logging.getLogger('NuRadioReco.interferometry')
+
 # to convert V**2/m**2 * ns -> V**2/m**2 * s -> J/m**2 -> eV/m**2
 conversion_factor_integrated_signal = 1 / units.s * \
     constants.c * constants.epsilon_0 / units.eSI
@@ -69,6 +74,79 @@ def get_signal(sum_trace, tstep, window_width=100 * units.ns, kind="power"):
         sys.exit("get_signal(), kind = '{}' not supported".format(kind))
 
 
+def get_signals(sum_traces, trace_lengths, tstep, window_width=100 * units.ns, kind="power"):
+    """
+    Calculates signal quantity from many beam-formed waveforms at once
+
+    Same as `get_signal` but for the (zero-padded) output of `interfere_traces_interpolation_multiple_targets`.
+    Waveforms with the same length are processed together.
+
+    Parameters
+    ----------
+
+    sum_traces : np.array(k, m)
+        k beam-formed waveforms, zero-padded to m samples
+
+    trace_lengths : np.array(k,)
+        The number of valid samples of each waveform
+
+    tstep : double
+        Sampling bin size
+
+    window_width : double
+        Time window size to calculate power
+
+    kind : str
+        Key-word what to do: "amplitude", "power", or "hilbert_sum"
+
+    Returns
+    -------
+
+    signals : np.array(k,)
+        Signal calculated according to the specified metric for each waveform
+    """
+    if kind not in ["amplitude", "power", "hilbert_sum"]:
+        sys.exit("get_signal(), kind = '{}' not supported".format(kind))
+
+    signals = np.zeros(len(sum_traces))
+    for trace_length in np.unique(trace_lengths):
+        mask = trace_lengths == trace_length
+        traces = sum_traces[mask, :trace_length]
+
+        # find signal peak
+        hilbenv = np.abs(signal.hilbert(traces, axis=-1))
+        peak_idx = np.argmax(hilbenv, axis=-1)
+
+        if kind == "amplitude":
+            signals[mask] = hilbenv[np.arange(len(traces)), peak_idx]
+            continue
+
+        # shift peak in middle of trace
+        shift = trace_length // 2 - peak_idx
+        roll_idx = (np.arange(trace_length)[None, :] - shift[:, None]) % trace_length
+        traces = np.take_along_axis(traces, roll_idx, axis=-1)
+        peak_idx = trace_length // 2
+
+        # define signal window. If trace is to small -> pad
+        idx_width = int(window_width / 2 // tstep)
+        if trace_length < 2 * idx_width:
+            padding = np.zeros((len(traces), idx_width))
+            traces = np.hstack([padding, traces, padding])
+            peak_idx += idx_width
+
+        traces *= conversion_factor_integrated_signal * tstep
+
+        if kind == "power":
+            # return sum of squares within signal window
+            signals[mask] = np.sum(traces[:, peak_idx-idx_width:peak_idx+idx_width] ** 2, axis=-1)
+
+        elif kind == "hilbert_sum":
+            hilbenv = np.abs(signal.hilbert(traces, axis=-1))
+            signals[mask] = np.sum(hilbenv[:, peak_idx-idx_width:peak_idx+idx_width], axis=-1)
+
+    return signals
+
+
 def interfere_traces_interpolation(target_pos, positions, traces, times, tab):
     """
     Calculate sum of time shifted waveforms.
@@ -131,6 +209,87 @@ def interfere_traces_interpolation(target_pos, positions, traces, times, tab):
     return sum_trace
 
 
+def interfere_traces_interpolation_multiple_targets(target_positions, positions, traces, times, tab,
+                                                    max_chunk_size=int(1e7)):
+    """
+    Calculate sum of time shifted waveforms for many source/target locations at once.
+
+    Same as `interfere_traces_interpolation` but all time shifts are calculated in one go and the
+    shifted waveforms of all observers are summed with one array operation per chunk of targets.
+
+    Parameters
+    ----------
+
+    target_pos : np.array(k, 3)
+        source/traget locations
+
+    positions : np.array(n, 3)
+        observer positions
+
+    traces : np.array(n, m)
+        waveforms of n observers with m samples
+
+    times : np.array(n, m)
+        time stampes of the waveforms of each observer
+
+    tab : radiotools.atmosphere.refractivity.RefractivityTable
+        Tabulated table of the avg. refractive index between two points
+
+    max_chunk_size : int
+        Maximum number of elements (targets x observers x samples) of the intermediate arrays.
+        Limits the memory consumption.
+
+    Returns
+    -------
+
+    sum_traces : np.array(k, l)
+        Summed traces, zero-padded to the length of the longest summed trace
+
+    trace_lengths : np.array(k,)
+        The number of valid samples of each summed trace
+
+    """
+    target_positions = np.atleast_2d(target_positions)
+    traces = np.asarray(traces)
+    tstep = times[0, 1] - times[0, 0]
+
+    tshifts = get_time_shifts(target_positions, positions, tab)
+
+    # np.amin(times - tshift) == np.amin(times) - tshift (rounding is monotonic)
+    first_times = np.amin(np.amin(times, axis=1)[None, :] - tshifts, axis=1)
+    last_times = np.amax(np.amax(times, axis=1)[None, :] - tshifts, axis=1)
+    # length of np.arange(first_time, last_time + tstep, tstep)
+    trace_lengths = np.ceil((last_times + tstep - first_times) / tstep).astype(int)
+    n_samples = np.amax(trace_lengths)
+
+    sum_traces = np.zeros((len(target_positions), n_samples))
+    n_observers, n_times = times.shape
+    chunk_size = max(1, max_chunk_size // (n_observers * n_times))
+    for i_start in range(0, len(target_positions), chunk_size):
+        chunk = slice(i_start, i_start + chunk_size)
+        n_chunk = len(tshifts[chunk])
+        times_new = times[None, :, 1:] - tshifts[chunk, :, None]
+
+        fidx = np.around((times_new - first_times[chunk, None, None]) / tstep, 4)
+        idx = np.array(fidx, dtype=int)
+
+        if np.any(np.diff(idx, axis=-1) == 0):
+            sys.exit(
+                "Index array has not unique entries. That is most probably a rounding issue!")
+
+        f = (fidx - idx)[..., :1]  # are all the same
+
+        """ Linear interplation to match the binning of time_sum. """
+        traces_new = (1 - f) * traces[None, :, 1:] + f * traces[None, :, :-1]
+
+        # sum up all observers for each target
+        idx += (np.arange(n_chunk) * n_samples)[:, None, None]
+        sum_traces[chunk] = np.bincount(
+            idx.flatten(), weights=traces_new.flatten(), minlength=n_chunk * n_samples).reshape(n_chunk, n_samples)
+
+    return sum_traces, trace_lengths
+
+
 def get_time_shifts(target_pos, positions, tab):
     """
     Calculates the time delay of an electromagnetic wave along a straight trajectories between
@@ -139,8 +298,8 @@ def get_time_shifts(target_pos, positions, tab):
     Parameters
     ----------
 
-    target_pos : np.array(3,)
-        source/traget location
+    target_pos : np.array(3,) or np.array(k, 3)
+        source/traget location(s)
 
     positions : np.array(n, 3)
         observer positions (n observers)
@@ -151,23 +310,225 @@ def get_time_shifts(target_pos, positions, tab):
     Returns
     -------
 
-    tshifts : np.array(n,)
+    tshifts : np.array(n,) or np.array(k, n)
         Time delay in sec
 
     """
+    target_pos = np.asarray(target_pos)
+    positions = np.asarray(positions)
+
+    effective_refractivity = get_refractivity_between_points_tabulated(
+        np.atleast_2d(target_pos), positions, tab)
 
-    tshifts = np.zeros(len(positions))
-    for idx, pos in enumerate(positions):
-        effective_refractivity = tab.get_refractivity_between_two_points_tabulated(
-            target_pos, pos)
+    distances = np.linalg.norm(np.atleast_2d(target_pos)[:, None] - positions[None], axis=-1)
+    tshifts = distances * (effective_refractivity + 1) / constants.c
 
-        dt = np.linalg.norm(target_pos - pos) * \
-            (effective_refractivity + 1) / constants.c
-        tshifts[idx] = dt
+    if target_pos.ndim == 1:
+        tshifts = tshifts[0]
 
     return tshifts * units.s
 
 
+# padded versions of the (ragged) tables of the curved atmosphere, one per refractivity table
+_curved_tables = weakref.WeakKeyDictionary()
+
+# internal attributes of `radiotools.atmosphere.refractivity.RefractivityTable` (tested with radiotools 0.2.x)
+# which are used by the vectorized calculation of the effective refractivity
+_flat_table_attributes = [
+    '_curved', '_heights', '_height_increment', '_refractivity_at_sea_level', '_refractivity_integrated_table_flat']
+_curved_table_attributes = [
+    '_zeniths', '_interpolate_zenith', '_distances', '_distance_increment', '_refractivity_integrated_table']
+
+
+def _supports_vectorized_calculation(tab):
+    """ Returns True if the table provides all attributes needed by `get_refractivity_between_points_tabulated` """
+    if not all(hasattr(tab, attribute) for attribute in _flat_table_attributes):
+        return False
+    return not tab._curved or all(hasattr(tab, attribute) for attribute in _curved_table_attributes)
+
+
+def _get_padded_curved_table(tab):
+    if tab not in _curved_tables:
+        lengths = np.array([len(d) for d in tab._distances])
+        table = np.zeros((len(lengths), np.amax(lengths)))
+        for i, t in enumerate(tab._refractivity_integrated_table):
+            table[i, :len(t)] = t
+        first_distances = np.array([d[0] for d in tab._distances])
+        _curved_tables[tab] = (table, lengths, first_distances)
+
+    return _curved_tables[tab]
+
+
+def _get_integrated_refractivity_for_height_tabulated(tab, h):
+    """ Vectorized version of `RefractivityTable.get_integrated_refractivity_for_height_tabulated` """
+    table = tab._refractivity_integrated_table_flat
+    n = len(tab._heights)
+    fidx = (h - tab._heights[0]) / tab._height_increment
+    idx = np.trunc(fidx).astype(int)
+    f = fidx - idx
+
+    # if height is out of table (right edge): extrapolate
+    out_of_table = idx >= n - 1
+    idx_in = np.where(out_of_table, 0, idx)
+    slope10 = (table[-1] - table[-10]) / 10
+    refractivity = np.where(
+        out_of_table, table[-1] + slope10 * (fidx - n),
+        (1 - f) * table[idx_in] + f * table[np.where(out_of_table, 1, idx_in + 1)])
+
+    return np.where(h == 0, tab._refractivity_at_sea_level, refractivity)
+
+
+def _get_integrated_refractivity_for_distance(tab, d, zenith_idx):
+    """ Vectorized version of `RefractivityTable._get_integrated_refractivity_for_distance` for the zenith bins `zenith_idx` """
+    table, lengths, first_distances = _get_padded_curved_table(tab)
+    n = lengths[zenith_idx]
+
+    if np.any(d < first_distances[zenith_idx]):
+        raise ValueError("Requested distance is out of range")
+
+    distance_idx = (d - first_distances[zenith_idx]) / tab._distance_increment
+    idx = np.trunc(distance_idx).astype(int)
+
+    # if distance is out of table (right edge): extrapolate
+    out_of_table = idx >= n - 1
+    idx_in = np.where(out_of_table, 0, idx)
+    last = table[zenith_idx, n - 1]
+    slope10 = (last - table[zenith_idx, n - 10]) / 10
+    f = distance_idx - idx
+    return np.where(
+        out_of_table, last + slope10 * (distance_idx - n),
+        (1 - f) * table[zenith_idx, idx_in] + f * table[zenith_idx, np.where(out_of_table, 1, idx_in + 1)])
+
+
+def _get_integrated_refractivity_for_distance_and_zenith(tab, d, zenith):
+    """ Vectorized version of `RefractivityTable.get_integrated_refractivity_for_distance` """
+    zenith_idx = np.argmin(np.abs(tab._zeniths[None, :] - zenith[:, None]), axis=1)
+    if not tab._interpolate_zenith:
+        return _get_integrated_refractivity_for_distance(tab, d, zenith_idx)
+
+    below = tab._zeniths[zenith_idx] - zenith < 0
+    bin_low = np.where(below, zenith_idx, zenith_idx - 1) % len(tab._zeniths)
+    bin_up = np.where(below, zenith_idx + 1, zenith_idx)
+
+    rlow = _get_integrated_refractivity_for_distance(tab, d, bin_low)
+    rup = _get_integrated_refractivity_for_distance(tab, d, bin_up)
+
+    zlow = tab._zeniths[bin_low]
+    zup = tab._zeniths[bin_up]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rinterp = rlow + (rup - rlow) / (zup - zlow) * (zenith - zlow)
+    return np.where(rlow < rup, rinterp, rlow)
+
+
+def get_refractivity_between_points_tabulated(target_positions, positions, tab):
+    """
+    Calculates the effective refractivity between many source/target locations and observers.
+
+    Vectorized version of `radiotools.atmosphere.refractivity.RefractivityTable.get_refractivity_between_two_points_tabulated`.
+    All pairs which require a numerical calculation (i.e., if the zenith angle is out of the range of the table)
+    are calculated with the (slow) method of the table. The vectorized calculation relies on the internal
+    layout of the table. If the installed version of radiotools does not provide it, the public method of the
+    table is called for every pair instead.
+
+    Parameters
+    ----------
+
+    target_positions : np.array(k, 3)
+        source/traget locations
+
+    positions : np.array(n, 3)
+        observer positions (n observers)
+
+    tab : radiotools.atmosphere.refractivity.RefractivityTable
+        Tabulated table of the avg. refractive index between two points
+
+    Returns
+    -------
+
+    effective_refractivity : np.array(k, n)
+        The effective refractivity between all pairs of targets and observers
+
+    """
+    p1 = np.broadcast_to(target_positions[:, None], (len(target_positions), len(positions), 3)).reshape(-1, 3)
+    p2 = np.broadcast_to(positions[None], (len(target_positions), len(positions), 3)).reshape(-1, 3)
+
+    if not _supports_vectorized_calculation(tab):
+        logger.debug("Refractivity table does not support the vectorized calculation, calculate each pair separately")
+        refractivity = np.array([tab.get_refractivity_between_two_points_tabulated(x1, x2) for x1, x2 in zip(p1, p2)])
+        return refractivity.reshape(len(target_positions), len(positions))
+
+    origin = np.array([0, 0, atm.r_e])
+    dist = np.linalg.norm(p1 - p2, axis=-1)
+
+    # local altitudes and zenith angles assuming a spherical earth (see radiotools.helper)
+    norm_p2 = np.linalg.norm(origin + p2, axis=-1)
+    local_zenith = (origin + p2) / norm_p2[:, None]
+    obs_level_local = np.linalg.norm(origin + p2 - local_zenith * atm.r_e, axis=-1)
+    norm_p1 = np.linalg.norm(origin + p1, axis=-1)
+    altitude_p1 = np.linalg.norm(origin + p1 - (origin + p1) / norm_p1[:, None] * atm.r_e, axis=-1)
+    cos_zenith = np.sum(local_zenith * (p1 - p2), axis=-1) / (
+        np.linalg.norm(local_zenith, axis=-1) * dist)
+    zenith_local = np.arccos(np.clip(cos_zenith, -1, 1))
+
+    # flat solution
+    h1 = obs_level_local
+    h2 = altitude_p1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        refractivity = (_get_integrated_refractivity_for_height_tabulated(tab, h2) -
+                        _get_integrated_refractivity_for_height_tabulated(tab, h1)) / (h2 - h1)
+
+    if not tab._curved:
+        return refractivity.reshape(len(target_positions), len(positions))
+
+    curved = zenith_local >= np.amin(tab._zeniths)
+    numerical = np.zeros_like(curved)
+
+    # zenith angle at sea level and distance to sea level (see radiotools.helper.get_zenith_angle_at_sea_level)
+    zenith_at_sea_level = np.copy(zenith_local)
+    distance_to_earth = np.zeros_like(zenith_local)
+    above_sea_level = curved & (obs_level_local != 0)
+
+    r_e = atm.r_e
+    tan_zenith = np.tan(zenith_local[above_sea_level])
+    b = -tan_zenith
+    c = (r_e + obs_level_local[above_sea_level]) * tan_zenith
+    r0 = 1 + b ** 2
+    x0 = -c / r0
+    y0 = -b * c / r0
+    two_intersections = np.abs(c ** 2 - r_e ** 2 * r0) >= 1e-6
+    two_intersections &= ~(c ** 2 > r_e ** 2 * r0 + 1e-6)
+    with np.errstate(invalid='ignore'):
+        mult = np.sqrt((r_e ** 2 - c ** 2 / r0) / r0)
+    # take the closer intersection
+    x = x0 - b * mult
+    y = y0 + mult
+    distance_to_earth[above_sea_level] = np.sqrt(x ** 2 + (y - (r_e + obs_level_local[above_sea_level])) ** 2)
+    line = np.array([np.sin(zenith_local[above_sea_level]), np.cos(zenith_local[above_sea_level])])
+    cos_zenith_sea = (x * line[0] + y * line[1]) / (np.sqrt(x ** 2 + y ** 2) * np.sqrt(np.sum(line ** 2, axis=0)))
+    zenith_at_sea_level[above_sea_level] = np.arccos(np.clip(cos_zenith_sea, -1, 1))
+    numerical[np.flatnonzero(above_sea_level)[~two_intersections]] = True
+
+    curved &= ~numerical
+    curved &= zenith_at_sea_level >= np.amin(tab._zeniths)
+    out_of_range = curved & (zenith_at_sea_level > np.amax(tab._zeniths))
+    numerical |= out_of_range
+    curved &= ~out_of_range
+
+    d1 = distance_to_earth[curved]
+    d2 = dist[curved] + d1
+    zenith = zenith_at_sea_level[curved]
+    r1 = _get_integrated_refractivity_for_distance_and_zenith(tab, d1, zenith)
+    r2 = _get_integrated_refractivity_for_distance_and_zenith(tab, d2, zenith)
+    refractivity[curved] = (r2 - r1) / (d2 - d1)
+
+    if np.any(numerical):
+        logger.warning("Zenith out of range, perform numerical calculation for {} pairs".format(np.sum(numerical)))
+        for i in np.flatnonzero(numerical):
+            refractivity[i] = tab.get_refractivity_between_two_points_numerical(p1[i], p2[i])
+
+    return refractivity.reshape(len(target_positions), len(positions))
+
+
 def fit_axis(z, theta, phi, coreX, coreY):
     """
     Predicts the intersetction of an axis/line with horizontal layers at different heights.
@@ -0,0 +1,290 @@
+"""
+Lightweight profiling of simulation and reconstruction chains
+
+Named timing spans can be nested. For every span name, the number of calls, the total time, the time
+spent in the span itself (excluding nested spans) and optionally the change of the memory allocated by python
+(via `tracemalloc`) are aggregated. Additionally, every span is stored as an event that can be exported in
+the Chrome trace format and inspected with chrome://tracing or https://ui.perfetto.dev.
+
+The profiler is disabled by default, in which case a span costs a single attribute lookup. All module
+`run` methods that use the `register_run` decorator are recorded automatically once the profiler is enabled.
+
+Example::
+
+    from NuRadioReco.utilities import profiling
+
+    profiler = profiling.get_profiler()
+    profiler.enable()
+    with profiling.span("my reconstruction"):
+        for evt in reader.run():
+            channelBandPassFilter.run(evt, evt.get_station(11), det)
+    profiler.log_summary()
+    profiler.write_json("profile.json")
+    profiler.write_chrome_trace("trace.json")
+
+"""
+from timeit import default_timer as timer
+import functools
+import threading
+import tracemalloc
+import json
+import os
+import logging
+logger = logging.getLogger('NuRadioReco.profiling')
+
+
+class _NullSpan:
+    """ context manager that does nothing, used if the profiler is disabled """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+class _Span:
+
+    def __init__(self, profiler, name, category, args):
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def __enter__(self):
+        self._profiler._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler._exit(self)
+        return False
+
+
+class Profiler:
+    """
+    Collects timing spans, see the module documentation
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.__trace_allocations = False
+        # True if `tracemalloc` was started by `enable` (and hence is stopped by `disable`)
+        self.__started_tracemalloc = False
+        self.__max_trace_events = None
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def enable(self, trace_allocations=False, max_trace_events=1000000):
+        """
+        Enables the profiler
+
+        Parameters
+        ----------
+        trace_allocations: bool (default False)
+            if True, the change of the memory allocated by python is recorded for every span.
+            This starts `tracemalloc` (if it is not running yet), which slows down the execution considerably.
+        max_trace_events: int or None (default 1000000)
+            maximum number of spans that are stored for the Chrome trace export. Afterwards, only the
+            aggregated statistics are updated. None means no limit.
+        """
+        self.__trace_allocations = trace_allocations
+        self.__max_trace_events = max_trace_events
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self):
+        """
+        Disables the profiler. The recorded spans are kept.
+
+        `tracemalloc` is only stopped if it was started by `enable`.
+        """
+        self.enabled = False
+        if self.__started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.__started_tracemalloc = False
+        self.__trace_allocations = False
+
+    def reset(self):
+        """ Removes all recorded spans """
+        with self.__lock:
+            self.__statistics = {}
+            self.__trace_events = []
+            self.__n_dropped_trace_events = 0
+            self.__t0 = timer()
+
+    def span(self, name, category='', **args):
+        """
+        Returns a context manager that records the time spent in its body
+
+        Parameters
+        ----------
+        name: str
+            the name of the span, the statistics are aggregated per name
+        category: str
+            an optional category, e.g. 'module' or 'simulation'
+        args: keyword arguments
+            additional information that is stored in the Chrome trace (not aggregated)
+        """
+        if not self.enabled:
+            return _null_span
+        return _Span(self, name, category, args)
+
+    def _get_stack(self):
+        if not hasattr(self.__local, 'stack'):
+            self.__local.stack = []
+        return self.__local.stack
+
+    def _enter(self, span):
+        span.t_children = 0
+        if self.__trace_allocations:
+            span.memory_start = tracemalloc.get_traced_memory()[0]
+        self._get_stack().append(span)
+        span.t_start = timer()
+
+    def _exit(self, span):
+        t_end = timer()
+        duration = t_end - span.t_start
+        memory_delta = 0
+        # spans that were opened before the allocation tracing was enabled have no start value
+        memory_start = getattr(span, 'memory_start', None)
+        if memory_start is not None and tracemalloc.is_tracing():
+            memory_delta = tracemalloc.get_traced_memory()[0] - memory_start
+        stack = self._get_stack()
+        stack.pop()
+        if len(stack):
+            stack[-1].t_children += duration
+
+        with self.__lock:
+            if span._name not in self.__statistics:
+                self.__statistics[span._name] = {
+                    'category': span._category, 'calls': 0, 'total_time': 0., 'self_time': 0.,
+                    'min_time': duration, 'max_time': duration, 'memory_delta': 0}
+            statistics = self.__statistics[span._name]
+            statistics['calls'] += 1
+            statistics['total_time'] += duration
+            statistics['self_time'] += duration - span.t_children
+            statistics['min_time'] = min(statistics['min_time'], duration)
+            statistics['max_time'] = max(statistics['max_time'], duration)
+            statistics['memory_delta'] += memory_delta
+
+            if self.__max_trace_events is None or len(self.__trace_events) < self.__max_trace_events:
+                self.__trace_events.append((span._name, span._category, span.t_start, duration,
+                                            threading.get_ident(), memory_delta, span._args))
+            else:
+                self.__n_dropped_trace_events += 1
+
+    def get_statistics(self):
+        """
+        Returns the aggregated statistics
+
+        Returns
+        -------
+        statistics: dict
+            for every span name a dictionary with the keys 'category', 'calls', 'total_time', 'self_time',
+            'min_time', 'max_time' (all times in seconds) and 'memory_delta' (in bytes,
+            only filled if `trace_allocations` is enabled)
+        """
+        with self.__lock:
+            return {name: dict(statistics) for name, statistics in self.__statistics.items()}
+
+    def log_summary(self, level=logging.INFO):
+        """ Logs the aggregated statistics, sorted by the time spent in each span itself """
+        statistics = self.get_statistics()
+        if not len(statistics):
+            return
+        t_total = sum(s['self_time'] for s in statistics.values())
+        lines = ["{:<50} {:>10} {:>12} {:>12} {:>7}".format("span", "calls", "total [s]", "self [s]", "self")]
+        for name, s in sorted(statistics.items(), key=lambda x: x[1]['self_time'], reverse=True):
+            lines.append("{:<50} {:>10d} {:>12.3f} {:>12.3f} {:>6.1f}%".format(
+                name[:50], s['calls'], s['total_time'], s['self_time'], 100. * s['self_time'] / max(t_total, 1e-12)))
+        logger.log(level, "profiling summary:\n" + "\n".join(lines))
+
+    def write_json(self, filename):
+        """
+        Writes the aggregated statistics into a json file
+
+        Parameters
+        ----------
+        filename: str
+        """
+        output = {
+            'pid': os.getpid(),
+            'wall_time': timer() - self.__t0,
+            'dropped_trace_events': self.__n_dropped_trace_events,
+            'spans': self.get_statistics()
+        }
+        with open(filename, 'w') as fout:
+            json.dump(output, fout, indent=1)
+
+    def write_chrome_trace(self, filename):
+        """
+        Writes all recorded spans in the Chrome trace event format
+
+        Parameters
+        ----------
+        filename: str
+        """
+        pid = os.getpid()
+        events = []
+        with self.__lock:
+            for name, category, t_start, duration, tid, memory_delta, args in self.__trace_events:
+                event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                         'ts': (t_start - self.__t0) * 1e6, 'dur': duration * 1e6}
+                if memory_delta or len(args):
+                    event['args'] = {key: str(value) for key, value in args.items()}
+                    if memory_delta:
+                        event['args']['memory_delta'] = memory_delta
+                events.append(event)
+        with open(filename, 'w') as fout:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fout)
+
+
+_profiler = Profiler()
+
+
+def get_profiler():
+    """ returns the profiler instance of this process """
+    return _profiler
+
+
+def span(name, category='', **args):
+    """
+    Returns a context manager that records the time spent in its body with the profiler of this process,
+    see `Profiler.span`
+    """
+    if not _profiler.enabled:
+        return _null_span
+    return _Span(_profiler, name, category, args)
+
+
+def profile(name=None, category=''):
+    """
+    Decorator that records every call of the decorated function as a span
+
+    Parameters
+    ----------
+    name: str or None
+        the name of the span, default is the qualified name of the function
+    category: str
+        an optional category
+    """
+
+    def decorator(function):
+        span_name = name if name is not None else function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return function(*args, **kwargs)
+            with _Span(_profiler, span_name, category, {}):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,89 @@
+"""
+Independent random number streams derived from a single seed
+
+The streams are addressed by a key, e.g. (event group id, station id, module name), and are
+derived from the seed of the run with `numpy.random.SeedSequence`. The random numbers of one stream
+therefore do not depend on which other streams were used before, i.e., on the order in which events
+are processed. This allows to split a simulation into several jobs or to resume it without changing
+the result.
+
+Example::
+
+    random_streams = RandomStreams(seed=1234)
+    rnd = random_streams.get_generator(event_group_id, station_id, 'channelGenericNoiseAdder')
+    phases = rnd.uniform(0, 2 * np.pi, 100)
+
+"""
+import zlib
+import numpy as np
+from numpy.random import Generator, Philox, SeedSequence
+
+
+class RandomStreams:
+    """
+    Derives independent random number generators from a single seed
+
+    Each generator is created from a child `numpy.random.SeedSequence` of the seed. The child is
+    identified by its spawn key, which is built from the key passed to `get_generator`. This is
+    equivalent to `SeedSequence.spawn` but does not depend on the number of children that
+    were spawned before.
+    """
+
+    def __init__(self, seed):
+        """
+        Parameters
+        ----------
+        seed: int
+            the seed of the run
+        """
+        self.__seed = seed
+        self.__seed_sequence = SeedSequence(seed)
+
+    def get_seed(self):
+        """ returns the seed of the run """
+        return self.__seed
+
+    def get_seed_sequence(self, *key):
+        """
+        Returns the seed sequence of the random number stream identified by `key`
+
+        Parameters
+        ----------
+        key: ints or strings
+            identifies the stream, e.g. the event group id, the station id and the name of a module.
+            Strings are converted into integers with a CRC32 checksum.
+
+        Returns
+        -------
+        seed_sequence: numpy.random.SeedSequence
+        """
+        spawn_key = tuple(_key_to_int(k) for k in key)
+        return SeedSequence(self.__seed_sequence.entropy, spawn_key=self.__seed_sequence.spawn_key + spawn_key)
+
+    def get_generator(self, *key):
+        """
+        Returns a new random number generator for the stream identified by `key`
+
+        Calling this function twice with the same key returns two generators that produce
+        the same sequence of random numbers.
+
+        Parameters
+        ----------
+        key: ints or strings
+            identifies the stream, e.g. the event group id, the station id and the name of a module
+
+        Returns
+        -------
+        generator: numpy.random.Generator
+        """
+        return Generator(Philox(self.get_seed_sequence(*key)))
+
+
+def _key_to_int(key):
+    """ converts an element of a stream key into a non-negative integer """
+    if isinstance(key, str):
+        return zlib.crc32(key.encode())
+    key = int(key)
+    if key < 0:
+        raise ValueError(f"stream keys have to be non-negative, got {key}")
+    return key
@@ -240,7 +240,8 @@ def delay_trace(trace, sampling_frequency, time_delay, delayed_samples=None):
     Parameters
     ----------
     trace: array of floats
-        Array containing the trace
+        Array containing the trace. Several traces with the same sampling rate
+        can be delayed at once, the time axis is the last axis.
     sampling_frequency: float
         Sampling rate for the trace
     time_delay: float
@@ -259,7 +260,7 @@ def delay_trace(trace, sampling_frequency, time_delay, delayed_samples=None):
         msg = 'Time delay must be positive'
         raise ValueError(msg)
 
-    n_samples = len(trace)
+    n_samples = trace.shape[-1]
 
     spectrum = fft.time2freq(trace, sampling_frequency)
     frequencies = np.fft.rfftfreq(n_samples, 1 / sampling_frequency)
@@ -271,7 +272,7 @@ def delay_trace(trace, sampling_frequency, time_delay, delayed_samples=None):
     init_sample = int(time_delay * sampling_frequency) + 1
 
     if delayed_samples is not None:
-        delayed_trace = delayed_trace[init_sample:None]
-        delayed_trace = delayed_trace[:delayed_samples]
+        delayed_trace = delayed_trace[..., init_sample:None]
+        delayed_trace = delayed_trace[..., :delayed_samples]
 
     return delayed_trace